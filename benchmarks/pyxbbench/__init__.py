@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Benchmark suite for PyXB binding generation, parsing and serialization.
+
+The suite generates bindings for a set of L{reference
+corpora<pyxbbench.corpora>} that exercise distinct features of the
+binding runtime, then times document parsing with C{CreateFromDocument},
+validation with C{validateBinding}, serialization with C{toxml} and
+C{writeXML}, import of the generated module in a fresh interpreter, and
+peak memory use.  Results are written as JSON so that they can be kept
+and compared across releases.
+
+Run it from the directory containing this package::
+
+  python -m pyxbbench --output results.json
+  python -m pyxbbench --baseline results.json
+
+"""
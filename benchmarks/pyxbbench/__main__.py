@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from __future__ import print_function
+import io
+import json
+import logging
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import pyxb
+import pyxb.utils.saxutils
+from pyxb.utils import six
+from pyxbbench import corpora, harness
+
+parser = optparse.OptionParser(usage="%prog [options] [corpus...]",
+                               description='Measure PyXB binding generation, parsing, validation and serialization performance on reference corpora.')
+parser.add_option('--list', action='store_true', default=False,
+                  help='List the available corpora and exit')
+parser.add_option('--scale', type='int', default=500,
+                  help='Number of records in each generated document [default: %default]')
+parser.add_option('--repeat', type='int', default=5,
+                  help='Number of timed repetitions of each operation [default: %default]')
+parser.add_option('--output', metavar='FILE',
+                  help='Write JSON results to FILE instead of standard output')
+parser.add_option('--work-dir', metavar='DIR',
+                  help='Write generated bindings to DIR and keep them; by default a temporary directory is used')
+parser.add_option('--no-import', dest='measure_import', action='store_false', default=True,
+                  help='Do not measure import time of the generated bindings')
+parser.add_option('--no-memory', dest='measure_memory', action='store_false', default=True,
+                  help='Do not measure peak memory use')
+parser.add_option('--parser-backend', choices=sorted(six.iterkeys(pyxb.utils.saxutils._ParserBackendMap)),
+                  help='SAX parser backend used for parsing documents')
+parser.add_option('--xml-style', choices=sorted(six.iterkeys(pyxb._XMLStyleMap)),
+                  help='Interface used by CreateFromDocument')
+parser.add_option('--baseline', metavar='FILE',
+                  help='Compare results with those in FILE; exit with status 1 if any regressed')
+parser.add_option('--threshold', type='float', default=0.10,
+                  help='Fractional increase over the baseline considered a regression [default: %default]')
+parser.add_option('--verbose', action='store_true', default=False,
+                  help='Log progress to standard error')
+(options, args) = parser.parse_args()
+
+logging.basicConfig(level=(options.verbose and logging.INFO or logging.WARNING))
+
+if options.list:
+    for corpus in corpora.Corpora:
+        print('%-12s %s' % (corpus.name(), corpus.description()))
+    sys.exit(0)
+
+selected = []
+for name in args:
+    corpus = corpora.CorpusMap.get(name)
+    if corpus is None:
+        parser.error('Unrecognized corpus "%s"' % (name,))
+    selected.append(corpus)
+if not selected:
+    selected = corpora.Corpora
+
+# Set through the environment so the import measurements, which run in
+# separate interpreters, see the same configuration.
+if options.parser_backend is not None:
+    os.environ[pyxb.utils.saxutils._ParserBackend_envvar] = options.parser_backend
+    pyxb.utils.saxutils.SetParserBackend()
+if options.xml_style is not None:
+    os.environ[pyxb._XMLStyle_envvar] = options.xml_style
+    pyxb._SetXMLStyle()
+
+work_dir = options.work_dir
+if work_dir is None:
+    work_dir = tempfile.mkdtemp(prefix='pyxbbench')
+elif not os.path.isdir(work_dir):
+    os.makedirs(work_dir)
+try:
+    runner = harness.Runner(work_dir, scale=options.scale, repeat=options.repeat,
+                            measure_import=options.measure_import, measure_memory=options.measure_memory)
+    results = []
+    failures = 0
+    for corpus in selected:
+        try:
+            results.append(runner.run(corpus))
+        except Exception as e:
+            logging.exception('Benchmark of %s failed', corpus.name())
+            results.append(harness.FailedResult(corpus, e))
+            failures += 1
+finally:
+    if options.work_dir is None:
+        shutil.rmtree(work_dir)
+
+report = harness.Report(results, scale=options.scale, repeat=options.repeat)
+text = json.dumps(report, indent=2, sort_keys=True)
+if options.output is None:
+    print(text)
+else:
+    with io.open(options.output, 'w', encoding='utf-8') as f:
+        f.write(six.text_type(text))
+        f.write(six.u('\n'))
+
+if options.baseline is not None:
+    with io.open(options.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = harness.Regressions(harness.Compare(baseline, report), options.threshold)
+    for (corpus, metric, bv, cv, ratio) in regressions:
+        print('REGRESSION %s %s: %g -> %g (%+.1f%%)' % (corpus, metric, bv, cv, 100.0 * (ratio - 1.0)), file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+if failures:
+    sys.exit(1)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Reference corpora for the PyXB benchmark suite.
+
+Each corpus pairs a schema with a generator for instance documents of a
+requested size.  The schemas live in the C{schemas} directory next to
+this package, or are taken from the examples distributed with PyXB, so
+the suite runs without network access.  Documents are synthesized
+deterministically so results from different runs and releases are
+comparable."""
+
+import base64
+import binascii
+import os.path
+from pyxb.utils import six
+
+_BenchmarkRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SchemaRoot = os.path.join(_BenchmarkRoot, 'schemas')
+_DistributionRoot = os.path.dirname(_BenchmarkRoot)
+
+class Corpus (object):
+    """A schema and a way to produce instance documents conforming to it.
+
+    Subclasses provide L{_generateBody}, which is invoked with the
+    number of records to emit and returns the text of the document root
+    content."""
+
+    __name = None
+    def name (self):
+        """The identifier used to select the corpus and label its results."""
+        return self.__name
+
+    __description = None
+    def description (self):
+        """A short human-readable description of what the corpus exercises."""
+        return self.__description
+
+    __schemaLocation = None
+    def schemaLocation (self):
+        """The absolute path to the schema document for the corpus."""
+        return self.__schemaLocation
+
+    __namespaceURI = None
+    def namespaceURI (self):
+        """The target namespace of the corpus schema."""
+        return self.__namespaceURI
+
+    __rootName = None
+    def rootName (self):
+        """The local name of the document element."""
+        return self.__rootName
+
+    __rootAttributes = None
+
+    def __init__ (self, name, description, schema_location, namespace_uri, root_name='document', root_attributes=''):
+        self.__name = name
+        self.__description = description
+        self.__schemaLocation = schema_location
+        self.__namespaceURI = namespace_uri
+        self.__rootName = root_name
+        self.__rootAttributes = root_attributes
+
+    def _generateBody (self, scale):
+        raise NotImplementedError('%s._generateBody' % (type(self).__name__,))
+
+    def document (self, scale):
+        """Return the text of an instance document containing C{scale}
+        records.
+
+        @rtype: C{unicode}"""
+        return six.u('<?xml version="1.0" encoding="utf-8"?>\n<ns:%s xmlns:ns="%s"%s>%s</ns:%s>') % (self.__rootName, self.__namespaceURI, self.__rootAttributes, self._generateBody(scale), self.__rootName)
+
+class _DeepCorpus (Corpus):
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            leaves = ''.join([ '<leaf id="l%d.%d"><name>leaf %d of %d</name><amount>%d</amount></leaf>' % (i, _j, _j, i, i * _j) for _j in six.moves.xrange(3) ])
+            parts.append('<level1 seq="%d"><level2><level3><level4><level5>%s</level5><tag>t%d</tag></level4></level3><tag>outer</tag></level2></level1>' % (i, leaves, i))
+        return six.u('').join(parts)
+
+class _ChoiceCorpus (Corpus):
+    __Values = ( 'text', '42', 'text', 'true', 'text', '3.25', 'text', '-7', 'text', 'token' )
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            # Visit alternatives in an order that is not simply the
+            # declaration order, so each transition looks up a different
+            # element.
+            for j in (i % 20, (i * 7) % 20, (i * 13 + 5) % 20):
+                parts.append('<c%02d>%s</c%02d>' % (j, self.__Values[j % 10], j))
+        return six.u('').join(parts)
+
+class _AllCorpus (Corpus):
+    __Order = ( 'hgfedcba', 'abcdefgh', 'bdfhaceg', 'hdbfceg', 'cgbfdh' )
+    __Values = { 'c' : '12', 'f' : '-3' }
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            order = self.__Order[i % len(self.__Order)]
+            parts.append('<record>%s</record>' % (''.join([ '<%s>%s</%s>' % (_c, self.__Values.get(_c, 'v%d' % (i,)), _c) for _c in order ]),))
+        return six.u('').join(parts)
+
+class _FacetsCorpus (Corpus):
+    __States = ( 'new', 'open', 'held', 'shipped', 'closed' )
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            shipped = ''
+            if 0 == (i % 3):
+                shipped = '<shipped>2013-%02d-%02d</shipped>' % (1 + (i % 12), 1 + (i % 28))
+            parts.append('<line state="%s"><code>%s-%04d</code><quantity>%d</quantity><price>%d.%02d</price><label>Line item %d</label><scores>%s</scores>%s</line>'
+                         % (self.__States[i % len(self.__States)], ('ABC', 'XYZ', 'QRS')[i % 3], i % 10000, 1 + (i % 99999), i, i % 100, i,
+                            ' '.join([ str(i * _k) for _k in six.moves.xrange(5) ]), shipped))
+        return six.u('').join(parts)
+
+class _SubstitutionGroupCorpus (Corpus):
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            kind = i % 3
+            if 0 == kind:
+                parts.append('<ns:ISO8601>2013-%02d-%02dT%02d:%02d:00Z</ns:ISO8601>' % (1 + (i % 12), 1 + (i % 28), i % 24, i % 60))
+            elif 1 == kind:
+                parts.append('<ns:pairTime epoch="unix"><seconds>%d</seconds><fractionalSeconds>0.%d</fractionalSeconds></ns:pairTime>' % (1000000 + i, i % 10))
+            else:
+                parts.append('<ns:label>event %d</ns:label>' % (i,))
+        return six.u('').join(parts)
+
+class _MixedCorpus (Corpus):
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            parts.append('<p>Paragraph %d has <em>emphasized <em>nested</em> text</em> and <code>x = %d</code> with a <link href="http://example.com/%d">link</link> at the end.</p>' % (i, i, i))
+        return six.u('').join(parts)
+
+class _PurchaseOrderCorpus (Corpus):
+    def _generateBody (self, scale):
+        parts = [ '<shipTo xsi:type="ns:USAddress"><name>Mary Jones</name><street>8 Elm Street</street><city>New Town</city><state>AL</state><zip>91858</zip></shipTo>',
+                  '<billTo xsi:type="ns:USAddress"><name>Robert Smith</name><street>8 Oak Avenue</street><city>Old Town</city><state>AK</state><zip>95819</zip></billTo>',
+                  '<items>' ]
+        for i in six.moves.xrange(scale):
+            comment = ''
+            if 0 == (i % 4):
+                comment = '<ns:comment>Item %d</ns:comment>' % (i,)
+            parts.append('<item partNum="%03d-AA"><productName>Product %d</productName><quantity>%d</quantity><USPrice>%d.95</USPrice>%s<shipDate>1999-12-%02d</shipDate></item>'
+                         % (i % 1000, i, 1 + (i % 99), i, comment, 1 + (i % 28)))
+        parts.append('</items>')
+        return six.u('').join(parts)
+
+class _TemporalCorpus (Corpus):
+    __Zones = ( 'Z', '+02:00', '-05:00', '', '+05:30' )
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            zone = self.__Zones[i % len(self.__Zones)]
+            stamp = '2016-%02d-%02dT%02d:%02d:%02d' % (1 + (i % 12), 1 + (i % 28), i % 24, i % 60, (i * 7) % 60)
+            parts.append('<sample stamp="%sZ"><observed>%s.%06d%s</observed><received>%s%s</received><local>%02d:%02d:%02d.%d</local><day>2016-%02d-%02d%s</day><window>PT%dM%d.%03dS</window></sample>'
+                         % (stamp, stamp, (i * 7919) % 1000000, zone, stamp, zone,
+                            i % 24, (i * 3) % 60, (i * 11) % 60, i % 10,
+                            1 + ((i * 5) % 12), 1 + ((i * 3) % 28), zone,
+                            i % 60, i % 60, i % 1000))
+        return six.u('').join(parts)
+
+class _BinaryCorpus (Corpus):
+    def _generateBody (self, scale):
+        parts = []
+        for i in six.moves.xrange(scale):
+            data = bytearray([ (i + 7 * _j) % 256 for _j in six.moves.xrange(4096 + 64 * (i % 64)) ])
+            literal = base64.encodestring(bytes(data)) if six.PY2 else base64.encodebytes(bytes(data))
+            parts.append('<record><digest>%s</digest><attachment name="a%d.bin">\n%s</attachment></record>'
+                         % (binascii.hexlify(bytes(data[:32])).decode('ascii').upper(), i, literal.decode('ascii')))
+        return six.u('').join(parts)
+
+def _SchemaPath (name):
+    return os.path.join(_SchemaRoot, name)
+
+Corpora = (
+    _DeepCorpus('deep', 'Five levels of nested complex types per record', _SchemaPath('deep.xsd'), 'urn:pyxbbench:deep'),
+    _ChoiceCorpus('choice', 'Repeated choice among twenty alternatives', _SchemaPath('choice.xsd'), 'urn:pyxbbench:choice'),
+    _AllCorpus('all', 'xs:all model group with optional members in varying order', _SchemaPath('all.xsd'), 'urn:pyxbbench:all'),
+    _FacetsCorpus('facets', 'Pattern, enumeration, range, length and digit facets', _SchemaPath('facets.xsd'), 'urn:pyxbbench:facets'),
+    _SubstitutionGroupCorpus('substgroup', 'Members of an abstract substitution group', _SchemaPath('substgroup.xsd'), 'urn:pyxbbench:substgroup'),
+    _MixedCorpus('mixed', 'Mixed content with nested inline markup', _SchemaPath('mixed.xsd'), 'urn:pyxbbench:mixed'),
+    _TemporalCorpus('temporal', 'dateTime, date, time and duration values with assorted time zones', _SchemaPath('temporal.xsd'), 'urn:pyxbbench:temporal'),
+    _BinaryCorpus('binary', 'base64Binary attachments and hexBinary digests', _SchemaPath('binary.xsd'), 'urn:pyxbbench:binary'),
+    _PurchaseOrderCorpus('ipo', 'XML Schema primer international purchase order', os.path.join(_DistributionRoot, 'examples', 'xsdprimer', 'ipo.xsd'), 'http://www.example.com/IPO',
+                         root_name='purchaseOrder', root_attributes=' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" orderDate="1999-12-01"'),
+    )
+"""The reference corpora, in the order in which they are run by default."""
+
+CorpusMap = dict([ (_c.name(), _c) for _c in Corpora ])
+"""Map from corpus name to L{Corpus} instance."""
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measurement support for the PyXB benchmark suite.
+
+A L{Runner} generates bindings for a L{corpus<pyxbbench.corpora.Corpus>},
+writes them to a work directory, and measures binding generation, module
+import, document parsing, validation and serialization.  Results are
+plain dictionaries so they can be written as JSON and compared against a
+baseline from an earlier run with L{Compare}."""
+
+import datetime
+import io
+import logging
+import os
+import os.path
+import platform
+import subprocess
+import sys
+import timeit
+import pyxb
+import pyxb.binding.generate
+import pyxb.utils.saxutils
+from pyxb.utils import six
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+_log = logging.getLogger(__name__)
+
+FormatVersion = 1
+"""Version of the result document layout.  Increment when the meaning of
+an existing key changes, so that L{Compare} does not silently compare
+incompatible measurements."""
+
+TimedMetrics = ( 'generate', 'import', 'parse', 'validate', 'toxml', 'writexml' )
+"""The keys of per-corpus results that hold timing statistics, in seconds."""
+
+MemoryMetrics = ( 'parse_peak_bytes', 'toxml_peak_bytes' )
+"""The keys of per-corpus results that hold peak allocation sizes, in bytes."""
+
+def _Statistics (samples):
+    samples = sorted(samples)
+    n = len(samples)
+    if 0 == (n % 2):
+        median = (samples[n // 2 - 1] + samples[n // 2]) / 2.0
+    else:
+        median = samples[n // 2]
+    return { 'min' : samples[0],
+             'median' : median,
+             'mean' : sum(samples) / float(n),
+             'max' : samples[-1],
+             'samples' : n }
+
+def _Time (fn, repeat):
+    """Invoke C{fn} C{repeat} times and return timing statistics along
+    with the value returned by the last invocation."""
+    samples = []
+    rv = None
+    for _ in six.moves.xrange(repeat):
+        t0 = timeit.default_timer()
+        rv = fn()
+        samples.append(timeit.default_timer() - t0)
+    return (_Statistics(samples), rv)
+
+def _PeakMemory (fn):
+    """Return the peak number of bytes allocated while invoking C{fn}, or
+    C{None} if allocation tracing is not supported by this Python."""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        fn()
+        (_, peak) = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+_ImportScript = '''
+import sys
+import timeit
+t0 = timeit.default_timer()
+import pyxb.binding.datatypes
+t1 = timeit.default_timer()
+import %s
+t2 = timeit.default_timer()
+sys.stdout.write('%%.9f %%.9f\\n' %% (t1 - t0, t2 - t1))
+'''
+
+class Runner (object):
+    """Run the benchmark measurements for one or more corpora."""
+
+    __scale = None
+    __repeat = None
+    __workDir = None
+    __measureImport = None
+    __measureMemory = None
+
+    def __init__ (self, work_dir, scale=500, repeat=5, measure_import=True, measure_memory=True):
+        """Create a runner.
+
+        @param work_dir: Directory into which generated binding modules
+        are written.  It is added to C{sys.path}.
+
+        @keyword scale: The number of records in each generated document.
+
+        @keyword repeat: The number of times each operation is timed.
+
+        @keyword measure_import: If C{False}, the cost of importing the
+        generated bindings in a fresh interpreter is not measured.
+
+        @keyword measure_memory: If C{False}, peak allocation during
+        parsing and serialization is not measured.  Tracing allocations
+        slows execution, so this is done in separate passes from the
+        timing runs."""
+        self.__workDir = work_dir
+        self.__scale = scale
+        self.__repeat = repeat
+        self.__measureImport = measure_import
+        self.__measureMemory = measure_memory
+        if work_dir not in sys.path:
+            sys.path.insert(0, work_dir)
+
+    @classmethod
+    def ModuleName (cls, corpus):
+        """The name of the generated binding module for C{corpus}."""
+        return 'pyxbbench_%s' % (corpus.name(),)
+
+    def __generateBindings (self, corpus):
+        # Some example schemas include others with relative file: URIs,
+        # which are resolved against the working directory.
+        cwd = os.getcwd()
+        try:
+            os.chdir(os.path.dirname(corpus.schemaLocation()))
+            code = pyxb.binding.generate.GeneratePython(schema_location=corpus.schemaLocation())
+        finally:
+            os.chdir(cwd)
+        module_name = self.ModuleName(corpus)
+        with io.open(os.path.join(self.__workDir, module_name + '.py'), 'w', encoding='utf-8') as f:
+            f.write(six.text_type(code))
+        return module_name
+
+    def __measureImportTime (self, module_name):
+        env = os.environ.copy()
+        path = [ self.__workDir ]
+        path.extend([ _p for _p in sys.path if _p and os.path.isdir(_p) ])
+        env['PYTHONPATH'] = os.pathsep.join(path)
+        runtime = []
+        bindings = []
+        for _ in six.moves.xrange(self.__repeat):
+            output = subprocess.check_output([ sys.executable, '-c', _ImportScript % (module_name,) ], env=env)
+            (rt, bt) = output.decode('ascii').split()
+            runtime.append(float(rt))
+            bindings.append(float(bt))
+        rv = _Statistics(bindings)
+        rv['runtime'] = _Statistics(runtime)
+        return rv
+
+    def run (self, corpus):
+        """Measure a single corpus.
+
+        @return: A dictionary with the corpus identification, document
+        size, one statistics dictionary for each of L{TimedMetrics} that
+        was measured, and each of L{MemoryMetrics} that was measured."""
+        _log.info('Benchmarking %s', corpus.name())
+        rv = { 'corpus' : corpus.name(),
+               'description' : corpus.description(),
+               'scale' : self.__scale }
+
+        t0 = timeit.default_timer()
+        module_name = self.__generateBindings(corpus)
+        rv['generate'] = _Statistics([ timeit.default_timer() - t0 ])
+
+        if self.__measureImport:
+            rv['import'] = self.__measureImportTime(module_name)
+        module = __import__(module_name)
+
+        xmld = corpus.document(self.__scale).encode('utf-8')
+        rv['document_bytes'] = len(xmld)
+
+        (rv['parse'], instance) = _Time(lambda: module.CreateFromDocument(xmld), self.__repeat)
+        (rv['validate'], _) = _Time(instance.validateBinding, self.__repeat)
+        (rv['toxml'], _) = _Time(lambda: instance.toxml('utf-8'), self.__repeat)
+        (rv['writexml'], _) = _Time(lambda: instance.writeXML(io.BytesIO(), 'utf-8'), self.__repeat)
+
+        if self.__measureMemory:
+            rv['parse_peak_bytes'] = _PeakMemory(lambda: module.CreateFromDocument(xmld))
+            rv['toxml_peak_bytes'] = _PeakMemory(lambda: instance.toxml('utf-8'))
+        return rv
+
+def FailedResult (corpus, exc):
+    """Return the result recorded for a corpus that could not be measured.
+
+    @return: A dictionary with the corpus identification and an C{error}
+    key describing C{exc}, and no measurements."""
+    return { 'corpus' : corpus.name(),
+             'description' : corpus.description(),
+             'error' : '%s: %s' % (type(exc).__name__, exc) }
+
+def Environment ():
+    """Describe the interpreter and PyXB configuration the results were
+    obtained with."""
+    return { 'pyxb_version' : pyxb.__version__,
+             'python_version' : platform.python_version(),
+             'python_implementation' : platform.python_implementation(),
+             'platform' : platform.platform(),
+             'parser_backend' : pyxb.utils.saxutils._ParserBackendMapReverse[pyxb.utils.saxutils._ParserBackend],
+             'xml_style' : pyxb._XMLStyleMapReverse[pyxb._XMLStyle],
+             'timestamp' : datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ') }
+
+def Report (results, **options):
+    """Assemble the complete result document for a set of per-corpus
+    results.  Keyword arguments are recorded as the run options."""
+    return { 'format_version' : FormatVersion,
+             'environment' : Environment(),
+             'options' : options,
+             'results' : results }
+
+def Compare (baseline, current):
+    """Compare two result documents produced by L{Report}.
+
+    Timings are compared using the minimum sample, which is least affected
+    by unrelated system load.  Memory is compared directly.
+
+    @return: A list of C{(corpus, metric, baseline, current, ratio)}
+    tuples, one for each measurement present in both documents, where
+    C{ratio} is C{current / baseline}.
+
+    @raise pyxb.UsageError: the documents have different format versions."""
+    if baseline.get('format_version') != current.get('format_version'):
+        raise pyxb.UsageError('Cannot compare benchmark format %s with %s' % (baseline.get('format_version'), current.get('format_version')))
+    base_map = dict([ (_r['corpus'], _r) for _r in baseline['results'] ])
+    rv = []
+    for cur in current['results']:
+        base = base_map.get(cur['corpus'])
+        if base is None:
+            continue
+        for metric in TimedMetrics + MemoryMetrics:
+            (bv, cv) = (base.get(metric), cur.get(metric))
+            if isinstance(bv, dict):
+                bv = bv['min']
+            if isinstance(cv, dict):
+                cv = cv['min']
+            if not bv or cv is None:
+                continue
+            rv.append((cur['corpus'], metric, bv, cv, float(cv) / bv))
+    return rv
+
+def Regressions (comparison, threshold=0.10):
+    """Filter the output of L{Compare} to the measurements that grew by
+    more than C{threshold}."""
+    return [ _c for _c in comparison if _c[4] > (1.0 + threshold) ]
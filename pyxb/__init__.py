@@ -26,6 +26,7 @@ submodules:
 """
 
 import logging
+import threading
 from pyxb.utils import six
 
 _log = logging.getLogger(__name__)
@@ -123,7 +124,14 @@ a DOM model, XMLStyle_saxdom will be used for pyxb.utils.domutils.StringToDOM
 if this style is selected."""
 
 _XMLStyle = XMLStyle_saxer
-"""The current XML processing style."""
+"""The process-wide XML processing style.
+
+Code that parses documents should use L{_CurrentXMLStyle}, which also
+honors an override made by the calling thread."""
+
+# Per-thread state, such as XML style and validation overrides, that
+# must not leak between threads parsing documents concurrently.
+_ThreadState = threading.local()
 
 _XMLStyleMap = { 'minidom' : XMLStyle_minidom,
                  'saxdom' : XMLStyle_saxdom,
@@ -132,7 +140,7 @@ _XMLStyleMapReverse = dict([ (_v, _k) for (_k, _v) in six.iteritems(_XMLStyleMap
 
 _XMLStyle_envvar = 'PYXB_XML_STYLE'
 
-def _SetXMLStyle (style=None):
+def _SetXMLStyle (style=None, thread_only=False):
     """Set the interface used to parse XML content.
 
     This can be invoked within code.  The system default of L{XMLStyle_saxer}
@@ -141,8 +149,17 @@ def _SetXMLStyle (style=None):
 
     @param style: One of L{XMLStyle_minidom}, L{XMLStyle_saxdom},
     L{XMLStyle_saxer}.  If not provided, the system default is used.
+
+    @keyword thread_only: If C{True}, the style applies only to the calling
+    thread, overriding the process-wide style until it is changed again.  In
+    this case a C{style} of C{None} removes the override.
     """
     global _XMLStyle
+    if thread_only:
+        if (style is not None) and (_XMLStyleMapReverse.get(style) is None):
+            raise PyXBException('Bad value %s for _SetXMLStyle' % (style,))
+        _ThreadState.xml_style = style
+        return
     if style is None:
         import os
         style_name = os.environ.get(_XMLStyle_envvar)
@@ -157,6 +174,16 @@ def _SetXMLStyle (style=None):
 
 _SetXMLStyle()
 
+def _CurrentXMLStyle ():
+    """Return the XML processing style in effect for the calling thread.
+
+    This is the style set with C{thread_only} in L{_SetXMLStyle} if there is
+    one, otherwise the process-wide style."""
+    style = getattr(_ThreadState, 'xml_style', None)
+    if style is None:
+        return _XMLStyle
+    return style
+
 # Global flag that we can use to determine whether optimization is active in
 # this session.  There may be cases where we can bypass methods that just
 # check for things we don't care about in an optimized context
@@ -197,6 +224,9 @@ class ValidationConfig (object):
     L{invalidElementInContent} control how
     L{pyxb.binding.basis.complexTypeDefinition.orderedContent} affects
     generated documents.
+
+    L{identityConstraints} controls whether identity constraints are
+    checked when parsing documents.
     """
 
     __forBinding = True
@@ -302,6 +332,29 @@ class ValidationConfig (object):
         self.__invalidElementInContent = value
     invalidElementInContent = property(__getInvalidElementInContent)
 
+    __identityConstraints = NEVER
+    def __getIdentityConstraints (self):
+        """How identity constraints and ID/IDREF values are handled when
+        parsing a document.
+
+        With L{NEVER} (default) nothing is done.  Otherwise the parser
+        builds a L{pyxb.binding.identity.IdentityIndex} for the document,
+        available from the document element through
+        L{pyxb.binding.basis._TypeBinding_mixin._identityIndex}.  With
+        L{IGNORE_ONCE} problems are only recorded in the index; with
+        L{RAISE_EXCEPTION} the first problem is raised at the end of the
+        document.
+
+        The value is one of L{NEVER} (default), L{IGNORE_ONCE},
+        L{RAISE_EXCEPTION}."""
+        return self.__identityConstraints
+    def _setIdentityConstraints (self, value):
+        """Set the value of L{identityConstraints}."""
+        if not (value in ( self.NEVER, self.IGNORE_ONCE, self.RAISE_EXCEPTION )):
+            raise ValueError(value)
+        self.__identityConstraints = value
+    identityConstraints = property(__getIdentityConstraints)
+
     def copy (self):
         """Make a copy of this instance.
 
@@ -310,7 +363,93 @@ class ValidationConfig (object):
         import copy
         return copy.copy(self)
 
-GlobalValidationConfig = ValidationConfig()
+class _GlobalValidationConfig (ValidationConfig):
+    """The class of L{GlobalValidationConfig}.
+
+    Changes made through the inherited setters apply to the whole process.  A
+    thread may instead install its own L{ValidationConfig} with
+    L{setThreadConfig}; until that is removed, every setting read through
+    this object in that thread comes from the thread configuration.  This
+    allows, for example, one request handler to parse without validation
+    while others continue to validate."""
+
+    def threadConfig (self):
+        """Return the configuration installed for the calling thread, or
+        C{None} if the process-wide settings are in effect."""
+        return getattr(_ThreadState, 'validation_config', None)
+
+    def setThreadConfig (self, config):
+        """Install C{config} as the validation configuration for the calling
+        thread.
+
+        @param config: A L{ValidationConfig} instance, or C{None} to revert to
+        the process-wide settings.  A convenient starting point is
+        C{pyxb.GlobalValidationConfig.copy()}.
+
+        @return: the previously installed thread configuration, so it can be
+        restored."""
+        if not ((config is None) or isinstance(config, ValidationConfig)):
+            raise TypeError(config)
+        if config is self:
+            config = None
+        previous = self.threadConfig()
+        _ThreadState.validation_config = config
+        return previous
+
+    def copy (self):
+        """Make a copy of the settings in effect for the calling thread.
+
+        The copy is a plain L{ValidationConfig}."""
+        config = self.threadConfig()
+        if config is not None:
+            return config.copy()
+        rv = ValidationConfig()
+        rv.__dict__.update(self.__dict__)
+        return rv
+
+    def __getForBinding (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).forBinding
+        return config.forBinding
+    forBinding = property(__getForBinding)
+
+    def __getForDocument (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).forDocument
+        return config.forDocument
+    forDocument = property(__getForDocument)
+
+    def __getContentInfluencesGeneration (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).contentInfluencesGeneration
+        return config.contentInfluencesGeneration
+    contentInfluencesGeneration = property(__getContentInfluencesGeneration)
+
+    def __getOrphanElementInContent (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).orphanElementInContent
+        return config.orphanElementInContent
+    orphanElementInContent = property(__getOrphanElementInContent)
+
+    def __getInvalidElementInContent (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).invalidElementInContent
+        return config.invalidElementInContent
+    invalidElementInContent = property(__getInvalidElementInContent)
+
+    def __getIdentityConstraints (self):
+        config = self.threadConfig()
+        if config is None:
+            return super(_GlobalValidationConfig, self).identityConstraints
+        return config.identityConstraints
+    identityConstraints = property(__getIdentityConstraints)
+
+GlobalValidationConfig = _GlobalValidationConfig()
 
 _GenerationRequiresValid = True
 """Legacy flag; prefer L{forDocument<ValidationConfig.forDocument>} in L{GlobalValidationConfig}."""
@@ -383,6 +522,50 @@ def PreserveInputTimeZone (value=None):
     _PreserveInputTimeZone = value
     return _PreserveInputTimeZone
 
+_EagerAutomatonBuild_envvar = 'PYXB_EAGER_AUTOMATA'
+
+_EagerAutomatonBuild = False
+"""If C{True}, content model automata are built when binding modules are
+imported.  See L{EagerAutomatonBuild}."""
+
+def EagerAutomatonBuild (value=None):
+    """Query or set a flag that controls when content model automata are built.
+
+    Generated binding modules register a builder for the
+    L{pyxb.utils.fac.Automaton} that validates the content of each complex
+    type.  Normally the automaton is constructed the first time an instance
+    of the type has its content validated, so importing a large module does
+    not pay for content models that are never used.  A process that forks
+    workers may prefer to pay this cost once in the parent; enabling this
+    flag builds all automata that have been registered so far, and causes
+    those in subsequently imported modules to be built at import time.
+
+    The initial value of the flag is C{True} if the environment variable
+    C{PYXB_EAGER_AUTOMATA} is set to a non-empty value other than C{0}.
+
+    @keyword value: If absent or C{None}, no change is made; otherwise, this
+    enables (C{True}) or disables (C{False}) eager construction.
+    @type value: C{bool}
+
+    @return: C{True} iff automata are built at import time."""
+    global _EagerAutomatonBuild
+    if value is None:
+        return _EagerAutomatonBuild
+    if not isinstance(value, bool):
+        raise TypeError(value)
+    _EagerAutomatonBuild = value
+    if value:
+        import pyxb.binding.basis
+        pyxb.binding.basis.complexTypeDefinition._BuildDeferredAutomata()
+    return _EagerAutomatonBuild
+
+def _InitEagerAutomatonBuild ():
+    import os
+    global _EagerAutomatonBuild
+    _EagerAutomatonBuild = os.environ.get(_EagerAutomatonBuild_envvar, '0') not in ('', '0')
+
+_InitEagerAutomatonBuild()
+
 _OutputEncoding = 'utf-8'
 """Default unicode encoding to use when creating output.
 
@@ -406,7 +589,7 @@ def NonElementContent (instance):
     @return: an iterator producing text values
     """
     import pyxb.binding.basis
-    return pyxb.binding.basis.NonElementContent.ContentIterator(instance.orderedContent())
+    return pyxb.binding.basis.NonElementContent.ContentIterator(instance._orderedContent())
 
 ## Local Variables:
 ## fill-column:78
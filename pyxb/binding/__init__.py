@@ -8,6 +8,7 @@ from . import basis
 from . import datatypes
 from . import facets
 from . import content
+from . import identity
 
 # Do not include the stuff that's required only for code generation
 # noimport generate
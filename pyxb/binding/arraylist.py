@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module supports holding the values of numeric list types in NumPy
+arrays.
+
+A list simple type such as C{gml:doubleList} is normally represented by a
+L{pyxb.binding.basis.STD_list} holding one binding instance for each item.
+For lists with many items (coordinates in C{gml:posList}, for example) the
+cost of creating and validating those instances dominates conversion.
+
+L{EnableArrayStorage} registers a L{superseding
+class<pyxb.binding.basis._DynamicCreate_mixin._SetSupersedingClass>} for a
+list binding whose item type derives from C{xs:double}, C{xs:float},
+C{xs:integer}, or C{xs:int}.  Instances of the superseding class created
+from a lexical representation or from a NumPy array hold their items in a
+read-only array: the text is converted in a single operation, the
+constraining facets of the item type are checked on the array as a whole,
+and the lexical representation is generated from the array.  Values that
+the array cannot represent (for example, an C{xs:integer} that does not fit
+in 64 bits) are held as an ordinary list.
+
+An array-backed instance is still a list of the binding type.  Reading an
+item produces a new instance of the item type.  The first operation that
+modifies the list converts it to an ordinary list of item instances.
+Operations implemented in C that access the storage of a list directly
+(such as the C{json} encoder) do not see the items of an array-backed
+instance; use L{ArrayStorage_mixin.asArray} or C{list()} to obtain them.
+
+NumPy is required only when array storage is enabled."""
+
+import logging
+import pyxb
+import pyxb.binding.basis as basis
+import pyxb.binding.datatypes as datatypes
+import pyxb.binding.facets as facets
+from pyxb.utils import six
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_log = logging.getLogger(__name__)
+
+def _RequireNumPy ():
+    if numpy is None:
+        raise pyxb.PyXBException('Array storage requires the numpy package')
+
+def _ArrayDtype (item_type):
+    """Return the NumPy dtype used to hold items of the given type, or
+    C{None} if array storage is not supported for it."""
+    if issubclass(item_type, datatypes._fp):
+        # xs:float values are held in double precision elsewhere in PyXB,
+        # so use that here too.
+        return numpy.dtype(numpy.float64)
+    if issubclass(item_type, datatypes.unsignedLong):
+        return numpy.dtype(numpy.uint64)
+    if issubclass(item_type, (datatypes.integer, datatypes.int)):
+        return numpy.dtype(numpy.int64)
+    return None
+
+def SupportsArrayStorage (binding):
+    """Return C{True} iff array storage can be enabled for the given
+    binding class."""
+    if not (isinstance(binding, type) and issubclass(binding, basis.STD_list)):
+        return False
+    item_type = binding._ItemType
+    if (item_type is None) or issubclass(item_type, (basis.STD_union, basis.STD_list)):
+        return False
+    _RequireNumPy()
+    return _ArrayDtype(item_type) is not None
+
+def EnableArrayStorage (binding):
+    """Hold the values of the given list binding in NumPy arrays.
+
+    A subclass of the L{superseding class
+    <pyxb.binding.basis._DynamicCreate_mixin._SupersedingClass>} of
+    C{binding} that incorporates L{ArrayStorage_mixin} is created and
+    installed as the new superseding class, so it is used for values
+    created by L{Factory<pyxb.binding.basis._TypeBinding_mixin.Factory>}
+    and when converting documents.  Derived list types are not affected.
+
+    @param binding: A subclass of L{pyxb.binding.basis.STD_list} for which
+    L{SupportsArrayStorage} is C{True}
+
+    @return: The array-backed class
+
+    @raise pyxb.PyXBException: NumPy is not available
+    @raise pyxb.UsageError: array storage is not supported for C{binding}
+    """
+    _RequireNumPy()
+    if not SupportsArrayStorage(binding):
+        raise pyxb.UsageError('Array storage is not supported for %s' % (binding,))
+    superseding = binding._SupersedingClass()
+    if issubclass(superseding, ArrayStorage_mixin):
+        return superseding
+    array_class = type(superseding.__name__, (ArrayStorage_mixin, superseding),
+                       { '__module__' : superseding.__module__,
+                         '_ArrayBinding' : binding,
+                         '_ArrayPriorSupersedingClass' : superseding,
+                         '_ArrayDtype' : _ArrayDtype(binding._ItemType) })
+    binding._SetSupersedingClass(array_class)
+    return array_class
+
+def DisableArrayStorage (binding):
+    """Revert the effect of L{EnableArrayStorage} on the given binding.
+
+    Existing array-backed values are unaffected."""
+    superseding = binding._SupersedingClass()
+    if issubclass(superseding, ArrayStorage_mixin):
+        prior = superseding._ArrayPriorSupersedingClass
+        if prior is binding:
+            prior = None
+        binding._SetSupersedingClass(prior)
+
+def EnableModuleArrayStorage (module):
+    """Enable array storage for every list binding defined in the given
+    binding module that supports it.
+
+    @return: The list bindings for which array storage was enabled"""
+    _RequireNumPy()
+    bindings = []
+    for value in six.itervalues(vars(module)):
+        if isinstance(value, type) and (value.__module__ == module.__name__) and SupportsArrayStorage(value):
+            bindings.append(value)
+    for binding in bindings:
+        EnableArrayStorage(binding)
+    return bindings
+
+def _RestoreList (binding, array, items):
+    """Reconstruct a pickled list value.
+
+    The value is created as an instance of the current superseding class of
+    C{binding}, which need not support array storage."""
+    cls = binding._SupersedingClass()
+    rv = cls.__new__(cls)
+    if array is None:
+        six.list_type.extend(rv, items)
+    elif issubclass(cls, ArrayStorage_mixin):
+        rv._setArray(array)
+    else:
+        item_type = binding._ItemType
+        six.list_type.extend(rv, [ item_type(_v, _validate_constraints=False) for _v in array.tolist() ])
+    return rv
+
+class ArrayStorage_mixin (pyxb.cscRoot):
+    """Mix-in for a L{pyxb.binding.basis.STD_list} subclass that holds its
+    items in a NumPy array.
+
+    Classes that incorporate this are created by L{EnableArrayStorage}.
+    Instances created from a string or a NumPy array hold their items in a
+    read-only array; others hold them in the list."""
+
+    _ArrayBinding = None
+    """The list binding for which this class was created."""
+
+    _ArrayPriorSupersedingClass = None
+    """The superseding class of L{_ArrayBinding} before this class replaced it."""
+
+    _ArrayDtype = None
+    """The NumPy dtype of the array holding the items."""
+
+    # The read-only array holding the items, or None if they are held in
+    # the list.
+    __array = None
+
+    # Cache of the vectorized item constraint checks, keyed by class.  Each
+    # entry is qualified by the constraint validator of the item type, which
+    # is replaced whenever a facet is reconfigured.
+    __ItemChecks = { }
+
+    def _arrayStorage (self):
+        """Return the array holding the items of this instance, or C{None}
+        if they are held in the list."""
+        return self.__array
+
+    def _setArray (self, array):
+        array.flags.writeable = False
+        self.__array = array
+
+    def asArray (self):
+        """Return the items of this instance as a NumPy array.
+
+        For an array-backed instance this is the read-only array holding the
+        items; copy it to make changes."""
+        if self.__array is not None:
+            return self.__array
+        return numpy.array(six.list_type(self), dtype=self._ArrayDtype)
+
+    def __array__ (self, dtype=None, copy=None):
+        return numpy.asarray(self.asArray(), dtype=dtype)
+
+    def _materialize (self):
+        """Replace the array holding the items with item instances held in
+        the list."""
+        array = self.__array
+        if array is not None:
+            item_type = self._ItemType
+            self.__array = None
+            six.list_type.extend(self, [ item_type(_v, _validate_constraints=False) for _v in array.tolist() ])
+
+    @classmethod
+    def __ItemCheckSequence (cls):
+        item_type = cls._ItemType
+        validator = item_type._ConstraintValidator()
+        cached = cls.__ItemChecks.get(cls)
+        if (cached is not None) and (cached[0] is validator):
+            return cached[1]
+        integral = (cls._ArrayDtype.kind in 'iu')
+        (facet_values, complete) = item_type._ClassFacetSequence()
+        checks = []
+        for facet in facet_values:
+            if facet.compileValidator() is None:
+                continue
+            check = cls.__VectorCheck(facet, integral)
+            if check is not None:
+                checks.append((facet, check))
+        checks = tuple(checks)
+        if complete:
+            cls.__ItemChecks[cls] = (validator, checks)
+        return checks
+
+    @classmethod
+    def __VectorCheck (cls, facet, integral):
+        # Return a function that takes an array and returns an array of
+        # booleans indicating which items satisfy the facet, or None if
+        # the facet cannot be violated by a value held in the array.
+        if isinstance(facet, (facets.CF_pattern, facets.CF_whiteSpace)):
+            # Patterns are not applied to non-string values.
+            return None
+        if isinstance(facet, facets.CF_minInclusive):
+            bound = facet.value()
+            return lambda _a: _a >= bound
+        if isinstance(facet, facets.CF_maxInclusive):
+            bound = facet.value()
+            return lambda _a: _a <= bound
+        if isinstance(facet, facets.CF_minExclusive):
+            bound = facet.value()
+            return lambda _a: _a > bound
+        if isinstance(facet, facets.CF_maxExclusive):
+            bound = facet.value()
+            return lambda _a: _a < bound
+        if isinstance(facet, facets.CF_fractionDigits) and integral:
+            return None
+        if isinstance(facet, facets.CF_totalDigits) and integral:
+            scale = 10 ** facet.value()
+            if scale > numpy.iinfo(cls._ArrayDtype).max:
+                return None
+            return lambda _a: (_a < scale) & (_a > -scale)
+        if isinstance(facet, facets.CF_enumeration):
+            values = numpy.array(facet.values(), dtype=cls._ArrayDtype)
+            return lambda _a: numpy.isin(_a, values)
+        # Anything else is checked one item at a time.
+        validator = facet.compileValidator()
+        item_type = cls._ItemType
+        def check (array):
+            return numpy.array([ validator(item_type(_v, _validate_constraints=False)) for _v in array.tolist() ], dtype=bool)
+        return check
+
+    @classmethod
+    def _ArrayFromValue (cls, value, location=None):
+        """Return an array holding the items of the given value, or C{None}
+        if the value cannot be held in an array.
+
+        @param value: A string comprising the lexical representation of the
+        list, or a NumPy array
+
+        @raise pyxb.SimpleListValueError: an item does not satisfy the
+        constraints of the item type."""
+        tokens = None
+        try:
+            if isinstance(value, six.string_types):
+                kind = cls._ArrayDtype.kind
+                if (('u' == kind) and ('-' in value)) or (('i' == kind) and (('l' in value) or ('L' in value))):
+                    # Older versions of NumPy wrap negative values into
+                    # unsigned types and accept Python 2 long literals.
+                    return None
+                tokens = value.split()
+                array = numpy.array(tokens, dtype=cls._ArrayDtype)
+            elif isinstance(value, numpy.ndarray) and (1 == value.ndim) and numpy.can_cast(value.dtype, cls._ArrayDtype):
+                array = value.astype(cls._ArrayDtype)
+            else:
+                return None
+        except (ValueError, OverflowError, TypeError):
+            # Let the item type decide what to make of it.
+            return None
+        if cls._GetValidationConfig().forBinding:
+            for (facet, check) in cls.__ItemCheckSequence():
+                valid = check(array)
+                if not valid.all():
+                    ix = int(numpy.argmin(valid))
+                    item = array[ix].item() if tokens is None else tokens[ix]
+                    raise pyxb.SimpleListValueError(cls, item, location)
+        return array
+
+    @classmethod
+    def _ConvertArguments_vx (cls, args, kw):
+        content = kw.pop('_array_content', None)
+        if (content is not None) and (0 < len(args)):
+            array = cls._ArrayFromValue(args[0], kw.get('_location'))
+            if array is not None:
+                content.append(array)
+                # The list itself remains empty.
+                return ((),) + args[1:]
+        return super(ArrayStorage_mixin, cls)._ConvertArguments_vx(args, kw)
+
+    def __init__ (self, *args, **kw):
+        # The array is passed out of _ConvertArguments_vx through the
+        # keywords, since that is where the arguments are converted.
+        # Constraints are validated once it is in place.
+        validate_constraints = kw.pop('_validate_constraints', self._validationConfig.forBinding)
+        content = []
+        kw['_array_content'] = content
+        super(ArrayStorage_mixin, self).__init__(_validate_constraints=False, *args, **kw)
+        if content:
+            self._setArray(content[0])
+        if validate_constraints and not kw.get('_nil', False):
+            self.xsdConstraintsOK(kw.get('_location'))
+
+    @classmethod
+    def _CheckValidValue (cls, value):
+        if isinstance(value, ArrayStorage_mixin) and (value._arrayStorage() is not None):
+            array = value._arrayStorage()
+            for (facet, check) in cls.__ItemCheckSequence():
+                valid = check(array)
+                if not valid.all():
+                    raise pyxb.SimpleListValueError(cls, array[int(numpy.argmin(valid))].item())
+            cls.XsdConstraintsOK(value)
+            return
+        super(ArrayStorage_mixin, cls)._CheckValidValue(value)
+
+    @classmethod
+    def XsdLiteral (cls, value):
+        if isinstance(value, ArrayStorage_mixin) and (value._arrayStorage() is not None):
+            return ' '.join(map(cls._ItemType.XsdLiteral, value._arrayStorage().tolist()))
+        return super(ArrayStorage_mixin, cls).XsdLiteral(value)
+
+    def __reduce_ex__ (self, protocol):
+        # Reconstruct through the list binding, since this class cannot be
+        # located by name.
+        array = self.__array
+        items = None
+        if array is None:
+            items = six.list_type(self)
+        state = self.__getstate__()
+        if isinstance(state, tuple):
+            state[0].pop('_ArrayStorage_mixin__array', None)
+        else:
+            state.pop('_ArrayStorage_mixin__array', None)
+        return (_RestoreList, (self._ArrayBinding, array, items), state)
+
+    # Operations that read the list
+
+    def __len__ (self):
+        if self.__array is not None:
+            return len(self.__array)
+        return super(ArrayStorage_mixin, self).__len__()
+
+    def __iter__ (self):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).__iter__()
+        item_type = self._ItemType
+        return (item_type(_v, _validate_constraints=False) for _v in self.__array.tolist())
+
+    def __reversed__ (self):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).__reversed__()
+        item_type = self._ItemType
+        return (item_type(_v, _validate_constraints=False) for _v in reversed(self.__array.tolist()))
+
+    def __getitem__ (self, key):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).__getitem__(key)
+        item_type = self._ItemType
+        if isinstance(key, slice):
+            return [ item_type(_v, _validate_constraints=False) for _v in self.__array[key].tolist() ]
+        return item_type(self.__array[key].item(), _validate_constraints=False)
+
+    if six.PY2:
+        def __getslice__ (self, start, end):
+            return self.__getitem__(slice(max(0, start), max(0, end)))
+
+    def __contains__ (self, item):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).__contains__(item)
+        return bool((self.__array == self._ValidatedItem(item)).any())
+
+    def count (self, x):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).count(x)
+        return int((self.__array == self._ValidatedItem(x)).sum())
+
+    def index (self, x, *args):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).index(x, *args)
+        return self.__array.tolist().index(self._ValidatedItem(x), *args)
+
+    def copy (self):
+        return six.list_type(self)
+
+    def __values (self):
+        if self.__array is None:
+            return six.list_type(self)
+        return self.__array.tolist()
+
+    def __eq__ (self, other):
+        return self.__values() == other
+
+    def __ne__ (self, other):
+        return self.__values() != other
+
+    def __lt__ (self, other):
+        return self.__values() < other
+
+    def __le__ (self, other):
+        return self.__values() <= other
+
+    def __gt__ (self, other):
+        return self.__values() > other
+
+    def __ge__ (self, other):
+        return self.__values() >= other
+
+    __hash__ = None
+
+    def __add__ (self, other):
+        return six.list_type(self) + other
+
+    def __radd__ (self, other):
+        return other + six.list_type(self)
+
+    def __mul__ (self, n):
+        return six.list_type(self) * n
+
+    __rmul__ = __mul__
+
+    def __repr__ (self):
+        if self.__array is None:
+            return super(ArrayStorage_mixin, self).__repr__()
+        return repr(six.list_type(self))
+
+    # Operations that modify the list
+
+    def __setitem__ (self, key, value):
+        self._materialize()
+        super(ArrayStorage_mixin, self).__setitem__(key, value)
+
+    def __delitem__ (self, key):
+        self._materialize()
+        super(ArrayStorage_mixin, self).__delitem__(key)
+
+    if six.PY2:
+        def __setslice__ (self, start, end, values):
+            self._materialize()
+            super(ArrayStorage_mixin, self).__setslice__(start, end, values)
+
+        def __delslice__ (self, start, end):
+            self._materialize()
+            super(ArrayStorage_mixin, self).__delslice__(start, end)
+
+    def __iadd__ (self, other):
+        self._materialize()
+        return super(ArrayStorage_mixin, self).__iadd__(other)
+
+    def __imul__ (self, n):
+        self._materialize()
+        return super(ArrayStorage_mixin, self).__imul__(n)
+
+    def append (self, x):
+        self._materialize()
+        super(ArrayStorage_mixin, self).append(x)
+
+    def extend (self, x, _from_xml=False):
+        self._materialize()
+        super(ArrayStorage_mixin, self).extend(x, _from_xml=_from_xml)
+
+    def insert (self, i, x):
+        self._materialize()
+        super(ArrayStorage_mixin, self).insert(i, x)
+
+    def remove (self, x):
+        self._materialize()
+        super(ArrayStorage_mixin, self).remove(x)
+
+    def pop (self, *args):
+        self._materialize()
+        return super(ArrayStorage_mixin, self).pop(*args)
+
+    def sort (self, *args, **kw):
+        self._materialize()
+        super(ArrayStorage_mixin, self).sort(*args, **kw)
+
+    def reverse (self):
+        self._materialize()
+        super(ArrayStorage_mixin, self).reverse()
+
+    def clear (self):
+        self.__array = None
+        del self[:]
@@ -18,6 +18,8 @@ inherit, and that describe the content models of those schema."""
 
 import logging
 import collections
+import threading
+import weakref
 import xml.dom
 import pyxb
 from pyxb.utils import domutils, utility, six
@@ -27,6 +29,48 @@ import decimal
 
 _log = logging.getLogger(__name__)
 
+class _ValidationTracking_mixin (object):
+    """Mix-in for values that may be changed in place after a containing
+    binding instance has been validated.
+
+    A L{complexTypeDefinition} instance remembers that it has been validated,
+    so that validating it again, or generating a document from it, need not
+    repeat the work unless its content changes.  When it validates, it
+    registers itself with each such value it holds through
+    L{_addValidationDependent}.  Changing the value invokes
+    L{_invalidateValidation}, which discards the registrations and
+    invalidates each registered container in turn, so a change anywhere in a
+    binding tree invalidates exactly the instances on the path to its root.
+
+    Containers are held through weak references, and the registrations are
+    not preserved when the value is pickled or copied."""
+
+    # None, or a list of weak references to registered containers
+    __validationDependents = None
+
+    def _addValidationDependent (self, container):
+        """Record that the validation of C{container} depends on the
+        current value of this instance."""
+        dependents = self.__validationDependents
+        if dependents is None:
+            self.__validationDependents = [ weakref.ref(container) ]
+            return
+        for ref in dependents:
+            if ref() is container:
+                return
+        dependents.append(weakref.ref(container))
+
+    def _invalidateValidation (self):
+        """Discard any record that this instance, or a container that
+        depends on it, has been validated."""
+        dependents = self.__validationDependents
+        if dependents is not None:
+            self.__validationDependents = None
+            for ref in dependents:
+                container = ref()
+                if container is not None:
+                    container._invalidateValidation()
+
 class _TypeBinding_mixin (utility.Locatable_mixin):
     # Private member holding the validation configuration that applies to the
     # class or instance.  Can't really make it private with __ prefix because
@@ -90,7 +134,7 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
     _XSDLocation = None
     """Where the definition can be found in the originating schema."""
 
-    _ReservedSymbols = set([ 'validateBinding', 'toDOM', 'toxml', 'Factory', 'property' ])
+    _ReservedSymbols = set([ 'validateBinding', 'toDOM', 'toxml', 'writeXML', 'Factory', 'property' ])
 
     if pyxb._CorruptionDetectionEnabled:
         def __setattr__ (self, name, value):
@@ -121,11 +165,60 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
         return self.__namespaceContext
     def _setNamespaceContext (self, namespace_context):
         """Associate a L{namespace context <pyxb.binding.NamespaceContext>}
-        with the binding instance."""
-        self.__namespaceContext = namespace_context
+        with the binding instance.
+
+        Ignored if L{_CompactInstances} is set."""
+        if not self._CompactInstances:
+            self.__namespaceContext = namespace_context
         return self
     __namespaceContext = None
 
+    _CompactInstances = False
+    """If C{True}, instances of the class do not retain their location or
+    namespace context, and complex type instances without mixed content do
+    not record element content in their L{orderedContent
+    <complexTypeDefinition.orderedContent>}.  This reduces the memory
+    required for each instance.  Generated bindings set this when
+    C{pyxbgen} is invoked with C{--compact-instances}."""
+
+    # Instance attributes that are not preserved when an instance is pickled.
+    # They describe how the instance was produced rather than its value, and
+    # bring along large object graphs.
+    _PickleTransient = frozenset([ '_Locatable_mixin__location', '_TypeBinding_mixin__namespaceContext',
+                                   '_TypeBinding_mixin__identityIndex',
+                                   '_ValidationTracking_mixin__validationDependents' ])
+
+    def __getstate__ (self):
+        """Support pickling.
+
+        The state excludes the L{location<_location>} and L{namespace
+        context<_namespaceContext>} of the instance, along with anything else
+        named in C{_PickleTransient}.  Element bindings and element
+        declarations referenced by the instance are pickled by reference, so
+        the module that defines them must be importable where the instance is
+        unpickled."""
+        transient = self._PickleTransient
+        state = dict([ (_k, _v) for (_k, _v) in six.iteritems(getattr(self, '__dict__', {})) if not (_k in transient) ])
+        slots = None
+        for cls in type(self).mro():
+            for name in cls.__dict__.get('__slots__', ()):
+                if (name in transient) or (name in ('__dict__', '__weakref__')):
+                    continue
+                try:
+                    value = getattr(self, name)
+                except AttributeError:
+                    continue
+                if slots is None:
+                    slots = {}
+                slots[name] = value
+        if slots is None:
+            return state
+        return (state, slots)
+
+    def _setLocation (self, location):
+        if not self._CompactInstances:
+            super(_TypeBinding_mixin, self)._setLocation(location)
+
     def _setElement (self, elt):
         """Associate an element binding with the instance.
 
@@ -151,6 +244,19 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
         return self.__element
     __element = None
 
+    def _identityIndex (self):
+        """Return the L{pyxb.binding.identity.IdentityIndex} built while
+        parsing the document of which this instance is the document
+        element.
+
+        @return: C{None} unless the index was requested through
+        L{pyxb.ValidationConfig.identityConstraints}"""
+        return self.__identityIndex
+    def _setIdentityIndex (self, identity_index):
+        self.__identityIndex = identity_index
+        return self
+    __identityIndex = None
+
     __xsiNil = None
     def _isNil (self):
         """Indicate whether this instance is U{nil
@@ -183,6 +289,8 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
             # The element must be empty, so also remove all element content.
             # Attribute values are left unchanged.
             self._resetContent(reset_elements=True)
+        if isinstance(self, _ValidationTracking_mixin):
+            self._invalidateValidation()
 
     def _resetContent (self, reset_elements=False):
         """Reset the content of an element value.
@@ -533,7 +641,7 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
         bds.finalize()
         return bds.document()
 
-    def toxml (self, encoding=None, bds=None, root_only=False, element_name=None):
+    def toxml (self, encoding=None, bds=None, root_only=False, element_name=None, stream=None):
         """Shorthand to get the object as an XML document.
 
         If you want to set the default namespace, pass in a pre-configured
@@ -556,12 +664,51 @@ class _TypeBinding_mixin (utility.Locatable_mixin):
         @param element_name: This value is passed through to L{toDOM}, and is
         useful when the value has no bound element but you want to convert it
         to XML anyway.
+
+        @param stream: If provided, the document is written to this file-like
+        object by L{writeXML} instead of being returned, and no DOM tree is
+        constructed.  C{bds} must then be C{None} or an instance of
+        L{pyxb.utils.domutils.BindingStreamSupport}.
         """
+        if stream is not None:
+            return self.writeXML(stream, encoding=encoding, bds=bds, root_only=root_only, element_name=element_name)
         dom = self.toDOM(bds, element_name=element_name)
         if root_only:
             dom = dom.documentElement
         return dom.toxml(encoding)
 
+    def writeXML (self, stream, encoding=None, bds=None, root_only=False, element_name=None):
+        """Write the object as an XML document to a stream.
+
+        This produces the same document as L{toxml}, but the text is written
+        to C{stream} as the binding is traversed rather than first being
+        assembled into a DOM tree.  Namespace declarations are placed on the
+        outermost element that requires them, instead of all being in the
+        document element.
+
+        @param stream: A file-like object.  If C{encoding} is C{None} it must
+        accept text; otherwise it must accept bytes.
+
+        @param encoding: The encoding to be used, as with L{toxml}.
+
+        @param bds: Optional L{pyxb.utils.domutils.BindingStreamSupport}
+        instance to use for writing.  If not provided (default), a new
+        generic one is created.
+
+        @param root_only: Set to C{True} to suppress the XML declaration.
+
+        @param element_name: As with L{toxml}.
+
+        @return: C{stream}
+        """
+        if bds is None:
+            bds = domutils.BindingStreamSupport()
+        if not isinstance(bds, domutils.BindingStreamSupport):
+            raise pyxb.UsageError('writeXML requires a BindingStreamSupport instance')
+        bds.beginDocument(stream, encoding, xml_declaration=not root_only)
+        self.toDOM(bds, element_name=element_name)
+        return bds.endDocument()
+
     def _toDOM_csc (self, dom_support, parent):
         assert parent is not None
         if self.__xsiNil:
@@ -668,7 +815,8 @@ class _DynamicCreate_mixin (pyxb.cscRoot):
         """
         assert (superseding is None) or issubclass(superseding, cls)
         if superseding is None:
-            cls.__dict__.pop(cls.__SupersedingClassAttribute(), None)
+            if cls.__SupersedingClassAttribute() in cls.__dict__:
+                delattr(cls, cls.__SupersedingClassAttribute())
         else:
             setattr(cls, cls.__SupersedingClassAttribute(), superseding)
         return superseding
@@ -1039,9 +1187,171 @@ class simpleTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixin
         super_fn = getattr(super(simpleTypeDefinition, cls), '_XsdConstraintsPreCheck_vb', lambda *a,**kw: value)
         return super_fn(value)
 
-    # Cache of pre-computed sequences of class facets in the order required
-    # for constraint validation
-    __ClassFacetSequence = { }
+    # Cache of compiled constraint validators, keyed by class.
+    __ClassConstraintValidator = { }
+
+    @classmethod
+    def _InvalidateConstraintValidators (cls):
+        """Discard all compiled constraint validators.
+
+        This is invoked whenever a constraining facet is reconfigured."""
+        simpleTypeDefinition.__ClassConstraintValidator.clear()
+        simpleTypeDefinition.__ClassStringScreen.clear()
+        STD_union._InvalidateMemberScreens()
+
+    @classmethod
+    def _ClassFacetSequence (cls):
+        """Return the facets that constrain this class, in the order
+        required for constraint validation, and whether that sequence
+        is complete.
+
+        The sequence is incomplete if it was requested before the
+        facet maps of all ancestor classes were initialized."""
+        # Constraints for simple type definitions are inherited.  Check them
+        # from least derived to most derived.
+        classes = [ _x for _x in cls.mro() if issubclass(_x, simpleTypeDefinition) ]
+        classes.reverse()
+        complete = True
+        facet_values = []
+        for clazz in classes:
+            # Classes that implement a variety or a family of datatypes
+            # (e.g., STD_union) rather than a datatype do not declare an
+            # expanded name.  They have no facets of their own, and their
+            # facet maps are never initialized.
+            if (clazz is not cls) and not ('_ExpandedName' in clazz.__dict__):
+                continue
+            # When setting up the datatypes, if we attempt to validate
+            # something before the facets have been initialized (e.g., a
+            # nonNegativeInteger used as a length facet for the parent
+            # integer datatype), just ignore that for now.  Don't cache
+            # the value, though, since a subsequent check after
+            # initialization should succceed.
+            try:
+                clazz_facets = list(six.itervalues(clazz._FacetMap()))
+            except AttributeError:
+                complete = False
+                clazz_facets = []
+            for v in clazz_facets:
+                if not (v in facet_values):
+                    facet_values.append(v)
+        return (facet_values, complete)
+
+    @classmethod
+    def _ConstraintValidator (cls):
+        """Return the compiled constraint validator for this class.
+
+        The validator is a callable that takes a value and returns
+        C{None} if the value satisfies all facets of the class, and
+        otherwise the first facet that it violates.  It is built from
+        L{pyxb.binding.facets.ConstrainingFacet.compileValidator} on
+        first use and rebuilt only if a facet is reconfigured."""
+        validator = cls.__ClassConstraintValidator.get(cls)
+        if validator is not None:
+            return validator
+        (facet_values, complete) = cls._ClassFacetSequence()
+        checks = []
+        for f in facet_values:
+            fn = f.compileValidator()
+            if fn is not None:
+                checks.append((f, fn))
+        if 0 == len(checks):
+            validator = lambda _v: None
+        elif 1 == len(checks):
+            [(facet, fn)] = checks
+            validator = lambda _v: None if fn(_v) else facet
+        else:
+            checks = tuple(checks)
+            def validator (value):
+                for (facet, fn) in checks:
+                    if not fn(value):
+                        return facet
+                return None
+        if complete:
+            cls.__ClassConstraintValidator[cls] = validator
+        return validator
+
+    _LexicalScreen_re = None
+    """A compiled regular expression that matches every string, stripped of
+    leading and trailing whitespace, from which an instance of this class
+    can be created; or C{None} if the class places no lexical restriction on
+    strings.  The expression may match strings that are not valid, but must
+    not reject any that are."""
+
+    @classmethod
+    def _LexicalScreen (cls):
+        """Return the regular expression used to screen strings for this
+        class; by default L{_LexicalScreen_re}."""
+        return cls._LexicalScreen_re
+
+    # Cache of string screens, keyed by class.
+    __ClassStringScreen = { }
+
+    @classmethod
+    def _StringScreen (cls):
+        """Return a function that determines whether an instance of this
+        class might be created from a string.
+
+        The function takes the string and a flag indicating whether the
+        whitespace facet will be applied to it, and returns C{False} only if
+        the class cannot accept the string.  It combines the
+        L{lexical screen<_LexicalScreen>} with, for string types, the
+        pattern and enumeration facets.  C{None} is returned if the class
+        might accept any string.
+
+        This is used to order the member types of a union so that the one
+        that accepts a value is normally the first attempted."""
+        try:
+            return cls.__ClassStringScreen[cls]
+        except KeyError:
+            pass
+        (screen, complete) = cls._StringScreen_vx()
+        if complete:
+            cls.__ClassStringScreen[cls] = screen
+        return screen
+
+    @classmethod
+    def _StringScreen_vx (cls):
+        """Build the L{_StringScreen} function for this class.
+
+        @return: the function, and whether it may be cached"""
+        checks = []
+        lexical_re = cls._LexicalScreen()
+        if lexical_re is not None:
+            match = lexical_re.match
+            checks.append(lambda _t, _n: match(_t.strip()) is not None)
+        complete = True
+        if issubclass(cls, six.text_type):
+            cf_whitespace = getattr(cls, '_CF_whiteSpace', None)
+            value_checks = []
+            valid_re = getattr(cls, '_ValidRE', None)
+            if valid_re is not None:
+                valid_match = valid_re.match
+                value_checks.append(lambda _v: valid_match(_v) is not None)
+            (facet_values, complete) = cls._ClassFacetSequence()
+            for f in facet_values:
+                if f.Name() in ('pattern', 'enumeration'):
+                    fn = f.compileValidator()
+                    if fn is not None:
+                        value_checks.append(fn)
+            if 0 < len(value_checks):
+                def check_value (text, normalize):
+                    if normalize and (cf_whitespace is not None):
+                        text = cf_whitespace.normalizeString(text)
+                    for fn in value_checks:
+                        if not fn(text):
+                            return False
+                    return True
+                checks.append(check_value)
+        if 0 == len(checks):
+            return (None, complete)
+        if 1 == len(checks):
+            return (checks[0], complete)
+        def screen (text, normalize):
+            for fn in checks:
+                if not fn(text, normalize):
+                    return False
+            return True
+        return (screen, complete)
 
     @classmethod
     def XsdConstraintsOK (cls, value, location=None):
@@ -1051,35 +1361,9 @@ class simpleTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixin
         """
 
         value = cls._XsdConstraintsPreCheck_vb(value)
-
-        facet_values = cls.__ClassFacetSequence.get(cls)
-        if facet_values is None:
-            # Constraints for simple type definitions are inherited.  Check them
-            # from least derived to most derived.
-            classes = [ _x for _x in cls.mro() if issubclass(_x, simpleTypeDefinition) ]
-            classes.reverse()
-            cache_result = True
-            facet_values = []
-            for clazz in classes:
-                # When setting up the datatypes, if we attempt to validate
-                # something before the facets have been initialized (e.g., a
-                # nonNegativeInteger used as a length facet for the parent
-                # integer datatype), just ignore that for now.  Don't cache
-                # the value, though, since a subsequent check after
-                # initialization should succceed.
-                try:
-                    clazz_facets = list(six.itervalues(clazz._FacetMap()))
-                except AttributeError:
-                    cache_result = False
-                    clazz_facets = []
-                for v in clazz_facets:
-                    if not (v in facet_values):
-                        facet_values.append(v)
-            if cache_result:
-                cls.__ClassFacetSequence[cls] = facet_values
-        for f in facet_values:
-            if not f.validateConstraint(value):
-                raise pyxb.SimpleFacetValueError(cls, value, f, location)
+        facet = cls._ConstraintValidator()(value)
+        if facet is not None:
+            raise pyxb.SimpleFacetValueError(cls, value, facet, location)
         return value
 
     def xsdConstraintsOK (self, location=None):
@@ -1188,7 +1472,7 @@ class simpleTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixin
     def _isValidValue (self):
         self._IsValidValue(self)
 
-    def _setAttribute (self, attr_en, value_lex):
+    def _setAttribute (self, attr_en, value_lex, validate_constraints=True):
         # Simple types have no attributes, but the parsing infrastructure
         # might invoke this to delegate responsibility for notifying the user
         # of the failure.
@@ -1252,7 +1536,11 @@ class STD_union (simpleTypeDefinition):
                 pass
         if rv is None:
             kw['_validate_constraints'] = True
-            for mt in cls._MemberTypes:
+            member_types = cls._MemberTypes
+            if (1 == len(args)) and not ('_dom_node' in kw):
+                normalize = kw.get('_apply_whitespace_facet', kw.get('_from_xml', False))
+                member_types = cls._OrderedMemberTypes(args[0], normalize)
+            for mt in member_types:
                 try:
                     rv = mt.Factory(*args, **kw)
                     break
@@ -1281,7 +1569,7 @@ class STD_union (simpleTypeDefinition):
         @raise pyxb.SimpleTypeValueError: the value is not an instance of a
         member type."""
         if not isinstance(value, cls._MemberTypes):
-            for mt in cls._MemberTypes:
+            for mt in cls._OrderedMemberTypes(value):
                 try:
                     # Force validation so we get the correct type, otherwise
                     # first member will be accepted.
@@ -1292,6 +1580,62 @@ class STD_union (simpleTypeDefinition):
             raise pyxb.SimpleUnionValueError(cls, value)
         return value
 
+    # Cache of member types paired with their string screens, keyed by class.
+    __ClassMemberScreens = { }
+
+    @classmethod
+    def _InvalidateMemberScreens (cls):
+        """Discard the cached member type screens of all union classes."""
+        STD_union.__ClassMemberScreens.clear()
+
+    @classmethod
+    def _MemberScreens (cls):
+        """Return a tuple pairing each member type with its
+        L{string screen<simpleTypeDefinition._StringScreen>}."""
+        try:
+            return cls.__ClassMemberScreens[cls]
+        except KeyError:
+            pass
+        screens = tuple([ (_mt, _mt._StringScreen()) for _mt in cls._MemberTypes ])
+        cls.__ClassMemberScreens[cls] = screens
+        return screens
+
+    @classmethod
+    def _StringScreen_vx (cls):
+        screens = [ _s for (_mt, _s) in cls._MemberScreens() ]
+        if None in screens:
+            return (None, True)
+        def screen (text, normalize):
+            for fn in screens:
+                if fn(text, normalize):
+                    return True
+            return False
+        return (screen, True)
+
+    @classmethod
+    def _OrderedMemberTypes (cls, value, normalize=False):
+        """Return the member types in the order they should be tried when
+        creating an instance from the given value.
+
+        For a string, member types that might accept it are placed first, in
+        their declared order, so the first attempt normally succeeds without
+        constructing and discarding instances of other members.  Members
+        that cannot accept it follow, in case a screen is incomplete.  Other
+        values are tried against the members in their declared order.
+
+        @param normalize: whether the whitespace facet of the member types
+        will be applied to C{value}"""
+        if not isinstance(value, six.string_types):
+            return cls._MemberTypes
+        accepted = []
+        rejected = []
+        for (mt, screen) in cls._MemberScreens():
+            if (screen is None) or screen(value, normalize):
+                accepted.append(mt)
+            else:
+                rejected.append(mt)
+        return accepted + rejected
+
     def __new__ (self, *args, **kw):
         raise pyxb.LogicError('%s: cannot construct instances of union' % (self.__class__.__name__,))
 
@@ -1313,7 +1657,7 @@ class STD_union (simpleTypeDefinition):
         return cls._ValidatedMember(value).xsdLiteral()
 
 
-class STD_list (simpleTypeDefinition, six.list_type):
+class STD_list (simpleTypeDefinition, _ValidationTracking_mixin, six.list_type):
     """Base class for collection datatypes.
 
     This class descends from the Python list type, and incorporates
@@ -1327,6 +1671,12 @@ class STD_list (simpleTypeDefinition, six.list_type):
     # initialized.  Alternative is to not descend from simpleTypeDefinition.
     __FacetMap = {}
 
+    # The list constructor ignores its arguments: the items are converted
+    # by __init__.  Doing the argument conversion here as well would
+    # create every item twice.
+    def __new__ (cls, *args, **kw):
+        return super(simpleTypeDefinition, cls).__new__(cls)
+
     @classmethod
     def _ValidatedItem (cls, value, kw=None):
         """Verify that the given value is permitted as an item of this list.
@@ -1354,6 +1704,18 @@ class STD_list (simpleTypeDefinition, six.list_type):
                 raise pyxb.SimpleListValueError(cls, value, location)
         return value
 
+    @classmethod
+    def _StringScreen_vx (cls):
+        item_screen = cls._ItemType._StringScreen()
+        if item_screen is None:
+            return (None, True)
+        def screen (text, normalize):
+            for token in text.split():
+                if not item_screen(token, False):
+                    return False
+            return True
+        return (screen, True)
+
     @classmethod
     def _ConvertArguments_vx (cls, args, kw):
         # If the first argument is a string, split it on spaces and use the
@@ -1395,15 +1757,38 @@ class STD_list (simpleTypeDefinition, six.list_type):
     def __convertMany (self, values):
         return [ self._ValidatedItem(_v) for _v in values ]
 
+    # Operations that change the list invalidate the validation of
+    # containing instances; see _ValidationTracking_mixin.
+
     def __setitem__ (self, key, value):
         if isinstance(key, slice):
             super(STD_list, self).__setitem__(key, self.__convertMany(value))
         else:
             super(STD_list, self).__setitem__(key, self._ValidatedItem(value))
+        self._invalidateValidation()
+
+    def __delitem__ (self, key):
+        super(STD_list, self).__delitem__(key)
+        self._invalidateValidation()
 
     if six.PY2:
         def __setslice__ (self, start, end, values):
             super(STD_list, self).__setslice__(start, end, self.__convertMany(values))
+            self._invalidateValidation()
+
+        def __delslice__ (self, start, end):
+            super(STD_list, self).__delslice__(start, end)
+            self._invalidateValidation()
+
+    def __iadd__ (self, other):
+        rv = super(STD_list, self).__iadd__(other)
+        self._invalidateValidation()
+        return rv
+
+    def __imul__ (self, n):
+        rv = super(STD_list, self).__imul__(n)
+        self._invalidateValidation()
+        return rv
 
     def __contains__ (self, item):
         return super(STD_list, self).__contains__(self._ValidatedItem(item))
@@ -1412,9 +1797,11 @@ class STD_list (simpleTypeDefinition, six.list_type):
 
     def append (self, x):
         super(STD_list, self).append(self._ValidatedItem(x))
+        self._invalidateValidation()
 
     def extend (self, x, _from_xml=False):
         super(STD_list, self).extend(self.__convertMany(x))
+        self._invalidateValidation()
 
     def count (self, x):
         return super(STD_list, self).count(self._ValidatedItem(x))
@@ -1424,9 +1811,27 @@ class STD_list (simpleTypeDefinition, six.list_type):
 
     def insert (self, i, x):
         super(STD_list, self).insert(i, self._ValidatedItem(x))
+        self._invalidateValidation()
 
     def remove (self, x):
         super(STD_list, self).remove(self._ValidatedItem(x))
+        self._invalidateValidation()
+
+    def pop (self, *args):
+        rv = super(STD_list, self).pop(*args)
+        self._invalidateValidation()
+        return rv
+
+    def sort (self, *args, **kw):
+        super(STD_list, self).sort(*args, **kw)
+        self._invalidateValidation()
+
+    def reverse (self):
+        super(STD_list, self).reverse()
+        self._invalidateValidation()
+
+    def clear (self):
+        del self[:]
 
 class element (utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
     """Class that represents a schema element within a binding.
@@ -1534,6 +1939,15 @@ class element (utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
         return self
     __substitutionGroup = None
 
+    def identityConstraints (self):
+        """The L{pyxb.binding.identity.IdentityConstraint} instances declared
+        on this element."""
+        return self.__identityConstraints
+    def _setIdentityConstraints (self, identity_constraints):
+        self.__identityConstraints = tuple(identity_constraints)
+        return self
+    __identityConstraints = ()
+
     def findSubstituendDecl (self, ctd_class):
         ed = ctd_class._ElementMap.get(self.name())
         if ed is not None:
@@ -1578,11 +1992,11 @@ class element (utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
         The type for this element must be a complex type definition."""
         return self.typeDefinition()._UseForTag(name).elementBinding()
 
-    def __init__ (self, name, type_definition, scope=None, nillable=False, abstract=False, unicode_default=None, fixed=False, substitution_group=None, documentation=None, location=None):
+    def __init__ (self, name, type_definition, scope=None, nillable=False, abstract=False, unicode_default=None, fixed=False, substitution_group=None, documentation=None, location=None, identity_constraints=None):
         """Create a new element binding.
         """
         assert isinstance(name, pyxb.namespace.ExpandedName)
-        self.__name = name
+        self.__name = pyxb.namespace.ExpandedName.Intern(name)
         self.__typeDefinition = type_definition
         self.__scope = scope
         self.__nillable = nillable
@@ -1597,8 +2011,23 @@ class element (utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
         self.__substitutionGroup = substitution_group
         self.__documentation = documentation
         self.__xsdLocation = location
+        if identity_constraints is not None:
+            self.__identityConstraints = tuple(identity_constraints)
         super(element, self).__init__()
 
+    def __reduce_ex__ (self, protocol):
+        # Element bindings are defined when their module is loaded; pickle
+        # them by reference so unpickled instances share them.
+        name = self.__name
+        if self.__scope is not None:
+            return (_ElementForReference, (self.__scope, name.uriTuple()))
+        ns = name.namespace()
+        if (ns is not None) and not ns.isAbsentNamespace():
+            # The type definition is passed so that unpickling imports the
+            # module that (usually) defines the element.
+            return (_ElementForReference, (None, name.uriTuple(), self.__typeDefinition))
+        return super(element, self).__reduce_ex__(protocol)
+
     def __call__ (self, *args, **kw):
         """Invoke the Factory method on the type associated with this element.
 
@@ -1859,6 +2288,19 @@ class element (utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
             desc.extend(["\n", self.documentation() ])
         return six.u('').join(desc)
 
+def _ElementForReference (scope, uri_tuple, type_definition=None):
+    """Locate the element binding pickled by L{element.__reduce_ex__}."""
+    if scope is not None:
+        return scope._UseForTag(pyxb.namespace.ExpandedName(*uri_tuple)).elementBinding()
+    (uri, local_name) = uri_tuple
+    ns = pyxb.namespace.NamespaceForURI(uri, create_if_missing=False)
+    rv = None
+    if (ns is not None) and ('elementBinding' in ns.categories()):
+        rv = ns.categoryMap('elementBinding').get(local_name)
+    if rv is None:
+        raise pyxb.LogicError('No element binding for {%s}%s; is its binding module imported?' % (uri, local_name))
+    return rv
+
 class enumeration_mixin (pyxb.cscRoot):
     """Marker in case we need to know that a PST has an enumeration constraint facet."""
 
@@ -1993,7 +2435,42 @@ class NonElementContent (_Content):
     def __init__ (self, value):
         super(NonElementContent, self).__init__(six.text_type(value))
 
-class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixin, _DynamicCreate_mixin):
+class _DeferredAutomaton (object):
+    """Descriptor standing in for the L{complexTypeDefinition._Automaton} of
+    a binding class until the automaton is needed.
+
+    On first access the builder function registered by the generated module
+    is invoked, and the resulting L{pyxb.utils.fac.Automaton} replaces this
+    descriptor in the class that holds it."""
+
+    # Lock held while a builder is executing, so concurrent first uses do
+    # not invoke the builder twice.
+    __Lock = threading.RLock()
+
+    __builder = None
+    __automaton = None
+
+    def __init__ (self, builder):
+        self.__builder = builder
+
+    def automaton (self):
+        """Return the automaton, invoking the builder if necessary."""
+        if self.__automaton is None:
+            with self.__Lock:
+                if self.__automaton is None:
+                    self.__automaton = self.__builder()
+                    self.__builder = None
+        return self.__automaton
+
+    def __get__ (self, instance, owner):
+        automaton = self.automaton()
+        for cls in owner.mro():
+            if cls.__dict__.get('_Automaton') is self:
+                cls._Automaton = automaton
+                break
+        return automaton
+
+class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixin, _DynamicCreate_mixin, _ValidationTracking_mixin):
     """Base for any Python class that serves as the binding for an
     XMLSchema complexType.
 
@@ -2054,7 +2531,16 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         information was present to determine the binding of the member
         element, the value is a binding instance.  Otherwise, the value is the
         original DOM Element node.
+
+        @note: The returned value is mutable, so any record that the instance
+        has been validated is discarded.
         """
+        self._invalidateValidation()
+        return self.__wildcardElements
+
+    def _wildcardElements (self):
+        """As with L{wildcardElements}, for callers that do not modify the
+        returned list."""
         return self.__wildcardElements
 
     def __init__ (self, *args, **kw):
@@ -2075,6 +2561,11 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
 
         @keyword _from_xml: See L{_TypeBinding_mixin.Factory}
 
+        @keyword _validate_constraints: If C{False}, positional content is
+        stored without checking it against the content model or the facets
+        of simple content.  The default is determined by the validation
+        configuration of the instance.
+
         @keyword _finalize_content_model: If C{True} the constructor invokes
         L{_TypeBinding_mixin._finalizeContentModel} prior to return.  The
         value defaults to C{False} when content is assigned through keyword
@@ -2089,6 +2580,7 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         location = kw.pop('_location', None)
         from_xml = kw.pop('_from_xml', dom_node is not None)
         do_finalize_content_model = kw.pop('_finalize_content_model', None)
+        validate_constraints = kw.pop('_validate_constraints', None)
         if dom_node is not None:
             if (location is None) and isinstance(dom_node, pyxb.utils.utility.Locatable_mixin):
                 location = dom_node._location()
@@ -2124,7 +2616,7 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         if 0 < len(args):
             if did_set_kw_elt:
                 raise pyxb.UsageError('Cannot mix keyword and positional args for element initialization')
-            self.extend(args, _from_xml=from_xml, _location=location)
+            self.extend(args, _from_xml=from_xml, _location=location, _require_validation=validate_constraints)
         elif self._CT_SIMPLE == self._ContentTypeTag:
             value = self._TypeDefinition.Factory(_require_value=not self._isNil(), _dom_node=dom_node, _location=location, _nil=self._isNil(), _apply_attributes=False, *args)
             if value._constructedWithValue():
@@ -2141,9 +2633,48 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
                              'xsdConstraintsOK', 'content', 'orderedContent', 'append', 'extend', 'value', 'reset' ]))
 
     # None, or a reference to a pyxb.utils.fac.Automaton instance that defines
-    # the content model for the type.
+    # the content model for the type.  Generated modules register a builder
+    # through _SetAutomatonBuilder, in which case until first use this is a
+    # _DeferredAutomaton that constructs the automaton when accessed.
     _Automaton = None
 
+    @classmethod
+    def _SetAutomatonBuilder (cls, builder):
+        """Method used by generated code to associate the content model
+        automaton with this type.
+
+        Constructing automata is expensive, and a module may define many
+        types that are never used, so by default the builder is not invoked
+        until the automaton is first required.  See
+        L{pyxb.EagerAutomatonBuild}.
+
+        @param builder: A function of no arguments that returns the
+        L{pyxb.utils.fac.Automaton} for the type."""
+        if pyxb._EagerAutomatonBuild:
+            cls._Automaton = builder()
+        else:
+            cls._Automaton = _DeferredAutomaton(builder)
+
+    @classmethod
+    def _BuildDeferredAutomata (cls):
+        """Build the automaton for this class and every subclass for which
+        construction has been deferred.
+
+        @return: the number of automata built"""
+        rv = 0
+        pending = [ cls ]
+        seen = set()
+        while pending:
+            c = pending.pop()
+            if c in seen:
+                continue
+            seen.add(c)
+            if isinstance(c.__dict__.get('_Automaton'), _DeferredAutomaton):
+                c._Automaton
+                rv += 1
+            pending.extend(c.__subclasses__())
+        return rv
+
     @classmethod
     def _AddElement (cls, element):
         """Method used by generated code to associate the element binding with a use in this type.
@@ -2152,7 +2683,7 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         module prior to any of the element instances (which reference type
         classes), so the association must be formed after the element
         instances are available."""
-        return cls._UseForTag(element.name())._setElementBinding(element)
+        return cls._UseForTag(element.name())._setElementBinding(element, scope=cls)
 
     @classmethod
     def _UseForTag (cls, tag, raise_if_fail=True):
@@ -2199,12 +2730,61 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         If the content of the instance does not validate against the content
         model, an exception is raised.
 
+        The result is retained until the content of the instance changes, or
+        the validation configuration that affects the order changes.  Do not
+        modify it.
+
         @return: C{None} or a list as described above.
         """
         if self._ContentTypeTag in (self._CT_EMPTY, self._CT_SIMPLE):
             return []
+        return self.__validatedChildren(self.__orderSettings())
+
+    def __validatedChildren (self, settings):
+        if (self.__validatedOrder is not None) and (self.__validatedOrderSettings == settings):
+            return self.__validatedOrder
         self._resetAutomaton()
-        return self.__automatonConfiguration.sequencedChildren()
+        order = self.__automatonConfiguration.sequencedChildren()
+        if self.__trackPluralValues():
+            self.__validatedOrder = order
+            self.__validatedOrderSettings = settings
+        return order
+
+    def __trackPluralValues (self):
+        # The order also depends on the content of plural element values,
+        # which can be changed without involving this instance.  A value
+        # that is not a _PluralBinding, such as a list assigned to the
+        # element, cannot report changes, so nothing that depends on it may
+        # be retained.
+        tracked = True
+        for ed in six.itervalues(self._ElementMap):
+            if ed.isPlural():
+                values = ed.value(self)
+                if isinstance(values, _ValidationTracking_mixin):
+                    values._addValidationDependent(self)
+                else:
+                    tracked = False
+        return tracked
+
+    # The result of _validatedChildren, and the validation settings in effect
+    # when it was calculated.
+    __validatedOrder = None
+    __validatedOrderSettings = None
+
+    # The validation settings in effect when validateBinding last succeeded,
+    # or None if the content has changed since then.
+    __validated = None
+
+    def __orderSettings (self):
+        vc = self._validationConfig
+        return (vc.contentInfluencesGeneration, vc.orphanElementInContent, vc.invalidElementInContent)
+
+    def _invalidateValidation (self):
+        # Nothing can depend on an instance that has not been validated.
+        if (self.__validated is not None) or (self.__validatedOrder is not None):
+            self.__validated = None
+            self.__validatedOrder = None
+            super(complexTypeDefinition, self)._invalidateValidation()
 
     def _symbolSet (self):
         """Return a map from L{content.ElementDeclaration} instances to a list of
@@ -2246,31 +2826,51 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
             au.validate(self)
 
     def _validateBinding_vx (self):
+        # Validation is repeated only if the content has changed.  Each
+        # changeable value in the content records that this instance depends
+        # on it; see _ValidationTracking_mixin.
+        settings = self.__orderSettings()
+        if self.__validated == settings:
+            return True
         if self._isNil():
             if (self._IsSimpleTypeContent() and (self.__content is not None)) or self.__content:
                 raise pyxb.ContentInNilInstanceError(self, self.__content)
+            self.__validated = settings
             return True
         if self._IsSimpleTypeContent() and (self.__content is None):
             raise pyxb.SimpleContentAbsentError(self, self._location())
-        order = self._validatedChildren()
+        order = []
+        complete = True
+        if not (self._ContentTypeTag in (self._CT_EMPTY, self._CT_SIMPLE)):
+            order = self.__validatedChildren(settings)
+            complete = self.__validatedOrder is order
         for content in order:
             if isinstance (content, NonElementContent):
                 continue
-            if isinstance(content.value, _TypeBinding_mixin):
-                content.value.validateBinding()
+            value = content.value
+            if isinstance(value, _TypeBinding_mixin):
+                value.validateBinding()
+                if isinstance(value, _ValidationTracking_mixin):
+                    value._addValidationDependent(self)
+                    # A child whose configuration disables validation was
+                    # not checked, so this instance must be checked again.
+                    if isinstance(value, complexTypeDefinition) and (value.__validated is None):
+                        complete = False
             elif content.elementDeclaration is not None:
                 _log.warning('Cannot validate value %s in field %s', content.value, content.elementDeclaration.id())
         self._validateAttributes()
+        if complete:
+            self.__validated = settings
         return True
 
-    def _setAttribute (self, attr_en, value_lex):
+    def _setAttribute (self, attr_en, value_lex, validate_constraints=True):
         au = self._AttributeMap.get(attr_en)
         if au is None:
             if self._AttributeWildcard is None:
                 raise pyxb.UnrecognizedAttributeError(type(self), attr_en, self)
             self.__wildcardAttributeMap[attr_en] = value_lex
         else:
-            au.set(self, value_lex, from_xml=True)
+            au.set(self, value_lex, from_xml=True, validate_constraints=validate_constraints)
         return au
 
     def xsdConstraintsOK (self, location=None):
@@ -2327,10 +2927,17 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         an error, or may be ignored.
 
         @note: The returned value is mutable, allowing the caller to change
-        the order to be used.
+        the order to be used.  Consequently any record that the instance has
+        been validated is discarded.
 
         @raise pyxb.NotComplexContentError: this is not a complex type with mixed or element-only content
         """
+        self._invalidateValidation()
+        return self._orderedContent()
+
+    def _orderedContent (self):
+        """As with L{orderedContent}, for callers that do not modify the
+        returned list."""
         if self._ContentTypeTag in (self._CT_EMPTY, self._CT_SIMPLE):
             raise pyxb.NotComplexContentError(self)
         return self.__content
@@ -2394,6 +3001,23 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         return self.__setContent(nv)
 
     __automatonConfiguration = None
+    _PickleTransient = _TypeBinding_mixin._PickleTransient.union([ '_complexTypeDefinition__automatonConfiguration',
+                                                                   '_complexTypeDefinition__validated',
+                                                                   '_complexTypeDefinition__validatedOrder',
+                                                                   '_complexTypeDefinition__validatedOrderSettings' ])
+
+    def __restoreAutomaton (self):
+        # Instances restored from a pickle do not carry an automaton
+        # configuration.  Rebuild it by replaying the existing content, so
+        # content appended subsequently is placed as it would have been in
+        # the original instance.
+        cfg = self._resetAutomaton()
+        try:
+            cfg.sequencedChildren()
+        except pyxb.ValidationError:
+            cfg.reset()
+        return cfg
+
     def _resetAutomaton (self):
         if self._Automaton is not None:
             if self.__automatonConfiguration is None:
@@ -2406,6 +3030,14 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         """For whitebox testing use only"""
         return self.__automatonConfiguration
 
+    def _discardAutomatonConfiguration (self):
+        """Discard the content model state of the instance.
+
+        This is used when element content is stored without stepping the
+        automaton.  The configuration is rebuilt from the content of the
+        instance if further content is appended."""
+        self.__automatonConfiguration = None
+
     def reset (self):
         """Reset the instance.
 
@@ -2529,6 +3161,8 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         if (not maybe_element) and isinstance(value, six.string_types) and (self._ContentTypeTag in (self._CT_EMPTY, self._CT_ELEMENT_ONLY)):
             if (0 == len(value.strip())) and not self._isNil():
                 return self
+        if maybe_element and (self.__automatonConfiguration is None) and (self._Automaton is not None):
+            self.__restoreAutomaton()
         if maybe_element and (self.__automatonConfiguration is not None):
             # Allows element content.
             if not require_validation:
@@ -2574,7 +3208,7 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
                 raise pyxb.ExtraSimpleContentError(self, value)
             if not self._isNil():
                 if not isinstance(value, self._TypeDefinition):
-                    value = self._TypeDefinition.Factory(value, _from_xml=from_xml)
+                    value = self._TypeDefinition.Factory(value, _from_xml=from_xml, _validate_constraints=require_validation)
                 self.__setContent(value)
                 if require_validation:
                     # NB: This only validates the value, not any associated
@@ -2604,15 +3238,18 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
             # Not an element and no mixed content allowed: error
             raise pyxb.MixedContentError(self, value)
 
-    def extend (self, value_list, _fallback_namespace=None, _from_xml=False, _location=None):
+    def extend (self, value_list, _fallback_namespace=None, _from_xml=False, _location=None, _require_validation=None):
         """Invoke L{append} for each value in the list, in turn."""
         kw = { '_fallback_namespace': _fallback_namespace,
                '_from_xml': _from_xml,
                '_location': _location }
+        if _require_validation is not None:
+            kw['_require_validation'] = _require_validation
         [ self.append(_v, **kw) for _v in value_list ]
         return self
 
     def __setContent (self, value):
+        self._invalidateValidation()
         self.__content = value
         return self.__content
 
@@ -2622,13 +3259,16 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
         #assert self._IsMixed() or (not self._performValidation()) or isinstance(child, _TypeBinding_mixin) or isinstance(child, six.string_types), 'Unrecognized child %s type %s' % (child, type(child))
         assert not (self._ContentTypeTag in (self._CT_EMPTY, self._CT_SIMPLE))
         assert isinstance(wrapped_value, _Content)
-        self.__content.append(wrapped_value)
+        self._invalidateValidation()
         if isinstance(wrapped_value, ElementContent):
             value = wrapped_value.value
             ed = wrapped_value.elementDeclaration
             if isinstance(value, _TypeBinding_mixin) and (ed is not None) and (value._element() is None):
                 assert isinstance(ed.elementBinding(), element)
                 value._setElement(ed.elementBinding())
+            if self._CompactInstances and not self._IsMixed():
+                return
+        self.__content.append(wrapped_value)
 
     @classmethod
     def _IsMixed (cls):
@@ -2654,8 +3294,11 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
 
     def _setDOMFromAttributes (self, dom_support, element):
         """Add any appropriate attributes from this instance into the DOM element."""
+        # Attributes were checked if the instance has been validated since it
+        # last changed.
+        validate = pyxb.GlobalValidationConfig.forDocument and (self.__validated is None)
         for au in six.itervalues(self._AttributeMap):
-            if pyxb.GlobalValidationConfig.forDocument:
+            if validate:
                 au.validate(self)
             au.addDOMAttribute(dom_support, self, element)
         if self.__wildcardAttributeMap:
@@ -2692,9 +3335,6 @@ class complexTypeDefinition (_TypeBinding_mixin, utility._DeconflictSymbols_mixi
                         content.value.toDOM(dom_support, parent)
                 else:
                     content.elementDeclaration.toDOM(dom_support, parent, content.value)
-            mixed_content = self.orderedContent()
-            for mc in mixed_content:
-                pass
         return getattr(super(complexTypeDefinition, self), '_toDOM_csc', lambda *_args,**_kw: dom_support)(dom_support, parent)
 
     @classmethod
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module supports converting many documents to bindings at once.
+
+Converting a document is CPU bound, so within one process throughput is
+limited by the global interpreter lock.  L{CreateFromDocuments} distributes
+documents among a pool of worker processes, each of which imports the binding
+module once and returns the resulting binding instances to the caller.
+Instances are transferred by pickling; see
+L{pyxb.binding.basis._TypeBinding_mixin.__getstate__} for what is
+preserved."""
+
+import logging
+import collections
+import importlib
+import itertools
+import multiprocessing
+import pickle
+import pyxb
+
+_log = logging.getLogger(__name__)
+
+# Binding modules imported by this process, keyed by module name.
+__Modules = { }
+
+def _BindingModule (module_name):
+    """Return the binding module with the given name, importing it if
+    necessary."""
+    module = __Modules.get(module_name)
+    if module is None:
+        module = __Modules[module_name] = importlib.import_module(module_name)
+    return module
+
+def _InitializeWorker (module_name):
+    """Import the binding module when a worker process starts."""
+    _BindingModule(module_name)
+
+def _Transferable (exc):
+    """Return C{exc} if it survives a round trip through pickle, otherwise a
+    L{pyxb.PyXBException} describing it.
+
+    Exceptions raised in a worker are returned to the caller by pickling
+    them.  Some validation exceptions reference objects that cannot be
+    reconstructed; without this the caller would see a pickling failure
+    instead of the original problem."""
+    try:
+        pickle.loads(pickle.dumps(exc, pickle.HIGHEST_PROTOCOL))
+        return exc
+    except Exception:
+        return pyxb.PyXBException('%s: %s' % (type(exc).__name__, exc))
+
+def _CreateFromChunk (module_name, documents, mapper, kw):
+    """Convert a sequence of documents in a worker process.
+
+    @return: a list with the binding instance for each document, or the
+    value of C{mapper} applied to it."""
+    module = _BindingModule(module_name)
+    results = []
+    for document in documents:
+        try:
+            instance = module.CreateFromDocument(document, **kw)
+            if mapper is not None:
+                instance = mapper(instance)
+        except Exception as e:
+            raise _Transferable(e)
+        results.append(instance)
+    return results
+
+def _Chunks (documents, chunksize):
+    iterator = iter(documents)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if 0 == len(chunk):
+            return
+        yield chunk
+
+def CreateFromDocuments (module_name, documents, workers=None, ordered=True, mapper=None, chunksize=16, executor=None, **kw):
+    """Convert a sequence of XML documents to binding instances using a pool
+    of worker processes.
+
+    Generated binding modules provide a C{CreateFromDocuments} function that
+    invokes this with their own module name.
+
+    @param module_name: The name of the binding module whose
+    C{CreateFromDocument} function converts each document.  The module must
+    be importable by that name in the worker processes.
+
+    @param documents: An iterable of documents, each of which is text or
+    bytes as accepted by C{CreateFromDocument}.  Documents are read from the
+    iterable as workers become available.
+
+    @keyword workers: The number of worker processes to use.  By default this
+    is the number of processors.  If zero, documents are converted in the
+    calling process; this does not require C{concurrent.futures}.
+
+    @keyword ordered: If C{True} (default), results are produced in the order
+    of the corresponding documents.  If C{False}, results are produced as
+    they become available.
+
+    @keyword mapper: An optional callable, invoked in the worker process with
+    each binding instance.  Its return value is produced in place of the
+    instance.  Use this to transfer only the information you need.  It must
+    be picklable, e.g. a module-level function.
+
+    @keyword chunksize: The number of documents sent to a worker at once.
+    Larger values reduce the cost of communicating with the workers at the
+    expense of coarser load balancing.
+
+    @keyword executor: An optional C{concurrent.futures.Executor} to use
+    instead of creating a process pool for this call.  It is not shut down on
+    completion.  Reusing an executor avoids the cost of starting worker
+    processes on each call.
+
+    Additional keywords are passed to C{CreateFromDocument} (e.g.,
+    C{location_base}).
+
+    @return: A generator of binding instances, or of values from C{mapper}.
+
+    @raise pyxb.PyXBException: C{concurrent.futures} is not available.  It
+    is part of the standard library in Python 3, and available for Python 2
+    as the C{futures} package.
+    """
+    if 1 > chunksize:
+        raise ValueError(chunksize)
+    if (executor is None) and (0 == workers):
+        return _CreateInProcess(module_name, documents, mapper, kw)
+    try:
+        import concurrent.futures
+    except ImportError:
+        raise pyxb.PyXBException('CreateFromDocuments requires the concurrent.futures package')
+    return _CreateInPool(concurrent.futures, module_name, documents, workers, ordered, mapper, chunksize, executor, kw)
+
+def _CreateInProcess (module_name, documents, mapper, kw):
+    module = _BindingModule(module_name)
+    for document in documents:
+        instance = module.CreateFromDocument(document, **kw)
+        if mapper is not None:
+            instance = mapper(instance)
+        yield instance
+
+def _CreateInPool (futures, module_name, documents, workers, ordered, mapper, chunksize, executor, kw):
+    own_executor = executor is None
+    if own_executor:
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        try:
+            executor = futures.ProcessPoolExecutor(max_workers=workers, initializer=_InitializeWorker, initargs=(module_name,))
+        except TypeError:
+            # Python before 3.7 does not support worker initialization; the
+            # module is imported with the first chunk instead.
+            executor = futures.ProcessPoolExecutor(max_workers=workers)
+    # Limit the number of chunks in flight, so documents are not all read
+    # from the iterable and held in memory at once.
+    limit = 2 * (workers or multiprocessing.cpu_count())
+    try:
+        pending = collections.deque()
+        for chunk in _Chunks(documents, chunksize):
+            pending.append(executor.submit(_CreateFromChunk, module_name, chunk, mapper, kw))
+            if len(pending) < limit:
+                continue
+            if ordered:
+                for result in pending.popleft().result():
+                    yield result
+            else:
+                (done, not_done) = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                pending = collections.deque(not_done)
+                for future in done:
+                    for result in future.result():
+                        yield result
+        if ordered:
+            while pending:
+                for result in pending.popleft().result():
+                    yield result
+        else:
+            for future in futures.as_completed(pending):
+                for result in future.result():
+                    yield result
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
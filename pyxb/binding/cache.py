@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module supports reusing the result of converting a document when
+the same document is converted again.
+
+A L{DocumentCache} wraps the C{CreateFromDocument} function of a binding
+module.  Converted documents are held in a frozen form, keyed by a hash of
+the document content; each request for a document that is in the cache
+produces a new, independent copy of the binding instance tree.
+
+The frozen form of an instance tree is its pickle; see
+L{pyxb.binding.basis._TypeBinding_mixin.__getstate__} for what is preserved.
+L{Freeze}, L{Thaw}, and L{Clone} are available for use independently of the
+cache."""
+
+import logging
+import collections
+import hashlib
+import pickle
+import threading
+import pyxb
+from pyxb.binding import basis, identity
+from pyxb.utils import six
+
+_log = logging.getLogger(__name__)
+
+def Freeze (instance):
+    """Return an immutable representation of a binding instance tree.
+
+    @rtype: C{bytes}"""
+    return pickle.dumps(instance, pickle.HIGHEST_PROTOCOL)
+
+def Thaw (frozen):
+    """Return a new binding instance tree from the result of L{Freeze}."""
+    return pickle.loads(frozen)
+
+def Clone (instance):
+    """Return a deep copy of a binding instance tree.
+
+    This is considerably faster than C{copy.deepcopy}.  The copy does not
+    retain the location or namespace context of the original."""
+    return Thaw(Freeze(instance))
+
+class DocumentCache (object):
+    """A bounded cache of binding instances created from documents.
+
+    The cache is used in place of the C{CreateFromDocument} function it
+    wraps::
+
+      cache = pyxb.binding.cache.DocumentCache(soap11.CreateFromDocument)
+      envelope = cache(xmld)
+
+    Documents are identified by a hash of their content (after encoding text
+    in L{pyxb._InputEncoding}), along with the keywords passed with them, the
+    L{validation configuration<pyxb.GlobalValidationConfig>}, and the
+    L{parser style<pyxb._SetXMLStyle>} in effect.
+    Least recently used entries are discarded when either the number of
+    entries or the total size of their frozen forms exceeds its limit.
+    Documents that cannot be converted are not cached.  Instances produced
+    from the cache do not retain their location or namespace context.  If
+    the converted document had an
+    L{identity index<pyxb.binding.identity.IdentityIndex>}, one is built
+    for each instance produced from the cache.
+
+    The cache may be used from multiple threads."""
+
+    def __init__ (self, create_from_document, max_entries=128, max_bytes=16 * 1024 * 1024):
+        """Create a cache.
+
+        @param create_from_document: The function used to convert documents
+        that are not in the cache, generally the C{CreateFromDocument}
+        function of a binding module.
+
+        @keyword max_entries: The maximum number of documents held in the
+        cache.  C{None} for no limit.
+
+        @keyword max_bytes: The maximum total size of the frozen instances
+        held in the cache.  A document that exceeds this on its own is not
+        cached.  C{None} for no limit."""
+        self.__createFromDocument = create_from_document
+        self.__maxEntries = max_entries
+        self.__maxBytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def maxEntries (self):
+        """The maximum number of documents held in the cache."""
+        return self.__maxEntries
+
+    def maxBytes (self):
+        """The maximum total size of the frozen instances held in the cache."""
+        return self.__maxBytes
+
+    def hits (self):
+        """The number of requests satisfied from the cache."""
+        return self.__hits
+
+    def misses (self):
+        """The number of requests that required a document to be converted."""
+        return self.__misses
+
+    def evictions (self):
+        """The number of entries discarded to remain within the limits."""
+        return self.__evictions
+
+    def entryCount (self):
+        """The number of documents held in the cache."""
+        return len(self.__entries)
+
+    def byteCount (self):
+        """The total size of the frozen instances held in the cache."""
+        return self.__bytes
+
+    def clear (self):
+        """Discard all entries.  The counters are not reset."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def __key (self, xml_text, kw):
+        xmld = xml_text
+        if isinstance(xmld, six.text_type):
+            xmld = xmld.encode(pyxb._InputEncoding)
+        vc = pyxb.GlobalValidationConfig
+        return (hashlib.sha1(xmld).digest(),
+                tuple(sorted(six.iteritems(kw), key=lambda _i: _i[0])),
+                (vc.forBinding, vc.forDocument, vc.orphanElementInContent, vc.invalidElementInContent, vc.identityConstraints),
+                pyxb._CurrentXMLStyle())
+
+    def __call__ (self, xml_text, **kw):
+        """Return the binding instance for the given document.
+
+        @param xml_text: The document, as accepted by the wrapped function.
+
+        Keywords are passed to the wrapped function.  Their values must be
+        hashable.
+
+        @return: A binding instance that is not shared with the cache or with
+        the result of any other call."""
+        key = self.__key(xml_text, kw)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__hits += 1
+                # Mark as most recently used.
+                del self.__entries[key]
+                self.__entries[key] = entry
+            else:
+                self.__misses += 1
+        if entry is not None:
+            (frozen, indexed) = entry
+            instance = Thaw(frozen)
+            if indexed:
+                # The identity index is not preserved in the frozen form.
+                identity._AttachIndex(instance)
+            return instance
+        instance = self.__createFromDocument(xml_text, **kw)
+        frozen = Freeze(instance)
+        indexed = isinstance(instance, basis._TypeBinding_mixin) and (instance._identityIndex() is not None)
+        self.__insert(key, (frozen, indexed))
+        return instance
+
+    def __insert (self, key, entry):
+        size = len(entry[0])
+        if (self.__maxBytes is not None) and (size > self.__maxBytes):
+            return
+        with self.__lock:
+            if key in self.__entries:
+                # Another thread converted the same document.
+                return
+            self.__entries[key] = entry
+            self.__bytes += size
+            while (((self.__maxEntries is not None) and (len(self.__entries) > self.__maxEntries))
+                   or ((self.__maxBytes is not None) and (self.__bytes > self.__maxBytes))):
+                (_, discarded) = self.__entries.popitem(last=False)
+                self.__bytes -= len(discarded[0])
+                self.__evictions += 1
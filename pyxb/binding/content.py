@@ -26,6 +26,7 @@ L{Wildcard} holds content-related information used in the content model.
 """
 
 import logging
+import weakref
 import xml.dom
 
 import pyxb
@@ -128,7 +129,9 @@ class AttributeUse (pyxb.cscRoot):
         to initialize an instance of L{data_type}
         """
 
-        self.__name = name
+        # Intern the name so lookups by names from the SAX parser are
+        # resolved by identity.
+        self.__name = pyxb.namespace.ExpandedName.Intern(name)
         self.__id = id
         self.__key = key
         self.__dataType = data_type
@@ -208,6 +211,7 @@ class AttributeUse (pyxb.cscRoot):
         return self.__getValue(ctd_instance)[1]
 
     def __setValue (self, ctd_instance, new_value, provided):
+        ctd_instance._invalidateValidation()
         return setattr(ctd_instance, self.__key, (provided, new_value))
 
     def reset (self, ctd_instance):
@@ -246,11 +250,13 @@ class AttributeUse (pyxb.cscRoot):
                 raise pyxb.MissingAttributeError(type(ctd_instance), self.__name, ctd_instance)
             self.__dataType._CheckValidValue(value)
             self.__dataType.XsdConstraintsOK(value)
+            if isinstance(value, basis._ValidationTracking_mixin):
+                value._addValidationDependent(ctd_instance)
         else:
             if self.__required:
                 raise pyxb.MissingAttributeError(type(ctd_instance), self.__name, ctd_instance)
 
-    def set (self, ctd_instance, new_value, from_xml=False):
+    def set (self, ctd_instance, new_value, from_xml=False, validate_constraints=True):
         """Set the value of the attribute.
 
         This validates the value against the data type, creating a new instance if necessary.
@@ -265,6 +271,9 @@ class AttributeUse (pyxb.cscRoot):
         lexical space and must by converted by the type factory.  If C{False}
         (default) the value is only converted if it is not already an instance
         of the attribute's underlying type.
+        @param validate_constraints: If C{False}, a value that must be
+        converted is not checked against the facets of the attribute's
+        datatype.
         """
         provided = True
         assert not isinstance(new_value, xml.dom.Node)
@@ -275,7 +284,10 @@ class AttributeUse (pyxb.cscRoot):
         if self.__prohibited:
             raise pyxb.ProhibitedAttributeError(type(ctd_instance), self.__name, ctd_instance)
         if (new_value is not None) and (from_xml or not isinstance(new_value, self.__dataType)):
-            new_value = self.__dataType.Factory(new_value, _from_xml=from_xml)
+            if validate_constraints:
+                new_value = self.__dataType.Factory(new_value, _from_xml=from_xml)
+            else:
+                new_value = self.__dataType.Factory(new_value, _from_xml=from_xml, _validate_constraints=False)
         if self.__fixed and (new_value != self.__defaultValue):
             raise pyxb.AttributeChangeError(type(ctd_instance), self.__name, ctd_instance)
         self.__setValue(ctd_instance, new_value, provided)
@@ -301,6 +313,109 @@ class AttributeUse (pyxb.cscRoot):
             desc.extend(['=', self.__unicodeDefault ])
         return ''.join(desc)
 
+class TransitionTable (object):
+    """Precompiled transition dispatch for a L{pyxb.utils.fac.Automaton}.
+
+    The general FAC engine in L{pyxb.utils.fac.Configuration} computes the
+    candidate transitions for each symbol by filtering every transition out
+    of the current state, and L{AutomatonConfiguration.step} clones the
+    configuration for each candidate in case the content is
+    non-deterministic.  When the content is an element for which the
+    L{ElementDeclaration} is known, and the transitions out of the current
+    state involve no sub-automata, the candidates can be located directly by
+    the declaration and the counter conditions evaluated as integer
+    comparisons.  This class holds the per-state tables that support that.
+
+    States for which a table cannot be built (those involved in an
+    L{unordered catenation<pyxb.utils.fac.All>}) have no entry, and the
+    general engine is used for them.
+
+    Tables are built on first use and shared among all configurations of an
+    automaton; use L{ForAutomaton} to obtain them."""
+
+    # Map from automaton to its table
+    __TableMap = weakref.WeakKeyDictionary()
+
+    # Map from State (None for the initial state) to a pair (element_map,
+    # wildcards).  The element_map maps ElementDeclaration instances to a
+    # tuple of compiled transitions that consume that element; wildcards is
+    # a tuple of compiled transitions that consume wildcard content.  Each
+    # compiled transition is a triple (destination, updates, use) where
+    # updates is a tuple of (counter_condition, do_increment, min, max)
+    # quadruples.
+    __stateMap = None
+
+    @classmethod
+    def ForAutomaton (cls, automaton):
+        """Return the table for the given automaton, building it if necessary."""
+        table = cls.__TableMap.get(automaton)
+        if table is None:
+            table = cls(automaton)
+            cls.__TableMap[automaton] = table
+        return table
+
+    def __init__ (self, automaton):
+        self.__stateMap = {}
+        self.__addState(None, automaton.initialTransitions)
+        for st in automaton.states:
+            if st.subAutomata is None:
+                self.__addState(st, st.transitionSet)
+
+    def __addState (self, state, transitions):
+        element_map = {}
+        wildcards = []
+        for xit in transitions:
+            if (xit.layerLink is not None) or (xit.nextTransition is not None):
+                return
+            dest = xit.destination
+            if dest.subAutomata is not None:
+                return
+            updates = tuple([ (_ui.counterCondition, _ui.doIncrement, _ui.counterCondition.min, _ui.counterCondition.max) for _ui in xit.updateInstructions ])
+            use = dest.symbol
+            if isinstance(use, ElementUse):
+                element_map.setdefault(use.elementDeclaration(), []).append( (dest, updates, use) )
+            elif isinstance(use, WildcardUse):
+                wildcards.append( (dest, updates, use) )
+            else:
+                return
+        for (k, v) in six.iteritems(element_map):
+            element_map[k] = tuple(v)
+        self.__stateMap[state] = (element_map, tuple(wildcards))
+
+    def stateTable (self, state):
+        """Return the dispatch data for transitions out of C{state}.
+
+        @param state: a L{pyxb.utils.fac.State} of the automaton, or C{None}
+        for the initial state.
+
+        @return: C{None} if transitions from the state must be processed by
+        the general engine, otherwise a pair C{(element_map, wildcards)}."""
+        return self.__stateMap.get(state)
+
+    @classmethod
+    def Satisfies (cls, counter_values, updates):
+        """Return C{True} iff the compiled counter updates may be applied.
+
+        This is the compiled equivalent of
+        L{pyxb.utils.fac.UpdateInstruction.Satisfies}."""
+        for (cc, do_increment, cmin, cmax) in updates:
+            value = counter_values[cc]
+            if do_increment:
+                if (cmax is not None) and (value >= cmax):
+                    return False
+            elif value < cmin:
+                return False
+        return True
+
+    @classmethod
+    def Apply (cls, counter_values, updates):
+        """Apply compiled counter updates, which must be satisfied."""
+        for (cc, do_increment, cmin, cmax) in updates:
+            if do_increment:
+                counter_values[cc] += 1
+            else:
+                counter_values[cc] = 1
+
 class AutomatonConfiguration (object):
     """State for a L{pyxb.utils.fac.Automaton} monitoring content for an
     incrementally constructed complex type binding instance.
@@ -320,13 +435,21 @@ class AutomatonConfiguration (object):
     __cfg = None
 
     # A list of pairs when the state is non-deterministic.  The first member
-    # of the pair is the configuration; the second is a tuple of closures that
-    # must be applied to the instance in order to store the content that was
-    # accepted along the path to that configuration.  This is in order of
+    # of the pair is the configuration; the second is the path of closures
+    # that must be applied to the instance in order to store the content that
+    # was accepted along the path to that configuration.  This is in order of
     # preference based on the location of path candidate declarations in the
-    # defining schema.
+    # defining schema.  No two configurations in the list are equivalent.
+    #
+    # A path is None when empty, otherwise a pair (closure, path) where the
+    # closure is the last one to be applied.  Paths that diverge from a
+    # common prefix share it.
     __multi = None
 
+    # The TransitionTable for the automaton, used to bypass the general
+    # engine for deterministic element transitions.
+    __transitionTable = None
+
     PermittedNondeterminism = 20
     """The maximum amount of unresolved non-determinism that is acceptable.
     If the value is exceeded, a L{pyxb.ContentNondeterminismExceededError}
@@ -340,8 +463,10 @@ class AutomatonConfiguration (object):
 
         Subsequent transitions are expected based on candidate content to be
         supplied through the L{step} method."""
-        self.__cfg = self.__instance._Automaton.newConfiguration()
+        automaton = self.__instance._Automaton
+        self.__cfg = automaton.newConfiguration()
         self.__multi = None
+        self.__transitionTable = TransitionTable.ForAutomaton(automaton)
 
     def nondeterminismCount (self):
         """Return the number of pending configurations.
@@ -367,23 +492,36 @@ class AutomatonConfiguration (object):
         @return: the cardinal number of successful transitions from the
         current configuration based on the parameters."""
 
+        if (element_decl is not None) and (self.__multi is None):
+            rv = self.__stepDeterministic(value, element_decl)
+            if rv is not None:
+                return rv
+
         sym = (value, element_decl)
 
         # Start with the current configuration(s), assuming we might see
         # non-determinism.
         new_multi = []
         if self.__multi is None:
-            multi = [ (self.__cfg, ()) ]
+            multi = [ (self.__cfg, None) ]
         else:
-            multi = self.__multi[:]
+            multi = self.__multi
         # Collect the complete set of reachable configurations along with the
         # closures that will update the instance content based on the path.
+        # Paths that consume the symbol through the same use share a
+        # closure.
+        closures = {}
         for (cfg, pending) in multi:
-            cand = cfg.candidateTransitions(sym)
-            for transition in cand:
+            for transition in cfg.candidateTransitions(sym):
+                use = transition.consumedSymbol()
+                fn = closures.get(use)
+                if fn is None:
+                    fn = closures[use] = use.consumingClosure(sym)
                 clone_map = {}
                 ccfg = cfg.clone(clone_map)
-                new_multi.append( (transition.apply(ccfg, clone_map), pending+(transition.consumedSymbol().consumingClosure(sym),)) )
+                new_multi.append( (transition.apply(ccfg, clone_map), (fn, pending)) )
+        if 1 < len(new_multi):
+            new_multi = pyxb.utils.fac.Configuration.Distinct(new_multi, key=lambda _cp: _cp[0])
         rv = len(new_multi)
         if 0 == rv:
             # No candidate transitions.  Do not change the state.
@@ -392,9 +530,8 @@ class AutomatonConfiguration (object):
             # Deterministic transition.  Save the configuration and apply the
             # corresponding updates.
             self.__multi = None
-            (self.__cfg, actions) = new_multi[0]
-            for fn in actions:
-                fn(self.__instance)
+            (self.__cfg, pending) = new_multi[0]
+            self.__applyPath(pending)
         else:
             # Non-deterministic.  Save everything for subsequent resolution.
             if rv > self.PermittedNondeterminism:
@@ -403,6 +540,43 @@ class AutomatonConfiguration (object):
             self.__multi = new_multi
         return rv
 
+    def __stepDeterministic (self, value, element_decl):
+        """Attempt a transition using the precompiled L{TransitionTable}.
+
+        @return: C{None} if the general engine must be used, or the cardinal
+        number of transitions taken (zero or one)."""
+        cfg = self.__cfg
+        if (cfg.superConfiguration is not None) or (cfg.subAutomata is not None):
+            return None
+        state_table = self.__transitionTable.stateTable(cfg.state)
+        if state_table is None:
+            return None
+        (element_map, wildcards) = state_table
+        counter_values = cfg._get_counterValues()
+        candidate = None
+        for cxit in element_map.get(element_decl, ()):
+            if TransitionTable.Satisfies(counter_values, cxit[1]):
+                if candidate is not None:
+                    return None
+                candidate = cxit
+        if wildcards:
+            sym = (value, element_decl)
+            for cxit in wildcards:
+                if TransitionTable.Satisfies(counter_values, cxit[1]) and cxit[2].match(sym):
+                    if candidate is not None:
+                        return None
+                    candidate = cxit
+        if candidate is None:
+            return 0
+        (destination, updates, use) = candidate
+        TransitionTable.Apply(cfg._counterValuesForUpdate(), updates)
+        cfg._set_state(destination, True)
+        if isinstance(use, ElementUse):
+            element_decl.setOrAppend(self.__instance, value)
+        else:
+            self.__instance._appendWildcardElement(value)
+        return 1
+
     def resolveNondeterminism (self, prefer_accepting=True):
         """Resolve any non-determinism in the automaton state.
 
@@ -444,8 +618,16 @@ class AutomatonConfiguration (object):
                     fn(foo)
                 print '1: %s ; 2 : %s ; wc: %s' % (foo.first, foo.second, foo.wildcardElements())
             '''
-        (self.__cfg, actions) = multi[0]
+        (self.__cfg, pending) = multi[0]
         self.__multi = None
+        self.__applyPath(pending)
+
+    def __applyPath (self, pending):
+        actions = []
+        while pending is not None:
+            (fn, pending) = pending
+            actions.append(fn)
+        actions.reverse()
         for fn in actions:
             fn(self.__instance)
 
@@ -508,7 +690,7 @@ class AutomatonConfiguration (object):
         vc = instance._validationConfig
         preferred_sequence = None
         if (vc.ALWAYS == vc.contentInfluencesGeneration) or (instance._ContentTypeTag == instance._CT_MIXED and vc.MIXED_ONLY == vc.contentInfluencesGeneration):
-            preferred_sequence = instance.orderedContent()
+            preferred_sequence = instance._orderedContent()
             if instance._ContentTypeTag == instance._CT_MIXED:
                 self.__pendingNonElementContent = []
         return preferred_sequence
@@ -804,12 +986,13 @@ import collections
 # represents list-style data structures so we can identify both lists and
 # these things which are not lists.
 @pyxb.utils.utility.BackfillComparisons
-class _PluralBinding (collections.MutableSequence):
+class _PluralBinding (collections.MutableSequence, basis._ValidationTracking_mixin):
     """Helper for element content that supports multiple occurences.
 
     This is an adapter for Python list.  Any operation that can mutate an item
     in the list ensures the stored value is compatible with the element for
-    which the list holds values."""
+    which the list holds values, and invalidates the validation of the
+    instance holding the list."""
 
     __list = None
     __elementBinding = None
@@ -836,9 +1019,11 @@ class _PluralBinding (collections.MutableSequence):
             self.__list.__setitem__(key, [ self.__convert(_v) for _v in value])
         else:
             self.__list.__setitem__(key, self.__convert(value))
+        self._invalidateValidation()
 
     def __delitem__ (self, key):
         self.__list.__delitem__(key)
+        self._invalidateValidation()
 
     def __iter__ (self):
         return self.__list.__iter__()
@@ -852,9 +1037,17 @@ class _PluralBinding (collections.MutableSequence):
     # The mutable sequence type methods
     def append (self, x):
         self.__list.append(self.__convert(x))
+        self._invalidateValidation()
+
+    def _appendUnchecked (self, x):
+        """Append a value known to be compatible with the element, without
+        conversion."""
+        self.__list.append(x)
+        self._invalidateValidation()
 
     def extend (self, x):
         self.__list.extend(map(self.__convert, x))
+        self._invalidateValidation()
 
     def count (self, x):
         return self.__list.count(x)
@@ -864,18 +1057,30 @@ class _PluralBinding (collections.MutableSequence):
 
     def insert (self, i, x):
         self.__list.insert(i, self.__convert(x))
+        self._invalidateValidation()
 
     def pop (self, i=-1):
-        return self.__list.pop(i)
+        rv = self.__list.pop(i)
+        self._invalidateValidation()
+        return rv
 
     def remove (self, x):
         self.__list.remove(x)
+        self._invalidateValidation()
 
     def reverse (self):
         self.__list.reverse()
+        self._invalidateValidation()
 
     def sort (self, key=None, reverse=False):
         self.__list.sort(key=key, reverse=reverse)
+        self._invalidateValidation()
+
+    def __getstate__ (self):
+        # Validated containers are not preserved
+        state = self.__dict__.copy()
+        state.pop('_ValidationTracking_mixin__validationDependents', None)
+        return state
 
     def __str__ (self):
         return self.__list.__str__()
@@ -897,6 +1102,10 @@ class _PluralBinding (collections.MutableSequence):
             return self.__list.__lt__(other.__list)
         return self.__list.__lt__(other)
 
+def _ElementDeclarationForReference (scope, uri_tuple):
+    """Locate the declaration pickled by L{ElementDeclaration.__reduce_ex__}."""
+    return scope._UseForTag(pyxb.namespace.ExpandedName(*uri_tuple))
+
 class ElementDeclaration (object):
     """Aggregate the information relevant to an element of a complex type.
 
@@ -941,13 +1150,24 @@ class ElementDeclaration (object):
         associated with the element declaration.
         """
         return self.__elementBinding
-    def _setElementBinding (self, element_binding):
+    def _setElementBinding (self, element_binding, scope=None):
         # Set the element binding for this use.  Only visible at all because
         # we have to define the uses before the element instances have been
-        # created.
+        # created.  The scope is the complex type binding class that
+        # declares the element.
         self.__elementBinding = element_binding
+        if scope is not None:
+            self.__scope = scope
         return self
     __elementBinding = None
+    __scope = None
+
+    def __reduce_ex__ (self, protocol):
+        # Declarations belong to their binding class; pickle them by
+        # reference so unpickled content refers to the same declaration.
+        if self.__scope is not None:
+            return (_ElementDeclarationForReference, (self.__scope, self.__name.uriTuple()))
+        return super(ElementDeclaration, self).__reduce_ex__(protocol)
 
     def isPlural (self):
         """True iff the content model indicates that more than one element
@@ -988,7 +1208,7 @@ class ElementDeclaration (object):
         @param element_binding: Reference to the class that serves as the
         binding for the element.
         """
-        self.__name = name
+        self.__name = pyxb.namespace.ExpandedName.Intern(name)
         self.__id = id
         self.__key = key
         self.__isPlural = is_plural
@@ -1029,6 +1249,7 @@ class ElementDeclaration (object):
 
     def reset (self, ctd_instance):
         """Set the value for this use in the given element to its default."""
+        ctd_instance._invalidateValidation()
         setattr(ctd_instance, self.__key, self.resetValue())
         return self
 
@@ -1052,6 +1273,28 @@ class ElementDeclaration (object):
             return self.append(ctd_instance, value)
         return self.set(ctd_instance, value)
 
+    def _setOrAppendUnchecked (self, ctd_instance, value, record_content=True):
+        """Store the value for this element in the binding instance without
+        conversion or validation.
+
+        This is used when building bindings from documents that are trusted
+        to be valid.  The value must already be a binding instance for this
+        element.
+
+        @param record_content: If C{False}, the value is not added to the
+        L{orderedContent<basis.complexTypeDefinition.orderedContent>} of
+        C{ctd_instance}."""
+        ctd_instance._invalidateValidation()
+        if self.__isPlural:
+            getattr(ctd_instance, self.__key)._appendUnchecked(value)
+        else:
+            setattr(ctd_instance, self.__key, value)
+        if record_content:
+            ctd_instance._addContent(basis.ElementContent(value, self))
+        elif isinstance(value, basis._TypeBinding_mixin) and (value._element() is None):
+            value._setElement(self.__elementBinding)
+        return self
+
     def append (self, ctd_instance, value):
         """Add the given value as another instance of this element within the binding instance.
         @raise pyxb.StructuralBadDocumentError: invoked on an element use that is not plural
@@ -1101,7 +1344,7 @@ class ElementDeclaration (object):
             value._toDOM_csc(dom_support, element)
         elif isinstance(value, six.string_types):
             element = dom_support.createChildElement(self.name(), parent)
-            element.appendChild(dom_support.document().createTextNode(value))
+            dom_support.appendTextChild(value, element)
         elif isinstance(value, _PluralBinding):
             for v in value:
                 self.toDOM(dom_support, parent, v)
@@ -52,6 +52,7 @@ import decimal as python_decimal
 from pyxb.exceptions_ import *
 import pyxb.namespace
 import pyxb.utils.unicode
+import pyxb.utils.binarycodec as binarycodec
 from pyxb.utils import six
 from . import basis
 
@@ -98,6 +99,7 @@ class boolean (basis.simpleTypeDefinition, six.int_type, basis._NoNullaryNonNill
     """XMLSchema datatype U{boolean<http://www.w3.org/TR/xmlschema-2/#boolean>}."""
     _XsdBaseType = anySimpleType
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('boolean')
+    _LexicalScreen_re = re.compile('^(?:true|false|1|0)$')
 
     @classmethod
     def XsdLiteral (cls, value):
@@ -136,6 +138,9 @@ class decimal (basis.simpleTypeDefinition, python_decimal.Decimal, basis._Repres
     """
     _XsdBaseType = anySimpleType
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('decimal')
+    # Python's Decimal also accepts digit group separators and non-ASCII
+    # digits; the screen must not reject what the constructor accepts.
+    _LexicalScreen_re = re.compile('^[-+]?[\\d_]*\\.?[\\d_]*(?:[eE][-+]?[\\d_]+)?$', re.UNICODE)
 
     def __new__ (cls, *args, **kw):
         args = cls._ConvertArguments(args, kw)
@@ -186,6 +191,7 @@ _PrimitiveDatatypes.append(decimal)
 
 class _fp (basis.simpleTypeDefinition, six.float_type, basis._NoNullaryNonNillableNew_mixin):
     _XsdBaseType = anySimpleType
+    _LexicalScreen_re = re.compile('^[-+]?(?:[\\d_]*\\.?[\\d_]*(?:[eE][-+]?[\\d_]+)?|inf|infinity|nan)$', re.IGNORECASE | re.UNICODE)
 
     @classmethod
     def XsdLiteral (cls, value):
@@ -211,6 +217,24 @@ _PrimitiveDatatypes.append(double)
 
 import datetime
 
+def _FractionToMicroseconds (digits, rounded=True):
+    """Convert the digits following the decimal point in a number of
+    seconds to an integral number of microseconds.
+
+    Integer arithmetic is used, so the result is exact.
+
+    @param rounded: If C{True} the result is rounded to the nearest
+    microsecond, with ties going to the even value; otherwise it is
+    truncated.  A fraction that would round up to a whole second yields
+    999999, so the remaining fields of the value are not affected."""
+    usec = six.int_type(digits[:6].ljust(6, '0'))
+    if rounded and (6 < len(digits)) and (999999 > usec):
+        rest = six.int_type(digits[6:])
+        half = 5 * (10 ** (len(digits) - 7))
+        if (rest > half) or ((rest == half) and (usec & 1)):
+            usec += 1
+    return usec
+
 class duration (basis.simpleTypeDefinition, datetime.timedelta, basis._RepresentAsXsdLiteral_mixin):
     """XMLSchema datatype U{duration<http://www.w3.org/TR/xmlschema-2/#duration>}.
 
@@ -229,7 +253,11 @@ class duration (basis.simpleTypeDefinition, datetime.timedelta, basis._Represent
     _XsdBaseType = anySimpleType
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('duration')
 
-    __Lexical_re = re.compile('^(?P<neg>-?)P((?P<years>\d+)Y)?((?P<months>\d+)M)?((?P<days>\d+)D)?(?P<Time>T((?P<hours>\d+)H)?((?P<minutes>\d+)M)?(((?P<seconds>\d+)(?P<fracsec>\.\d+)?)S)?)?$')
+    # The groups are: sign, years, months, days, time separator, hours,
+    # minutes, seconds, fractional seconds
+    __Lexical_re = re.compile('^(-?)P(?:(\d+)Y)?(?:(\d+)M)?(?:(\d+)D)?(?:(T)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:\.(\d+))?S)?)?$')
+
+    _LexicalScreen_re = __Lexical_re
 
     # We do not use weeks
     __XSDFields = ( 'years', 'months', 'days', 'hours', 'minutes', 'seconds' )
@@ -264,17 +292,17 @@ class duration (basis.simpleTypeDefinition, datetime.timedelta, basis._Represent
                 match = cls.__Lexical_re.match(text)
                 if match is None:
                     raise SimpleTypeValueError(cls, text)
-                match_map = match.groupdict()
-                if 'T' == match_map.get('Time'):
+                (neg, years, months, days, time_sep, hours, minutes, seconds, fracsec) = match.groups()
+                if (time_sep is not None) and (hours is None) and (minutes is None) and (seconds is None):
                     # Can't have T without additional time information
                     raise SimpleTypeValueError(cls, text)
 
-                negative_duration = ('-' == match_map.get('neg'))
+                negative_duration = ('-' == neg)
 
                 fractional_seconds = 0.0
-                if match_map.get('fracsec') is not None:
-                    fractional_seconds = six.float_type('0%s' % (match_map['fracsec'],))
-                    usec = six.int_type(1000000 * fractional_seconds)
+                if fracsec is not None:
+                    fractional_seconds = six.float_type('0.' + fracsec)
+                    usec = _FractionToMicroseconds(fracsec, rounded=False)
                     if negative_duration:
                         kw['microseconds'] = - usec
                     else:
@@ -283,17 +311,15 @@ class duration (basis.simpleTypeDefinition, datetime.timedelta, basis._Represent
                     # Discard any bogosity passed in by the caller
                     kw.pop('microsecond', None)
 
-                data = { }
-                for fn in cls.__XSDFields:
-                    v = match_map.get(fn, 0)
-                    if v is None:
-                        v = 0
-                    data[fn] = six.int_type(v)
-                    if fn in cls.__PythonFields:
-                        if negative_duration:
-                            kw[fn] = - data[fn]
-                        else:
-                            kw[fn] = data[fn]
+                data = { 'years' : six.int_type(years or 0),
+                         'months' : six.int_type(months or 0),
+                         'days' : six.int_type(days or 0),
+                         'hours' : six.int_type(hours or 0),
+                         'minutes' : six.int_type(minutes or 0),
+                         'seconds' : six.int_type(seconds or 0) }
+                sign = -1 if negative_duration else 1
+                for fn in ( 'days', 'hours', 'minutes', 'seconds' ):
+                    kw[fn] = sign * data[fn]
                 data['seconds'] += fractional_seconds
                 have_kw_update = True
             elif kw.get('_from_xml'):
@@ -382,24 +408,24 @@ class _PyXBDateTime_base (basis.simpleTypeDefinition, basis._RepresentAsXsdLiter
     Subclasses must define this."""
 
     # Map from strptime/strftime formats to the regular expressions we
-    # use to extract them.  We're more strict than strptime, so not
-    # trying to use that.
-    __PatternMap = { '%Y' : '(?P<negYear>-?)(?P<year>\d{4,})'
-                   , '%m' : '(?P<month>\d{2})'
-                   , '%d' : '(?P<day>\d{2})'
-                   , '%H' : '(?P<hour>\d{2})'
-                   , '%M' : '(?P<minute>\d{2})'
-                   , '%S' : '(?P<second>\d{2})(?P<fracsec>\.\d+)?'
-                   , '%Z' : '(?P<tzinfo>Z|[-+]\d\d:\d\d)' }
-
-    # Cache of compiled regular expressions to parse lexical space of
-    # a subclass.
-    __LexicalREMap = { }
+    # use to extract them, and the fields held by the groups of each
+    # expression.  We're more strict than strptime, so not trying to
+    # use that.
+    __PatternMap = { '%Y' : ('(-?)(\d{4,})', ( 'negYear', 'year' ))
+                   , '%m' : ('(\d{2})', ( 'month', ))
+                   , '%d' : ('(\d{2})', ( 'day', ))
+                   , '%H' : ('(\d{2})', ( 'hour', ))
+                   , '%M' : ('(\d{2})', ( 'minute', ))
+                   , '%S' : ('(\d{2})(?:\.(\d+))?', ( 'second', 'fracsec' ))
+                   , '%Z' : ('(Z|[-+]\d\d:\d\d)', ( 'tzinfo', )) }
+
+    # Cache of parsers for the lexical space of a subclass.
+    __LexicalParserMap = { }
 
     # Fields extracted by parsing that have an integer value
     __LexicalIntegerFields = ( 'year', 'month', 'day', 'hour', 'minute', 'second' )
 
-    _UTCTimeZone = pyxb.utils.utility.UTCOffsetTimeZone(0)
+    _UTCTimeZone = pyxb.utils.utility.UTCOffsetTimeZone.Intern(0)
     """A L{datetime.tzinfo} instance representing UTC."""
 
     _LocalTimeZone = pyxb.utils.utility.LocalTimeZone()
@@ -409,34 +435,46 @@ class _PyXBDateTime_base (basis.simpleTypeDefinition, basis._RepresentAsXsdLiter
     _DefaultMonth = 1
     _DefaultDay = 1
 
+    @classmethod
+    def __LexicalParser (cls):
+        """Return the parser for the lexical space of this class.
+
+        This is a tuple comprising the compiled regular expression; the
+        name and group index of each integer field; and the group indexes
+        of the year sign, the fractional seconds, and the time zone, each
+        of which is C{None} if the lexical space does not include it."""
+        parser = cls.__LexicalParserMap.get(cls)
+        if parser is None:
+            pattern = [ '^' ]
+            fields = []
+            for elt in re.split('(%[YmdHMSZ])', cls._Lexical_fmt + '%Z?$'):
+                (expr, elt_fields) = cls.__PatternMap.get(elt, (elt, ()))
+                pattern.append(expr)
+                fields.extend(elt_fields)
+            int_fields = tuple([ (_f, _i) for (_i, _f) in enumerate(fields) if _f in cls.__LexicalIntegerFields ])
+            indexes = [ (fields.index(_f) if _f in fields else None) for _f in ( 'negYear', 'fracsec', 'tzinfo' ) ]
+            parser = (re.compile(''.join(pattern)), int_fields) + tuple(indexes)
+            cls.__LexicalParserMap[cls] = parser
+        return parser
+
+    @classmethod
+    def _LexicalScreen (cls):
+        return cls.__LexicalParser()[0]
+
     @classmethod
     def _LexicalToKeywords (cls, text):
-        lexical_re = cls.__LexicalREMap.get(cls)
-        if lexical_re is None:
-            pattern = '^' + cls._Lexical_fmt + '%Z?$'
-            for (k, v) in six.iteritems(cls.__PatternMap):
-                pattern = pattern.replace(k, v)
-            lexical_re = re.compile(pattern)
-            cls.__LexicalREMap[cls] = lexical_re
+        (lexical_re, int_fields, neg_ix, frac_ix, tz_ix) = cls.__LexicalParser()
         match = lexical_re.match(text)
         if match is None:
             raise SimpleTypeValueError(cls, text)
-        match_map = match.groupdict()
-        kw = { }
-        for (k, v) in six.iteritems(match_map):
-            if (k in cls.__LexicalIntegerFields) and (v is not None):
-                kw[k] = six.int_type(v)
-        if '-' == match_map.get('negYear'):
+        groups = match.groups()
+        kw = dict([ (_f, six.int_type(groups[_i])) for (_f, _i) in int_fields ])
+        if (neg_ix is not None) and ('-' == groups[neg_ix]):
             kw['year'] = - kw['year']
-        if match_map.get('fracsec') is not None:
-            kw['microsecond'] = six.int_type(round(1000000 * six.float_type('0%s' % (match_map['fracsec'],))))
-        else:
-            # Discard any bogosity passed in by the caller
-            kw.pop('microsecond', None)
-        if match_map.get('tzinfo') is not None:
-            kw['tzinfo'] = pyxb.utils.utility.UTCOffsetTimeZone(match_map['tzinfo'])
-        else:
-            kw.pop('tzinfo', None)
+        if (frac_ix is not None) and (groups[frac_ix] is not None):
+            kw['microsecond'] = _FractionToMicroseconds(groups[frac_ix])
+        if groups[tz_ix] is not None:
+            kw['tzinfo'] = pyxb.utils.utility.UTCOffsetTimeZone.Intern(groups[tz_ix])
         return kw
 
     @classmethod
@@ -478,7 +516,10 @@ class _PyXBDateTime_base (basis.simpleTypeDefinition, basis._RepresentAsXsdLiter
         if pyxb.PreserveInputTimeZone():
             return
         tzoffs = kw.pop('tzinfo', None)
-        if tzoffs is not None:
+        if (tzoffs is cls._UTCTimeZone) or (isinstance(tzoffs, pyxb.utils.utility.UTCOffsetTimeZone) and not tzoffs.utcoffset(None)):
+            # Already in UTC
+            kw['tzinfo'] = cls._UTCTimeZone
+        elif tzoffs is not None:
             use_kw = kw.copy()
             # Ensure ctor requirements of datetime.datetime are met
             use_kw.setdefault('year', cls._DefaultYear)
@@ -745,13 +786,17 @@ class date (_PyXBDateOnly_base):
         utc_offset = (sdt - self).seconds // self.__SecondsPerMinute
         if utc_offset > self.__MinutesPerHalfDay:
             utc_offset -= self.__MinutesPerDay
-        return pyxb.utils.utility.UTCOffsetTimeZone(utc_offset)
+        return pyxb.utils.utility.UTCOffsetTimeZone.Intern(utc_offset)
 
     @classmethod
     def XsdLiteral (cls, value):
         # Work around strftime year restriction
         fmt = cls._Lexical_fmt
         rtz = value.xsdRecoverableTzinfo()
+        # Python 3.8 and later construct the result of datetime arithmetic
+        # with the type of the operand, which this constructor does not
+        # accept, so do the arithmetic on a plain datetime.
+        value = datetime.datetime(value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond, value.tzinfo)
         if rtz is not None:
             # If the date is timezoned, convert it to UTC
             value -= value.tzinfo.utcoffset(value)
@@ -834,16 +879,23 @@ class hexBinary (basis.simpleTypeDefinition, six.binary_type):
     _XsdBaseType = anySimpleType
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('hexBinary')
 
+    @classmethod
+    def _TextDecoder (cls, sink=None):
+        """Return an incremental decoder for literals of this type.
+
+        See L{pyxb.utils.binarycodec.Decoder}."""
+        return binarycodec.HexDecoder(sink)
+
     @classmethod
     def _ConvertArguments_vx (cls, args, kw):
         if (1 <= len(args)) and kw.get('_from_xml', False):
             xmlt = args[0]
+            decoder = cls._TextDecoder()
             try:
-                xmld = xmlt.encode('utf-8')
-                arg0 = binascii.unhexlify(xmld)
-                args = (arg0,) + args[1:]
-            except (TypeError, binascii.Error):
-                raise SimpleTypeValueError(cls, args[0])
+                decoder.feed(xmlt)
+                args = (decoder.close(),) + args[1:]
+            except (TypeError, ValueError):
+                raise SimpleTypeValueError(cls, xmlt)
         return args
 
     @classmethod
@@ -854,6 +906,15 @@ class hexBinary (basis.simpleTypeDefinition, six.binary_type):
         rvt = rvd.decode('utf-8')
         return rvt.upper()
 
+    @classmethod
+    def XsdLiteralChunks (cls, value):
+        """Generate the lexical representation of the value in pieces.
+
+        The concatenation of the pieces is L{XsdLiteral}C{(value)}."""
+        if isinstance(value, six.text_type):
+            value = value.encode('utf-8')
+        return binarycodec.HexChunks(value)
+
     @classmethod
     def XsdValueLength (cls, value):
         return len(value)
@@ -870,17 +931,8 @@ class base64Binary (basis.simpleTypeDefinition, six.binary_type):
 
     # base64 is too lenient: it accepts 'ZZZ=' as an encoding of
     # 'e\x96', while the required XML Schema production requires
-    # 'ZZY='.  Define a regular expression per section 3.2.16.
-
-    _B04 = '[AQgw]'
-    _B04S = '(%s ?)' % (_B04,)
-    _B16 = '[AEIMQUYcgkosw048]'
-    _B16S = '(%s ?)' % (_B16,)
-    _B64 = '[ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/]'
-    _B64S = '(%s ?)' % (_B64,)
-
-    __Pattern = '^((' + _B64S + '{4})*((' + _B64S + '{3}' + _B64 + ')|(' + _B64S + '{2}' + _B16S + '=)|(' + _B64S + _B04S + '= ?=)))?$'
-    __Lexical_re = re.compile(__Pattern)
+    # 'ZZY='.  The decoder checks the literal against the productions of
+    # section 3.2.16.
 
     __ValidateLength = None
 
@@ -889,10 +941,11 @@ class base64Binary (basis.simpleTypeDefinition, six.binary_type):
         """Control the maximum encoded size that is checked for XML literal validity.
 
         Python's base64 module allows some literals that are invalid
-        according to XML rules.  PyXB verifies the validity using a
-        regular expression, which is costly for something that is
-        unlikely to occur.  Use this function to inhibit checks for
-        validity based on the length of the XML literal.
+        according to XML rules, such as C{ZZZ=}, in which the bits that
+        precede the padding are not zero.  Use this function to accept
+        such literals based on the length of the XML literal.  Literals
+        that use characters outside the base64 alphabet, or that have the
+        wrong length, are always rejected.
 
         @param length: C{None} (default) to check all literals,
         otherwise the maximum length literal that will be checked.
@@ -907,20 +960,23 @@ class base64Binary (basis.simpleTypeDefinition, six.binary_type):
             return rv
         raise TypeError('must provide None or integer length')
 
+    @classmethod
+    def _TextDecoder (cls, sink=None):
+        """Return an incremental decoder for literals of this type.
+
+        See L{pyxb.utils.binarycodec.Decoder}."""
+        return binarycodec.Base64Decoder(sink, validate_length=cls.__ValidateLength)
+
     @classmethod
     def _ConvertArguments_vx (cls, args, kw):
         if (1 <= len(args)) and kw.get('_from_xml', False):
             xmlt = args[0]
+            decoder = cls._TextDecoder()
             try:
-                xmld = xmlt.encode('utf-8')
-                arg0 = base64.standard_b64decode(xmld)
-                args = (arg0,) + args[1:]
-            except (TypeError, binascii.Error):
+                decoder.feed(xmlt)
+                args = (decoder.close(),) + args[1:]
+            except (TypeError, ValueError):
                 raise SimpleTypeValueError(cls, xmlt)
-            if (cls.__ValidateLength is None) or (cls.__ValidateLength >= len(xmlt)):
-                # This is what it costs to try to be a validating processor.
-                if cls.__Lexical_re.match(xmlt) is None:
-                    raise SimpleTypeValueError(cls, xmlt)
         return args
 
     @classmethod
@@ -931,6 +987,15 @@ class base64Binary (basis.simpleTypeDefinition, six.binary_type):
         rvt = rvd.decode('utf-8')
         return rvt
 
+    @classmethod
+    def XsdLiteralChunks (cls, value):
+        """Generate the lexical representation of the value in pieces.
+
+        The concatenation of the pieces is L{XsdLiteral}C{(value)}."""
+        if isinstance(value, six.text_type):
+            value = value.encode('utf-8')
+        return binarycodec.Base64Chunks(value)
+
     @classmethod
     def XsdValueLength (cls, value):
         return len(value)
@@ -1189,6 +1254,7 @@ class integer (basis.simpleTypeDefinition, six.long_type, basis._NoNullaryNonNil
     """XMLSchema datatype U{integer<http://www.w3.org/TR/xmlschema-2/#integer>}."""
     _XsdBaseType = decimal
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('integer')
+    _LexicalScreen_re = re.compile('^[-+]?[\\d_]+[lL]?$', re.UNICODE)
 
     @classmethod
     def XsdLiteral (cls, value):
@@ -1215,6 +1281,7 @@ class int (basis.simpleTypeDefinition, six.int_type, basis._NoNullaryNonNillable
     """XMLSchema datatype U{int<http://www.w3.org/TR/xmlschema-2/#int>}."""
     _XsdBaseType = long
     _ExpandedName = pyxb.namespace.XMLSchema.createExpandedName('int')
+    _LexicalScreen_re = integer._LexicalScreen_re
 
     @classmethod
     def XsdLiteral (cls, value):
@@ -1294,7 +1361,7 @@ def _BuildAutomaton ():
         fac.UpdateInstruction(cc_0, True) ]))
     st_0._set_transitionSet(transitions)
     return fac.Automaton(states, counters, True, containing_state=None)
-anyType._Automaton = _BuildAutomaton()
+anyType._SetAutomatonBuilder(_BuildAutomaton)
 
 
 # anyType._IsUrType() is True; foo._IsUrType() for descendents of it
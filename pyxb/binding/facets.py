@@ -173,9 +173,19 @@ class ConstrainingFacet (Facet):
     # if it happens to be the same digraph.
     _FacetPrefix = 'CF'
 
+    @classmethod
+    def _InvalidateValidators (cls):
+        """Discard validators compiled from facets, since a facet has
+        been reconfigured."""
+        basis.simpleTypeDefinition._InvalidateConstraintValidators()
+
     def __init__ (self, **kw):
         super(ConstrainingFacet, self).__init__(**kw)
 
+    def _value (self, v):
+        super(ConstrainingFacet, self)._value(v)
+        self._InvalidateValidators()
+
     def _validateConstraint_vx (self, value):
         raise pyxb.LogicError("Facet %s does not implement constraints" % (self.Name(),))
 
@@ -185,6 +195,24 @@ class ConstrainingFacet (Facet):
         The actual test is delegated to the subclasses."""
         return self._validateConstraint_vx(value)
 
+    def _compileValidator_vx (self):
+        """Return a callable equivalent to L{validateConstraint}, or
+        C{None} if the facet in its current configuration accepts all
+        values.
+
+        Subclasses override this to precompute whatever the check
+        needs from the facet configuration, so that the returned
+        callable does as little work per value as possible."""
+        return self._validateConstraint_vx
+
+    def compileValidator (self):
+        """Return a callable that takes a value and returns True iff
+        it satisfies this facet, or C{None} if no check is required.
+
+        The result reflects the facet configuration at the time of the
+        call."""
+        return self._compileValidator_vx()
+
     def __setFromKeywords(self, **kw):
         kwv = kw.get('value')
         if kwv is not None:
@@ -203,6 +231,7 @@ class ConstrainingFacet (Facet):
         super_fn = getattr(super(ConstrainingFacet, self), '_setFromKeywords_vb', lambda *a,**kw: self)
         rv = super_fn(**kw)
         self.__setFromKeywords(**kw)
+        self._InvalidateValidators()
         return rv
 
 class _LateDatatype_mixin (pyxb.cscRoot):
@@ -332,6 +361,15 @@ class CF_length (ConstrainingFacet, _Fixed_mixin):
         value_length = value.xsdValueLength()
         return (value_length is None) or (self.value() is None) or (value_length == self.value())
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        def validator (value):
+            value_length = value.xsdValueLength()
+            return (value_length is None) or (value_length == bound)
+        return validator
+
 class CF_minLength (ConstrainingFacet, _Fixed_mixin):
     """A facet that constrains the length of the lexical representation of a value.
 
@@ -344,6 +382,15 @@ class CF_minLength (ConstrainingFacet, _Fixed_mixin):
         value_length = value.xsdValueLength()
         return (value_length is None) or (self.value() is None) or (value_length >= self.value())
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        def validator (value):
+            value_length = value.xsdValueLength()
+            return (value_length is None) or (value_length >= bound)
+        return validator
+
 class CF_maxLength (ConstrainingFacet, _Fixed_mixin):
     """A facet that constrains the length of the lexical representation of a value.
 
@@ -356,6 +403,15 @@ class CF_maxLength (ConstrainingFacet, _Fixed_mixin):
         value_length = value.xsdValueLength()
         return (value_length is None) or (self.value() is None) or (value_length <= self.value())
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        def validator (value):
+            value_length = value.xsdValueLength()
+            return (value_length is None) or (value_length <= bound)
+        return validator
+
 import pyxb.utils.xmlre
 
 class _PatternElement (utility.PrivateTransient_mixin):
@@ -395,6 +451,10 @@ class _PatternElement (utility.PrivateTransient_mixin):
             self.__compiledExpression = re.compile(self.__pythonExpression)
         return self.__compiledExpression.match(text)
 
+    def pythonExpression (self):
+        """The Python regular expression equivalent to the XML pattern."""
+        return self.__pythonExpression
+
 class CF_pattern (ConstrainingFacet, _CollectionFacet_mixin):
     """A facet that constrains the lexical representation of a value
     to match one of a set of patterns.
@@ -425,6 +485,7 @@ class CF_pattern (ConstrainingFacet, _CollectionFacet_mixin):
     def addPattern (self, **kw):
         pattern = self._CollectionFacet_itemType(**kw)
         self.__patternElements.append(pattern)
+        self._InvalidateValidators()
         return pattern
 
     def _validateConstraint_vx (self, value):
@@ -441,6 +502,24 @@ class CF_pattern (ConstrainingFacet, _CollectionFacet_mixin):
                 return True
         return False
 
+    def _compileValidator_vx (self):
+        if 0 == len(self.__patternElements):
+            return None
+        # Each Python expression is anchored at both ends, so the
+        # alternation of all of them matches iff one of them does.
+        alternatives = [ '(?:%s)' % (_pe.pythonExpression(),) for _pe in self.__patternElements ]
+        try:
+            match = re.compile('|'.join(alternatives)).match
+        except (re.error, OverflowError, AssertionError):
+            # Too many groups for one expression; fall back to testing
+            # the patterns individually.
+            return self._validateConstraint_vx
+        def validator (value):
+            if not isinstance(value, six.string_types):
+                return True
+            return match(value) is not None
+        return validator
+
 @six.python_2_unicode_compatible
 class _EnumerationElement (object):
     """This class represents individual values that appear within a
@@ -577,6 +656,7 @@ class CF_enumeration (ConstrainingFacet, _CollectionFacet_mixin, _LateDatatype_m
             value = ' '.join([ _v.xsdLiteral() for _v in value ])
         self.__valueToElement[value] = ee
         self._items().append(ee)
+        self._InvalidateValidators()
         return value
 
     def elementForValue (self, value):
@@ -604,6 +684,23 @@ class CF_enumeration (ConstrainingFacet, _CollectionFacet_mixin, _LateDatatype_m
                 return True
         return False
 
+    def _compileValidator_vx (self):
+        if 0 == len(self._items()):
+            return None
+        values = [ _ee.value() for _ee in six.iteritems(self) ]
+        try:
+            value_set = frozenset(values)
+        except TypeError:
+            # List values (possibly via a union member) are not
+            # hashable; compare them one at a time.
+            return self._validateConstraint_vx
+        def validator (value):
+            try:
+                return value in value_set
+            except TypeError:
+                return value in values
+        return validator
+
 class _Enumeration_mixin (pyxb.cscRoot):
     """Marker class to indicate that the generated binding has enumeration members."""
     @classmethod
@@ -648,6 +745,9 @@ class CF_whiteSpace (ConstrainingFacet, _Fixed_mixin):
         """No validation rules for whitespace facet."""
         return True
 
+    def _compileValidator_vx (self):
+        return None
+
 class CF_minInclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     """Specify the minimum legal value for the constrained type.
 
@@ -659,6 +759,12 @@ class CF_minInclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     def _validateConstraint_vx (self, value):
         return (self.value() is None) or (self.value() <= value)
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        return lambda value: bound <= value
+
 
 class CF_maxInclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     """Specify the maximum legal value for the constrained type.
@@ -671,6 +777,12 @@ class CF_maxInclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     def _validateConstraint_vx (self, value):
         return (self.value() is None) or (self.value() >= value)
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        return lambda value: bound >= value
+
 class CF_minExclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     """Specify the exclusive lower bound of legal values for the constrained type.
 
@@ -682,6 +794,12 @@ class CF_minExclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     def _validateConstraint_vx (self, value):
         return (self.value() is None) or (self.value() < value)
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        return lambda value: bound < value
+
 class CF_maxExclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     """Specify the exclusive upper bound of legal values for the constrained type.
 
@@ -693,6 +811,12 @@ class CF_maxExclusive (ConstrainingFacet, _Fixed_mixin, _LateDatatype_mixin):
     def _validateConstraint_vx (self, value):
         return (self.value() is None) or (self.value() > value)
 
+    def _compileValidator_vx (self):
+        bound = self.value()
+        if bound is None:
+            return None
+        return lambda value: bound > value
+
 class CF_totalDigits (ConstrainingFacet, _Fixed_mixin):
     """Specify the number of digits in the *value* space of the type.
 
@@ -727,6 +851,11 @@ class CF_totalDigits (ConstrainingFacet, _Fixed_mixin):
             scale *= 10
         return match and (v is not None) and (abs(v) < scale)
 
+    def _compileValidator_vx (self):
+        if self.value() is None:
+            return None
+        return self._validateConstraint_vx
+
 class CF_fractionDigits (ConstrainingFacet, _Fixed_mixin):
     """Specify the number of sub-unit digits in the *value* space of the type.
 
@@ -750,6 +879,11 @@ class CF_fractionDigits (ConstrainingFacet, _Fixed_mixin):
             scale *= 10
         return False
 
+    def _compileValidator_vx (self):
+        if self.value() is None:
+            return None
+        return self._validateConstraint_vx
+
 class FundamentalFacet (Facet):
     """A fundamental facet provides information on the value space of the associated type."""
 
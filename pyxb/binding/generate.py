@@ -24,9 +24,11 @@ import logging.config
 import io
 import datetime
 import errno
+import pickle
 
 import pyxb
 import pyxb.xmlschema as xs
+import pyxb.utils.uricache
 from pyxb.utils import utility, templates, six
 from pyxb.utils.utility import repr2to3
 from pyxb.binding import basis, datatypes, facets
@@ -317,7 +319,7 @@ def %{name} ():
         if st.subAutomata is not None:
             au_src.append('    sub_automata = []')
             for sa in st.subAutomata:
-                au_src.append('    sub_automata.append(%s)' % (_GenerateAutomaton(sa, template_map, st_id, lines, **kw),))
+                au_src.append('    sub_automata.append(%s())' % (_GenerateAutomaton(sa, template_map, st_id, lines, **kw),))
         if st.finalUpdate is None:
             au_src.append('    final_update = None')
         else:
@@ -346,7 +348,7 @@ def %{name} ():
         au_src.append('    %s._set_transitionSet(transitions)' % (state_map[st],))
     au_src.append('    return fac.Automaton(states, counters, %r, containing_state=%s)' % (automaton.nullable, containing_state))
     lines.extend(au_src)
-    return '%s()' % (name,)
+    return name
 
 def GenerateAutomaton (ctd, **kw):
     aux = _CTDAuxData.Get(ctd)
@@ -562,6 +564,45 @@ class %{std} (pyxb.binding.basis.STD_union):
                                            localName=binding_module.literal(std.name(), **kw), **template_map))
     outf.write(templates.replaceInText('_module_typeBindings.%{std} = %{std}\n', **template_map))
 
+def _IdentityConstraintsLiteral (ed, binding_module, **kw):
+    """Return a Python expression for the list of identity constraints
+    declared on an element, or C{None} if there are none."""
+    import pyxb.binding.identity
+    constraints = []
+    for icd in ed.identityConstraintDefinitions():
+        category = { icd.ICC_KEY : pyxb.binding.identity.IdentityConstraint.KEY,
+                     icd.ICC_KEYREF : pyxb.binding.identity.IdentityConstraint.KEYREF,
+                     icd.ICC_UNIQUE : pyxb.binding.identity.IdentityConstraint.UNIQUE }[icd.identityConstraintCategory()]
+        namespaces = {}
+        for xpath in [ icd.selector() ] + icd.fields():
+            for prefix in pyxb.binding.identity.XPathPrefixes(xpath):
+                if prefix in icd.xpathNamespaces():
+                    namespaces[prefix] = icd.xpathNamespaces()[prefix]
+        refer = None
+        if icd.referencedKey() is not None:
+            refer = icd.referencedKey().expandedName()
+        # Check the expressions now rather than when the bindings are
+        # imported.  Schemas in use do not always respect the restricted
+        # XPath subset; such constraints are not enforced.
+        try:
+            pyxb.binding.identity.IdentityConstraint(icd.expandedName(), category, icd.selector(), icd.fields(), namespaces, refer)
+        except pyxb.SchemaValidationError as e:
+            _log.warning('Identity constraint %s will not be enforced: %s', icd.expandedName(), e)
+            continue
+        aux_init = []
+        if namespaces:
+            aux_init.append('namespaces={ %s }' % (', '.join([ '%s : %s' % (repr2to3(_p), repr2to3(namespaces[_p])) for _p in sorted(namespaces) ]),))
+        if refer is not None:
+            aux_init.append('refer=%s' % (binding_module.literal(refer, **kw),))
+        aux_init.append('location=%s' % (repr2to3(icd._location()),))
+        constraints.append('pyxb.binding.identity.IdentityConstraint(%s, %s, %s, [ %s ], %s)' % (binding_module.literal(icd.expandedName(), **kw),
+                                                                                              repr2to3(category), repr2to3(icd.selector()),
+                                                                                              ', '.join([ repr2to3(_f) for _f in icd.fields() ]),
+                                                                                              ', '.join(aux_init)))
+    if not constraints:
+        return None
+    return '[ %s ]' % (', '.join(constraints),)
+
 def elementDeclarationMap (ed, binding_module, **kw):
     template_map = { }
     template_map['qname'] = six.text_type(ed.expandedName())
@@ -586,8 +627,11 @@ def elementDeclarationMap (ed, binding_module, **kw):
     template_map['typeDefinition'] = binding_module.literal(ed.typeDefinition(), **kw)
     if ed.substitutionGroupAffiliation():
         template_map['substitution_group'] = binding_module.literal(ed.substitutionGroupAffiliation(), **kw)
+    identity_constraints = _IdentityConstraintsLiteral(ed, binding_module, **kw)
+    if identity_constraints is not None:
+        template_map['identity_constraints'] = identity_constraints
     aux_init = []
-    for k in ( 'nillable', 'abstract', 'scope', 'documentation' ):
+    for k in ( 'nillable', 'abstract', 'scope', 'documentation', 'identity_constraints' ):
         if k in template_map:
             aux_init.append('%s=%s' % (k, template_map[k]))
     aux_init.append('location=%s' % (template_map['decl_location'],))
@@ -927,6 +971,10 @@ class %{ctd} (%{superclass}):
     class_keywords = frozenset(basis.complexTypeDefinition._ReservedSymbols)
     class_unique = set()
 
+    # Instance attribute names holding values for element and attribute
+    # declarations introduced in this class
+    slots = []
+
     # Deconflict elements first, attributes are lower priority.
     # Expectation is that all elements that have the same tag in the
     # XML are combined into the same instance member, even if they
@@ -972,6 +1020,7 @@ class %{ctd} (%{superclass}):
                 continue
 
             binding_module.importForDeclaration(ed)
+            slots.append(ef_map['key'])
             if ed.expandedName().localName() != ef_map['id']:
                 _log.warning('Element use %s.%s renamed to %s', ctd.expandedName(), ed.expandedName(), ef_map['id'])
             definitions.append(templates.replaceInText('''
@@ -988,11 +1037,11 @@ class %{ctd} (%{superclass}):
 
         auto_defn = GenerateAutomaton(ctd, binding_module=binding_module, **kw)
         if auto_defn is not None:
-            (automaton_ctor, lines) = auto_defn
+            (automaton_builder, lines) = auto_defn
             if lines:
                 outf.postscript().append("\n".join(lines))
                 outf.postscript().append("\n")
-            outf.postscript().append(templates.replaceInText('%{ctd}._Automaton = %{automaton_ctor}\n', ctd=template_map['ctd'], automaton_ctor=automaton_ctor))
+            outf.postscript().append(templates.replaceInText('%{ctd}._SetAutomatonBuilder(%{automaton_builder})\n', ctd=template_map['ctd'], automaton_builder=automaton_builder))
             outf.postscript().append("\n")
 
     # Create definitions for all attributes.
@@ -1047,6 +1096,8 @@ class %{ctd} (%{superclass}):
             au_map['documentation'] = binding_module.literal(None)
 
         binding_module.importForDeclaration(ad)
+        if au == aur:
+            slots.append(au_map['key'])
         attribute_uses.append(templates.replaceInText('%{use}.name() : %{use}', **au_map))
         if ad.expandedName().localName() != au_map['id']:
             _log.warning('Attribute %s.%s renamed to %s', ctd.expandedName(), ad.expandedName(), au_map['id'])
@@ -1059,6 +1110,10 @@ class %{ctd} (%{superclass}):
     %{inspector} = property(%{use}.value, %{use}.set, None, %{documentation})
 ''', ctd=template_map['ctd'], **au_map))
 
+    if generator.generateSlots():
+        prolog_template += '    __slots__ = (%s)\n' % (''.join([ '%s, ' % (repr2to3(_s),) for _s in slots ]),)
+    if generator.compactInstances():
+        prolog_template += '    _CompactInstances = True\n'
     if ctd.attributeWildcard() is not None:
         definitions.append('_AttributeWildcard = %s' % (binding_module.literal(ctd.attributeWildcard(), **kw),))
     if ctd.hasWildcardElement():
@@ -1122,7 +1177,23 @@ def _PrepareComplexTypeDefinition (ctd, generator, nsm, module_context):
     aux = _CTDAuxData.Create(ctd)
     multiples = aux.edMultiples
     for cd in ctd.localScopedDeclarations():
-        _SetNameWithAccessors(cd, ctd, cd in multiples, module_context, nsm, kw)
+        use_map = _SetNameWithAccessors(cd, ctd, cd in multiples, module_context, nsm, kw)
+        if generator.generateSlots():
+            use_map['key'] = _SlotName(ctd.nameInBinding(), use_map['key'])
+
+def _SlotName (class_name, name):
+    """Return the attribute name Python assigns to the slot C{name} in a
+    class named C{class_name}.
+
+    Names in C{__slots__} are subject to private name mangling, but the
+    binding runtime stores element and attribute values with C{setattr},
+    which is not.  Generating the mangled name as the key makes the two
+    agree."""
+    if name.startswith('__') and not name.endswith('__'):
+        stripped = class_name.lstrip('_')
+        if stripped:
+            return '_%s%s' % (stripped, name)
+    return name
 
 def _SetNameWithAccessors (component, container, is_plural, binding_module, nsm, kw):
     use_map = component._templateMap()
@@ -1394,6 +1465,8 @@ class _ModuleNaming_mixin (object):
 
     def bindingFile (self):
         return self.__bindingFile
+    def bindingFilePath (self):
+        return self.__bindingFilePath
     __bindingFile = None
     __bindingFilePath = None
 
@@ -1602,7 +1675,7 @@ class NamespaceModule (_ModuleNaming_mixin):
     __namespaceGroupModule = None
 
     _UniqueInModule = _ModuleNaming_mixin._UniqueInModule.copy()
-    _UniqueInModule.update([ 'CreateFromDOM', 'CreateFromDocument' ])
+    _UniqueInModule.update([ 'CreateFromDOM', 'CreateFromDocument', 'CreateFromDocuments' ])
 
     def namespaceGroupHead (self):
         return self.__namespaceGroupHead
@@ -1699,7 +1772,7 @@ def CreateFromDocument (xml_text, fallback_namespace=None, location_base=None, d
     only for absent namespaces.
     """
 
-    if pyxb.XMLStyle_saxer != pyxb._XMLStyle:
+    if pyxb.XMLStyle_saxer != pyxb._CurrentXMLStyle():
         dom = pyxb.utils.domutils.StringToDOM(xml_text)
         return CreateFromDOM(dom.documentElement)
     if fallback_namespace is None:
@@ -1715,6 +1788,18 @@ def CreateFromDocument (xml_text, fallback_namespace=None, location_base=None, d
     instance = handler.rootObject()
     return instance
 
+def CreateFromDocuments (documents, workers=None, ordered=True, mapper=None, **kw):
+    """Create Python instances from a sequence of XML documents, converting
+    them in a pool of worker processes.
+
+    Each document is converted as by L{CreateFromDocument}.  This module must
+    be importable by name in the worker processes.
+
+    @see: L{pyxb.binding.bulk.CreateFromDocuments} for the keywords and
+    return value."""
+    import pyxb.binding.bulk
+    return pyxb.binding.bulk.CreateFromDocuments(__name__, documents, workers=workers, ordered=ordered, mapper=mapper, **kw)
+
 def CreateFromDOM (node, fallback_namespace=None, default_namespace=None):
     """Create a Python instance from the given DOM node.
     The node tag must correspond to an element declaration in this module.
@@ -2266,6 +2351,80 @@ from %s import *
         return self
     __writeForCustomization = None
 
+    def generateSlots (self):
+        """Indicates whether complex type bindings should declare C{__slots__} for their element and attribute values.
+
+        This reduces the memory required by each binding instance.  The
+        instance attribute names used for element and attribute values
+        are mangled so they match the slot names, which changes the
+        layout of pickled instances."""
+        return self.__generateSlots
+    def setGenerateSlots (self, generate_slots):
+        self.__generateSlots = generate_slots
+        return self
+    __generateSlots = None
+
+    def compactInstances (self):
+        """Indicates whether complex type bindings should discard per-instance bookkeeping.
+
+        If enabled, instances of the generated classes do not retain the
+        document location or namespace context from which they were
+        created, and element content is not recorded in
+        C{orderedContent} (except for types with mixed content).  Error
+        messages will be less informative and documents generated from
+        the instances will follow the content model order rather than
+        the original order."""
+        return self.__compactInstances
+    def setCompactInstances (self, compact_instances):
+        self.__compactInstances = compact_instances
+        return self
+    __compactInstances = None
+
+    def reportResolutionTimes (self):
+        """Indicates whether C{pyxbgen} should report the time spent resolving schema components.
+
+        The report is taken from
+        L{pyxb.namespace.resolution.ResolutionStatistics} and breaks the time
+        down by the kind of component being resolved."""
+        return self.__reportResolutionTimes
+    def setReportResolutionTimes (self, report_resolution_times):
+        self.__reportResolutionTimes = report_resolution_times
+        return self
+    __reportResolutionTimes = None
+
+    def jobs (self):
+        """The number of processes used to generate and write binding modules.
+
+        Names are assigned to all components in a single process, after
+        which the code for each namespace, or group of mutually dependent
+        namespaces, is generated independently of the others.  When this is
+        greater than one, L{writeModules} distributes that work among this
+        many worker processes.  Worker processes are created by forking, so
+        where that is not supported the modules are generated in a single
+        process.
+
+        @rtype: C{int}"""
+        return self.__jobs
+    def setJobs (self, jobs):
+        self.__jobs = jobs
+        return self
+    __jobs = None
+
+    def incremental (self):
+        """Indicates whether C{pyxbgen} should skip generation when its inputs are unchanged.
+
+        When enabled, a manifest recording the signature of every schema
+        document read, the content of every namespace archive from which
+        components were loaded, and the files written is saved in the binding
+        root after bindings are generated.  If the manifest for the same
+        configuration shows that nothing has changed since, the bindings are
+        not regenerated.  See L{isUpToDate}."""
+        return self.__incremental
+    def setIncremental (self, incremental):
+        self.__incremental = incremental
+        return self
+    __incremental = None
+
     def allowAbsentModule (self):
         """Indicates whether the code generator is permitted to
         process namespace for which no module path can be determined.
@@ -2302,6 +2461,34 @@ from %s import *
         self.__uriContentArchiveDirectory = ucad
     __uriContentArchiveDirectory = None
 
+    def uriCacheDirectory (self):
+        """The directory holding a cache of documents retrieved from remote URIs.
+
+        Remote schema documents are read from the cache if present there,
+        and added to it when they are retrieved.  Before schema are
+        processed, the entrypoint schema and all documents they include or
+        import are retrieved concurrently.  See
+        L{pyxb.utils.uricache.URICache}.
+        @rtype: C{str}"""
+        return self.__uriCacheDirectory
+    def setUriCacheDirectory (self, uri_cache_directory):
+        self.__uriCacheDirectory = uri_cache_directory
+        return self
+    __uriCacheDirectory = None
+
+    def offline (self):
+        """Indicates whether remote documents must be found in the URI cache.
+
+        If enabled, documents that are not in the L{URI
+        cache<uriCacheDirectory>} are not retrieved from the network, and
+        schema that require them cannot be processed.  This has no effect if
+        no cache is used."""
+        return self.__offline
+    def setOffline (self, offline):
+        self.__offline = offline
+        return self
+    __offline = None
+
     def loggingConfigFile (self):
         """A file provided to L{logging.config.fileConfig} to control log messages.
 
@@ -2339,10 +2526,17 @@ from %s import *
         @keyword schemas: Invokes L{setSchemas}
         @keyword namespaces: Invokes L{setNamespaces}
         @keyword write_for_customization: Invokes L{setWriteForCustomization}
+        @keyword generate_slots: Invokes L{setGenerateSlots}
+        @keyword compact_instances: Invokes L{setCompactInstances}
+        @keyword report_resolution_times: Invokes L{setReportResolutionTimes}
+        @keyword jobs: Invokes L{setJobs}
+        @keyword incremental: Invokes L{setIncremental}
         @keyword allow_builtin_generation: Invokes L{setAllowBuiltinGeneration}
         @keyword allow_absent_module: Invokes L{setAllowAbsentModule}
         @keyword generate_to_files: Sets L{generateToFiles}
         @keyword uri_content_archive_directory: Invokes L{setUriContentArchiveDirectory}
+        @keyword uri_cache_directory: Invokes L{setUriCacheDirectory}
+        @keyword offline: Invokes L{setOffline}
         @keyword logging_config_file: Invokes L{setLoggingConfigFile}
         """
         argv = kw.get('argv')
@@ -2368,10 +2562,17 @@ from %s import *
         self.__schemas = kw.get('schemas', [])[:]
         self.__namespaces = set(kw.get('namespaces', []))
         self.__writeForCustomization = kw.get('write_for_customization', False)
+        self.__generateSlots = kw.get('generate_slots', False)
+        self.__compactInstances = kw.get('compact_instances', False)
+        self.__reportResolutionTimes = kw.get('report_resolution_times', False)
+        self.__jobs = kw.get('jobs', 1)
+        self.__incremental = kw.get('incremental', False)
         self.__allowBuiltinGeneration = kw.get('allow_builtin_generation', False)
         self.__allowAbsentModule = kw.get('allow_absent_module', False)
         self.__generateToFiles = kw.get('generate_to_files', True)
         self.__uriContentArchiveDirectory = kw.get('uri_content_archive_directory')
+        self.__uriCacheDirectory = kw.get('uri_cache_directory')
+        self.__offline = kw.get('offline', False)
         self.__loggingConfigFile = kw.get('logging_config_file')
         self.__unnamedModulePaths = set()
 
@@ -2402,9 +2603,16 @@ from %s import *
         ('default_namespace_public', setDefaultNamespacePublic),
         ('validate_changes', setValidateChanges),
         ('write_for_customization', setWriteForCustomization),
+        ('generate_slots', setGenerateSlots),
+        ('compact_instances', setCompactInstances),
+        ('report_resolution_times', setReportResolutionTimes),
+        ('jobs', setJobs),
+        ('incremental', setIncremental),
         ('allow_builtin_generation', setAllowBuiltinGeneration),
         ('allow_absent_module', setAllowAbsentModule),
         ('uri_content_archive_directory', setUriContentArchiveDirectory),
+        ('uri_cache_directory', setUriCacheDirectory),
+        ('offline', setOffline),
         ('logging_config_file', setLoggingConfigFile)
         )
     def applyOptionValues (self, options, args=None):
@@ -2464,6 +2672,14 @@ from %s import *
                              help=self.__stripSpaces(self.argAddLocationPrefixRewrite.__doc__))
             group.add_option('--uri-content-archive-directory', metavar="DIRECTORY",
                              help=self.__stripSpaces(self.uriContentArchiveDirectory.__doc__))
+            group.add_option('--uri-cache-directory', metavar="DIRECTORY",
+                             help=self.__stripSpaces(self.uriCacheDirectory.__doc__))
+            group.add_option('--offline',
+                             action='store_true', dest='offline',
+                             help=self.__stripSpaces(self.offline.__doc__ + ' This option turns on the feature.'))
+            group.add_option('--no-offline',
+                             action='store_false', dest='offline',
+                             help=self.__stripSpaces(self.offline.__doc__ + ' This option turns off the feature (I{default}).'))
             parser.add_option_group(group)
 
             group = optparse.OptionGroup(parser, 'Configuring Bindings', 'Specify where generated bindings should be written, and how they will be accessed from Python.')
@@ -2480,6 +2696,18 @@ from %s import *
             group.add_option('--no-write-for-customization',
                              action='store_false', dest='write_for_customization',
                              help=self.__stripSpaces(self.writeForCustomization.__doc__ + ' This option turns off the feature (I{default}).'))
+            group.add_option('--generate-slots',
+                             action='store_true', dest='generate_slots',
+                             help=self.__stripSpaces(self.generateSlots.__doc__ + ' This option turns on the feature.'))
+            group.add_option('--no-generate-slots',
+                             action='store_false', dest='generate_slots',
+                             help=self.__stripSpaces(self.generateSlots.__doc__ + ' This option turns off the feature (I{default}).'))
+            group.add_option('--compact-instances',
+                             action='store_true', dest='compact_instances',
+                             help=self.__stripSpaces(self.compactInstances.__doc__ + ' This option turns on the feature.'))
+            group.add_option('--no-compact-instances',
+                             action='store_false', dest='compact_instances',
+                             help=self.__stripSpaces(self.compactInstances.__doc__ + ' This option turns off the feature (I{default}).'))
             parser.add_option_group(group)
 
             group = optparse.OptionGroup(parser, 'Reading Namespace Archives', 'Locating and loading (or inhibiting load of) namespace archives.')
@@ -2522,6 +2750,20 @@ from %s import *
             group = optparse.OptionGroup(parser, 'Miscellaneous Options', "Anything else.")
             group.add_option('--logging-config-file', metavar="FILE",
                              help=self.__stripSpaces(self.loggingConfigFile.__doc__))
+            group.add_option('--report-resolution-times',
+                             action='store_true', dest='report_resolution_times',
+                             help=self.__stripSpaces(self.reportResolutionTimes.__doc__ + ' This option turns on the feature.'))
+            group.add_option('--no-report-resolution-times',
+                             action='store_false', dest='report_resolution_times',
+                             help=self.__stripSpaces(self.reportResolutionTimes.__doc__ + ' This option turns off the feature (I{default}).'))
+            group.add_option('--jobs', metavar="N", type='int',
+                             help=self.__stripSpaces(self.jobs.__doc__))
+            group.add_option('--incremental',
+                             action='store_true', dest='incremental',
+                             help=self.__stripSpaces(self.incremental.__doc__ + ' This option turns on the feature.'))
+            group.add_option('--no-incremental',
+                             action='store_false', dest='incremental',
+                             help=self.__stripSpaces(self.incremental.__doc__ + ' This option turns off the feature (I{default}).'))
             parser.add_option_group(group)
 
             group = optparse.OptionGroup(parser, 'Maintainer Options', "Don't use these.  They don't exist.  If they did, they'd do different things at different times, and if you used them you'd probably be sorry.")
@@ -2553,7 +2795,7 @@ from %s import *
         command line."""
         opts = []
         module_list = self.moduleList()
-        schema_list = self.schemaLocationList()
+        schema_list = self.schemaLocationList()[:]
         while module_list and schema_list:
             ml = module_list.pop(0)
             sl = schema_list.pop(0)
@@ -2579,7 +2821,7 @@ from %s import *
             opts.append('--import-augmentable-namespace=' + ns.uri())
         if self.archiveToFile() is not None:
             opts.append('--archive-to-file=' + self.archiveToFile())
-        for (ns, visibility) in self.namespaceVisibilityMap():
+        for (ns, visibility) in six.iteritems(self.namespaceVisibilityMap()):
             if visibility:
                 opts.append('--public-namespace=' + ns.uri())
             else:
@@ -2590,6 +2832,10 @@ from %s import *
             opts.append('--default-namespace-private')
         for (val, opt) in ( (self.validateChanges(), 'validate-changes'),
                             (self.writeForCustomization(), 'write-for-customization'),
+                            (self.generateSlots(), 'generate-slots'),
+                            (self.compactInstances(), 'compact-instances'),
+                            (self.reportResolutionTimes(), 'report-resolution-times'),
+                            (self.incremental(), 'incremental'),
                             (self.allowAbsentModule(), 'allow-absent-module'),
                             (self.allowBuiltinGeneration(), 'allow-builtin-generation') ):
             if val:
@@ -2598,6 +2844,12 @@ from %s import *
                 opts.append('--no-' + opt)
         if self.uriContentArchiveDirectory() is not None:
             opts.append('--uri-content-archive-directory=%s' + self.uriContentArchiveDirectory())
+        if self.uriCacheDirectory() is not None:
+            opts.append('--uri-cache-directory=' + self.uriCacheDirectory())
+            if self.offline():
+                opts.append('--offline')
+        if 1 != self.jobs():
+            opts.append('--jobs=%d' % (self.jobs(),))
         return opts
 
     def normalizeSchemaLocation (self, sl):
@@ -2641,10 +2893,29 @@ from %s import *
         return module_record
 
     __didResolveExternalSchema = False
+    def __installURICache (self):
+        """Arrange for L{pyxb.utils.utility.DataFromURI} to use the
+        L{URI cache<uriCacheDirectory>}, if one is configured.
+
+        @return: C{True} iff a cache is in use"""
+        if self.uriCacheDirectory() is None:
+            return False
+        cache = pyxb.utils.utility.GetURICache()
+        if (cache is None) or (cache.directory() != self.uriCacheDirectory()):
+            cache = pyxb.utils.uricache.URICache(self.uriCacheDirectory())
+            pyxb.utils.utility.SetURICache(cache)
+        cache.setOffline(self.offline())
+        return True
+
     def resolveExternalSchema (self):
         if self.__didResolveExternalSchema:
             return
 
+        # The manifest is identified by the schema locations, which are
+        # consumed below.
+        if self.incremental():
+            self.manifestPath()
+
         # Locate all relevant archives and the namespaces they
         # provide.
         pyxb.namespace.archive.NamespaceArchive.PreLoadArchives(self.archivePath())
@@ -2664,6 +2935,14 @@ from %s import *
             _log.info("Namespace %s marked import-augmentable" % (ns,))
             ns.setImportAugmentable(True)
 
+        # Retrieve all the remote schema documents we will need in
+        # parallel, skipping imports of namespaces that will be loaded from
+        # archives.
+        if self.__installURICache():
+            locations = [ self.normalizeSchemaLocation(_sl) for _sl in self.__schemaLocationList if not isinstance(_sl, tuple) ]
+            import_filter = lambda _uri: pyxb.namespace.NamespaceForURI(_uri, create_if_missing=True).isImportAugmentable()
+            pyxb.utils.utility.GetURICache().prefetchSchemas(locations, import_filter=import_filter)
+
         # Read all the schema we were told about.
         while self.__schemaLocationList:
             sl = self.__schemaLocationList.pop(0)
@@ -2800,7 +3079,7 @@ from %s import *
             self.__resolveComponentDependencies()
         return self.__componentOrder
 
-    def __generateBindings (self):
+    def __generateBindings (self, emit=True):
 
         # Note that module graph may have fewer nodes than
         # self.moduleRecords(), if a module has no components that
@@ -2814,6 +3093,7 @@ from %s import *
 
         record_binding_map = {}
         modules = []
+        module_units = []
         nsvm = self.namespaceVisibilityMap()
         for mr_scc in module_scc_order:
             scc_modules = [ ]
@@ -2832,9 +3112,11 @@ from %s import *
 
             scc_modules.sort(key=lambda _nm: _nm.namespace().uri())
             modules.extend(scc_modules)
+            module_units.append(scc_modules[:])
             if 1 < len(mr_scc):
                 ngm = NamespaceGroupModule(self, scc_modules)
                 modules.append(ngm)
+                module_units[-1].append(ngm)
                 for nsm in scc_modules:
                     nsm.setNamespaceGroupModule(ngm)
 
@@ -2873,6 +3155,23 @@ from %s import *
                 for m in ngm.namespaceModules():
                     m.addImportsFrom(ngm)
 
+        self.__bindingModules = modules
+        self.__moduleUnits = module_units
+        self.__definitions = (simple_type_definitions, complex_type_definitions, element_declarations)
+        if emit:
+            self.__emitBindings()
+
+    def __emitBindings (self, modules=None):
+        """Generate the code for the component definitions.
+
+        @keyword modules: If not C{None}, only definitions that are bound in
+        one of these modules are generated."""
+        (simple_type_definitions, complex_type_definitions, element_declarations) = self.__definitions
+        if modules is not None:
+            selected = lambda _c: self.moduleForComponent(_c) in modules
+            simple_type_definitions = filter(selected, simple_type_definitions)
+            complex_type_definitions = filter(selected, complex_type_definitions)
+            element_declarations = filter(selected, element_declarations)
         for std in simple_type_definitions:
             GenerateSTD(std, self)
         for ctd in complex_type_definitions:
@@ -2880,9 +3179,9 @@ from %s import *
         for ed in element_declarations:
             GenerateED(ed, self)
 
-        self.__bindingModules = modules
-
     __bindingModules = None
+    __moduleUnits = None
+    __definitions = None
     def bindingModules (self):
         if self.__componentGraph is None:
             self.__resolveComponentDependencies()
@@ -2890,6 +3189,168 @@ from %s import *
             self.__generateBindings()
         return self.__bindingModules
 
+    def writeModules (self):
+        """Generate the binding modules and write each to its file.
+
+        If L{jobs} is greater than one, the modules are divided among that
+        many worker processes, each of which generates and writes the code
+        for its share.  A namespace is always generated in the same process
+        as the other namespaces in its group, if any.  In that case the
+        content of the returned modules is not available in this process.
+
+        @return: The binding modules, as from L{bindingModules}"""
+        context = None
+        if (1 < self.jobs()) and self.generateToFiles() and (self.__bindingModules is None):
+            context = _ForkingContext()
+        if context is None:
+            modules = self.bindingModules()
+            for m in modules:
+                m.writeToModuleFile()
+            return modules
+
+        if self.__componentGraph is None:
+            self.__resolveComponentDependencies()
+        self.__generateBindings(emit=False)
+        modules = self.__bindingModules
+
+        # Balance the work by the number of definitions in each unit,
+        # assigning the largest units first.
+        (simple_type_definitions, complex_type_definitions, element_declarations) = self.__definitions
+        unit_size = { }
+        unit_of_module = { }
+        for unit in self.__moduleUnits:
+            unit_size[id(unit)] = 0
+            for m in unit:
+                unit_of_module[m] = unit
+        for c in simple_type_definitions + complex_type_definitions + element_declarations:
+            unit_size[id(unit_of_module[self.moduleForComponent(c)])] += 1
+        shares = [ ([], [0]) for _ in range(min(self.jobs(), len(self.__moduleUnits))) ]
+        for unit in sorted(self.__moduleUnits, key=lambda _u: -unit_size[id(_u)]):
+            (share_modules, share_size) = min(shares, key=lambda _s: _s[1][0])
+            share_modules.extend(unit)
+            share_size[0] += unit_size[id(unit)]
+        self.__moduleShares = [ frozenset(_s[0]) for _s in shares if _s[0] ]
+
+        global _ForkedGenerator
+        _ForkedGenerator = self
+        try:
+            pool = context.Pool(len(self.__moduleShares))
+            try:
+                pool.map(_WriteModuleShare, range(len(self.__moduleShares)))
+            finally:
+                pool.terminate()
+                pool.join()
+        finally:
+            _ForkedGenerator = None
+            self.__moduleShares = None
+            # The files were written by the workers.  Release the handles
+            # opened when the modules were created.
+            for m in modules:
+                if m.bindingFile() is not None:
+                    m.bindingFile().close()
+        return modules
+    __moduleShares = None
+
+    def _writeModuleShare (self, share):
+        """Generate and write one share of the binding modules.  This is
+        invoked in a worker process created by L{writeModules}."""
+        modules = self.__moduleShares[share]
+        self.__emitBindings(modules)
+        for m in self.__bindingModules:
+            if m in modules:
+                m.writeToModuleFile()
+
+    def manifestPath (self):
+        """The file in which the inputs and outputs of this configuration are
+        recorded when L{incremental} generation is enabled.
+
+        The file is in the L{binding root<bindingRoot>}, with a name that
+        identifies the options from which bindings are generated."""
+        if self.__manifestPath is None:
+            args = [ _a for _a in self.getCommandLineArgs() if not _a.startswith(self.__ManifestIgnoredOptions) ]
+            self.__manifestPath = os.path.join(self.bindingRoot(), '.pyxbgen-%s.manifest' % (pyxb.utils.utility.HashForText(six.u('\n').join(args)),))
+        return self.__manifestPath
+    __manifestPath = None
+    __ManifestIgnoredOptions = ('--jobs', '--incremental', '--no-incremental', '--report-resolution-times', '--no-report-resolution-times', '--logging-config-file', '--uri-cache-directory', '--offline')
+
+    # Identifies the format of the manifest file.
+    __ManifestFormat = '201610160000'
+
+    @classmethod
+    def __FileSignature (cls, path):
+        try:
+            with open(path, 'rb') as f:
+                return pyxb.utils.utility.HashForText(f.read())
+        except (IOError, OSError):
+            return None
+
+    def isUpToDate (self):
+        """Determine whether the bindings last generated with this
+        configuration are current.
+
+        This is true iff a manifest saved by L{saveManifest} exists, the
+        schema documents it records have the same signatures, the namespace
+        archives it records have the same content, and the files it records
+        have not been changed since they were written.  This does not detect
+        changes that would cause a different set of schema documents or
+        archives to be read.
+
+        @rtype: C{bool}"""
+        try:
+            with open(self.manifestPath(), 'rb') as f:
+                (format, version, schemas, archives, outputs) = pickle.load(f)
+        except Exception:
+            return False
+        if (self.__ManifestFormat != format) or (pyxb.__version__ != version):
+            return False
+        self.__installURICache()
+        for (location, signature) in schemas:
+            if location is None:
+                return False
+            try:
+                xmld = pyxb.utils.utility.DataFromURI(location, archive_directory=self.uriContentArchiveDirectory())
+            except Exception:
+                return False
+            if pyxb.utils.utility.HashForText(xmld) != signature:
+                _log.info('Schema %s has changed', location)
+                return False
+        for (path, signature) in archives + outputs:
+            if self.__FileSignature(path) != signature:
+                _log.info('File %s has changed', path)
+                return False
+        return True
+
+    def saveManifest (self):
+        """Record the inputs and outputs of the generation in the file
+        identified by L{manifestPath}, for use by L{isUpToDate}.
+
+        This does nothing unless L{incremental} generation is enabled.  It
+        should be invoked after the modules and namespace archive have been
+        written."""
+        if not self.incremental():
+            return
+        schemas = set()
+        for origin in self.generationUID().associatedObjects():
+            if isinstance(origin, pyxb.namespace.archive._SchemaOrigin):
+                schemas.add((origin.location(), origin.signature()))
+        outputs = []
+        for m in self.bindingModules():
+            if m.bindingFile() is not None:
+                outputs.append(m.bindingFilePath())
+        if self.archiveToFile() is not None:
+            outputs.append(self.archiveToFile())
+        archives = []
+        output_paths = set([ os.path.realpath(_p) for _p in outputs ])
+        for archive in pyxb.namespace.archive.NamespaceArchive.LoadedArchives():
+            if os.path.realpath(archive.archivePath()) not in output_paths:
+                archives.append(archive.archivePath())
+        manifest = (self.__ManifestFormat, pyxb.__version__,
+                    sorted(schemas, key=lambda _s: (_s[0] or '', _s[1])),
+                    [ (_p, self.__FileSignature(_p)) for _p in sorted(archives) ],
+                    [ (_p, self.__FileSignature(_p)) for _p in outputs ])
+        with pyxb.utils.utility.OpenOrCreate(self.manifestPath()) as f:
+            pickle.dump(manifest, f, 2)
+
     def writeNamespaceArchive (self):
         archive_file = self.archiveToFile()
         if archive_file is not None:
@@ -2908,3 +3369,29 @@ from %s import *
 
     def moduleForComponent (self, component):
         return _ModuleNaming_mixin.ComponentBindingModule(component)
+
+# The generator whose modules are being written by L{_WriteModuleShare}.  This
+# is set in the parent process before the worker processes are forked.
+_ForkedGenerator = None
+
+def _WriteModuleShare (share):
+    try:
+        _ForkedGenerator._writeModuleShare(share)
+    except Exception as e:
+        # Exceptions are returned by pickling them, which many can't survive.
+        _log.exception('Failure generating bindings')
+        raise pyxb.BindingGenerationError('%s: %s' % (type(e).__name__, e))
+
+def _ForkingContext ():
+    """Return the C{multiprocessing} context used to create worker processes
+    that inherit the state of this one, or C{None} if that is not possible."""
+    if not hasattr(os, 'fork'):
+        return None
+    import multiprocessing
+    if not hasattr(multiprocessing, 'get_context'):
+        # Python 2 always forks where that is possible.
+        return multiprocessing
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
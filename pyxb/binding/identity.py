@@ -0,0 +1,578 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module supports U{identity constraints
+<http://www.w3.org/TR/xmlschema-1/#cIdentity-constraint_Definitions>} and
+U{ID<http://www.w3.org/TR/xmlschema-2/#ID>}/U{IDREF
+<http://www.w3.org/TR/xmlschema-2/#IDREF>} references in binding instances.
+
+Generated bindings associate an L{IdentityConstraint} with each element
+that declares a C{key}, C{keyref}, or C{unique} constraint.  An
+L{IdentityIndex} holds, for a document, hash tables mapping the field values
+of each key and unique constraint to the node they identify, and ID values
+to the element that carries them.  These allow references to be resolved
+without walking the binding tree.
+
+The index is built while the document is parsed if
+L{identityConstraints<pyxb.ValidationConfig.identityConstraints>} requests
+it, and is then available from the document element through
+L{_identityIndex<pyxb.binding.basis._TypeBinding_mixin._identityIndex>}.
+It can be built for any binding instance by passing it to the
+L{IdentityIndex} constructor.
+
+Selectors and fields are restricted to the U{subset of XPath
+<http://www.w3.org/TR/xmlschema-1/#coss-identity-constraint>} that XML
+Schema permits.  Elements held as DOM nodes because they matched a wildcard
+without a binding are not visited."""
+
+import re
+import pyxb
+import pyxb.namespace
+from pyxb.binding import basis
+from pyxb.binding import datatypes
+from pyxb.utils import six
+
+# Matches one token of a restricted XPath expression
+_XPathToken_re = re.compile(r'\s*(?:(?P<sep>\.//|/|\|)|(?P<axis>child::|attribute::|@)|(?P<test>[\w.\-]+:\*|\*|[\w.\-]+(?::[\w.\-]+)?))', re.UNICODE)
+
+# Stands for any namespace in a name test
+_AnyNamespace = object()
+
+def _NameTest (token, namespaces, xpath):
+    """Convert a name test token to a pair of a namespace URI and a local
+    name.  The namespace is L{_AnyNamespace} and the local name C{None}
+    where the test allows any value.  An unprefixed name is in no
+    namespace."""
+    if '*' == token:
+        return (_AnyNamespace, None)
+    (prefix, local) = (None, token)
+    if ':' in token:
+        (prefix, local) = token.split(':', 1)
+    uri = None
+    if prefix is not None:
+        uri = namespaces.get(prefix)
+        if uri is None:
+            raise pyxb.SchemaValidationError('Prefix %s in identity constraint XPath %s is not bound' % (prefix, xpath))
+    if '*' == local:
+        local = None
+    return (uri, local)
+
+def _Matches (test, uri_tuple):
+    (uri, local) = test
+    return ((local is None) or (local == uri_tuple[1])) and ((uri is _AnyNamespace) or (uri == uri_tuple[0]))
+
+def XPathPrefixes (xpath):
+    """Return the set of namespace prefixes used in a selector or field
+    XPath expression."""
+    rv = set()
+    for mo in _XPathToken_re.finditer(xpath):
+        test = mo.group('test')
+        if (test is not None) and (':' in test):
+            rv.add(test.split(':', 1)[0])
+    return rv
+
+class _Path (object):
+    """One alternative of a selector or field expression.
+
+    A path is evaluated relative to a binding instance.  It optionally
+    begins at every descendant of the instance, then follows a sequence of
+    child steps, and for a field may end with an attribute."""
+
+    def __init__ (self, descendant, steps, attribute):
+        self.__descendant = descendant
+        self.__steps = steps
+        self.__attribute = attribute
+
+    def elements (self, instance):
+        """Return the binding instances selected by the path."""
+        nodes = [ instance ]
+        if self.__descendant:
+            nodes = _DescendantsOrSelf(instance)
+        for step in self.__steps:
+            if step is None:
+                continue
+            nodes = [ _c for _n in nodes for (_en, _c) in _ChildElements(_n) if _Matches(step, _en) ]
+        return nodes
+
+    def values (self, instance):
+        """Return the simple values selected by the path."""
+        nodes = self.elements(instance)
+        if self.__attribute is None:
+            return [ _v for _v in [ _SimpleValue(_n) for _n in nodes ] if _v is not None ]
+        return [ _v for _n in nodes for (_en, _v) in _Attributes(_n) if _Matches(self.__attribute, _en) ]
+
+def _ParseXPath (xpath, namespaces, is_field):
+    """Convert a selector or field expression to a list of L{_Path}
+    instances, one for each alternative.
+
+    @raise pyxb.SchemaValidationError: the expression is not in the
+    restricted XPath subset"""
+    tokens = []
+    position = 0
+    xpath_end = len(xpath.rstrip())
+    while position < xpath_end:
+        mo = _XPathToken_re.match(xpath, position)
+        if mo is None:
+            raise pyxb.SchemaValidationError('Invalid identity constraint XPath %s' % (xpath,))
+        tokens.append((mo.lastgroup, mo.group(mo.lastgroup)))
+        position = mo.end()
+    tokens.append(('sep', '|'))
+    tokens.reverse()
+
+    def next_test ():
+        (kind, token) = tokens.pop()
+        if 'test' != kind:
+            raise pyxb.SchemaValidationError('Invalid identity constraint XPath %s' % (xpath,))
+        return token
+
+    paths = []
+    while tokens:
+        descendant = False
+        if './/' == tokens[-1][1]:
+            descendant = True
+            tokens.pop()
+        steps = []
+        attribute = None
+        while True:
+            (kind, token) = tokens[-1]
+            if token in ('@', 'attribute::'):
+                if not is_field:
+                    raise pyxb.SchemaValidationError('Selector XPath %s may not select an attribute' % (xpath,))
+                tokens.pop()
+                attribute = _NameTest(next_test(), namespaces, xpath)
+            else:
+                if 'child::' == token:
+                    tokens.pop()
+                    token = next_test()
+                    if '.' == token:
+                        raise pyxb.SchemaValidationError('Invalid identity constraint XPath %s' % (xpath,))
+                else:
+                    token = next_test()
+                if '.' == token:
+                    steps.append(None)
+                else:
+                    steps.append(_NameTest(token, namespaces, xpath))
+            (kind, token) = tokens.pop()
+            if '|' == token:
+                break
+            if ('/' != token) or (attribute is not None):
+                raise pyxb.SchemaValidationError('Invalid identity constraint XPath %s' % (xpath,))
+        paths.append(_Path(descendant, tuple(steps), attribute))
+    return paths
+
+def _ChildElements (instance):
+    """Generate pairs of the uriTuple of the element name and the binding
+    instance for each element in the content of C{instance}."""
+    if not isinstance(instance, basis.complexTypeDefinition) or instance._IsSimpleTypeContent():
+        return
+    for eu in six.itervalues(instance._ElementMap):
+        value = eu.value(instance)
+        if value is None:
+            continue
+        if not eu.isPlural():
+            value = (value,)
+        for child in value:
+            if not isinstance(child, basis._TypeBinding_mixin):
+                continue
+            elt = child._element()
+            if elt is None:
+                yield (eu.name().uriTuple(), child)
+            else:
+                yield (elt.name().uriTuple(), child)
+    wildcard_elements = instance._wildcardElements()
+    if wildcard_elements:
+        for child in wildcard_elements:
+            if isinstance(child, basis._TypeBinding_mixin) and (child._element() is not None):
+                yield (child._element().name().uriTuple(), child)
+
+def _DescendantsOrSelf (instance):
+    rv = [ instance ]
+    for node in rv:
+        rv.extend([ _c for (_en, _c) in _ChildElements(node) ])
+    return rv
+
+def _Attributes (instance):
+    """Generate pairs of the uriTuple of the attribute name and the value
+    for each attribute of C{instance} that has a value."""
+    if not isinstance(instance, basis.complexTypeDefinition):
+        return
+    for au in six.itervalues(instance._AttributeMap):
+        value = au.value(instance)
+        if value is not None:
+            yield (au.name().uriTuple(), value)
+    wildcard_attributes = instance.wildcardAttributeMap()
+    if wildcard_attributes:
+        for (en, value) in six.iteritems(wildcard_attributes):
+            yield (en.uriTuple(), value)
+
+def _SimpleValue (instance):
+    """Return the simple value of an element, or C{None} if it is nil or
+    does not have simple content."""
+    if instance._isNil():
+        return None
+    if isinstance(instance, basis.simpleTypeDefinition):
+        return instance
+    if instance._IsSimpleTypeContent():
+        return instance.value()
+    return None
+
+def _KeyValue (value):
+    """Return a hashable equivalent of a field value."""
+    if isinstance(value, list):
+        return tuple([ _KeyValue(_v) for _v in value ])
+    return value
+
+class IdentityConstraint (object):
+    """An identity constraint declared on an element.
+
+    Instances are created by generated bindings and associated with the
+    element through L{pyxb.binding.basis.element._setIdentityConstraints}."""
+
+    KEY = 'key'
+    KEYREF = 'keyref'
+    UNIQUE = 'unique'
+
+    def name (self):
+        """The L{pyxb.namespace.ExpandedName} of the constraint."""
+        return self.__name
+    __name = None
+
+    def category (self):
+        """One of L{KEY}, L{KEYREF}, or L{UNIQUE}."""
+        return self.__category
+    __category = None
+
+    def selector (self):
+        """The XPath expression that selects the nodes to which the
+        constraint applies, relative to an instance of the element."""
+        return self.__selector
+    __selector = None
+
+    def fields (self):
+        """The XPath expressions, relative to a selected node, identifying
+        the values that make up its key."""
+        return self.__fields
+    __fields = None
+
+    def referencedKey (self):
+        """For a L{KEYREF} constraint, the L{pyxb.namespace.ExpandedName} of
+        the key or unique constraint to which it refers; otherwise
+        C{None}."""
+        return self.__referencedKey
+    __referencedKey = None
+
+    def xsdLocation (self):
+        """The L{pyxb.utils.utility.Location} where the constraint appears in
+        the schema."""
+        return self.__xsdLocation
+    __xsdLocation = None
+
+    def __init__ (self, name, category, selector, fields, namespaces=None, refer=None, location=None):
+        """Create a new identity constraint.
+
+        @param name: The name of the constraint
+        @type name: L{pyxb.namespace.ExpandedName}
+        @param category: One of L{KEY}, L{KEYREF}, or L{UNIQUE}
+        @param selector: The selector XPath expression
+        @param fields: A sequence of field XPath expressions
+        @keyword namespaces: A map from the prefixes used in the
+        expressions to namespace URIs
+        @keyword refer: The name of the referenced key, required for
+        L{KEYREF} constraints
+        @keyword location: The location of the constraint in the schema"""
+        if not (category in (self.KEY, self.KEYREF, self.UNIQUE)):
+            raise ValueError(category)
+        if (self.KEYREF == category) != (refer is not None):
+            raise pyxb.UsageError('Only keyref constraints refer to another constraint')
+        if namespaces is None:
+            namespaces = {}
+        self.__name = pyxb.namespace.ExpandedName(name)
+        self.__category = category
+        self.__selector = selector
+        self.__fields = tuple(fields)
+        if refer is not None:
+            refer = pyxb.namespace.ExpandedName(refer)
+        self.__referencedKey = refer
+        self.__xsdLocation = location
+        self.__selectorPaths = _ParseXPath(selector, namespaces, False)
+        self.__fieldPaths = [ _ParseXPath(_f, namespaces, True) for _f in self.__fields ]
+
+    def selectNodes (self, instance):
+        """Return the binding instances selected by the constraint within
+        an instance of the element that declares it."""
+        if 1 == len(self.__selectorPaths):
+            return self.__selectorPaths[0].elements(instance)
+        rv = []
+        seen = set()
+        for path in self.__selectorPaths:
+            for node in path.elements(instance):
+                if not (id(node) in seen):
+                    seen.add(id(node))
+                    rv.append(node)
+        return rv
+
+    def keyFor (self, node):
+        """Return the key of a selected node.
+
+        @return: A tuple holding the value of each field, or C{None} if
+        some field has no value.
+        @raise pyxb.IncompleteKeyError: some field has more than one
+        value"""
+        key = []
+        for paths in self.__fieldPaths:
+            values = []
+            for path in paths:
+                values.extend(path.values(node))
+            if 1 < len(values):
+                raise pyxb.IncompleteKeyError(self, tuple(values), node)
+            if not values:
+                return None
+            key.append(_KeyValue(values[0]))
+        return tuple(key)
+
+    def __str__ (self):
+        return '%s %s' % (self.__category, self.__name)
+
+class IdentityIndex (object):
+    """Hash indexes of the identity constraints and ID values in a
+    document.
+
+    Problems found while building the index, such as duplicate keys or
+    references without a target, are recorded as exceptions and can be
+    obtained from L{violations} or raised by L{validate}.
+
+    The index reflects the binding instances at the time it was built;
+    it is not updated when they change."""
+
+    # Attribute uses that may hold ID or IDREF values, keyed by
+    # complexTypeDefinition subclass
+    __IDUses = { }
+
+    def __init__ (self, instance=None):
+        """Create an index.
+
+        @param instance: If provided, a binding instance for which the
+        index is built immediately.  Otherwise the index is populated by
+        the parser as elements are completed."""
+        # Map from ID values to the element carrying them
+        self.__ids = {}
+        # Pairs of IDREF values and the element carrying them, checked at
+        # the end of the document
+        self.__idrefs = []
+        # Map from the uriTuple of a key or unique constraint name to a map
+        # from key values to the first node with that key in the document
+        self.__keys = {}
+        # Map from a pair of the uriTuple of a constraint name and the id of
+        # the instance declaring it to a pair of that instance and its table
+        self.__scopedKeys = {}
+        self.__violations = []
+        # For each element that has been started but not completed, a map
+        # from the uriTuple of a constraint name to the tables for that
+        # constraint from completed descendants
+        self.__pending = [ {} ]
+        if instance is not None:
+            self.__indexTree(instance)
+            self._endDocument()
+
+    def __indexTree (self, instance):
+        self._startElement()
+        for (en, child) in _ChildElements(instance):
+            self.__indexTree(child)
+        self._endElement(instance)
+
+    def _startElement (self):
+        """Note the start of an element in document order."""
+        self.__pending.append({})
+
+    def _endElement (self, instance):
+        """Add the completed binding instance for an element to the
+        index.  All elements within it must have been added already."""
+        visible = self.__pending.pop()
+        self.__indexIDs(instance)
+        elt = instance._element()
+        if elt is not None:
+            keyrefs = []
+            for ic in elt.identityConstraints():
+                if ic.KEYREF == ic.category():
+                    keyrefs.append(ic)
+                    continue
+                name = ic.name().uriTuple()
+                table = self.__buildTable(ic, instance)
+                self.__scopedKeys[(name, id(instance))] = (instance, table)
+                document_table = self.__keys.setdefault(name, {})
+                for (key, node) in six.iteritems(table):
+                    document_table.setdefault(key, node)
+                visible.setdefault(name, []).append(table)
+            for ic in keyrefs:
+                self.__checkKeyref(ic, instance, visible.get(ic.referencedKey().uriTuple(), ()))
+        # Tables of key constraints are visible to keyref constraints on
+        # ancestors
+        parent = self.__pending[-1]
+        for (name, tables) in six.iteritems(visible):
+            if name in parent:
+                parent[name].extend(tables)
+            else:
+                parent[name] = tables
+
+    def _endDocument (self):
+        """Check references once all elements have been added."""
+        for (value, node) in self.__idrefs:
+            if not (value in self.__ids):
+                self.__violations.append(pyxb.UnresolvedKeyrefError(None, value, node))
+        self.__idrefs = []
+        self.__pending = [ {} ]
+
+    @classmethod
+    def __IDUsesForType (cls, ctd):
+        uses = cls.__IDUses.get(ctd)
+        if uses is None:
+            uses = []
+            for au in six.itervalues(ctd._AttributeMap):
+                data_type = au.dataType()
+                if issubclass(data_type, basis.STD_list):
+                    data_type = data_type._ItemType
+                if issubclass(data_type, (datatypes.ID, datatypes.IDREF, basis.STD_union)):
+                    uses.append(au)
+            cls.__IDUses[ctd] = uses
+        return uses
+
+    def __indexIDs (self, instance):
+        if isinstance(instance, basis.complexTypeDefinition):
+            for au in self.__IDUsesForType(type(instance)):
+                self.__indexIDValue(au.value(instance), instance)
+            if instance._IsSimpleTypeContent():
+                self.__indexIDValue(instance.value(), instance)
+        else:
+            self.__indexIDValue(instance, instance)
+
+    def __indexIDValue (self, value, node):
+        if isinstance(value, datatypes.ID):
+            if value in self.__ids:
+                self.__violations.append(pyxb.DuplicateKeyError(None, value, node))
+            else:
+                self.__ids[value] = node
+        elif isinstance(value, datatypes.IDREF):
+            self.__idrefs.append((value, node))
+        elif isinstance(value, list):
+            for v in value:
+                self.__indexIDValue(v, node)
+
+    def __buildTable (self, ic, instance):
+        table = {}
+        for node in ic.selectNodes(instance):
+            try:
+                key = ic.keyFor(node)
+            except pyxb.IncompleteKeyError as e:
+                self.__violations.append(e)
+                continue
+            if key is None:
+                if ic.KEY == ic.category():
+                    self.__violations.append(pyxb.IncompleteKeyError(ic, None, node))
+                continue
+            if key in table:
+                self.__violations.append(pyxb.DuplicateKeyError(ic, key, node))
+            else:
+                table[key] = node
+        return table
+
+    def __checkKeyref (self, ic, instance, tables):
+        if 1 < len(tables):
+            merged = {}
+            for table in tables:
+                merged.update(table)
+            tables = [ merged ]
+        for node in ic.selectNodes(instance):
+            try:
+                key = ic.keyFor(node)
+            except pyxb.IncompleteKeyError as e:
+                self.__violations.append(e)
+                continue
+            if (key is not None) and not any([ key in _t for _t in tables ]):
+                self.__violations.append(pyxb.UnresolvedKeyrefError(ic, key, node))
+
+    def resolveIDREF (self, idref):
+        """Return the element that has the given ID value.
+
+        @return: A binding instance, or C{None} if no element in the
+        document has that ID."""
+        return self.__ids.get(idref)
+
+    def lookupByKey (self, name, *values, **kw):
+        """Return the node identified by a key or unique constraint.
+
+        @param name: The constraint, as an L{IdentityConstraint} or its
+        name.  A string is interpreted as a name in no namespace.
+        @param values: The value of each field of the constraint, in order
+        @keyword scope: If provided, the binding instance declaring the
+        constraint within which the key is looked up.  By default the
+        first node in the document with the key is returned.
+        @return: A binding instance, or C{None} if there is no node with
+        the key."""
+        scope = kw.pop('scope', None)
+        if kw:
+            raise TypeError('Unexpected keywords: %s' % (' '.join(six.iterkeys(kw)),))
+        if isinstance(name, IdentityConstraint):
+            name = name.name()
+        name = pyxb.namespace.ExpandedName(name).uriTuple()
+        key = tuple([ _KeyValue(_v) for _v in values ])
+        if scope is None:
+            return self.__keys.get(name, {}).get(key)
+        (declaring_instance, table) = self.__scopedKeys.get((name, id(scope)), (None, {}))
+        if declaring_instance is not scope:
+            return None
+        return table.get(key)
+
+    def violations (self):
+        """Return a list of L{pyxb.IdentityConstraintError} instances
+        describing the problems found while building the index."""
+        return self.__violations[:]
+
+    def validate (self):
+        """Raise the first problem found while building the index.
+
+        @return: C{True} if there were no problems
+        @raise pyxb.IdentityConstraintError: the document does not satisfy
+        its identity constraints or has invalid ID references"""
+        if self.__violations:
+            raise self.__violations[0]
+        return True
+
+def _AttachIndex (instance, mode=None):
+    """Build the index for a document that was not produced by the parser,
+    such as one restored from a cache or snapshot, and attach it to the
+    document element as the parser would.
+
+    @param instance: The binding instance for the document element
+    @keyword mode: How identity constraints are handled, as with
+    L{pyxb.ValidationConfig.identityConstraints}.  By default the global
+    setting is used.
+    @return: The L{IdentityIndex}, or C{None} if C{mode} is
+    L{pyxb.ValidationConfig.NEVER}
+    @raise pyxb.IdentityConstraintError: C{mode} is
+    L{pyxb.ValidationConfig.RAISE_EXCEPTION} and the document has a
+    problem"""
+    if mode is None:
+        mode = pyxb.GlobalValidationConfig.identityConstraints
+    if pyxb.ValidationConfig.NEVER == mode:
+        return None
+    index = IdentityIndex(instance)
+    instance._setIdentityIndex(index)
+    if pyxb.ValidationConfig.RAISE_EXCEPTION == mode:
+        index.validate()
+    return index
+
+## Local Variables:
+## fill-column:78
+## End:
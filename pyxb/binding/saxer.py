@@ -17,13 +17,17 @@
 using a SAX parser."""
 
 import logging
+import io
 import xml.dom
+import xml.sax.xmlreader
 import pyxb.namespace
 import pyxb.utils.saxutils
 import pyxb.utils.saxdom
 import pyxb.utils.utility
 from pyxb.binding import basis
+from pyxb.binding import identity
 from pyxb.namespace.builtin import XMLSchema_instance as XSI
+from pyxb.utils import six
 
 _log = logging.getLogger(__name__)
 
@@ -83,6 +87,17 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
 
     __domDepth = None
 
+    # True iff element content of this element was detached rather than
+    # being added as content.  See PyXBSAXHandler select keyword.
+    __contentDetached = False
+
+    # True iff the binding instance is built without validation.  See
+    # PyXBSAXHandler trusted keyword.
+    __trusted = False
+
+    # The simple type of content that is decoded as it is received
+    __valueType = None
+
     def __init__ (self, **kw):
         super(_SAXElementState, self).__init__(**kw)
         self.__bindingInstance = None
@@ -103,13 +118,15 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
         self.__enclosingCTD = enclosing_ctd
 
     # Create the binding instance for this element.
-    def __constructElement (self, new_object_factory, attrs, content=None):
-        kw = { '_from_xml' : True,
+    def __constructElement (self, new_object_factory, attrs, content=None, from_xml=True):
+        kw = { '_from_xml' : from_xml,
                '_location' : self.location() }
 
         # Note whether the node is marked nil
         if self.__XSINilTuple in attrs:
             kw['_nil'] = pyxb.binding.datatypes.boolean(attrs.getValue(self.__XSINilTuple))
+        if self.__trusted:
+            kw['_validate_constraints'] = False
 
         if content is None:
             content = []
@@ -126,13 +143,13 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
         # that names are pairs of (namespaceURI, localName), just like we
         # want them to be.
         for attr_name in self.__attributes.getNames():
-            attr_en = pyxb.namespace.ExpandedName(attr_name)
+            attr_en = pyxb.namespace.ExpandedName.Intern(attr_name)
             # Ignore xmlns and xsi attributes; we've already handled those
             if attr_en.namespace() in ( pyxb.namespace.XMLNamespaces, XSI ):
                 continue
             # The binding instance may be a simple type that does not support
             # attributes; the following raises an exception in that case.
-            self.__bindingInstance._setAttribute(attr_en, attrs.getValue(attr_name))
+            self.__bindingInstance._setAttribute(attr_en, attrs.getValue(attr_name), validate_constraints=not self.__trusted)
 
         return self.__bindingInstance
 
@@ -177,7 +194,7 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
         parent_state.addElementContent(self.location(), element, None)
         return element
 
-    def startBindingElement (self, type_class, new_object_factory, element_decl, attrs):
+    def startBindingElement (self, type_class, new_object_factory, element_decl, attrs, trusted=False):
         """Actions upon entering an element that will produce a binding instance.
 
         The element use is recorded.  If the type is a subclass of
@@ -194,13 +211,24 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
         @type element_decl: L{basis.element}
         @param attrs: The XML attributes associated with the element
         @type attrs: C{xml.sax.xmlreader.Attributes}
+        @param trusted: If C{True}, the binding instance is created and
+        populated without validation; see L{endBindingElement}.
         @return: The generated binding instance, or C{None} if creation is delayed
         """
+        self.__trusted = trusted
         self.__delayedConstructor = None
         self.__elementDecl = element_decl
         self.__attributes = attrs
         if type_class._IsSimpleTypeContent():
             self.__delayedConstructor = new_object_factory
+            # Binary content is decoded as the text is received.
+            value_type = type_class
+            if issubclass(type_class, pyxb.binding.basis.complexTypeDefinition):
+                value_type = type_class._TypeDefinition
+            text_decoder = getattr(value_type, '_TextDecoder', None)
+            if text_decoder is not None:
+                self.__valueType = value_type
+                self.setTextDecoder(text_decoder())
         else:
             try:
                 pyxb.namespace.NamespaceContext.PushContext(self.namespaceContext())
@@ -209,10 +237,33 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
                 pyxb.namespace.NamespaceContext.PopContext()
         return self.__bindingInstance
 
-    def endBindingElement (self):
+    def detachElementContent (self):
+        """Record that element content of this element will not be
+        provided.
+
+        The binding instance for the element cannot be validated against its
+        content model, so validation is disabled for it."""
+        self.__contentDetached = True
+
+    def endBindingElement (self, detach=False, ordered_content=True):
         """Perform any end-of-element processing.
 
         For simple type instances, this creates the binding instance.
+
+        If the element was started in trusted mode, element content is
+        stored directly in the binding instance without consulting the
+        content model, simple values are not checked against their facets,
+        and the completed instance is not validated.
+
+        @keyword detach: If C{True}, the binding instance is not added to the
+        content of the enclosing element, which is instead notified through
+        L{detachElementContent}.
+
+        @keyword ordered_content: If C{False} and the element was started in
+        trusted mode, element content is not recorded in the
+        L{orderedContent<basis.complexTypeDefinition.orderedContent>} of
+        the binding instance.  Ignored for types with mixed content.
+
         @return: The generated binding instance
         """
         if self.__delayedConstructor is not None:
@@ -221,9 +272,19 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
                 if info.maybe_element or (info.element_decl is not None):
                     raise pyxb.NonElementValidationError(info.item, info.location)
                 args.append(info.item)
+            text_decoder = self.textDecoder()
             try:
                 pyxb.namespace.NamespaceContext.PushContext(self.namespaceContext())
-                self.__constructElement(self.__delayedConstructor, self.__attributes, args)
+                if text_decoder is None:
+                    self.__constructElement(self.__delayedConstructor, self.__attributes, args)
+                else:
+                    self.setTextDecoder(None)
+                    if 0 < text_decoder.length():
+                        try:
+                            args.append(text_decoder.close())
+                        except ValueError as e:
+                            raise pyxb.SimpleTypeValueError(self.__valueType, e.args[0])
+                    self.__constructElement(self.__delayedConstructor, self.__attributes, args, from_xml=False)
             except pyxb.ValidationError as e:
                 if e.location is None:
                     e.location = self.location()
@@ -231,19 +292,56 @@ class _SAXElementState (pyxb.utils.saxutils.SAXElementState):
             finally:
                 pyxb.namespace.NamespaceContext.PopContext()
         else:
-            for info in self.content():
-                self.__bindingInstance.append(info.item,
-                                              _element_decl=info.element_decl,
-                                              _maybe_element=info.maybe_element,
-                                              _location=info.location)
+            if self.__contentDetached:
+                vc = self.__bindingInstance._validationConfig.copy()
+                vc._setForBinding(False)
+                self.__bindingInstance._setValidationConfig(vc)
+            if self.__trusted:
+                self.__storeTrustedContent(ordered_content)
+            else:
+                for info in self.content():
+                    self.__bindingInstance.append(info.item,
+                                                  _element_decl=info.element_decl,
+                                                  _maybe_element=info.maybe_element,
+                                                  _location=info.location)
         parent_state = self.parentState()
         if parent_state is not None:
-            parent_state.addElementContent(self.location(), self.__bindingInstance, self.__elementDecl)
+            if detach:
+                if isinstance(parent_state, _SAXElementState):
+                    parent_state.detachElementContent()
+            else:
+                parent_state.addElementContent(self.location(), self.__bindingInstance, self.__elementDecl)
         # As CreateFromDOM does, validate the resulting element
         if self.__bindingInstance._element() is None:
             self.__bindingInstance._setElement(self.__elementBinding)
+        if self.__trusted:
+            return self.__bindingInstance
         return self.__bindingInstance._postDOMValidate()
 
+    def __storeTrustedContent (self, ordered_content):
+        # Place content by its element declaration rather than by stepping
+        # through the content model.  Character data goes through append,
+        # which without validation does not use the automaton either.
+        instance = self.__bindingInstance
+        record_content = ordered_content or instance._IsMixed()
+        has_wildcard = instance.wildcardElements() is not None
+        for info in self.content():
+            if info.element_decl is not None:
+                info.element_decl._setOrAppendUnchecked(instance, info.item, record_content)
+            elif info.maybe_element:
+                if not has_wildcard:
+                    raise pyxb.StructuralBadDocumentError(container=instance, content=info.item)
+                instance._appendWildcardElement(info.item)
+            else:
+                instance.append(info.item,
+                                _maybe_element=info.maybe_element,
+                                _location=info.location,
+                                _require_validation=False)
+        # The configuration has not seen the stored content.  Discard it so
+        # that content appended later is placed after replaying the content,
+        # as is done for unpickled instances.
+        instance._discardAutomatonConfiguration()
+
 class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
     """A SAX handler class which generates a binding instance for a document
     through a streaming parser.
@@ -259,6 +357,7 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
       saxer.parse(io.StringIO(xmlt))
       instance = handler.rootObject()
 
+    See L{iterparse} for a way to process large documents incrementally.
     """
 
     # Whether invocation of handler methods should be traced
@@ -270,6 +369,50 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
     __domHandler = None
     __domDepth = None
 
+    # A set of ExpandedName instances identifying elements to be detached
+    # when complete, or None
+    __selectNames = None
+
+    # A set of tuples of uriTuple values identifying paths from the document
+    # element to elements to be detached when complete, or None
+    __selectPaths = None
+
+    # Binding instances for selected elements that have not yet been
+    # retrieved through completedObjects.
+    __completedObjects = None
+
+    # True iff binding instances are created without validation
+    __trusted = False
+
+    # Whether element content is recorded in the ordered content of binding
+    # instances created in trusted mode
+    __orderedContent = False
+
+    # How identity constraints are handled, or None to use the value from
+    # pyxb.GlobalValidationConfig
+    __identityConstraints = None
+
+    # The index of identity constraints for the current document, or None
+    __identityIndex = None
+    __identityIndexMode = None
+
+    def trusted (self):
+        """C{True} iff this handler builds binding instances without
+        validation.  See the C{trusted} keyword to L{__init__}."""
+        return self.__trusted
+
+    def completedObjects (self):
+        """Return the binding instances for selected elements that have
+        been completed since the last call.
+
+        See the C{select} keyword to L{__init__}.
+
+        @return: a list of binding instances in document order of element
+        completion"""
+        rv = self.__completedObjects
+        self.__completedObjects = []
+        return rv
+
     def rootObject (self):
         """Return the binding object corresponding to the top-most
         element in the document
@@ -283,9 +426,18 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
             # Happens if the top-level element got processed as a DOM instance.
             assert isinstance(self.__rootObject, xml.dom.Node)
             raise pyxb.UnrecognizedDOMRootNodeError(self.__rootObject)
+        if self.__trusted:
+            return self.__rootObject
         return self.__rootObject._postDOMValidate()
     __rootObject = None
 
+    def identityIndex (self):
+        """Return the L{pyxb.binding.identity.IdentityIndex} for the
+        document, or C{None} if identity constraints are not being
+        processed.  See the C{identity_constraints} keyword to
+        L{__init__}."""
+        return self.__identityIndex
+
     def reset (self):
         """Reset the state of the handler in preparation for processing a new
         document.
@@ -294,6 +446,14 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
         """
         super(PyXBSAXHandler, self).reset()
         self.__rootObject = None
+        self.__completedObjects = []
+        mode = self.__identityConstraints
+        if mode is None:
+            mode = pyxb.GlobalValidationConfig.identityConstraints
+        self.__identityIndexMode = mode
+        self.__identityIndex = None
+        if pyxb.ValidationConfig.NEVER != mode:
+            self.__identityIndex = identity.IdentityIndex()
         return self
 
     def __init__ (self, **kw):
@@ -302,12 +462,74 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
         @keyword element_state_constructor: Overridden with the value
         L{_SAXElementState} before invoking the L{superclass
         constructor<pyxb.utils.saxutils.BaseSAXHandler.__init__>}.
+
+        @keyword select: Optional iterable identifying elements that are to
+        be detached from the document as soon as they are complete.  Each
+        member is either a L{pyxb.namespace.ExpandedName}, selecting all
+        elements with that name, or a sequence of them, selecting elements
+        by their path from the document element.  A string is rejected with
+        L{pyxb.UsageError}.  The binding instances of
+        selected elements are not stored in their parent; they are made
+        available through L{completedObjects}.  Because the parent's content
+        is incomplete, the content model of the parent is not validated.
+
+        @keyword trusted: If C{True}, the document is assumed to be valid.
+        Binding instances are populated by assigning element content directly
+        to the fields identified by the element declarations, without
+        stepping through the content model; simple values are not checked
+        against their facets; and completed instances are not validated.
+        This is substantially faster, but an invalid document may produce
+        binding instances that do not conform to the schema without any
+        error being raised.  L{validateBinding
+        <basis._TypeBinding_mixin.validateBinding>} may be used to check the
+        result.  Default is C{False}.
+
+        @keyword ordered_content: In trusted mode, whether element content
+        is recorded in the L{orderedContent
+        <basis.complexTypeDefinition.orderedContent>} of binding instances.
+        The content is always recorded for types with mixed content, and
+        always recorded when not in trusted mode.  Default is C{False}.
+
+        @keyword identity_constraints: How identity constraints and ID/IDREF
+        values are handled, as with L{pyxb.ValidationConfig.identityConstraints}.
+        By default the value in effect in L{pyxb.GlobalValidationConfig}
+        when each document starts is used.
         """
 
         kw.setdefault('element_state_constructor', _SAXElementState)
+        select = kw.pop('select', None)
+        self.__trusted = kw.pop('trusted', False)
+        self.__orderedContent = kw.pop('ordered_content', False)
+        self.__identityConstraints = kw.pop('identity_constraints', None)
         super(PyXBSAXHandler, self).__init__(**kw)
+        if select is not None:
+            # A string would be taken as a path of one-character names that
+            # never matches.
+            if isinstance(select, six.string_types):
+                raise pyxb.UsageError('select must be an iterable of names or paths, not a string')
+            self.__selectNames = set()
+            self.__selectPaths = set()
+            for sel in select:
+                if isinstance(sel, pyxb.namespace.ExpandedName):
+                    self.__selectNames.add(sel)
+                elif isinstance(sel, six.string_types):
+                    raise pyxb.UsageError('select member %s must be an ExpandedName or a path, not a string' % (sel,))
+                else:
+                    self.__selectPaths.add(tuple([ pyxb.namespace.ExpandedName(_en).uriTuple() for _en in sel ]))
         self.reset()
 
+    def __isSelected (self, this_state):
+        if this_state.expandedName() in self.__selectNames:
+            return True
+        if self.__selectPaths:
+            path = []
+            state = this_state
+            while isinstance(state, _SAXElementState) and (state.expandedName() is not None):
+                path.insert(0, state.expandedName().uriTuple())
+                state = state.parentState()
+            return tuple(path) in self.__selectPaths
+        return False
+
     def startElementNS (self, name, qname, attrs):
         (this_state, parent_state, ns_ctx, name_en) = super(PyXBSAXHandler, self).startElementNS(name, qname, attrs)
 
@@ -335,7 +557,7 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
         # Start knowing nothing
         type_class = None
         if element_binding is not None:
-            element_binding = element_binding.elementForName(name)
+            element_binding = element_binding.elementForName(name_en)
             type_class = element_binding.typeDefinition()
 
         # Process an xsi:type attribute, if present
@@ -365,9 +587,12 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
         else:
             this_state.setEnclosingCTD(parent_state.enclosingCTD())
 
+        if self.__identityIndex is not None:
+            self.__identityIndex._startElement()
+
         # Process the element start.  This may or may not return a
         # binding object.
-        binding_object = this_state.startBindingElement(type_class, new_object_factory, element_decl, attrs)
+        binding_object = this_state.startBindingElement(type_class, new_object_factory, element_decl, attrs, trusted=self.__trusted)
 
         # If the top-level element has complex content, this sets the
         # root object.  If it has simple content, see endElementNS.
@@ -385,7 +610,12 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
             # Process the element end.  This will return a binding object,
             # either the one created at the start or the one created at
             # the end.
-            binding_object = this_state.endBindingElement()
+            detach = (self.__selectNames is not None) and self.__isSelected(this_state)
+            binding_object = this_state.endBindingElement(detach=detach, ordered_content=self.__orderedContent)
+            if self.__identityIndex is not None:
+                self.__identityIndex._endElement(binding_object)
+            if detach:
+                self.__completedObjects.append(binding_object)
         assert binding_object is not None
 
         # If we don't have a root object, save it.  No, there is not a
@@ -401,6 +631,19 @@ class PyXBSAXHandler (pyxb.utils.saxutils.BaseSAXHandler):
         if (self.__rootObject is None) and not this_state.inDOMMode():
             self.__rootObject = binding_object
 
+    def endDocument (self):
+        """Complete the identity index for the document, if one is being
+        built, and raise any problem it found if so configured."""
+        super(PyXBSAXHandler, self).endDocument()
+        index = self.__identityIndex
+        if index is None:
+            return
+        index._endDocument()
+        if isinstance(self.__rootObject, basis._TypeBinding_mixin):
+            self.__rootObject._setIdentityIndex(index)
+        if pyxb.ValidationConfig.RAISE_EXCEPTION == self.__identityIndexMode:
+            index.validate()
+
 def make_parser (*args, **kw):
     """Extend L{pyxb.utils.saxutils.make_parser} to change the default
     C{content_handler_constructor} to be L{PyXBSAXHandler}.
@@ -408,6 +651,61 @@ def make_parser (*args, **kw):
     kw.setdefault('content_handler_constructor', PyXBSAXHandler)
     return pyxb.utils.saxutils.make_parser(*args, **kw)
 
+def iterparse (source, select, chunk_size=65536, **kw):
+    """Incrementally parse a document, generating the binding instances for
+    selected elements as they are completed.
+
+    Selected elements are detached from their parents, so once the caller
+    releases a generated instance it may be reclaimed.  For a document that
+    consists of a long sequence of records this permits processing in memory
+    proportional to the size of a record rather than the size of the
+    document.  For example::
+
+      import pyxb.binding.saxer
+      for prog in pyxb.binding.saxer.iterparse(open('feed.xml', 'rb'), [ tvd.Namespace.createExpandedName('program') ]):
+          process(prog)
+
+    @param source: The document, as a file-like object from which data may
+    be read, or as data (Python 2 C{str} or Python 3 C{bytes}) or text
+    (Python 2 C{unicode} or Python 3 C{str}) in the L{pyxb._InputEncoding}
+    encoding.
+
+    @param select: An iterable identifying the elements to generate; see
+    the C{select} keyword of L{PyXBSAXHandler.__init__}.
+
+    @keyword chunk_size: The amount of data read from C{source} for each
+    step of the parser.
+
+    All other keywords are passed to L{make_parser}.  Note that the root
+    object of the document is not generated unless it is selected, and the
+    content models of the elements containing selected elements are not
+    validated.
+    """
+    if isinstance(source, six.text_type):
+        source = source.encode(pyxb._InputEncoding)
+    if isinstance(source, six.binary_type):
+        source = io.BytesIO(source)
+    kw['select'] = select
+    saxer = make_parser(**kw)
+    handler = saxer.getContentHandler()
+    if not isinstance(saxer, xml.sax.xmlreader.IncrementalParser):
+        saxer.parse(source)
+        for obj in handler.completedObjects():
+            yield obj
+        return
+    if isinstance(saxer, xml.sax.xmlreader.Locator):
+        handler.setDocumentLocator(saxer)
+    while True:
+        data = source.read(chunk_size)
+        if not data:
+            break
+        saxer.feed(data)
+        for obj in handler.completedObjects():
+            yield obj
+    saxer.close()
+    for obj in handler.completedObjects():
+        yield obj
+
 ## Local Variables:
 ## fill-column:78
 ## End:
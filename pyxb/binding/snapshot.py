@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module supports saving binding instance trees in a compact binary
+form that can be restored much faster than the original document can be
+parsed.
+
+A snapshot records only the information content of the tree: attribute and
+element values, wildcard content, simple content, nil status, and ordered
+content.  Binding classes are identified by their L{_ExpandedName
+<pyxb.binding.basis._TypeBinding_mixin._ExpandedName>} (or module and class
+name for anonymous types) and element values by the L{id
+<pyxb.binding.content.ElementDeclaration.id>} of their declaration, so a
+snapshot remains loadable if binding modules are regenerated from the same
+schema.  Simple values are held in their native Python representation where
+there is one, and otherwise as their XML literal.
+
+The body of a snapshot is encoded with C{marshal}.  A snapshot written by one
+version of Python can be read by the same or a later version.
+
+Location and namespace context information is not preserved.
+"""
+
+import logging
+import importlib
+import marshal
+import struct
+import xml.dom
+import pyxb
+import pyxb.namespace
+import pyxb.utils.domutils
+from pyxb.binding import basis, datatypes, identity
+from pyxb.utils import six
+
+_log = logging.getLogger(__name__)
+
+_Magic = six.b('PyXBsnap')
+_Header = struct.Struct('>BB')
+
+FormatVersion = 1
+"""The version of the snapshot format written by L{CreateSnapshot}."""
+
+# Set in the header flags if the tree was validated before it was saved.
+_Flag_Validated = 0x01
+
+# Element and type indexes that denote the declared element or type, and
+# the absence of an element binding.
+_Declared = -1
+_NoElement = -2
+
+# Kinds of wildcard element content.
+_Wildcard_Binding = 0
+_Wildcard_DOM = 1
+
+class _Encoder (object):
+    """Convert a binding instance tree to a tree of values that C{marshal}
+    can serialize."""
+
+    def __init__ (self):
+        self.__types = []
+        self.__typeIndex = { }
+        self.__elements = []
+        self.__elementIndex = { }
+
+    def tables (self):
+        return (tuple(self.__types), tuple(self.__elements))
+
+    def typeIndex (self, type_class):
+        rv = self.__typeIndex.get(type_class)
+        if rv is None:
+            uri = local_name = None
+            en = type_class._ExpandedName
+            if (en is not None) and (en.namespace() is not None) and not en.namespace().isAbsentNamespace():
+                (uri, local_name) = en.uriTuple()
+            rv = self.__typeIndex[type_class] = len(self.__types)
+            self.__types.append((uri, local_name, type_class.__module__, type_class.__name__))
+        return rv
+
+    def elementIndex (self, elt):
+        if elt is None:
+            return _NoElement
+        rv = self.__elementIndex.get(elt)
+        if rv is None:
+            scope = _Declared
+            if elt.scope() is not None:
+                scope = self.typeIndex(elt.scope())
+            (uri, local_name) = elt.name().uriTuple()
+            module_name = attribute = None
+            ns = elt.name().namespace()
+            if (elt.scope() is None) and ((ns is None) or ns.isAbsentNamespace()):
+                # Global elements in an absent namespace cannot be located
+                # by name; find the module attribute that holds them.
+                (module_name, attribute) = self.__moduleAttribute(elt)
+            rv = self.__elementIndex[elt] = len(self.__elements)
+            self.__elements.append((scope, uri, local_name, module_name, attribute))
+        return rv
+
+    def __moduleAttribute (self, elt):
+        module_name = elt.typeDefinition().__module__
+        module = importlib.import_module(module_name)
+        for (name, value) in six.iteritems(vars(module)):
+            if value is elt:
+                return (module_name, name)
+        raise pyxb.SnapshotError('Unable to locate binding for element %s' % (elt.name(),))
+
+    def __domText (self, node):
+        bds = pyxb.utils.domutils.BindingDOMSupport()
+        bds.appendChild(node, bds.document())
+        return bds.finalize().toxml('utf-8')
+
+    def encode (self, value, declared_type, declared_element):
+        value_type = type(value)
+        if value_type is declared_type:
+            type_index = _Declared
+        else:
+            type_index = self.typeIndex(value_type)
+        element = value._element()
+        if element is declared_element:
+            element_index = _Declared
+        else:
+            element_index = self.elementIndex(element)
+        nil = bool(value._isNil())
+        if isinstance(value, basis.complexTypeDefinition):
+            return self.__encodeComplex(value, value_type, type_index, element_index, nil)
+        payload = self.__encodeSimple(value, value_type)
+        if (_Declared == type_index) and (_Declared == element_index) and not nil:
+            return payload
+        return (type_index, element_index, nil, payload)
+
+    def __encodeSimple (self, value, value_type):
+        if issubclass(value_type, basis.STD_list):
+            item_type = value_type._ItemType
+            return [ self.encode(_v, item_type, None) for _v in value ]
+        if isinstance(value, six.text_type):
+            return six.text_type(value)
+        if isinstance(value, datatypes.boolean):
+            return bool(value)
+        if isinstance(value, six.integer_types):
+            return int(value)
+        if isinstance(value, six.float_type):
+            return float(value)
+        if isinstance(value, six.binary_type):
+            return six.binary_type(value)
+        if isinstance(value, pyxb.namespace.ExpandedName):
+            return [ value.namespaceURI(), value.localName() ]
+        return value.xsdLiteral()
+
+    def __encodeComplex (self, value, value_type, type_index, element_index, nil):
+        attributes = []
+        for au in six.itervalues(value_type._AttributeMap):
+            if au.provided(value):
+                attributes.append((au.id(), self.encode(au.value(value), au.dataType(), None)))
+        elements = []
+        content_refs = { }
+        for ed in six.itervalues(value_type._ElementMap):
+            ev = ed.value(value)
+            if ev is None:
+                continue
+            eb = ed.elementBinding()
+            etype = eb.typeDefinition()
+            if ed.isPlural():
+                if 0 == len(ev):
+                    continue
+                for (i, v) in enumerate(ev):
+                    content_refs[id(v)] = (ed.id(), i)
+                elements.append((ed.id(), [ self.encode(_v, etype, eb) for _v in ev ]))
+            else:
+                content_refs[id(ev)] = (ed.id(), 0)
+                elements.append((ed.id(), self.encode(ev, etype, eb)))
+        wildcard_attributes = None
+        wam = value.wildcardAttributeMap()
+        if wam:
+            wildcard_attributes = [ (_n.uriTuple(), six.text_type(_v)) for (_n, _v) in six.iteritems(wam) ]
+        wildcards = None
+        wel = value._wildcardElements()
+        if wel:
+            wildcards = []
+            for (i, w) in enumerate(wel):
+                content_refs[id(w)] = (None, i)
+                if isinstance(w, xml.dom.Node):
+                    wildcards.append((_Wildcard_DOM, self.__domText(w)))
+                else:
+                    wildcards.append((_Wildcard_Binding, self.encode(w, None, None)))
+        simple = None
+        if (basis.complexTypeDefinition._CT_SIMPLE == value._ContentTypeTag) and not nil:
+            simple = self.encode(value.value(), value_type._TypeDefinition, None)
+        content = None
+        if not (value._ContentTypeTag in (basis.complexTypeDefinition._CT_EMPTY, basis.complexTypeDefinition._CT_SIMPLE)):
+            content = []
+            for c in value._orderedContent():
+                if isinstance(c, basis.NonElementContent):
+                    content.append(six.text_type(c.value))
+                else:
+                    ref = content_refs.get(id(c.value))
+                    # Content that is no longer held by the instance is not
+                    # preserved.
+                    if ref is not None:
+                        content.append(ref)
+        return (type_index, element_index, nil, tuple(attributes), tuple(elements), wildcard_attributes, wildcards, simple, content)
+
+class _Decoder (object):
+    """Reconstruct a binding instance tree from the output of L{_Encoder}."""
+
+    def __init__ (self, types, elements):
+        self.__types = [ self.__resolveType(*_t) for _t in types ]
+        self.__elements = [ self.__resolveElement(*_e) for _e in elements ]
+        self.__attributeUses = { }
+        self.__elementDeclarations = { }
+
+    def __resolveType (self, uri, local_name, module_name, class_name):
+        rv = None
+        if uri is not None:
+            if pyxb.namespace.XMLSchema.uri() == uri:
+                rv = getattr(datatypes, local_name, None)
+            else:
+                ns = pyxb.namespace.NamespaceForURI(uri, create_if_missing=False)
+                if (ns is not None) and ('typeBinding' in ns.categories()):
+                    rv = ns.categoryMap('typeBinding').get(local_name)
+        if rv is None:
+            try:
+                rv = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError):
+                raise pyxb.SnapshotError('Unable to locate binding class %s.%s' % (module_name, class_name))
+        return rv._SupersedingClass()
+
+    def __resolveElement (self, scope_index, uri, local_name, module_name, attribute):
+        if module_name is not None:
+            try:
+                return getattr(importlib.import_module(module_name), attribute)
+            except (ImportError, AttributeError):
+                raise pyxb.SnapshotError('Unable to locate element binding %s.%s' % (module_name, attribute))
+        scope = None
+        if _Declared != scope_index:
+            scope = self.__types[scope_index]
+        try:
+            return basis._ElementForReference(scope, (uri, local_name))
+        except (pyxb.LogicError, pyxb.PyXBException, KeyError):
+            raise pyxb.SnapshotError('Unable to locate element binding {%s}%s' % (uri, local_name))
+
+    def element (self, index):
+        if _NoElement == index:
+            return None
+        return self.__elements[index]
+
+    def __attributeUse (self, type_class, au_id):
+        uses = self.__attributeUses.get(type_class)
+        if uses is None:
+            uses = self.__attributeUses[type_class] = dict([ (_au.id(), _au) for _au in six.itervalues(type_class._AttributeMap) ])
+        return uses[au_id]
+
+    def __elementDeclaration (self, type_class, ed_id):
+        decls = self.__elementDeclarations.get(type_class)
+        if decls is None:
+            decls = self.__elementDeclarations[type_class] = dict([ (_ed.id(), _ed) for _ed in six.itervalues(type_class._ElementMap) ])
+        return decls[ed_id]
+
+    def decode (self, node, declared_type, declared_element):
+        if not isinstance(node, tuple):
+            return self.__decodeSimple(node, declared_type, declared_element, False)
+        type_class = declared_type
+        if _Declared != node[0]:
+            type_class = self.__types[node[0]]
+        element = declared_element
+        if _Declared != node[1]:
+            element = self.element(node[1])
+        if 4 == len(node):
+            return self.__decodeSimple(node[3], type_class, element, node[2])
+        return self.__decodeComplex(node, type_class, element)
+
+    def __decodeSimple (self, payload, type_class, element, nil):
+        kw = { '_validate_constraints' : False }
+        if element is not None:
+            kw['_element'] = element
+        if nil:
+            kw['_nil'] = True
+        if issubclass(type_class, basis.STD_list):
+            item_type = type_class._ItemType
+            return type_class.Factory([ self.decode(_p, item_type, None) for _p in payload ], **kw)
+        if isinstance(payload, list):
+            return type_class.Factory(pyxb.namespace.ExpandedName(*payload), **kw)
+        if isinstance(payload, six.text_type) and not issubclass(type_class, six.text_type):
+            kw['_from_xml'] = True
+        return type_class.Factory(payload, **kw)
+
+    def __decodeComplex (self, node, type_class, element):
+        (_, _, nil, attributes, elements, wildcard_attributes, wildcards, simple, content) = node
+        kw = { '_validate_constraints' : False }
+        if element is not None:
+            kw['_element'] = element
+        if nil:
+            kw['_nil'] = True
+        args = ()
+        if simple is not None:
+            args = (self.decode(simple, type_class._TypeDefinition, None),)
+        instance = type_class.Factory(*args, **kw)
+        for (au_id, av) in attributes:
+            au = self.__attributeUse(type_class, au_id)
+            au.set(instance, self.decode(av, au.dataType(), None), validate_constraints=False)
+        values = { }
+        for (ed_id, ev) in elements:
+            ed = self.__elementDeclaration(type_class, ed_id)
+            eb = ed.elementBinding()
+            etype = eb.typeDefinition()
+            if ed.isPlural():
+                ev = [ self.decode(_v, etype, eb) for _v in ev ]
+                for v in ev:
+                    ed._setOrAppendUnchecked(instance, v, False)
+            else:
+                ev = [ self.decode(ev, etype, eb) ]
+                ed._setOrAppendUnchecked(instance, ev[0], False)
+            values[ed_id] = (ed, ev)
+        if wildcard_attributes:
+            wam = instance.wildcardAttributeMap()
+            for ((uri, local_name), text) in wildcard_attributes:
+                wam[pyxb.namespace.ExpandedName(uri, local_name)] = text
+        wildcard_values = []
+        if wildcards:
+            wel = instance.wildcardElements()
+            for (kind, payload) in wildcards:
+                if _Wildcard_DOM == kind:
+                    wv = pyxb.utils.domutils.StringToDOM(payload).documentElement
+                else:
+                    wv = self.decode(payload, None, None)
+                wel.append(wv)
+                wildcard_values.append(wv)
+        if content:
+            for c in content:
+                if not isinstance(c, tuple):
+                    instance._addContent(basis.NonElementContent(c))
+                    continue
+                (ed_id, index) = c
+                if ed_id is None:
+                    instance._addContent(basis.ElementContent(wildcard_values[index], None))
+                else:
+                    (ed, ev) = values[ed_id]
+                    instance._addContent(basis.ElementContent(ev[index], ed))
+        if isinstance(instance, basis.complexTypeDefinition):
+            instance._discardAutomatonConfiguration()
+        return instance
+
+def CreateSnapshot (instance, validate=True):
+    """Return a snapshot of a binding instance and everything it contains.
+
+    @param instance: A binding instance, usually the root of a tree obtained
+    from C{CreateFromDocument}.
+
+    @keyword validate: If C{True} (default), the instance is validated before
+    the snapshot is taken, and the snapshot records that it holds a valid
+    tree so that L{CreateFromSnapshot} need not validate it again.
+
+    @return: The snapshot, as bytes.
+
+    @raise pyxb.ValidationError: C{validate} is C{True} and the instance is
+    not valid.
+    """
+    flags = 0
+    if validate:
+        instance.validateBinding()
+        flags |= _Flag_Validated
+    encoder = _Encoder()
+    element = instance._element()
+    declared_type = None
+    if element is not None:
+        declared_type = element.typeDefinition()
+    root_element = encoder.elementIndex(element)
+    root = encoder.encode(instance, declared_type, element)
+    (types, elements) = encoder.tables()
+    body = (types, elements, root_element, root)
+    return _Magic + _Header.pack(FormatVersion, flags) + marshal.dumps(body)
+
+def CreateFromSnapshot (snapshot, validate=None):
+    """Reconstruct a binding instance from a snapshot.
+
+    The binding modules for the content of the snapshot are imported if
+    necessary.
+
+    @param snapshot: A value returned by L{CreateSnapshot}.
+
+    @keyword validate: If C{True}, the reconstructed instance is validated.
+    If C{False}, it is not.  If C{None} (default), it is validated only if
+    the snapshot was taken without validation.
+
+    If L{identityConstraints<pyxb.ValidationConfig.identityConstraints>}
+    requests it, an L{identity index<pyxb.binding.identity.IdentityIndex>} is
+    built for the reconstructed instance as it would be by the parser.
+
+    @return: The binding instance.
+
+    @raise pyxb.SnapshotError: the snapshot is not in a supported format, or
+    refers to bindings that cannot be located.
+    @raise pyxb.ValidationError: the reconstructed instance is validated and
+    is not valid.
+    @raise pyxb.IdentityConstraintError: identity constraints are checked
+    and the reconstructed instance does not satisfy them.
+    """
+    prefix_length = len(_Magic) + _Header.size
+    if (not isinstance(snapshot, six.binary_type)) or (snapshot[:len(_Magic)] != _Magic) or (len(snapshot) < prefix_length):
+        raise pyxb.SnapshotError('Not a PyXB snapshot')
+    (version, flags) = _Header.unpack(snapshot[len(_Magic):prefix_length])
+    if FormatVersion < version:
+        raise pyxb.SnapshotError('Snapshot format version %d is not supported' % (version,))
+    try:
+        (types, elements, root_element, root) = marshal.loads(snapshot[prefix_length:])
+    except (ValueError, EOFError, TypeError):
+        raise pyxb.SnapshotError('Snapshot content is corrupt')
+    decoder = _Decoder(types, elements)
+    element = decoder.element(root_element)
+    declared_type = None
+    if element is not None:
+        declared_type = element.typeDefinition()
+    instance = decoder.decode(root, declared_type, element)
+    if validate is None:
+        validate = not (flags & _Flag_Validated)
+    if validate:
+        instance.validateBinding()
+    if isinstance(instance, basis._TypeBinding_mixin):
+        identity._AttachIndex(instance)
+    return instance
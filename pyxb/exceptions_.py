@@ -94,6 +94,12 @@ class NamespaceArchiveError (PyXBException):
     """Problem related to namespace archives"""
     pass
 
+class SnapshotError (PyXBException):
+    """Raised when a binding instance snapshot cannot be restored.
+
+    See L{pyxb.binding.snapshot}."""
+    pass
+
 class SchemaUniquenessError (PyXBException):
     """Raised when somebody tries to create a schema component using a
     schema that has already been used in that namespace.  Import and
@@ -956,6 +962,66 @@ class AttributeChangeError (AttributeValidationError):
     def __str__ (self):
         return six.u('Cannot change fixed attribute %s in type %s') % (self.tag, self.type)
 
+class IdentityConstraintError (ValidationError):
+    """Raised when a document does not satisfy an identity constraint, or
+    its ID and IDREF values are inconsistent.
+
+    See L{pyxb.binding.identity.IdentityIndex}."""
+
+    constraint = None
+    """The L{pyxb.binding.identity.IdentityConstraint} that is not
+    satisfied, or C{None} if the problem is with ID or IDREF values."""
+
+    value = None
+    """The key as a tuple of field values, or the ID or IDREF value."""
+
+    instance = None
+    """The binding instance selected by the constraint, or the one holding
+    the ID or IDREF value."""
+
+    def __init__ (self, constraint, value, instance=None, location=None):
+        """@param constraint: the value for the L{constraint} attribute.
+        @param value: the value for the L{value} attribute.
+        @param instance: the value for the L{instance} attribute.
+        @param location: the value for the L{location} attribute.  Default taken from C{instance} if possible.
+        """
+        import pyxb.utils.utility as utility
+        self.constraint = constraint
+        self.value = value
+        self.instance = instance
+        if (location is None) and isinstance(instance, utility.Locatable_mixin):
+            location = instance._location()
+        self.location = location
+        super(IdentityConstraintError, self).__init__(constraint, value, instance, location)
+
+@six.python_2_unicode_compatible
+class DuplicateKeyError (IdentityConstraintError):
+    """Raised when two nodes have the same key for a key or unique
+    constraint, or two elements have the same ID."""
+    def __str__ (self):
+        if self.constraint is None:
+            return six.u('ID %s appears more than once') % (self.value,)
+        return six.u('Value %s appears more than once for %s') % (self.value, self.constraint)
+
+@six.python_2_unicode_compatible
+class IncompleteKeyError (IdentityConstraintError):
+    """Raised when a node selected by a key constraint lacks a value for
+    a field, or a field of an identity constraint has more than one
+    value.  In the latter case L{value} holds the field values."""
+    def __str__ (self):
+        if self.value is None:
+            return six.u('Node selected by %s lacks a value for a field') % (self.constraint,)
+        return six.u('Field of %s has multiple values %s') % (self.constraint, self.value)
+
+@six.python_2_unicode_compatible
+class UnresolvedKeyrefError (IdentityConstraintError):
+    """Raised when a keyref constraint or IDREF value does not match any
+    key or ID."""
+    def __str__ (self):
+        if self.constraint is None:
+            return six.u('No element has ID %s') % (self.value,)
+        return six.u('Value %s of %s does not match any key') % (self.value, self.constraint)
+
 class BindingError (PyXBException):
     """Raised when the bindings are mis-used.
 
@@ -77,6 +77,76 @@ class ExpandedName (pyxb.cscRoot):
     # Cached tuple representation
     __expandedName = None
 
+    # Cached hash value.  This is not preserved when pickling, since string
+    # hashes may differ between interpreter instances.
+    __hash = None
+
+    # Map from the key used to intern a name to the canonical instance for
+    # that name, for names recorded from ExpandedName instances, generally
+    # those of the declarations in binding modules.
+    __InternMap = { }
+
+    # As __InternMap, for names first seen as tuples from the parser.
+    __TransientInternMap = { }
+
+    # The number of entries in the map of names from the parser at which it
+    # is discarded.  This bounds the memory consumed when processing
+    # documents with arbitrary (e.g., wildcard) element names, without
+    # discarding the names of declarations.
+    _InternLimit = 16384
+
+    @classmethod
+    def Intern (cls, name, fallback_namespace=None):
+        """Return the canonical expanded name for the given name.
+
+        This is used on the SAX processing path, where the parser delivers
+        names as C{(namespace URI, local name)} tuples.  Names returned from
+        this method are shared, so lookups in dictionaries keyed by interned
+        names (such as the element and attribute maps of complex types,
+        whose keys are interned when the bindings are loaded) succeed on
+        object identity without a field-by-field comparison.
+
+        Names recorded from L{ExpandedName} instances are retained
+        indefinitely.  Names first seen as tuples are retained until their
+        number exceeds L{_InternLimit}, when they are all discarded.
+
+        @param name: A C{(namespace URI, local name)} tuple, or an
+        L{ExpandedName} instance.  In the latter case, the instance becomes
+        the canonical one if none has yet been recorded.
+
+        @keyword fallback_namespace: As with the L{ExpandedName}
+        constructor, an absent namespace used if C{name} has no namespace.
+
+        @return: An instance of L{ExpandedName}
+        """
+        if isinstance(name, ExpandedName):
+            key = name.__internKey()
+            rv = cls.__InternMap.get(key)
+            if rv is None:
+                # Keep a name already returned to the parser canonical.
+                rv = cls.__InternMap[key] = cls.__TransientInternMap.pop(key, name)
+            return rv
+        (uri, local_name) = name
+        key = name
+        if (uri is None) and (fallback_namespace is not None) and fallback_namespace.isAbsentNamespace():
+            key = (fallback_namespace, local_name)
+        rv = cls.__InternMap.get(key)
+        if rv is None:
+            rv = cls.__TransientInternMap.get(key)
+            if rv is None:
+                if len(cls.__TransientInternMap) >= cls._InternLimit:
+                    cls.__TransientInternMap.clear()
+                rv = cls.__TransientInternMap[key] = cls(uri, local_name, fallback_namespace=fallback_namespace)
+        return rv
+
+    def __internKey (self):
+        # Names in an absent namespace are distinguished by namespace
+        # instance; all others by URI, so that the key of a name in a
+        # namespace is the tuple delivered by the parser.
+        if (self.__namespace is not None) and (self.__namespaceURI is None):
+            return (self.__namespace, self.__localName)
+        return (self.__namespaceURI, self.__localName)
+
     def validateComponentModel (self):
         """Pass model validation through to namespace part."""
         return self.namespace().validateComponentModel()
@@ -205,10 +275,18 @@ class ExpandedName (pyxb.cscRoot):
         return self.localName()
 
     def __hash__ (self):
-        if self.__namespaceURI is None:
-            # Handle both str and unicode hashes
-            return type(self.__localName).__hash__(self.__localName)
-        return tuple.__hash__(self.__expandedName)
+        if self.__hash is None:
+            if self.__namespaceURI is None:
+                # Handle both str and unicode hashes
+                self.__hash = type(self.__localName).__hash__(self.__localName)
+            else:
+                self.__hash = tuple.__hash__(self.__expandedName)
+        return self.__hash
+
+    def __getstate__ (self):
+        state = self.__dict__.copy()
+        state.pop('_ExpandedName__hash', None)
+        return state
 
     def __otherForCompare (self, other):
         if isinstance(other, six.string_types):
@@ -220,6 +298,8 @@ class ExpandedName (pyxb.cscRoot):
         return other
 
     def __eq__ (self, other):
+        if self is other:
+            return True
         if other is None:
             return False
         return 0 == pyxb.utils.utility.IteratedCompareMixed(self.__uriTuple, self.__otherForCompare(other))
@@ -44,10 +44,110 @@ def GetArchivePath ():
     or C{None} if that variable is not defined."""
     return os.environ.get(PathEnvironmentVariable)
 
+IndexEnvironmentVariable = 'PYXB_ARCHIVE_INDEX'
+"""Environment variable holding the path to an archive index file.  If set,
+L{NamespaceArchive.PreLoadArchives} records the module records of each
+archive it examines in this file, and on later scans takes them from the
+file instead of opening archives that have not changed.  The file is created
+if it does not exist."""
+
+def GetArchiveIndexPath ():
+    """Return the archive index path as defined by the
+    L{IndexEnvironmentVariable}, or C{None} if that variable is not
+    defined."""
+    return os.environ.get(IndexEnvironmentVariable)
+
 # Stuff required for pickling
 from pyxb.utils.six.moves import cPickle as pickle
 import re
 
+class _ArchiveIndex (object):
+    """A persisted record of the module records held in a set of archives.
+
+    Each entry is keyed by the real path of an archive, and is used only if
+    the size and modification time of the archive are unchanged since the
+    entry was recorded.  The module records are kept as a pickle, so the
+    index can be read without unpickling the records of archives that are
+    not present in the archive path."""
+
+    # A code used to identify the format of the index file.
+    # YYYYMMDDHHMM
+    __PickleFormat = '201610160000'
+
+    def __init__ (self, index_path):
+        self.__indexPath = index_path
+        self.__entries = { }
+        self.__modified = False
+        try:
+            with open(index_path, 'rb') as f:
+                (fmt, entries) = pickle.load(f)
+            if self.__PickleFormat == fmt:
+                self.__entries = entries
+            else:
+                _log.info('Ignoring archive index %s with format %s', index_path, fmt)
+        except (IOError, OSError):
+            pass
+        except Exception:
+            _log.warning('Ignoring unreadable archive index %s', index_path)
+
+    def indexPath (self):
+        return self.__indexPath
+
+    @classmethod
+    def __Signature (cls, archive_path):
+        st = os.stat(archive_path)
+        return (st.st_size, st.st_mtime)
+
+    def lookup (self, archive_path):
+        """Return C{(generation_uid, module_records)} from the entry for the
+        given archive, or C{None} if there is no entry or the archive has
+        changed since the entry was recorded."""
+        key = os.path.realpath(archive_path)
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        (signature, generation_uid, module_records) = entry
+        try:
+            if self.__Signature(archive_path) != signature:
+                return None
+        except OSError:
+            return None
+        return (generation_uid, pickle.loads(module_records))
+
+    def record (self, archive_path, generation_uid, module_records):
+        key = os.path.realpath(archive_path)
+        try:
+            self.__entries[key] = (self.__Signature(archive_path), generation_uid, pickle.dumps(module_records, -1))
+            self.__modified = True
+        except (OSError, pickle.PicklingError):
+            _log.warning('Unable to index archive %s', archive_path)
+
+    def prune (self):
+        """Discard entries for archives that no longer exist."""
+        for key in list(six.iterkeys(self.__entries)):
+            if not os.path.exists(key):
+                del self.__entries[key]
+                self.__modified = True
+
+    def save (self):
+        """Write the index if it has changed.
+
+        The index is written to a temporary file which then replaces the
+        original, so concurrent readers see either the old or the new
+        index."""
+        if not self.__modified:
+            return
+        temp_path = '%s.%d' % (self.__indexPath, os.getpid())
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump((self.__PickleFormat, self.__entries), f, -1)
+            if os.path.exists(self.__indexPath) and (os.name == 'nt'):
+                os.remove(self.__indexPath)
+            os.rename(temp_path, self.__indexPath)
+            self.__modified = False
+        except (IOError, OSError):
+            _log.warning('Unable to write archive index %s', self.__indexPath)
+
 class NamespaceArchive (object):
     """Represent a file from which one or more namespaces can be read, or to
     which they will be written."""
@@ -96,14 +196,28 @@ class NamespaceArchive (object):
             ns._removeArchive(self)
 
     @classmethod
-    def __GetArchiveInstance (cls, archive_file, stage=None):
+    def __GetArchiveInstance (cls, archive_file, stage=None, index=None):
         """Return a L{NamespaceArchive} instance associated with the given file.
 
         To the extent possible, the same file accessed through different paths
         returns the same L{NamespaceArchive} instance.
+
+        If an L{_ArchiveIndex} is provided, the generation UID and module
+        records are taken from it if it has a current entry for the file, and
+        the file is not opened until components are read.  Otherwise they are
+        read from the file and recorded in the index.
         """
 
-        nsa = NamespaceArchive(archive_path=archive_file, stage=cls._STAGE_uid)
+        indexed = None
+        if index is not None:
+            indexed = index.lookup(archive_file)
+        if indexed is not None:
+            nsa = NamespaceArchive(archive_path=archive_file, stage=cls._STAGE_UNOPENED)
+            nsa.__setFromIndex(*indexed)
+        else:
+            nsa = NamespaceArchive(archive_path=archive_file, stage=cls._STAGE_uid)
+            if index is not None:
+                nsa.__index = index
         rv = cls.__NamespaceArchives.get(nsa.generationUID(), nsa)
         if rv == nsa:
             cls.__NamespaceArchives[rv.generationUID()] = rv
@@ -113,11 +227,12 @@ class NamespaceArchive (object):
     __ArchivePattern_re = re.compile('\.wxs$')
 
     @classmethod
-    def PreLoadArchives (cls, archive_path=None, reset=False):
+    def PreLoadArchives (cls, archive_path=None, reset=False, index_path=None):
         """Scan for available archives, associating them with namespaces.
 
         This only validates potential archive contents; it does not load
-        namespace data from the archives.
+        namespace data from the archives.  Components are read from an
+        archive only when a namespace it holds is used.
 
         @keyword archive_path: A list of files or directories in which
         namespace archives can be found.  The entries are separated by
@@ -130,6 +245,11 @@ class NamespaceArchive (object):
         @keyword reset: If C{False} (default), the most recently read set of
         archives is returned; if C{True}, the archive path is re-scanned and the
         namespace associations validated.
+
+        @keyword index_path: The path to an archive index file.  Archives
+        that have not changed since they were recorded in the index are not
+        opened during the scan.  Defaults to L{GetArchiveIndexPath()}.  See
+        L{IndexEnvironmentVariable}.
         """
 
         from pyxb.namespace import builtin
@@ -152,14 +272,22 @@ class NamespaceArchive (object):
                 candidate_files = pyxb.utils.utility.GetMatchingFiles(archive_path, cls.__ArchivePattern_re,
                                                                       default_path_wildcard='+', default_path=GetArchivePath(),
                                                                       prefix_pattern='&', prefix_substituend=DefaultArchivePrefix)
+                if index_path is None:
+                    index_path = GetArchiveIndexPath()
+                index = None
+                if index_path is not None:
+                    index = _ArchiveIndex(index_path)
                 for afn in candidate_files:
                     try:
-                        nsa = cls.__GetArchiveInstance(afn, stage=cls._STAGE_readModules)
+                        nsa = cls.__GetArchiveInstance(afn, stage=cls._STAGE_readModules, index=index)
                         archive_set.add(nsa)
                     except pickle.UnpicklingError:
                         _log.exception('Cannot unpickle archive %s', afn)
                     except pyxb.NamespaceArchiveError:
                         _log.exception('Cannot process archive %s', afn)
+                if index is not None:
+                    index.prune()
+                    index.save()
 
                 # Do this for two reasons: first, to get an iterable that won't
                 # cause problems when we remove unresolvable archives from
@@ -246,6 +374,45 @@ class NamespaceArchive (object):
         return self.__moduleRecords
     __moduleRecords = None
 
+    @classmethod
+    def ArchivesForComponent (cls, namespace, category, local_name):
+        """Return the archives that provide the named component.
+
+        This uses the table of contents held in the module records of the
+        archives found by L{PreLoadArchives}; no components are read.
+
+        @param namespace: A L{pyxb.namespace.Namespace} instance, or the URI
+        of one.
+        @param category: The category of the component, e.g.
+        C{typeDefinition} or C{elementDeclaration}.
+        @param local_name: The name of the component within its namespace.
+        @return: A list of L{NamespaceArchive} instances, ordered by archive
+        path."""
+        if cls.__NamespaceArchives is None:
+            return []
+        if isinstance(namespace, pyxb.namespace.Namespace):
+            namespace = namespace.uri()
+        rv = []
+        for archive in six.itervalues(cls.__NamespaceArchives):
+            for mr in archive.moduleRecords() or ():
+                if mr.namespace().uri() != namespace:
+                    continue
+                if mr.providesComponent(category, local_name):
+                    rv.append(archive)
+                    break
+        rv.sort(key=lambda _a: _a.archivePath())
+        return rv
+
+    @classmethod
+    def LoadedArchives (cls):
+        """Return the archives from which components have been read into
+        their namespaces.
+
+        @rtype: C{list} of L{NamespaceArchive}"""
+        if cls.__NamespaceArchives is None:
+            return []
+        return [ _a for _a in six.itervalues(cls.__NamespaceArchives) if (_a.__stage is not None) and (_a._STAGE_readComponents <= _a.__stage) and (_a.archivePath() is not None) ]
+
     @classmethod
     def ForPath (cls, archive_file):
         """Return the L{NamespaceArchive} instance that can be found at the
@@ -333,8 +500,28 @@ class NamespaceArchive (object):
 
         return unpickler
 
+    # The index in which module records read from the archive are recorded,
+    # if any.
+    __index = None
+
+    # Module records taken from an index, to be used in place of the ones in
+    # the archive when stage _STAGE_readModules is reached.
+    __indexedModuleRecords = None
+
+    def __setFromIndex (self, generation_uid, module_records):
+        self.__generationUID = generation_uid
+        self.__indexedModuleRecords = module_records
+        self.__stage = self._STAGE_uid
+
     def __readModules (self, unpickler):
-        mrs = unpickler.load()
+        if unpickler is None:
+            mrs = self.__indexedModuleRecords
+            self.__indexedModuleRecords = None
+        else:
+            mrs = unpickler.load()
+            if self.__index is not None:
+                self.__index.record(self.archivePath(), self.generationUID(), mrs)
+                self.__index = None
         assert isinstance(mrs, set), 'Expected set got %s from %s' % (type(mrs), self.archivePath())
         if self.__moduleRecords is None:
             for mr in mrs.copy():
@@ -396,6 +583,23 @@ class NamespaceArchive (object):
                         raise pyxb.NamespaceArchiveError('Archive %s namespace %s module %s origin %s archive/active conflict on category %s: %s' % (self.__archivePath, ns, mr, origin, cat, " ".join(cross_objects)))
                     _log.info('%s no conflicts on %d names', cat, len(names))
 
+    def __openIndexedArchive (self):
+        """Open an archive whose module records were taken from an index.
+
+        The components in the archive refer to the origins recorded in the
+        module records of the archive, not those in the index, so the origins
+        of the module records in use are replaced by the ones read here."""
+        generation_uid = self.__generationUID
+        unpickler = self.__createUnpickler()
+        if generation_uid != self.__generationUID:
+            raise pyxb.NamespaceArchiveError('%s: archive changed since it was indexed' % (self.archivePath(),))
+        for mr in unpickler.load():
+            mr2 = mr.namespace().lookupModuleRecordByUID(mr.generationUID())
+            if mr2 is None:
+                raise pyxb.NamespaceArchiveError('Lost module record %s %s from %s' % (mr.namespace(), mr.generationUID(), self.archivePath()))
+            mr2._replaceOrigins(mr)
+        return unpickler
+
     def __readComponentSet (self, unpickler):
         self.__validatePrerequisites(self._STAGE_readComponents)
         for n in range(len(self.__moduleRecords)):
@@ -417,7 +621,7 @@ class NamespaceArchive (object):
                     self.__stage = self._STAGE_uid
                     continue
                 if self.__stage < self._STAGE_readModules:
-                    assert self.__unpickler is not None
+                    assert (self.__unpickler is not None) or (self.__indexedModuleRecords is not None)
                     self.__readModules(self.__unpickler)
                     self.__stage = self._STAGE_readModules
                     continue
@@ -426,7 +630,8 @@ class NamespaceArchive (object):
                     self.__stage = self._STAGE_validateModules
                     continue
                 if self.__stage < self._STAGE_readComponents:
-                    assert self.__unpickler is not None
+                    if self.__unpickler is None:
+                        self.__unpickler = self.__openIndexedArchive()
                     self.__stage = self._STAGE_readComponents
                     self.__readComponentSet(self.__unpickler)
                     self.__unpickler = None
@@ -692,6 +897,24 @@ class ModuleRecord (pyxb.utils.utility.PrivateTransient_mixin):
         return self
     __originMap = None
 
+    def _replaceOrigins (self, other):
+        """Replace the origins of this record with those of another record
+        for the same generation, read from the same archive."""
+        assert self.__generationUID == other.__generationUID
+        origins = other.origins()
+        for origin in origins:
+            origin._setModuleRecord(self)
+        self._setOrigins(origins)
+        return self
+
+    def providesComponent (self, category, local_name):
+        """Return C{True} iff one of the origins in this record provides a
+        component with the given name in the given category."""
+        for origin in self.origins():
+            if local_name in origin.categoryMembers().get(category, ()):
+                return True
+        return False
+
     def hasMatchingOrigin (self, **kw):
         for origin in self.origins():
             if origin.match(**kw):
@@ -820,6 +1043,9 @@ class _ObjectOrigin (pyxb.utils.utility.PrivateTransient_mixin, pyxb.cscRoot):
 
     def moduleRecord (self):
         return self.__moduleRecord
+    def _setModuleRecord (self, module_record):
+        self.__moduleRecord = module_record
+        return self
     __moduleRecord = None
 
     def namespace (self):
@@ -17,6 +17,9 @@
 Namespaces<http://www.w3.org/TR/2006/REC-xml-names-20060816/index.html>}."""
 
 import logging
+import collections
+import threading
+import timeit
 import pyxb
 import pyxb.utils.utility
 from pyxb.namespace import archive, utility
@@ -73,6 +76,62 @@ class _Resolvable_mixin (pyxb.cscRoot):
             _log.info('Resolution delayed for %s: %s\n\tDepends on: %s', self, why, depends_on)
         self._namespaceContext().queueForResolution(self, depends_on)
 
+class ResolutionStatistics (object):
+    """Accumulates the time spent resolving schema components.
+
+    Each attempt by L{_NamespaceResolution_mixin.resolveDefinitions} to
+    resolve a component is recorded under the name of the component's class,
+    so the cost of resolution can be attributed to the kinds of component
+    that incur it.  The statistics accumulate until L{Reset} is invoked."""
+
+    _Timer = staticmethod(timeit.default_timer)
+
+    # Map from component class name to a list [attempts, resolved, seconds]
+    __Timings = {}
+
+    @classmethod
+    def Record (cls, component_type, elapsed, resolved):
+        """Record one attempt to resolve a component.
+
+        @param component_type: The class of the component
+        @param elapsed: The time spent in the attempt, in seconds
+        @param resolved: C{True} iff the attempt resolved the component"""
+        entry = cls.__Timings.get(component_type.__name__)
+        if entry is None:
+            entry = cls.__Timings[component_type.__name__] = [0, 0, 0.0]
+        entry[0] += 1
+        if resolved:
+            entry[1] += 1
+        entry[2] += elapsed
+
+    @classmethod
+    def Reset (cls):
+        """Discard all recorded statistics."""
+        cls.__Timings.clear()
+
+    @classmethod
+    def Timings (cls):
+        """Return the recorded statistics.
+
+        @return: A map from component class name to a tuple C{(attempts,
+        resolved, seconds)}"""
+        return dict([ (_k, tuple(_v)) for (_k, _v) in six.iteritems(cls.__Timings) ])
+
+    @classmethod
+    def Report (cls):
+        """Return a textual summary of the recorded statistics, most
+        expensive component category first."""
+        timings = sorted(six.iteritems(cls.Timings()), key=lambda _i: (-_i[1][2], _i[0]))
+        rv = [ '%-32s %9s %9s %10s' % ('Component', 'Attempts', 'Resolved', 'Seconds') ]
+        total = [0, 0, 0.0]
+        for (name, (attempts, resolved, seconds)) in timings:
+            rv.append('%-32s %9d %9d %10.4f' % (name, attempts, resolved, seconds))
+            total[0] += attempts
+            total[1] += resolved
+            total[2] += seconds
+        rv.append('%-32s %9d %9d %10.4f' % ('Total', total[0], total[1], total[2]))
+        return "\n".join(rv)
+
 class _NamespaceResolution_mixin (pyxb.cscRoot):
     """Mix-in that aggregates those aspects of XMLNamespaces relevant to
     resolving component references.
@@ -196,55 +255,150 @@ class _NamespaceResolution_mixin (pyxb.cscRoot):
         """Loop until all references within the associated resolvable objects
         have been resolved.
 
-        This method iterates through all components on the unresolved list,
-        invoking the _resolve method of each.  If the component could not be
-        resolved in this pass, it iis placed back on the list for the next
-        iteration.  If an iteration completes without resolving any of the
-        unresolved components, a pyxb.NotInNamespaceError exception is raised.
+        Components are resolved from a work list.  A component that could
+        not be resolved because it depends on another unresolved component
+        is set aside until that component has been resolved; one that could
+        not be resolved for some other reason is retried after others have
+        been resolved.  If no component can be resolved, every remaining
+        component is tried once more before a pyxb.NotInNamespaceError
+        exception is raised.
+
+        The time spent resolving each component is recorded in
+        L{ResolutionStatistics}.
 
         @note: Do not invoke this until all top-level definitions for the
         namespace have been provided.  The resolution routines are entitled to
         raise a validation exception if a reference to an unrecognized
         component is encountered.
+
+        @keyword allow_unresolved: If C{True}, return C{False} instead of
+        raising an exception when components remain that cannot be resolved,
+        presumably because they depend on components in another namespace.
+        The remaining components are retained for a subsequent call.
         """
         if not self.needsResolution():
             return True
 
-        while 0 < len(self.__unresolvedComponents):
-            # Save the list of unresolved objects, reset the list to capture
-            # any new objects defined during resolution, and attempt the
-            # resolution for everything that isn't resolved.
-            unresolved = self.__unresolvedComponents
-
+        # Components ready to be attempted
+        ready = collections.deque()
+        # Components that were attempted and asked to be retried, without
+        # identifying what they are waiting for
+        deferred = []
+        # Map from an unresolved component to the components waiting for it
+        waiting = {}
+        # Map from a waiting component to the components it depends on
+        depends = {}
+        # Components in any of the above
+        pending = set()
+
+        def park (resolvable):
+            for d in depends.get(resolvable, ()):
+                if not d.isResolved():
+                    waiting.setdefault(d, []).append(resolvable)
+                    return True
+            depends.pop(resolvable, None)
+            return False
+
+        def collect (attempted=None):
+            # Move the components queued by queueForResolution into the work
+            # list.  The one just attempted, if requeued without recording a
+            # dependency, goes to the end of the line.
+            queued = self.__unresolvedComponents
+            dependencies = self.__unresolvedDependents
             self.__unresolvedComponents = []
             self.__unresolvedDependents = {}
-            for resolvable in unresolved:
+            for resolvable in queued:
+                if resolvable.isResolved():
+                    continue
+                if resolvable in dependencies:
+                    depends.setdefault(resolvable, set()).update(dependencies[resolvable])
+                if resolvable in pending:
+                    continue
+                pending.add(resolvable)
+                if park(resolvable):
+                    pass
+                elif resolvable is attempted:
+                    deferred.append(resolvable)
+                else:
+                    ready.append(resolvable)
+
+        def wake (resolved):
+            for resolvable in waiting.pop(resolved, ()):
+                if not park(resolvable):
+                    ready.append(resolvable)
+
+        collect()
+        progress = False
+        retried = False
+        while True:
+            while ready:
+                resolvable = ready.popleft()
+                pending.discard(resolvable)
+                if resolvable.isResolved():
+                    wake(resolvable)
+                    continue
+
                 # Attempt the resolution.
+                start = ResolutionStatistics._Timer()
                 resolvable._resolve()
+                ResolutionStatistics.Record(type(resolvable), ResolutionStatistics._Timer() - start, resolvable.isResolved())
 
                 # Either we resolved it, or we queued it to try again later
                 assert resolvable.isResolved() or (resolvable in self.__unresolvedComponents), 'Lost resolvable %s' % (resolvable,)
+                collect(resolvable)
+                if resolvable.isResolved():
+                    # We only clone things that have scope None.  We never
+                    # resolve things that have scope None.  Therefore, we
+                    # should never have resolved something that has
+                    # clones.
+                    assert resolvable._clones() is None
+                    progress = True
+                    retried = False
+                    wake(resolvable)
+
+            # Components may be waiting on something in another namespace
+            # that has since been resolved.
+            for blocker in [ _b for _b in six.iterkeys(waiting) if _b.isResolved() ]:
+                wake(blocker)
+            if ready:
+                continue
+            if not (deferred or waiting):
+                break
+            if progress:
+                progress = False
+                ready.extend(deferred)
+                deferred = []
+                continue
+            if not retried:
+                # Nothing resolved since the deferred components were last
+                # tried.  Give everything one more chance in case a recorded
+                # dependency was not the only obstacle.
+                retried = True
+                ready.extend(deferred)
+                deferred = []
+                for resolvables in six.itervalues(waiting):
+                    ready.extend(resolvables)
+                waiting.clear()
+                continue
 
-                # We only clone things that have scope None.  We never
-                # resolve things that have scope None.  Therefore, we
-                # should never have resolved something that has
-                # clones.
-                if (resolvable.isResolved() and (resolvable._clones() is not None)):
-                    assert False
-            if self.__unresolvedComponents == unresolved:
-                if allow_unresolved:
-                    return False
-                # This only happens if we didn't code things right, or the
-                # there is a circular dependency in some named component
-                # (i.e., the schema designer didn't do things right).
-                failed_components = []
-                from pyxb.xmlschema import structures
-                for d in self.__unresolvedComponents:
-                    if isinstance(d, structures._NamedComponent_mixin):
-                        failed_components.append('%s named %s' % (d.__class__.__name__, d.name()))
-                    else:
-                        failed_components.append('Anonymous %s' % (d.__class__.__name__,))
-                raise pyxb.NotInNamespaceError('Infinite loop in resolution:\n  %s' % ("\n  ".join(failed_components),))
+            unresolved = deferred[:]
+            for resolvables in six.itervalues(waiting):
+                unresolved.extend(resolvables)
+            self.__unresolvedComponents = unresolved
+            self.__unresolvedDependents = dict([ (_r, depends[_r]) for _r in unresolved if _r in depends ])
+            if allow_unresolved:
+                return False
+            # This only happens if we didn't code things right, or the
+            # there is a circular dependency in some named component
+            # (i.e., the schema designer didn't do things right).
+            failed_components = []
+            from pyxb.xmlschema import structures
+            for d in self.__unresolvedComponents:
+                if isinstance(d, structures._NamedComponent_mixin):
+                    failed_components.append('%s named %s' % (d.__class__.__name__, d.name()))
+                else:
+                    failed_components.append('Anonymous %s' % (d.__class__.__name__,))
+            raise pyxb.NotInNamespaceError('Infinite loop in resolution:\n  %s' % ("\n  ".join(failed_components),))
 
         # Replace the list of unresolved components with None, so that
         # attempts to subsequently add another component fail.
@@ -363,25 +517,39 @@ class NamespaceContext (object):
                 rv.append('  xmlns:%s=%s' % (pfx, six.text_type(ns)))
         return six.u('').join(rv)
 
-    __ContextStack = []
+    # The stack of active contexts is maintained separately for each
+    # thread, so documents can be parsed concurrently.
+    __ContextState = threading.local()
+
+    @classmethod
+    def __ContextStack (cls):
+        try:
+            return cls.__ContextState.stack
+        except AttributeError:
+            stack = cls.__ContextState.stack = []
+            return stack
+
     @classmethod
     def PushContext (cls, ctx):
         """Make C{ctx} the currently active namespace context.
 
-        Prior contexts are retained on a LIFO stack."""
+        Prior contexts are retained on a LIFO stack.  Each thread has
+        its own stack."""
         assert isinstance(ctx, cls)
-        cls.__ContextStack.append(ctx)
+        cls.__ContextStack().append(ctx)
         return ctx
 
     @classmethod
     def Current (cls):
         """Access the currently active namespace context.
 
-        If no context is active, C{None} is returned.  This probably
-        represents mis-use of the infrastructure (viz., failure to record the
-        context within which a QName must be resolved)."""
-        if cls.__ContextStack:
-            return cls.__ContextStack[-1]
+        If no context is active in the calling thread, C{None} is
+        returned.  This probably represents mis-use of the
+        infrastructure (viz., failure to record the context within which
+        a QName must be resolved)."""
+        stack = cls.__ContextStack()
+        if stack:
+            return stack[-1]
         return None
 
     @classmethod
@@ -390,7 +558,7 @@ class NamespaceContext (object):
         predecessor.
 
         The discarded context is returned."""
-        return cls.__ContextStack.pop()
+        return cls.__ContextStack().pop()
 
     __TargetNamespaceAttributes = { }
     @classmethod
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module converts between binary data and the lexical
+representations of the XML Schema U{base64Binary
+<http://www.w3.org/TR/xmlschema-2/#base64Binary>} and U{hexBinary
+<http://www.w3.org/TR/xmlschema-2/#hexBinary>} datatypes.
+
+Decoders accept the text of a literal in arbitrary pieces, such as the
+sequence of C{characters} events produced by a SAX parser, and validate and
+decode each piece as it is received.  The time required is linear in the
+length of the literal, and the text is never held in full.  The decoded
+data is accumulated in memory, or written to a caller-provided sink such as
+a temporary file.
+
+L{Base64Chunks} and L{HexChunks} perform the inverse conversion, generating
+a literal in pieces from data held in memory or in a file."""
+
+import base64
+import binascii
+import io
+import re
+from pyxb.utils import six
+
+# XML whitespace.  Both datatypes collapse whitespace, so any whitespace
+# between the characters of a base64Binary literal is acceptable, while a
+# hexBinary literal may have whitespace only at its start and end.
+_XMLWhitespace = ' \t\r\n'
+
+def _RemoveWhitespace (text):
+    # Much faster than the equivalent regular expression substitution
+    return text.replace(' ', '').replace('\n', '').replace('\r', '').replace('\t', '')
+
+_Base64Alphabet_re = re.compile(r'[A-Za-z0-9+/]*\Z')
+_HexAlphabet_re = re.compile(r'[0-9A-Fa-f]*\Z')
+
+# The characters permitted before one or two padding characters in a
+# base64Binary literal; see the B16 and B04 productions in section 3.2.16 of
+# the XML Schema datatypes specification.
+_B16 = frozenset('AEIMQUYcgkosw048')
+_B04 = frozenset('AQgw')
+
+class Decoder (object):
+    """Base class for incremental decoders of binary data.
+
+    Text is provided through L{feed}, and the decoded data is obtained from
+    L{close}.  An error in the text is reported by L{close} as a
+    C{ValueError} whose argument is the text found to be invalid; text
+    received after the error is ignored.  This allows L{feed} to be invoked
+    from parser event handlers that should not raise exceptions.
+
+    Pieces of text are collected until at least L{_BatchLength} characters
+    are available, so the cost of decoding does not depend on how the text
+    was divided."""
+
+    # The number of characters of text decoded together
+    _BatchLength = 65536
+
+    def __init__ (self, sink=None):
+        """Create a decoder.
+
+        @keyword sink: Where the decoded data is placed.  If C{None}, the
+        data is accumulated in memory and returned by L{close} as C{bytes}.
+        A C{bytearray} is extended with the data, which may then be accessed
+        through a C{memoryview}.  Any other object must have a C{write}
+        method, such as a file opened in binary mode or a
+        C{tempfile.SpooledTemporaryFile}."""
+        self.__sink = sink
+        if sink is None:
+            self.__buffer = io.BytesIO()
+            self._write = self.__buffer.write
+        elif isinstance(sink, bytearray):
+            self._write = sink.extend
+        else:
+            self._write = sink.write
+        self.__length = 0
+        self.__error = None
+        self.__batch = []
+        self.__batchLength = 0
+
+    def sink (self):
+        """The sink provided when the decoder was created, or C{None} if the
+        decoded data is held in memory."""
+        return self.__sink
+
+    def length (self):
+        """The number of characters of text received."""
+        return self.__length
+
+    def _setError (self, text):
+        if self.__error is None:
+            self.__error = text
+
+    def __flushBatch (self):
+        if self.__batch:
+            text = ''.join(self.__batch)
+            self.__batch = []
+            self.__batchLength = 0
+            if self.__error is None:
+                self._feed(text)
+
+    def feed (self, text):
+        """Decode the next piece of the literal."""
+        self.__length += len(text)
+        self.__batch.append(text)
+        self.__batchLength += len(text)
+        if self.__batchLength >= self._BatchLength:
+            self.__flushBatch()
+
+    def close (self):
+        """Complete decoding of the literal.
+
+        @return: The decoded data as C{bytes} if no sink was provided,
+        otherwise the sink.
+        @raise ValueError: The text is not a valid literal"""
+        self.__flushBatch()
+        if self.__error is None:
+            self._close()
+        if self.__error is not None:
+            raise ValueError(self.__error)
+        if self.__sink is None:
+            return self.__buffer.getvalue()
+        return self.__sink
+
+    def _feed (self, text):
+        raise NotImplementedError('%s._feed' % (type(self).__name__,))
+
+    def _close (self):
+        raise NotImplementedError('%s._close' % (type(self).__name__,))
+
+class Base64Decoder (Decoder):
+    """An incremental decoder for base64Binary literals.
+
+    Whitespace is ignored.  Each complete four-character group of the
+    literal is decoded as soon as it is received."""
+
+    def __init__ (self, sink=None, validate_length=None):
+        """Create a decoder.
+
+        @keyword sink: See L{Decoder.__init__}
+
+        @keyword validate_length: As with
+        L{pyxb.binding.datatypes.base64Binary.XsdValidateLength}, controls
+        whether the character preceding the padding of the literal is
+        checked.  C{None} (default) checks every literal; otherwise literals
+        with more than this number of characters are not checked.  Other
+        requirements on the literal are always checked."""
+        super(Base64Decoder, self).__init__(sink)
+        self.__validateLength = validate_length
+        # Characters of an incomplete group awaiting more text
+        self.__pending = ''
+        # The final group, once a padding character has been received
+        self.__final = None
+
+    def _feed (self, text):
+        text = _RemoveWhitespace(text)
+        if not text:
+            return
+        if self.__final is not None:
+            self.__final += text
+            if 4 < len(self.__final):
+                self._setError(self.__final)
+            return
+        text = self.__pending + text
+        padding = text.find('=')
+        body = text
+        if 0 <= padding:
+            body = text[:padding]
+        if _Base64Alphabet_re.match(body) is None:
+            self._setError(text)
+            return
+        group_end = len(body) - (len(body) % 4)
+        if 0 < group_end:
+            self._write(binascii.a2b_base64(body[:group_end].encode('ascii')))
+        if 0 <= padding:
+            self.__final = text[group_end:]
+            if 4 < len(self.__final):
+                self._setError(self.__final)
+        else:
+            self.__pending = body[group_end:]
+
+    def _close (self):
+        if self.__final is None:
+            if self.__pending:
+                self._setError(self.__pending)
+            return
+        final = self.__final
+        padding = final.find('=')
+        if (4 != len(final)) or (padding < 2) or (final[padding:] != '=' * (4 - padding)):
+            self._setError(final)
+            return
+        if (self.__validateLength is None) or (self.__validateLength >= self.length()):
+            if not (final[padding-1] in (_B04 if (2 == padding) else _B16)):
+                self._setError(final)
+                return
+        self._write(binascii.a2b_base64(final.encode('ascii')))
+
+class HexDecoder (Decoder):
+    """An incremental decoder for hexBinary literals.
+
+    Whitespace is permitted only before and after the digits of the
+    literal.  Each complete pair of digits is decoded as soon as it is
+    received."""
+
+    def __init__ (self, sink=None):
+        super(HexDecoder, self).__init__(sink)
+        self.__started = False
+        self.__ended = False
+        # A digit awaiting the second digit of its pair
+        self.__pending = ''
+
+    def _feed (self, text):
+        if not self.__started:
+            text = text.lstrip(_XMLWhitespace)
+            if not text:
+                return
+            self.__started = True
+        digits = text.rstrip(_XMLWhitespace)
+        if digits and self.__ended:
+            self._setError(text)
+            return
+        if len(digits) < len(text):
+            self.__ended = True
+        if _HexAlphabet_re.match(digits) is None:
+            self._setError(text)
+            return
+        digits = self.__pending + digits
+        pair_end = len(digits) - (len(digits) % 2)
+        if 0 < pair_end:
+            self._write(binascii.unhexlify(digits[:pair_end].encode('ascii')))
+        self.__pending = digits[pair_end:]
+
+    def _close (self):
+        if self.__pending:
+            self._setError(self.__pending)
+
+def _DataChunks (data, chunk_size):
+    if hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        view = memoryview(data)
+        for offset in six.moves.xrange(0, len(view), chunk_size):
+            yield view[offset:offset+chunk_size].tobytes()
+
+def Base64Chunks (data, chunk_size=49152):
+    """Generate the base64Binary literal for binary data in pieces.
+
+    The concatenation of the pieces is the literal produced by
+    L{pyxb.binding.datatypes.base64Binary.XsdLiteral}.
+
+    @param data: The data to encode: an object supporting the buffer
+    protocol, such as C{bytes}, or a file-like object with a C{read} method.
+
+    @keyword chunk_size: The number of bytes of data encoded in each piece.
+    For data held in memory this is rounded down to a multiple of three, so
+    that no piece but the last has padding; the C{read} method of a file
+    must return complete pieces of this size until the data is exhausted.
+
+    @return: A generator of text"""
+    chunk_size = max(3, chunk_size - (chunk_size % 3))
+    for chunk in _DataChunks(data, chunk_size):
+        yield base64.standard_b64encode(chunk).decode('ascii')
+
+def HexChunks (data, chunk_size=32768):
+    """Generate the hexBinary literal for binary data in pieces.
+
+    The concatenation of the pieces is the literal produced by
+    L{pyxb.binding.datatypes.hexBinary.XsdLiteral}.
+
+    @param data: As with L{Base64Chunks}
+
+    @keyword chunk_size: The number of bytes of data encoded in each piece
+
+    @return: A generator of text"""
+    for chunk in _DataChunks(data, chunk_size):
+        yield binascii.hexlify(chunk).decode('ascii').upper()
+
+## Local Variables:
+## fill-column:78
+## End:
@@ -60,8 +60,9 @@ def StringToDOM (xml_text, **kw):
     @see: L{pyxb._SetXMLStyle}."""
 
     xmlt = xml_text
-    if pyxb.XMLStyle_minidom == pyxb._XMLStyle:
-        parser = pyxb.utils.saxutils.make_parser()
+    if pyxb.XMLStyle_minidom == pyxb._CurrentXMLStyle():
+        # pulldom requires a standard SAX driver
+        parser = pyxb.utils.saxutils.make_parser(backend=pyxb.utils.saxutils.ParserBackend_sax)
         # minidom.parseString is broken.  In Python 2, this means don't
         # feed it unicode.  In Python 3 this means don't feed it bytes.
         if (six.PY2 and not isinstance(xmlt, six.binary_type)):
@@ -397,6 +398,10 @@ class BindingDOMSupport (object):
         if isinstance(value, pyxb.namespace.ExpandedName):
             return self.qnameAsText(value, enable_default_namespace=enable_default_namespace)
         if isinstance(value, STD_list):
+            if getattr(value, '_arrayStorage', None) is not None:
+                # Numeric lists held in arrays (see pyxb.binding.arraylist)
+                # do not depend on namespace context.
+                return value.xsdLiteral()
             return ' '.join([ self.valueAsText(_v, enable_default_namespace=enable_default_namespace) for _v in value ])
         if isinstance(value, simpleTypeDefinition):
             return value.xsdLiteral()
@@ -592,6 +597,336 @@ class BindingDOMSupport (object):
         """Add the text to the parent as a text node."""
         return parent.appendChild(self.document().createTextNode(self.valueAsText(text)))
 
+def _EscapeText (text):
+    """Escape character data the way C{xml.dom.minidom} does when writing a
+    document."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+class _StreamElement (object):
+    """An element that has been started, but not yet closed, by a
+    L{BindingStreamSupport} instance."""
+
+    __slots__ = ( 'parent', 'qname', 'attributes', 'pendingText', 'startWritten', 'hasContent', 'declarations' )
+
+    def __init__ (self, parent, qname):
+        self.parent = parent
+        self.qname = qname
+        # List of ( qname, text ) pairs for the start tag
+        self.attributes = []
+        # Iterables of the text content received before the start tag was
+        # written
+        self.pendingText = []
+        self.startWritten = False
+        self.hasContent = False
+        # Namespaces declared on this element, removed from scope on close
+        self.declarations = []
+
+class BindingStreamSupport (BindingDOMSupport):
+    """This supports writing a document directly to a stream from a binding
+    instance, without constructing a DOM tree.
+
+    It provides the subset of the L{BindingDOMSupport} interface used by
+    L{pyxb.binding.basis._TypeBinding_mixin.toDOM}, so the same conversion
+    code is used for both.  Where L{BindingDOMSupport} creates DOM nodes,
+    this class writes their text to the stream once it is known that no
+    further attributes can be added to an element.
+
+    Because the start tag of the document element has been written before
+    the content is examined, namespace declarations cannot all be placed in
+    the document element.  Instead each namespace is declared on the element
+    being written when it is first referenced, and remains in scope for the
+    content of that element.  The prefixes used are the same as those
+    L{BindingDOMSupport} would select.
+
+    Instances are normally created by
+    L{pyxb.binding.basis._TypeBinding_mixin.writeXML}.  A pre-configured
+    instance may be passed to that method through its C{bds} keyword to
+    provide a default namespace or namespace prefix map.
+    """
+
+    # Bytes of output text accumulated before a write is issued to the stream
+    _BufferLimit = 65536
+
+    def stream (self):
+        """The stream to which the document is being written, or C{None} if
+        no document is in progress."""
+        return self.__stream
+    __stream = None
+
+    def encoding (self):
+        """The encoding used for data written to the stream, or C{None} if
+        text is written."""
+        return self.__encoding
+    __encoding = None
+
+    # The document element, or None if it has not yet been created
+    __documentElement = None
+
+    # The innermost open element
+    __openElement = None
+
+    # Map from namespace to prefix for declarations in scope at __openElement
+    __declaredPrefixes = None
+
+    # List of (namespace, prefix) pairs referenced since the last element
+    # start tag was written
+    __pendingReferences = None
+
+    # Buffered output text, and its length
+    __buffer = None
+    __bufferLength = 0
+
+    def __init__ (self, stream=None, encoding=None, **kw):
+        """Create a new instance used for writing a single document.
+
+        @keyword stream: The file-like object to which the document is
+        written.  This may be provided later through L{beginDocument}.
+
+        @keyword encoding: If C{None}, text is written to the stream.
+        Otherwise text is encoded using this encoding and the resulting
+        bytes are written.
+
+        @note: Other keywords are passed to L{BindingDOMSupport}; however
+        C{implementation} is used only for converting wildcard DOM nodes to
+        text.
+        """
+        super(BindingStreamSupport, self).__init__(**kw)
+        if stream is not None:
+            self.beginDocument(stream, encoding)
+
+    def reset (self):
+        """Reset this instance to the state it was when created.
+
+        Any document in progress is discarded without being completed."""
+        super(BindingStreamSupport, self).reset()
+        self.__documentElement = None
+        self.__openElement = None
+        self.__declaredPrefixes = { }
+        self.__pendingReferences = []
+        self.__buffer = []
+        self.__bufferLength = 0
+
+    def beginDocument (self, stream, encoding=None, xml_declaration=False):
+        """Prepare to write a new document to the given stream.
+
+        @param stream: A file-like object with a C{write} method.
+
+        @keyword encoding: See L{__init__}.
+
+        @keyword xml_declaration: If C{True}, the document starts with an XML
+        declaration in the form written by C{xml.dom.Node.toxml()}.
+        """
+        self.reset()
+        self.__stream = stream
+        self.__encoding = encoding
+        if xml_declaration:
+            if encoding is None:
+                self.__write('<?xml version="1.0" ?>')
+            else:
+                self.__write('<?xml version="1.0" encoding="%s"?>' % (encoding,))
+        return self
+
+    def document (self):
+        """There is no document node when streaming; returns C{None}."""
+        return None
+
+    def __write (self, text):
+        self.__buffer.append(text)
+        self.__bufferLength += len(text)
+        if self.__bufferLength >= self._BufferLimit:
+            self.__flushBuffer()
+
+    def __flushBuffer (self):
+        if self.__buffer:
+            text = ''.join(self.__buffer)
+            if self.__encoding is not None:
+                text = text.encode(self.__encoding, 'xmlcharrefreplace')
+            self.__stream.write(text)
+        self.__buffer = []
+        self.__bufferLength = 0
+
+    def namespacePrefix (self, namespace, enable_default_namespace=True):
+        pfx = super(BindingStreamSupport, self).namespacePrefix(namespace, enable_default_namespace)
+        if pfx is not None:
+            if isinstance(namespace, six.string_types):
+                namespace = pyxb.namespace.NamespaceForURI(namespace, create_if_missing=True)
+            if self.__declaredPrefixes.get(namespace) != pfx:
+                self.__pendingReferences.append((namespace, pfx))
+        return pfx
+
+    def __declarePending (self, element):
+        """Record declarations for namespaces referenced but not in scope on
+        the given element, which must be the innermost open element.
+
+        @return: a list of (name, value) pairs for the xmlns attributes."""
+        rv = []
+        for (ns, pfx) in self.__pendingReferences:
+            if self.__declaredPrefixes.get(ns) == pfx:
+                continue
+            element.declarations.append((ns, self.__declaredPrefixes.get(ns)))
+            self.__declaredPrefixes[ns] = pfx
+            rv.append(('xmlns:' + pfx, ns.uri()))
+        self.__pendingReferences = []
+        return rv
+
+    def __writeStartTag (self, element):
+        assert not element.startWritten
+        attributes = element.attributes
+        if element is self.__documentElement:
+            ns = self.defaultNamespace()
+            if ns is not None:
+                attributes.append(('xmlns', ns.uri()))
+        attributes.extend(self.__declarePending(element))
+        text = [ '<', element.qname ]
+        for (an, av) in attributes:
+            text.extend((' ', an, '="', _EscapeText(av), '"'))
+        if element.hasContent:
+            text.append('>')
+        self.__write(''.join(text))
+        for chunks in element.pendingText:
+            for chunk in chunks:
+                self.__write(chunk)
+        element.attributes = None
+        element.pendingText = None
+        element.startWritten = True
+
+    def __closeElement (self, element):
+        assert element is self.__openElement
+        if element.startWritten:
+            self.__write('</%s>' % (element.qname,))
+        else:
+            self.__writeStartTag(element)
+            if element.hasContent:
+                self.__write('</%s>' % (element.qname,))
+            else:
+                self.__write('/>')
+        for (ns, pfx) in reversed(element.declarations):
+            if pfx is None:
+                self.__declaredPrefixes.pop(ns, None)
+            else:
+                self.__declaredPrefixes[ns] = pfx
+        self.__openElement = element.parent
+
+    def __openContent (self, parent):
+        """Close any elements nested within C{parent}, and return C{parent}
+        or its replacement if it is C{None}."""
+        if parent is None:
+            parent = self.__documentElement
+        while (self.__openElement is not None) and (self.__openElement is not parent):
+            self.__closeElement(self.__openElement)
+        if self.__openElement is None:
+            raise pyxb.UsageError('Attempt to add content to a closed element')
+        return parent
+
+    def createChildElement (self, expanded_name, parent=None):
+        if isinstance(expanded_name, six.string_types):
+            expanded_name = pyxb.namespace.ExpandedName(None, expanded_name)
+        if not isinstance(expanded_name, pyxb.namespace.ExpandedName):
+            raise pyxb.LogicError('Invalid type %s for expanded name' % (type(expanded_name),))
+        if (parent is None) and (self.__documentElement is None):
+            element = self.__documentElement = _StreamElement(None, None)
+        else:
+            parent = self.__openContent(parent)
+            if not parent.startWritten:
+                parent.hasContent = True
+                self.__writeStartTag(parent)
+            element = _StreamElement(parent, None)
+        name = expanded_name.localName()
+        if expanded_name.namespace() is not None:
+            name = self.qnameAsText(expanded_name)
+        element.qname = name
+        self.__openElement = element
+        return element
+
+    def addAttribute (self, element, expanded_name, value):
+        if element.startWritten:
+            raise pyxb.UsageError('Attempt to add attribute %s after element content was written' % (expanded_name,))
+        name = expanded_name
+        if isinstance(name, pyxb.namespace.ExpandedName):
+            name = self.qnameAsText(expanded_name, enable_default_namespace=False)
+        element.attributes.append((name, self.valueAsText(value)))
+
+    def addXMLNSDeclaration (self, element, namespace, prefix=None):
+        if not isinstance(namespace, pyxb.namespace.Namespace):
+            raise pyxb.UsageError('addXMLNSdeclaration: must be given a namespace instance')
+        if namespace.isAbsentNamespace():
+            raise pyxb.UsageError('addXMLNSdeclaration: namespace must not be an absent namespace')
+        if element.startWritten:
+            raise pyxb.UsageError('Attempt to add namespace declaration after element content was written')
+        if prefix is None:
+            prefix = self.namespacePrefix(namespace)
+        if not prefix: # None or empty string
+            an = 'xmlns'
+        else:
+            an = 'xmlns:' + prefix
+        element.attributes.append((an, namespace.uri()))
+        return prefix
+
+    def __textChunks (self, value):
+        """Return an iterable of the escaped text representing the value.
+
+        Binary values are represented by a generator, so large values are
+        encoded piece by piece as they are written."""
+        from pyxb.binding.datatypes import base64Binary, hexBinary
+        if isinstance(value, (base64Binary, hexBinary)):
+            return type(value).XsdLiteralChunks(value)
+        return ( _EscapeText(self.valueAsText(value)), )
+
+    def appendTextChild (self, text, parent):
+        parent = self.__openContent(parent)
+        chunks = self.__textChunks(text)
+        parent.hasContent = True
+        if parent.startWritten:
+            for chunk in chunks:
+                self.__write(chunk)
+        else:
+            parent.pendingText.append(chunks)
+
+    def appendChild (self, child, parent):
+        """Write the DOM node as content of the parent.
+
+        Namespaces referenced in the node that are not in scope are declared
+        in the node's element."""
+        parent = self.__openContent(parent)
+        if not parent.startWritten:
+            parent.hasContent = True
+            self.__writeStartTag(parent)
+        child = self.cloneIntoImplementation(child)
+        if xml.dom.Node.ELEMENT_NODE == child.nodeType:
+            for (ns, pfx) in self.__pendingReferences:
+                if self.__declaredPrefixes.get(ns) != pfx:
+                    child.setAttributeNS(pyxb.namespace.XMLNamespaces.uri(), 'xmlns:' + pfx, ns.uri())
+        self.__pendingReferences = []
+        child.writexml(self)
+        return child
+
+    def write (self, text):
+        """Write raw text to the document.
+
+        This exists so that DOM nodes can be serialized using their
+        C{writexml} method."""
+        self.__write(text)
+
+    def finalize (self):
+        """Write any buffered text to the stream.
+
+        Elements that remain open are not closed; see L{endDocument}."""
+        if self.__stream is not None:
+            self.__flushBuffer()
+        return self.document()
+
+    def endDocument (self):
+        """Close all open elements, write any buffered text, and disassociate
+        the stream from this instance.
+
+        @return: the stream to which the document was written"""
+        while self.__openElement is not None:
+            self.__closeElement(self.__openElement)
+        self.__flushBuffer()
+        stream = self.__stream
+        self.__stream = None
+        return stream
+
 ## Local Variables:
 ## fill-column:78
 ## End:
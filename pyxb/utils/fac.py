@@ -693,7 +693,7 @@ class Transition (object):
             configuration = layer_link.leaveAutomaton(configuration)
         elif isinstance(layer_link, Automaton):
             configuration = configuration.enterAutomaton(layer_link)
-        UpdateInstruction.Apply(self.updateInstructions, configuration._get_counterValues())
+        UpdateInstruction.Apply(self.updateInstructions, configuration._counterValuesForUpdate())
         configuration._set_state(self.destination, layer_link is None)
         if self.__nextTransition is None:
             return configuration
@@ -853,10 +853,28 @@ class Configuration (Configuration_ABC):
     """The values of the counters.
 
     This is a map from the CounterCondition instances of the
-    underlying automaton to integer values."""
+    underlying automaton to integer values.  The map may be shared
+    with configurations cloned from this one, and must not be changed
+    except through L{_counterValuesForUpdate}."""
     def _get_counterValues (self):
         return self.__counterValues
 
+    # True if the counter value map may be referenced by another
+    # configuration.
+    __counterValuesShared = False
+
+    def _counterValuesForUpdate (self):
+        """Return the counter values as a map that may be updated in
+        place.
+
+        Cloned configurations share their counter values until one of
+        them is updated, at which point that configuration receives a
+        private copy."""
+        if self.__counterValuesShared:
+            self.__counterValues = self.__counterValues.copy()
+            self.__counterValuesShared = False
+        return self.__counterValues
+
     __automaton = None
     def __get_automaton (self):
         return self.__automaton
@@ -953,6 +971,7 @@ class Configuration (Configuration_ABC):
         fac = self.__automaton
         self.__state = None
         self.__counterValues = dict(zip(fac.counterConditions, len(fac.counterConditions) * (1,)))
+        self.__counterValuesShared = False
         self.__subConfiguration = None
         self.__subAutomata = None
 
@@ -1063,7 +1082,9 @@ class Configuration (Configuration_ABC):
         This is used for parallel execution where a configuration has
         multiple candidate transitions and must follow all of them.
         It clones the entire chain of configurations through
-        multiple layers.
+        multiple layers.  The clones share their counter values with
+        the originals until either is updated, so the cost does not
+        depend on the number of counters.
 
         @param clone_map: Optional map into which the translation from
         the original configuration object to the corresponding cloned
@@ -1081,10 +1102,15 @@ class Configuration (Configuration_ABC):
 
     def _clone (self, clone_map, super_configuration):
         assert not self in clone_map
-        other = type(self)(self.__automaton)
+        # Bypass __init__, which would build counter values that are
+        # immediately replaced.
+        cls = type(self)
+        other = cls.__new__(cls)
         clone_map[self] = other
+        other.__automaton = self.__automaton
         other.__state = self.__state
-        other.__counterValues = self.__counterValues.copy()
+        other.__counterValues = self.__counterValues
+        other.__counterValuesShared = self.__counterValuesShared = True
         other.__superConfiguration = super_configuration
         if self.__subAutomata is not None:
             other.__subAutomata = self.__subAutomata[:]
@@ -1092,6 +1118,57 @@ class Configuration (Configuration_ABC):
                 other.__subConfiguration = self.__subConfiguration._clone(clone_map, other)
         return other
 
+    def equivalenceKey (self):
+        """Return a value identifying the behavior of the configuration.
+
+        Two configurations with equal keys accept the same sequences
+        of symbols from this point, so when executing in parallel only
+        one of them need be retained.  A counter without an upper
+        bound constrains transitions only until it reaches its lower
+        bound, so all values at or above that bound are considered
+        equal.
+
+        @return: A hashable value, or C{None} if the configuration is
+        part of a chain of configurations through multiple layers, in
+        which case it is not compared with others."""
+        if (self.__superConfiguration is not None) or (self.__subAutomata is not None):
+            return None
+        cv = self.__counterValues
+        values = []
+        for cc in self.__automaton.counterConditions:
+            value = cv[cc]
+            if (cc.max is None) and (value > cc.min):
+                value = cc.min
+            values.append(value)
+        return (self.__state, tuple(values))
+
+    @classmethod
+    def Distinct (cls, configurations, key=None):
+        """Remove configurations that are equivalent to a preceding one.
+
+        @param configurations: A list of items holding L{Configuration}s
+        in order of preference.
+
+        @keyword key: A function that extracts the L{Configuration}
+        from an item.  By default the items are configurations.
+
+        @return: A list containing the first item for each distinct
+        L{equivalenceKey}, in the original order.  Items whose
+        configuration has no key are always retained."""
+        seen = set()
+        rv = []
+        for item in configurations:
+            cfg = item
+            if key is not None:
+                cfg = key(item)
+            ek = cfg.equivalenceKey()
+            if ek is not None:
+                if ek in seen:
+                    continue
+                seen.add(ek)
+            rv.append(item)
+        return rv
+
     def __str__ (self):
         return '%s: %s' % (self.__state, ' ; '.join([ '%s=%u' % (_c,_v) for (_c,_v) in six.iteritems(self.__counterValues)]))
 
@@ -25,8 +25,11 @@ element in the stream.  These classes are extended for specific parsing needs
 from __future__ import print_function
 import xml.sax
 import xml.sax.handler
+import xml.sax.xmlreader
+import xml.parsers.expat
 import io
 import logging
+import pyxb
 import pyxb.namespace
 from pyxb.utils import six
 
@@ -168,6 +171,18 @@ class SAXElementState (object):
         return self.__content
     __content = None
 
+    def textDecoder (self):
+        """An object to which the character content of the element is
+        passed as it is received, or C{None} if the text is accumulated in
+        L{content}.
+
+        The object must have a C{feed} method that accepts text.  See
+        L{pyxb.utils.binarycodec.Decoder}."""
+        return self.__textDecoder
+    def setTextDecoder (self, text_decoder):
+        self.__textDecoder = text_decoder
+    __textDecoder = None
+
     def __init__ (self, **kw):
         self.__expandedName = kw.get('expanded_name')
         self.__namespaceContext = kw['namespace_context']
@@ -352,8 +367,10 @@ class BaseSAXHandler (xml.sax.handler.ContentHandler, object):
         """Process the start of an element."""
         self.__flushPendingText()
 
-        # Get the element name, which is already a tuple with the namespace assigned.
-        expanded_name = pyxb.namespace.ExpandedName(name, fallback_namespace=self.__fallbackNamespace)
+        # Get the element name, which is already a tuple with the namespace
+        # assigned.  Use the canonical instance so subsequent lookups in
+        # binding maps are resolved by identity.
+        expanded_name = pyxb.namespace.ExpandedName.Intern(name, fallback_namespace=self.__fallbackNamespace)
 
         # See if this element supports a targetNamespace attribute.  xs:schema
         # and wsdl:definitions both do.
@@ -421,13 +438,22 @@ class BaseSAXHandler (xml.sax.handler.ContentHandler, object):
         self.__pendingText = []
 
     def characters (self, content):
-        """Save the text as content"""
+        """Save the text as content, or pass it to the element's
+        L{text decoder<SAXElementState.textDecoder>}"""
+        text_decoder = self.__elementState.textDecoder()
+        if text_decoder is not None:
+            text_decoder.feed(content)
+            return
         if self.__pendingTextLocation is None:
             self.__pendingTextLocation = self.location()
         self.__pendingText.append(content)
 
     def ignorableWhitespace (self, whitespace):
         """Save whitespace as content too."""
+        text_decoder = self.__elementState.textDecoder()
+        if text_decoder is not None:
+            text_decoder.feed(whitespace)
+            return
         self.__pendingText.append(whitespace)
 
     def processingInstruction (self, target, data):
@@ -463,6 +489,299 @@ def SetCreateParserModules (create_parser_modules):
     else:
         _CreateParserModules = list(create_parser_modules)
 
+ParserBackend_sax = 0
+"""Create parsers with C{xml.sax.make_parser}, using the modules provided to
+L{SetCreateParserModules}.  Events pass through the standard SAX driver for
+the underlying parser.  This is the default."""
+
+ParserBackend_expat = 1
+"""Create parsers with L{ExpatParser}, which invokes the content handler
+directly from C{pyexpat} callbacks."""
+
+ParserBackend_lxml = 2
+"""Create parsers with L{LXMLParser}, which invokes the content handler from
+the parser target interface of C{lxml.etree}.  This requires lxml 4.4 or
+later, and does not provide location information."""
+
+_ParserBackend = ParserBackend_sax
+"""The parser backend used by L{make_parser}."""
+
+_ParserBackendMap = { 'sax' : ParserBackend_sax,
+                      'expat' : ParserBackend_expat,
+                      'lxml' : ParserBackend_lxml }
+_ParserBackendMapReverse = dict([ (_v, _k) for (_k, _v) in six.iteritems(_ParserBackendMap) ])
+
+_ParserBackend_envvar = 'PYXB_PARSER_BACKEND'
+
+def SetParserBackend (backend=None):
+    """Set the parser used by L{make_parser}.
+
+    This can be invoked within code.  The system default of
+    L{ParserBackend_sax} can also be overridden at runtime by setting the
+    environment variable C{PYXB_PARSER_BACKEND} to one of C{sax}, C{expat},
+    or C{lxml}.
+
+    @param backend: One of L{ParserBackend_sax}, L{ParserBackend_expat},
+    L{ParserBackend_lxml}.  If not provided, the system default is used.
+
+    @raise pyxb.PyXBException: the backend is not recognized, or requires a
+    package that is not available.
+    """
+    global _ParserBackend
+    if backend is None:
+        import os
+        backend_name = os.environ.get(_ParserBackend_envvar)
+        if backend_name is None:
+            backend_name = 'sax'
+        backend = _ParserBackendMap.get(backend_name)
+        if backend is None:
+            raise pyxb.PyXBException('Bad value "%s" for %s' % (backend_name, _ParserBackend_envvar))
+    if _ParserBackendMapReverse.get(backend) is None:
+        raise pyxb.PyXBException('Bad value %s for SetParserBackend' % (backend,))
+    if ParserBackend_lxml == backend:
+        try:
+            import lxml.etree
+        except ImportError:
+            raise pyxb.PyXBException('Parser backend lxml requires the lxml package')
+    _ParserBackend = backend
+
+class _AttributesNS (dict):
+    """Lightweight implementation of the C{xml.sax.xmlreader.AttributesNS}
+    interface used by the handlers in PyXB.
+
+    Keys are C{(namespaceURI, localName)} pairs."""
+
+    def getValue (self, name):
+        return self[name]
+
+    def getNames (self):
+        return list(six.iterkeys(self))
+
+    def getLength (self):
+        return len(self)
+
+class _DirectParser (xml.sax.xmlreader.IncrementalParser, xml.sax.xmlreader.Locator, object):
+    """Base for parsers that invoke the content handler directly from the
+    underlying parser's callbacks.
+
+    These implement the subset of the C{xml.sax.xmlreader.IncrementalParser}
+    interface used by PyXB, and serve as their own locator.  Because
+    namespace processing is always done, the only features accepted are
+    C{feature_namespaces} enabled and C{feature_namespace_prefixes}
+    disabled.  External entities are never resolved."""
+
+    # Map from the name as presented by the underlying parser to a
+    # (namespaceURI, localName) pair
+    __nameMap = None
+
+    # The InputSource being parsed, if known
+    __source = None
+
+    # True iff startDocument has been sent for the current document
+    __started = False
+
+    def __init__ (self, bufsize=2**16):
+        xml.sax.xmlreader.IncrementalParser.__init__(self, bufsize)
+        self.__nameMap = {}
+
+    def setFeature (self, name, state):
+        if (xml.sax.handler.feature_namespaces == name) and state:
+            return
+        if (xml.sax.handler.feature_namespace_prefixes == name) and not state:
+            return
+        raise xml.sax.SAXNotSupportedException('Feature %s cannot be set to %s in %s' % (name, state, type(self).__name__))
+
+    def getFeature (self, name):
+        if xml.sax.handler.feature_namespaces == name:
+            return True
+        if xml.sax.handler.feature_namespace_prefixes == name:
+            return False
+        raise xml.sax.SAXNotRecognizedException('Feature %s not recognized' % (name,))
+
+    def _splitName (self, name):
+        """Convert a name as provided by the underlying parser into a
+        C{(namespaceURI, localName)} pair."""
+        raise NotImplementedError('%s._splitName' % (type(self).__name__,))
+
+    def _name (self, name):
+        rv = self.__nameMap.get(name)
+        if rv is None:
+            rv = self.__nameMap[name] = self._splitName(name)
+        return rv
+
+    def _attributes (self, attrs):
+        rv = _AttributesNS()
+        for (k, v) in six.iteritems(attrs):
+            rv[self._name(k)] = v
+        return rv
+
+    def _parseError (self, message, exception):
+        self.getErrorHandler().fatalError(xml.sax.SAXParseException(message, exception, self))
+
+    def _startParser (self, content_handler):
+        """Create the underlying parser and connect it to the content handler."""
+        raise NotImplementedError('%s._startParser' % (type(self).__name__,))
+
+    def _feed (self, data, is_final):
+        """Provide data to the underlying parser."""
+        raise NotImplementedError('%s._feed' % (type(self).__name__,))
+
+    def prepareParser (self, source):
+        # Discard any state left by a parse that was aborted by an exception
+        self.reset()
+        self.__source = source
+
+    def feed (self, data):
+        if not self.__started:
+            content_handler = self.getContentHandler()
+            self._startParser(content_handler)
+            self.__started = True
+            content_handler.setDocumentLocator(self)
+            content_handler.startDocument()
+        self._feed(data, False)
+
+    def close (self):
+        if not self.__started:
+            self.feed(six.binary_type())
+        self._feed(six.binary_type(), True)
+        self.getContentHandler().endDocument()
+        self.reset()
+
+    def reset (self):
+        self.__started = False
+        self.__source = None
+
+    def getPublicId (self):
+        if self.__source is None:
+            return None
+        return self.__source.getPublicId()
+
+    def getSystemId (self):
+        if self.__source is None:
+            return None
+        return self.__source.getSystemId()
+
+class ExpatParser (_DirectParser):
+    """Parser that drives a content handler directly from C{pyexpat}
+    callbacks.
+
+    This bypasses C{xml.sax.expatreader}, eliminating the adapter layer
+    through which each event is otherwise dispatched.  Names are converted
+    to C{(namespaceURI, localName)} pairs once per document and cached."""
+
+    __parser = None
+
+    def _splitName (self, name):
+        parts = name.split(' ', 1)
+        if 1 == len(parts):
+            return (None, name)
+        return tuple(parts)
+
+    def _startParser (self, content_handler):
+        parser = xml.parsers.expat.ParserCreate(None, ' ')
+        parser.buffer_text = True
+        start_element = content_handler.startElementNS
+        end_element = content_handler.endElementNS
+        def start_element_handler (name, attrs):
+            start_element(self._name(name), None, self._attributes(attrs))
+        def end_element_handler (name):
+            end_element(self._name(name), None)
+        parser.StartElementHandler = start_element_handler
+        parser.EndElementHandler = end_element_handler
+        parser.CharacterDataHandler = content_handler.characters
+        parser.ProcessingInstructionHandler = content_handler.processingInstruction
+        parser.StartNamespaceDeclHandler = content_handler.startPrefixMapping
+        parser.EndNamespaceDeclHandler = content_handler.endPrefixMapping
+        self.__parser = parser
+
+    def _feed (self, data, is_final):
+        try:
+            self.__parser.Parse(data, is_final)
+        except xml.parsers.expat.ExpatError as e:
+            self._parseError(xml.parsers.expat.ErrorString(e.code), e)
+
+    def reset (self):
+        super(ExpatParser, self).reset()
+        self.__parser = None
+
+    def getLineNumber (self):
+        if self.__parser is None:
+            return 1
+        return self.__parser.CurrentLineNumber
+
+    def getColumnNumber (self):
+        if self.__parser is None:
+            return 0
+        return self.__parser.CurrentColumnNumber
+
+class _LXMLTarget (object):
+    """Parser target for C{lxml.etree.XMLParser} that forwards events to a
+    SAX content handler."""
+
+    def __init__ (self, parser, content_handler):
+        self.__parser = parser
+        self.__contentHandler = content_handler
+        self.data = content_handler.characters
+        self.pi = content_handler.processingInstruction
+
+    def start (self, tag, attrib):
+        parser = self.__parser
+        self.__contentHandler.startElementNS(parser._name(tag), None, parser._attributes(attrib))
+
+    def end (self, tag):
+        self.__contentHandler.endElementNS(self.__parser._name(tag), None)
+
+    def start_ns (self, prefix, uri):
+        self.__contentHandler.startPrefixMapping(prefix or None, uri)
+
+    def end_ns (self, prefix):
+        self.__contentHandler.endPrefixMapping(prefix or None)
+
+    def close (self):
+        pass
+
+class LXMLParser (_DirectParser):
+    """Parser that drives a content handler from the parser target interface
+    of C{lxml.etree}.
+
+    lxml does not expose the position of target events, so bindings created
+    through this parser have no location information."""
+
+    __parser = None
+
+    def _splitName (self, name):
+        if name.startswith('{'):
+            (ns, ln) = name[1:].split('}', 1)
+            return (ns, ln)
+        return (None, name)
+
+    def _startParser (self, content_handler):
+        import lxml.etree
+        self.__parser = lxml.etree.XMLParser(target=_LXMLTarget(self, content_handler), resolve_entities=False, no_network=True)
+
+    def _feed (self, data, is_final):
+        import lxml.etree
+        try:
+            if is_final:
+                self.__parser.close()
+            elif data:
+                self.__parser.feed(data)
+        except lxml.etree.XMLSyntaxError as e:
+            self._parseError(six.text_type(e), e)
+
+    def reset (self):
+        super(LXMLParser, self).reset()
+        self.__parser = None
+
+    def getLineNumber (self):
+        return None
+
+    def getColumnNumber (self):
+        return None
+
+_ParserBackendClass = { ParserBackend_expat : ExpatParser,
+                        ParserBackend_lxml : LXMLParser }
+
 def make_parser (**kw):
     """Extend C{xml.sax.make_parser} to configure the parser the way we
     need it:
@@ -490,12 +809,21 @@ def make_parser (**kw):
     L{pyxb.namespace.ExpandedName}.  This keyword is not used by this
     function, but is passed to the C{content_handler_constructor}.
     @type fallback_namespace: L{pyxb.namespace.Namespace}
+
+    @keyword backend: The kind of parser to create.  If absent or C{None},
+    the value established by L{SetParserBackend} is used.
     """
     content_handler_constructor = kw.pop('content_handler_constructor', BaseSAXHandler)
     content_handler = kw.pop('content_handler', None)
+    backend = kw.pop('backend', None)
     if content_handler is None:
         content_handler = content_handler_constructor(**kw)
-    parser = xml.sax.make_parser(_CreateParserModules)
+    if backend is None:
+        backend = _ParserBackend
+    if ParserBackend_sax == backend:
+        parser = xml.sax.make_parser(_CreateParserModules)
+    else:
+        parser = _ParserBackendClass[backend]()
     parser.setFeature(xml.sax.handler.feature_namespaces, True)
     parser.setFeature(xml.sax.handler.feature_namespace_prefixes, False)
     parser.setContentHandler(content_handler)
@@ -506,65 +834,60 @@ def make_parser (**kw):
         pass
     return parser
 
+SetParserBackend()
+
 if '__main__' == __name__:
     import xml.dom.pulldom
     import xml.dom.minidom
     import pyxb.utils.saxdom as saxdom
     import time
-    import lxml.sax
-    import lxml.etree
     import sys
 
-    Handler = BaseSAXHandler
+    try:
+        import lxml.sax
+        import lxml.etree
+    except ImportError:
+        lxml = None
+
     xml_file = 'examples/tmsxtvd/tmsdatadirect_sample.xml'
     if 1 < len(sys.argv):
         xml_file = sys.argv[1]
     xmld = open(xml_file, 'rb').read()
 
+    def timeParse (parser):
+        t1 = time.time()
+        parser.parse(io.BytesIO(xmld))
+        return time.time() - t1
+
     dt1 = time.time()
-    dt2 = time.time()
     dom = xml.dom.minidom.parse(io.BytesIO(xmld))
-    dt3 = time.time()
-
-    snt1 = time.time()
-    saxer = make_parser(content_handler=_NoopSAXHandler())
-    snt2 = time.time()
-    saxer.parse(io.BytesIO(xmld))
-    snt3 = time.time()
-
-    sbt1 = time.time()
-    saxer = make_parser(content_handler=BaseSAXHandler())
-    sbt2 = time.time()
-    saxer.parse(io.BytesIO(xmld))
-    sbt3 = time.time()
-
-    pdt1 = time.time()
-    sdomer = make_parser(content_handler_constructor=saxdom._DOMSAXHandler)
-    h = sdomer.getContentHandler()
-    pdt2 = time.time()
-    sdomer.parse(io.BytesIO(xmld))
-    pdt3 = time.time()
-
-    lst1 = time.time()
-    tree = lxml.etree.fromstring(xmld)
-    lst2 = time.time()
-    lsh = Handler()
-    lxml.sax.saxify(tree, lsh)
-    lst3 = time.time()
-
-    ldt1 = time.time()
-    tree = lxml.etree.fromstring(xmld)
-    ldt2 = time.time()
-    ldh = xml.dom.pulldom.SAX2DOM()
-    lxml.sax.saxify(tree, ldh)
-    ldt3 = time.time()
-
-    print('minidom read %f, parse %f, total %f' % (dt2-dt1, dt3-dt2, dt3-dt1))
-    print('SAX+noop create %f, parse %f, total %f' % (snt2-snt1, snt3-snt2, snt3-snt1))
-    print('SAX+ns create %f, parse %f, total %f' % (sbt2-sbt1, sbt3-sbt2, sbt3-sbt1))
-    print('PyXB SAXDOM-based create %f, parse %f, total %f' % (pdt2-pdt1, pdt3-pdt2, pdt3-pdt1))
-    print('LXML+SAX tree %f, parse %f, total %f' % (lst2-lst1, lst3-lst2, lst3-lst1))
-    print('LXML+pulldom DOM tree %f, parse %f, total %f' % (ldt2-ldt1, ldt3-ldt2, ldt3-ldt1))
+    dt2 = time.time()
+    print('minidom parse %f' % (dt2-dt1,))
+
+    backends = [ ParserBackend_sax, ParserBackend_expat ]
+    if lxml is not None:
+        backends.append(ParserBackend_lxml)
+    for backend in backends:
+        name = _ParserBackendMapReverse[backend]
+        print('%s+noop parse %f' % (name, timeParse(make_parser(content_handler=_NoopSAXHandler(), backend=backend))))
+        print('%s+ns parse %f' % (name, timeParse(make_parser(content_handler=BaseSAXHandler(), backend=backend))))
+        print('%s PyXB SAXDOM-based parse %f' % (name, timeParse(make_parser(content_handler_constructor=saxdom._DOMSAXHandler, backend=backend))))
+
+    if lxml is not None:
+        lst1 = time.time()
+        tree = lxml.etree.fromstring(xmld)
+        lst2 = time.time()
+        lxml.sax.saxify(tree, BaseSAXHandler())
+        lst3 = time.time()
+
+        ldt1 = time.time()
+        tree = lxml.etree.fromstring(xmld)
+        ldt2 = time.time()
+        lxml.sax.saxify(tree, xml.dom.pulldom.SAX2DOM())
+        ldt3 = time.time()
+
+        print('LXML+SAX tree %f, parse %f, total %f' % (lst2-lst1, lst3-lst2, lst3-lst1))
+        print('LXML+pulldom DOM tree %f, parse %f, total %f' % (ldt2-ldt1, ldt3-ldt2, ldt3-ldt1))
 
 ## Local Variables:
 ## fill-column:78
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright 2009-2013, Peter A. Bigot
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain a
+# copy of the License at:
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""This module provides a local cache for documents retrieved by URI.
+
+Schema for standards bundles are generally published on remote servers, and
+a single entrypoint schema may include or import dozens of other documents.
+A L{URICache} holds the content of remote documents on disk, so that they
+are retrieved from the network only once, and can be used without network
+access in L{offline<URICache.offline>} mode.  Install a cache with
+L{pyxb.utils.utility.SetURICache} to have it used by
+L{pyxb.utils.utility.DataFromURI}, and so by schema processing.
+
+L{URICache.prefetchSchemas} retrieves a set of schema documents along with
+every document they include or import, using multiple threads, so that
+subsequent processing of the schema finds them in the cache."""
+
+import logging
+import errno
+import os
+import threading
+import xml.parsers.expat
+import pyxb
+import pyxb.utils.utility
+from pyxb.utils.six.moves.urllib import parse as urlparse
+
+_log = logging.getLogger(__name__)
+
+# The namespace of the schema elements that reference other schema documents
+_XMLSchemaURI = 'http://www.w3.org/2001/XMLSchema'
+
+class URICache (object):
+    """A content-addressed store of documents retrieved from remote URIs.
+
+    The content of each document is stored in a file named by its
+    L{signature<pyxb.utils.utility.HashForText>}, so documents that are
+    available at several locations are stored once.  A separate file for
+    each URI records the signature of its content.  Files are replaced
+    atomically, so a cache directory may be shared by concurrent processes.
+
+    Only URIs with a scheme in L{CacheableSchemes} are cached; local files
+    are always read directly."""
+
+    CacheableSchemes = frozenset(['http', 'https', 'ftp'])
+    """The URI schemes of documents that are held in the cache."""
+
+    def __init__ (self, directory, offline=False):
+        """Create a cache stored in the given directory.
+
+        @param directory: The directory holding the cache.  It is created
+        if necessary.
+
+        @keyword offline: If C{True}, documents that are not in the cache are
+        not retrieved from their source; see L{offline}."""
+        self.__directory = directory
+        self.__offline = offline
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def directory (self):
+        """The directory holding the cache."""
+        return self.__directory
+
+    def offline (self):
+        """Indicates whether documents absent from the cache are an error.
+
+        In offline mode no network access is attempted, and retrieving a
+        document that is not in the cache raises C{IOError}."""
+        return self.__offline
+    def setOffline (self, offline):
+        self.__offline = offline
+        return self
+
+    def hits (self):
+        """The number of documents retrieved from the cache."""
+        return self.__hits
+
+    def misses (self):
+        """The number of documents retrieved from their source."""
+        return self.__misses
+
+    def isCacheable (self, uri):
+        """Return C{True} iff documents at the given URI are held in the cache."""
+        return urlparse.urlparse(uri)[0].lower() in self.CacheableSchemes
+
+    def __path (self, *elts):
+        return os.path.join(self.__directory, *elts)
+
+    def __uriPath (self, uri):
+        return self.__path('uri', pyxb.utils.utility.HashForText(uri))
+
+    def __contentPath (self, signature):
+        return self.__path('content', signature)
+
+    def __replaceFile (self, path, data):
+        temp_path = '%s.%d.%d' % (path, os.getpid(), id(threading.current_thread()))
+        with pyxb.utils.utility.OpenOrCreate(temp_path) as f:
+            f.write(data)
+        if os.path.exists(path) and (os.name == 'nt'):
+            os.remove(path)
+        os.rename(temp_path, path)
+
+    def lookup (self, uri):
+        """Return the cached content of the given URI, or C{None} if it is not
+        in the cache."""
+        try:
+            with open(self.__uriPath(uri), 'rb') as f:
+                signature = f.readline().decode('ascii').strip()
+            with open(self.__contentPath(signature), 'rb') as f:
+                xmld = f.read()
+        except (IOError, OSError):
+            return None
+        if pyxb.utils.utility.HashForText(xmld) != signature:
+            _log.warning('Discarding corrupt cache entry for %s', uri)
+            return None
+        return xmld
+
+    def store (self, uri, xmld):
+        """Record the content of the given URI in the cache.
+
+        @return: The signature of the content"""
+        signature = pyxb.utils.utility.HashForText(xmld)
+        content_path = self.__contentPath(signature)
+        if not os.path.exists(content_path):
+            self.__replaceFile(content_path, xmld)
+        self.__replaceFile(self.__uriPath(uri), ('%s\n%s\n' % (signature, uri)).encode('utf-8'))
+        return signature
+
+    def retrieve (self, uri, archive_directory=None):
+        """Return the content of the given URI, from the cache if it is
+        present there and otherwise from its source.
+
+        Content retrieved from the source is added to the cache.
+
+        @keyword archive_directory: Passed to
+        L{pyxb.utils.utility.DataFromURI} when the document is retrieved
+        from its source.
+
+        @raise IOError: The cache is offline and does not hold the document"""
+        xmld = self.lookup(uri)
+        if xmld is not None:
+            with self.__lock:
+                self.__hits += 1
+            return xmld
+        if self.__offline:
+            raise IOError(errno.ENOENT, 'Document not in cache and cache is offline', uri)
+        xmld = pyxb.utils.utility.DataFromURI(uri, archive_directory=archive_directory, use_cache=False)
+        with self.__lock:
+            self.__misses += 1
+        self.store(uri, xmld)
+        return xmld
+
+    @classmethod
+    def _SchemaReferences (cls, xmld):
+        """Return the references to other documents in the given schema
+        document.
+
+        @return: A list of C{(namespace, schema_location)} pairs, where
+        C{namespace} is the namespace named by an C{import}, or C{None} for
+        other references."""
+        references = []
+        def start_element (name, attrs):
+            (ns, _, local_name) = name.rpartition(' ')
+            if (_XMLSchemaURI != ns) or not (local_name in ('include', 'import', 'redefine')):
+                return
+            location = attrs.get('schemaLocation')
+            if location is not None:
+                references.append((attrs.get('namespace') if ('import' == local_name) else None, location))
+        parser = xml.parsers.expat.ParserCreate(namespace_separator=' ')
+        parser.StartElementHandler = start_element
+        parser.Parse(xmld, True)
+        return references
+
+    def __scanSchema (self, location):
+        try:
+            if self.isCacheable(location):
+                xmld = self.retrieve(location)
+            else:
+                xmld = pyxb.utils.utility.DataFromURI(location, use_cache=False)
+            return (None, [ (_ns, pyxb.utils.utility.NormalizeLocation(_sl, location)) for (_ns, _sl) in self._SchemaReferences(xmld) ])
+        except Exception as e:
+            return (e, [])
+
+    def prefetchSchemas (self, locations, workers=8, import_filter=None):
+        """Retrieve schema documents and the documents they reference.
+
+        The documents at the given locations are retrieved, along with the
+        documents named by the C{schemaLocation} of each C{include},
+        C{import}, and C{redefine} in them, recursively.  Documents are
+        retrieved concurrently using a pool of threads.  Remote documents are
+        added to the cache; local files are read only to find their
+        references.
+
+        Failures are logged and otherwise ignored: they will be reported
+        when the schema is processed.
+
+        @param locations: The absolute locations of schema documents
+
+        @keyword workers: The number of threads used to retrieve documents
+
+        @keyword import_filter: If not C{None}, a function invoked with the
+        namespace URI of each C{import}; the imported document is retrieved
+        only if it returns C{True}.
+
+        @return: The set of locations that were retrieved successfully"""
+        from multiprocessing.pool import ThreadPool
+        seen = set()
+        retrieved = set()
+        frontier = [ ]
+        for location in locations:
+            if not (location in seen):
+                seen.add(location)
+                frontier.append(location)
+        # The frontier usually starts with a single entrypoint, so the pool
+        # is sized for the documents it references rather than for the
+        # initial locations.
+        pool = ThreadPool(max(1, workers))
+        try:
+            while frontier:
+                next_frontier = []
+                for (location, (exc, references)) in zip(frontier, pool.map(self.__scanSchema, frontier)):
+                    if exc is not None:
+                        _log.warning('Unable to prefetch %s: %s', location, exc)
+                        continue
+                    retrieved.add(location)
+                    for (namespace, reference) in references:
+                        if reference in seen:
+                            continue
+                        if (namespace is not None) and (import_filter is not None) and not import_filter(namespace):
+                            continue
+                        seen.add(reference)
+                        next_frontier.append(reference)
+                frontier = next_frontier
+        finally:
+            pool.close()
+            pool.join()
+        return retrieved
@@ -729,11 +729,35 @@ def NormalizeLocation (uri, parent_uri=None, prefix_map=None):
     return abs_uri
 
 
-def DataFromURI (uri, archive_directory=None):
+__URICache = None
+
+def SetURICache (cache):
+    """Set the cache through which L{DataFromURI} retrieves remote documents.
+
+    @param cache: A L{pyxb.utils.uricache.URICache}, or C{None} to retrieve
+    every document from its source.
+    @return: The cache that was previously in use"""
+    global __URICache
+    rv = __URICache
+    __URICache = cache
+    return rv
+
+def GetURICache ():
+    """Return the cache set by L{SetURICache}, or C{None}."""
+    return __URICache
+
+def DataFromURI (uri, archive_directory=None, use_cache=True):
     """Retrieve the contents of the uri as raw data.
 
     If the uri does not include a scheme (e.g., C{http:}), it is
-    assumed to be a file path on the local system."""
+    assumed to be a file path on the local system.
+
+    If a L{URI cache<SetURICache>} is in use and C{use_cache} is true,
+    remote documents are retrieved through it."""
+
+    cache = __URICache
+    if use_cache and (cache is not None) and cache.isCacheable(uri):
+        return cache.retrieve(uri, archive_directory)
 
     from pyxb.utils.six.moves.urllib.request import urlopen
     stream = None
@@ -1024,6 +1048,26 @@ class UTCOffsetTimeZone (datetime.tzinfo):
         else:
             self.__tzName = '+%02d:%02d' % divmod(self.__utcOffset_min, 60)
 
+    # Instances returned by Intern, keyed by specification
+    __Interned = { }
+
+    @classmethod
+    def Intern (cls, spec=None):
+        """Return a shared time zone instance with the given offset.
+
+        Instances are immutable, so one may be shared by all values that
+        have the same offset.  This avoids creating an instance for every
+        timezoned value converted from its lexical representation.
+
+        @param spec: As for the constructor.  It must be hashable."""
+        try:
+            return cls.__Interned[spec]
+        except KeyError:
+            pass
+        tz = cls(spec)
+        cls.__Interned[spec] = tz
+        return tz
+
     def utcoffset (self, dt):
         """Returns the constant offset for this zone."""
         return self.__utcOffset_td
@@ -1304,7 +1348,9 @@ class Locatable_mixin (pyxb.cscRoot):
     __location = None
 
     def __init__ (self, *args, **kw):
-        self.__location = kw.pop('location', None)
+        location = kw.pop('location', None)
+        if location is not None:
+            self.__location = location
         super(Locatable_mixin, self).__init__(*args, **kw)
 
     def _setLocation (self, location):
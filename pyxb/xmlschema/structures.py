@@ -3482,6 +3482,17 @@ class IdentityConstraintDefinition (_SchemaComponent_mixin, _NamedComponent_mixi
         return self.__fields
 
     __referencedKey = None
+    def referencedKey (self):
+        """For a keyref constraint, the L{IdentityConstraintDefinition} to
+        which it refers; otherwise C{None}."""
+        return self.__referencedKey
+
+    __xpathNamespaces = None
+    def xpathNamespaces (self):
+        """A map from the prefixes in scope for the L{selector} and
+        L{fields} expressions to namespace URIs."""
+        return self.__xpathNamespaces
+
     __referAttribute = None
     __icc = None
 
@@ -3529,6 +3540,10 @@ class IdentityConstraintDefinition (_SchemaComponent_mixin, _NamedComponent_mixi
                 raise pyxb.SchemaValidationError('field element missing xpath attribute')
             rv.__fields.append(xp_attr)
 
+        # The namespace context is discarded once the schema is resolved,
+        # so retain what is needed to interpret the expressions.
+        rv.__xpathNamespaces = dict([ (_p, _ns.uri()) for (_p, _ns) in six.iteritems(rv._namespaceContext().inScopeNamespaces()) if _p is not None ])
+
         rv._annotationFromDOM(node)
         rv.__annotations = []
         if rv.annotation() is not None:
@@ -0,0 +1,71 @@
+PYXB_ARCHIVE_PATH=.
+export PYXB_ARCHIVE_PATH
+
+test_name=${0}
+
+fail () {
+  echo 1>&2 "${test_name} FAILED: ${@}"
+  exit 1
+}
+
+clean () {
+  rm -f *.wxs *.pyc base.py app.py .pyxbgen-*.manifest
+}
+
+gen_base () {
+  pyxbgen \
+    --schema-location=base.xsd --module=base \
+    --archive-to-file=base.wxs "${@}"
+}
+
+gen_app () {
+  pyxbgen --jobs=2 \
+    --schema-location=app.xsd --module=app "${@}"
+}
+
+clean
+
+gen_base --incremental > gen.out || fail cannot generate base schema
+grep -q 'up to date' gen.out && fail base reported up to date before generation
+gen_app --incremental > gen.out || fail cannot generate application schema
+grep -q 'up to date' gen.out && fail app reported up to date before generation
+python tst-app.py || fail generated bindings test
+
+# Nothing changed
+gen_base --incremental > gen.out || fail cannot check base schema
+grep -q 'up to date' gen.out || fail base not up to date
+gen_app --incremental > gen.out || fail cannot check application schema
+grep -q 'up to date' gen.out || fail app not up to date
+
+# A different configuration has its own manifest
+gen_app --incremental --module-prefix=other > gen.out || fail cannot generate other application schema
+grep -q 'up to date' gen.out && fail other configuration reported up to date
+rm -rf other
+
+# Regenerating the base archive invalidates the application bindings
+rm -f base.wxs base.py
+gen_base > gen.out || fail cannot regenerate base schema
+gen_app --incremental > gen.out || fail cannot regenerate application schema
+grep -q 'up to date' gen.out && fail app reported up to date with changed archive
+python tst-app.py || fail regenerated bindings test
+
+# A changed schema invalidates the bindings
+sed -e 's@name="elt"@name="elt2"@' app.xsd > app2.xsd
+cp app.xsd app.xsd.orig
+cp app2.xsd app.xsd
+gen_app --incremental > gen.out || fail cannot generate changed application schema
+mv app.xsd.orig app.xsd
+grep -q 'up to date' gen.out && fail app reported up to date with changed schema
+gen_app --incremental > gen.out || fail cannot regenerate application schema
+grep -q 'up to date' gen.out && fail app reported up to date with restored schema
+python tst-app.py || fail restored bindings test
+
+# A changed output invalidates the bindings
+echo '# edited' >> app.py
+gen_app --incremental > gen.out || fail cannot regenerate edited application
+grep -q 'up to date' gen.out && fail app reported up to date with edited output
+python tst-app.py || fail rewritten bindings test
+
+rm -f gen.out app2.xsd
+clean
+echo "incremental TESTS PASSED"
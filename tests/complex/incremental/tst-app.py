@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import unittest
+import app
+import base
+
+class Test (unittest.TestCase):
+    def testApp (self):
+        xmlt = '<elt xmlns="urn:app"><xbase><elt xmlns="urn:base">text</elt></xbase></elt>'
+        instance = app.CreateFromDocument(xmlt)
+        self.assertTrue(isinstance(instance.xbase, base.base_))
+        self.assertEqual('text', instance.xbase.elt)
+
+if '__main__' == __name__:
+    unittest.main()
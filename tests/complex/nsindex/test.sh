@@ -0,0 +1,35 @@
+PYXB_ARCHIVE_PATH=.
+export PYXB_ARCHIVE_PATH
+
+test_name=${0}
+
+fail () {
+  echo 1>&2 "${test_name} FAILED: ${@}"
+  exit 1
+}
+
+rm -f *.wxs *.wxi *.pyc base.py app.py
+
+pyxbgen \
+  --schema-location=base.xsd --module=base \
+  --archive-to-file=base.wxs || fail cannot generate base schema
+
+PYXB_ARCHIVE_INDEX=index.wxi pyxbgen \
+  --schema-location=app.xsd --module=app \
+  || fail cannot generate application schema
+test -f index.wxi || fail index not created
+
+python tst-index.py || fail indexed archive test
+
+# A changed archive is read from the file and its index entry replaced
+rm -f base.py base.wxs
+pyxbgen \
+  --schema-location=base.xsd --module=base \
+  --archive-to-file=base.wxs || fail cannot regenerate base schema
+PYXB_ARCHIVE_INDEX=index.wxi pyxbgen \
+  --schema-location=app.xsd --module=app \
+  || fail cannot regenerate application schema with stale index
+python tst-index.py || fail refreshed index test
+
+rm -f *.wxs *.wxi *.pyc base.py app.py
+echo "nsindex TESTS PASSED"
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import unittest
+import os
+import pyxb.namespace
+import pyxb.namespace.archive
+from pyxb.namespace.archive import NamespaceArchive
+
+class Test (unittest.TestCase):
+    def testIndexed (self):
+        NamespaceArchive.PreLoadArchives(archive_path='.', index_path='index.wxi')
+        base = pyxb.namespace.NamespaceForURI('urn:base')
+        archives = NamespaceArchive.ArchivesForComponent(base, 'typeDefinition', 'base')
+        self.assertEqual(1, len(archives))
+        archive = archives[0]
+        self.assertEqual('base.wxs', os.path.basename(archive.archivePath()))
+        self.assertEqual([], NamespaceArchive.ArchivesForComponent('urn:base', 'typeDefinition', 'missing'))
+        self.assertEqual([], NamespaceArchive.ArchivesForComponent('urn:app', 'typeDefinition', 'base'))
+        # Module records came from the index; the archive has not been opened
+        self.assertEqual(NamespaceArchive._STAGE_readModules, archive._stage())
+        self.assertTrue(archive._NamespaceArchive__unpickler is None)
+        base.validateComponentModel()
+        self.assertEqual(NamespaceArchive._STAGE_COMPLETE, archive._stage())
+        td = base.typeDefinitions()['base']
+        self.assertTrue(td._objectOrigin().moduleRecord() in base.moduleRecords())
+
+if '__main__' == __name__:
+    unittest.main()
@@ -70,6 +70,25 @@ class Test_dateTime (unittest.TestCase):
         dt = xsd.dateTime(2000, 3, 4, 23, tzinfo=UTCOffsetTimeZone(180))
         self.assertEqual('2000-03-04T20:00:00Z', dt.xsdLiteral())
 
+    def testFractionRounding (self):
+        self.assertEqual(123456, xsd.dateTime('2002-10-27T12:14:32.1234564').microsecond)
+        self.assertEqual(123456, xsd.dateTime('2002-10-27T12:14:32.1234565').microsecond)
+        self.assertEqual(123458, xsd.dateTime('2002-10-27T12:14:32.1234575').microsecond)
+        self.assertEqual(900000, xsd.dateTime('2002-10-27T12:14:32.9').microsecond)
+        self.assertEqual(999999, xsd.dateTime('2002-10-27T12:14:32.9999994').microsecond)
+        self.assertEqual(999999, xsd.dateTime('2002-10-27T12:14:32.9999995').microsecond)
+        self.assertEqual(999999, xsd.dateTime('2002-10-27T12:14:32.9999996').microsecond)
+        self.assertEqual(32, xsd.dateTime('2002-10-27T12:14:32.9999996').second)
+        self.assertEqual(999999, xsd.time('23:59:59.99999999').microsecond)
+
+    def testSharedTimeZone (self):
+        dt1 = xsd.dateTime('2002-10-27T12:14:32Z')
+        dt2 = xsd.dateTime('2003-01-01T00:00:00+05:00')
+        self.assertTrue(dt1.tzinfo is dt2.tzinfo)
+        t1 = xsd.time('12:14:32-05:00')
+        t2 = xsd.time('06:00:00-05:00')
+        self.assertTrue(t1.tzinfo is t2.tzinfo)
+
     # Manual test to see whether LocalTime works; run this on a
     # machine that uses DST.
     def XtestBogus (self):
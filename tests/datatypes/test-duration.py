@@ -107,6 +107,15 @@ class Test_duration (unittest.TestCase):
         self.assertEqual(0, v.total_seconds())
         self.assertEqual(xmlt, v.xsdLiteral())
 
+    def testFractionalSeconds (self):
+        v = xsd.duration('PT0.57S')
+        self.assertEqual(570000, v.microseconds)
+        v = xsd.duration('PT1.0000019S')
+        self.assertEqual(1, v.seconds)
+        self.assertEqual(1, v.microseconds)
+        self.assertRaises(pyxb.SimpleTypeValueError, xsd.duration, 'PT')
+        self.assertRaises(pyxb.SimpleTypeValueError, xsd.duration, 'P1DT')
+
     def testAddition (self):
         date = xsd.dateTime(2002, 10, 27, 12, 14, 32)
         duration = xsd.duration('P3DT5H3M')
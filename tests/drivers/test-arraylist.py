@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb
+import pyxb.binding.generate
+import pyxb.binding.arraylist as arraylist
+import pyxb.binding.datatypes as xs
+import copy
+import pickle
+
+try:
+    import numpy
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:arraylist" targetNamespace="urn:arraylist">
+  <xs:simpleType name="doubleList">
+    <xs:list itemType="xs:double"/>
+  </xs:simpleType>
+  <xs:simpleType name="tSmall">
+    <xs:restriction base="xs:int">
+      <xs:minInclusive value="-5"/>
+      <xs:maxExclusive value="100"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="smallList">
+    <xs:list itemType="tns:tSmall"/>
+  </xs:simpleType>
+  <xs:simpleType name="ulongList">
+    <xs:list itemType="xs:unsignedLong"/>
+  </xs:simpleType>
+  <xs:simpleType name="integerList">
+    <xs:list itemType="xs:integer"/>
+  </xs:simpleType>
+  <xs:simpleType name="stringList">
+    <xs:list itemType="xs:string"/>
+  </xs:simpleType>
+  <xs:complexType name="tPosList">
+    <xs:simpleContent>
+      <xs:extension base="tns:doubleList">
+        <xs:attribute name="count" type="xs:int"/>
+      </xs:extension>
+    </xs:simpleContent>
+  </xs:complexType>
+  <xs:element name="posList" type="tns:tPosList"/>
+  <xs:element name="small" type="tns:smallList"/>
+  <xs:element name="big" type="tns:integerList"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestArrayList (unittest.TestCase):
+
+    ListBindings = (doubleList, smallList, ulongList, integerList)
+
+    def setUp (self):
+        if have_numpy:
+            for binding in self.ListBindings:
+                arraylist.EnableArrayStorage(binding)
+
+    def tearDown (self):
+        if have_numpy:
+            for binding in self.ListBindings:
+                arraylist.DisableArrayStorage(binding)
+
+    def testSupport (self):
+        self.assertTrue(arraylist.SupportsArrayStorage(doubleList))
+        self.assertTrue(arraylist.SupportsArrayStorage(smallList))
+        self.assertFalse(arraylist.SupportsArrayStorage(stringList))
+        self.assertFalse(arraylist.SupportsArrayStorage(xs.double))
+        if not have_numpy:
+            self.assertRaises(pyxb.PyXBException, arraylist.EnableArrayStorage, doubleList)
+
+    if have_numpy:
+        def testEnable (self):
+            self.assertTrue(issubclass(doubleList._SupersedingClass(), arraylist.ArrayStorage_mixin))
+            self.assertRaises(pyxb.UsageError, arraylist.EnableArrayStorage, stringList)
+            arraylist.DisableArrayStorage(doubleList)
+            self.assertTrue(doubleList._SupersedingClass() is doubleList)
+            v = doubleList.Factory('1 2')
+            self.assertTrue(type(v) is doubleList)
+            arraylist.EnableArrayStorage(doubleList)
+            v = doubleList.Factory('1 2')
+            self.assertTrue(isinstance(v, doubleList))
+            self.assertTrue(v._arrayStorage() is not None)
+
+        def testParse (self):
+            instance = CreateFromDocument('<ns:posList xmlns:ns="urn:arraylist" count="5">1.5 2 -3e2 INF NaN</ns:posList>')
+            v = instance.value()
+            self.assertTrue(isinstance(v, doubleList))
+            array = v.asArray()
+            self.assertEqual(numpy.float64, array.dtype)
+            self.assertFalse(array.flags.writeable)
+            self.assertEqual(5, len(v))
+            self.assertEqual(xs.double, type(v[0]))
+            self.assertEqual(1.5, v[0])
+            self.assertEqual([2.0, -300.0], list(v[1:3]))
+            self.assertEqual(1, v.count(2.0))
+            self.assertTrue(-300.0 in v)
+            dom = instance.toDOM().documentElement
+            self.assertEqual('1.5 2.0 -300.0 INF NaN', dom.firstChild.data)
+            instance.validateBinding()
+
+        def testFacets (self):
+            v = CreateFromDocument('<ns:small xmlns:ns="urn:arraylist">1 2 99 -5</ns:small>')
+            self.assertTrue(v._arrayStorage() is not None)
+            self.assertEqual('1 2 99 -5', v.xsdLiteral())
+            for text in ('1 2 100', '1 -6'):
+                self.assertRaises(SimpleListValueError, CreateFromDocument, '<ns:small xmlns:ns="urn:arraylist">%s</ns:small>' % (text,))
+            for text in ('1 x', '1 2.5'):
+                self.assertRaises(pyxb.SimpleTypeValueError, CreateFromDocument, '<ns:small xmlns:ns="urn:arraylist">%s</ns:small>' % (text,))
+            self.assertRaises(SimpleListValueError, smallList.Factory, numpy.array([1, 200]))
+
+        def testFallback (self):
+            v = CreateFromDocument('<ns:big xmlns:ns="urn:arraylist">1 99999999999999999999999</ns:big>')
+            self.assertTrue(v._arrayStorage() is None)
+            self.assertEqual([1, 99999999999999999999999], list(v))
+            v = ulongList.Factory('18446744073709551615 0')
+            self.assertEqual(numpy.uint64, v.asArray().dtype)
+            self.assertEqual('18446744073709551615 0', v.xsdLiteral())
+            self.assertRaises(pyxb.SimpleTypeValueError, ulongList.Factory, '1 -1')
+            v = doubleList.Factory([1, 2])
+            self.assertTrue(v._arrayStorage() is None)
+            self.assertEqual('1.0 2.0', v.xsdLiteral())
+
+        def testFromArray (self):
+            v = doubleList.Factory(numpy.arange(4))
+            self.assertEqual(numpy.float64, v.asArray().dtype)
+            self.assertEqual('0.0 1.0 2.0 3.0', v.xsdLiteral())
+            self.assertTrue(numpy.array_equal(numpy.arange(4), numpy.asarray(v)))
+            v = integerList.Factory(numpy.arange(3, dtype=numpy.int32))
+            self.assertEqual(numpy.int64, v.asArray().dtype)
+
+        def testMutate (self):
+            v = doubleList.Factory('1 2 3')
+            v.append(4)
+            self.assertTrue(v._arrayStorage() is None)
+            self.assertEqual([1.0, 2.0, 3.0, 4.0], list(v))
+            self.assertEqual('1.0 2.0 3.0 4.0', v.xsdLiteral())
+            v = doubleList.Factory('1 2 3')
+            v[0] = 5
+            self.assertEqual(xs.double, type(v[0]))
+            self.assertEqual([5.0, 2.0, 3.0], list(v))
+            v.clear()
+            self.assertEqual(0, len(v))
+
+        def testOperators (self):
+            v = smallList.Factory('1 2 3')
+            self.assertEqual([1, 2, 3], v)
+            self.assertEqual([0, 1, 2, 3], [0] + v)
+            self.assertEqual([1, 2, 3, 0], v + [0])
+            self.assertEqual([1, 2, 3, 1, 2, 3], v * 2)
+            self.assertEqual(2, v.index(3))
+            self.assertEqual([3, 2, 1], list(reversed(v)))
+
+        def testCopy (self):
+            instance = CreateFromDocument('<ns:posList xmlns:ns="urn:arraylist" count="2">1 2</ns:posList>')
+            for protocol in (0, 2):
+                clone = pickle.loads(pickle.dumps(instance, protocol))
+                self.assertTrue(clone.value()._arrayStorage() is not None)
+                self.assertEqual(instance.value(), clone.value())
+                self.assertEqual(2, clone.count)
+            v = copy.deepcopy(instance.value())
+            self.assertTrue(v._arrayStorage() is not None)
+            self.assertEqual(instance.value(), v)
+
+if __name__ == '__main__':
+    unittest.main()
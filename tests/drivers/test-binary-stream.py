@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb
+import pyxb.binding.generate
+import pyxb.binding.datatypes as xs
+from pyxb.utils import six
+import base64
+import io
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:binary" targetNamespace="urn:binary">
+  <xs:complexType name="tAttachment">
+    <xs:simpleContent>
+      <xs:extension base="xs:base64Binary">
+        <xs:attribute name="name" type="xs:string"/>
+      </xs:extension>
+    </xs:simpleContent>
+  </xs:complexType>
+  <xs:simpleType name="tDigest">
+    <xs:restriction base="xs:hexBinary">
+      <xs:length value="4"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="attachment" type="tns:tAttachment"/>
+  <xs:element name="data" type="xs:base64Binary" nillable="true"/>
+  <xs:element name="digest" type="tns:tDigest"/>
+  <xs:element name="bundle">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="tns:digest"/>
+        <xs:element ref="tns:attachment" maxOccurs="unbounded"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestBinaryStream (unittest.TestCase):
+
+    # Larger than the decoder batch, and divided into lines
+    payload = six.b('').join([ six.int2byte(_i % 251) for _i in range(200000) ])
+    literal = (base64.encodestring(payload) if six.PY2 else base64.encodebytes(payload)).decode('ascii')
+
+    def testParse (self):
+        xmlt = six.u('<ns:attachment xmlns:ns="urn:binary" name="a">\n%s</ns:attachment>') % (self.literal,)
+        instance = CreateFromDocument(xmlt)
+        self.assertEqual(self.payload, instance.value())
+        self.assertTrue(isinstance(instance.value(), xs.base64Binary))
+        self.assertEqual('a', instance.name)
+        instance = CreateFromDocument(six.u('<ns:digest xmlns:ns="urn:binary">\n  0aFf0102 </ns:digest>'))
+        self.assertEqual(six.b('\x0a\xff\x01\x02'), instance)
+        self.assertTrue(isinstance(instance, tDigest))
+
+    def testEmpty (self):
+        for xmlt in ('<ns:data xmlns:ns="urn:binary"/>',
+                     '<ns:data xmlns:ns="urn:binary"> </ns:data>',
+                     '<ns:data xmlns:ns="urn:binary" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:nil="true"/>'):
+            self.assertEqual(six.b(''), CreateFromDocument(xmlt))
+
+    def testInvalid (self):
+        for literal in ('ZZZ=', 'Zg=', 'Zm9v!'):
+            xmlt = '<ns:data xmlns:ns="urn:binary">\n%s</ns:data>' % (literal,)
+            with self.assertRaises(SimpleTypeValueError) as cm:
+                CreateFromDocument(xmlt)
+            self.assertEqual(1, cm.exception.location.lineNumber)
+        self.assertRaises(SimpleTypeValueError, CreateFromDocument, '<ns:digest xmlns:ns="urn:binary">0a ff0102</ns:digest>')
+        self.assertRaises(SimpleFacetValueError, CreateFromDocument, '<ns:digest xmlns:ns="urn:binary">0aff01</ns:digest>')
+
+    def testWrite (self):
+        instance = bundle(digest=six.b('\x0a\xff\x01\x02'), attachment=[ attachment(self.payload, name='a'), attachment(six.b('e'), name='b') ])
+        xmld = instance.toxml('utf-8')
+        stream = io.BytesIO()
+        instance.writeXML(stream, 'utf-8')
+        self.assertEqual(xmld, stream.getvalue())
+        copy = CreateFromDocument(stream.getvalue())
+        self.assertEqual(self.payload, copy.attachment[0].value())
+        self.assertEqual(six.b('e'), copy.attachment[1].value())
+
+if __name__ == '__main__':
+    unittest.main()
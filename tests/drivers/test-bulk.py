@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.bulk
+import pickle
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:bulk" targetNamespace="urn:bulk">
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:string">
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:complexType name="tItem">
+    <xs:sequence>
+      <xs:element name="code" type="tns:tCode"/>
+      <xs:element name="tag" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+    <xs:attribute name="id" type="xs:int" use="required"/>
+  </xs:complexType>
+  <xs:complexType name="tNote" mixed="true">
+    <xs:sequence>
+      <xs:element name="em" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="item" type="tns:tItem"/>
+  <xs:element name="note" type="tns:tNote"/>
+  <xs:element name="code" type="tns:tCode"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+try:
+    import concurrent.futures
+    have_futures = True
+except ImportError:
+    have_futures = False
+
+def document (i):
+    return '<b:item xmlns:b="urn:bulk" id="%d"><code>c%d</code><tag>a</tag><tag>b</tag></b:item>' % (i, i % 10)
+
+def item_id (instance):
+    return instance.id
+
+class TestPickle (unittest.TestCase):
+
+    def roundTrip (self, instance):
+        return pickle.loads(pickle.dumps(instance, pickle.HIGHEST_PROTOCOL))
+
+    def testComplex (self):
+        instance = CreateFromDocument(document(3))
+        self.assertTrue(instance._location() is not None)
+        self.assertTrue(instance._namespaceContext() is not None)
+        copy = self.roundTrip(instance)
+        self.assertTrue(copy._location() is None)
+        self.assertTrue(copy._namespaceContext() is None)
+        self.assertTrue(copy._element() is item)
+        self.assertTrue(copy.code._element() is tItem._UseForTag(pyxb.namespace.ExpandedName(None, 'code')).elementBinding())
+        self.assertEqual(instance.toxml('utf-8'), copy.toxml('utf-8'))
+
+    def testSimple (self):
+        instance = CreateFromDocument('<b:code xmlns:b="urn:bulk">abc</b:code>')
+        copy = self.roundTrip(instance)
+        self.assertTrue(isinstance(copy, tCode))
+        self.assertEqual('abc', copy)
+        self.assertTrue(copy._element() is code)
+
+    def testMixed (self):
+        xmlt = '<ns1:note xmlns:ns1="urn:bulk">some <em>mixed</em> text</ns1:note>'
+        copy = self.roundTrip(CreateFromDocument(xmlt))
+        self.assertTrue(copy.orderedContent()[1].elementDeclaration is tNote._UseForTag(pyxb.namespace.ExpandedName(None, 'em')))
+        self.assertEqual(xmlt, copy.toxml('utf-8', root_only=True).decode('utf-8'))
+
+    def testAppend (self):
+        copy = self.roundTrip(CreateFromDocument(document(3)))
+        self.assertTrue(copy._automatonConfiguration() is None)
+        tag = tItem._UseForTag(pyxb.namespace.ExpandedName(None, 'tag')).elementBinding()
+        copy.append(tag('c'))
+        self.assertTrue(copy._automatonConfiguration() is not None)
+        self.assertEqual(['a', 'b', 'c'], list(copy.tag))
+        self.assertTrue(copy.validateBinding())
+
+class TestBulk (unittest.TestCase):
+
+    documents = [ document(_i) for _i in range(50) ]
+
+    def checkOrdered (self, results):
+        self.assertEqual(len(self.documents), len(results))
+        for (i, instance) in enumerate(results):
+            self.assertTrue(isinstance(instance, tItem))
+            self.assertEqual(i, instance.id)
+            self.assertEqual(['a', 'b'], list(instance.tag))
+
+    def testInProcess (self):
+        self.checkOrdered(list(CreateFromDocuments(self.documents, workers=0)))
+        self.assertEqual(list(range(50)), list(CreateFromDocuments(self.documents, workers=0, mapper=item_id)))
+
+    if have_futures:
+        def testOrdered (self):
+            self.checkOrdered(list(CreateFromDocuments(self.documents, workers=2, chunksize=3)))
+
+        def testAsCompleted (self):
+            results = list(CreateFromDocuments(self.documents, workers=2, ordered=False, mapper=item_id, chunksize=4))
+            self.assertEqual(list(range(50)), sorted(results))
+
+        def testExecutor (self):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+                self.checkOrdered(list(CreateFromDocuments(self.documents, executor=executor)))
+                self.checkOrdered(list(CreateFromDocuments(self.documents, executor=executor, chunksize=7)))
+
+        def testError (self):
+            documents = self.documents + [ document(99).replace('c9', 'c99x') ]
+            self.assertRaises(SimpleFacetValueError, list, CreateFromDocuments(documents, workers=2))
+
+    def testUnavailable (self):
+        if have_futures:
+            return
+        self.assertRaises(pyxb.PyXBException, CreateFromDocuments, self.documents, workers=2)
+
+if __name__ == '__main__':
+    unittest.main()
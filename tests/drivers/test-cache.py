@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.cache
+import copy
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:cache" targetNamespace="urn:cache">
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:string">
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="order">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="code" type="tns:tCode" maxOccurs="unbounded"/>
+      </xs:sequence>
+      <xs:attribute name="id" type="xs:int"/>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+from pyxb.binding.cache import DocumentCache, Clone
+
+import unittest
+
+def document (n):
+    return '<tns:order xmlns:tns="urn:cache" id="%d"><code>a</code><code>b</code></tns:order>' % (n,)
+
+class TestCache (unittest.TestCase):
+
+    def testClone (self):
+        instance = CreateFromDocument(document(1))
+        clone = Clone(instance)
+        self.assertFalse(clone is instance)
+        self.assertEqual(instance.toxml('utf-8'), clone.toxml('utf-8'))
+        clone.code.append('c')
+        self.assertEqual(['a', 'b'], list(instance.code))
+        self.assertEqual(['a', 'b', 'c'], list(clone.code))
+        self.assertEqual(instance.toxml('utf-8'), copy.deepcopy(instance).toxml('utf-8'))
+
+    def testHits (self):
+        cache = DocumentCache(CreateFromDocument)
+        first = cache(document(1))
+        self.assertEqual((0, 1), (cache.hits(), cache.misses()))
+        second = cache(document(1).encode('utf-8'))
+        self.assertEqual((1, 1), (cache.hits(), cache.misses()))
+        self.assertFalse(first is second)
+        self.assertEqual(first.toxml('utf-8'), second.toxml('utf-8'))
+        second.code.append('c')
+        third = cache(document(1))
+        self.assertEqual(['a', 'b'], list(third.code))
+        cache(document(2))
+        self.assertEqual((2, 2), (cache.hits(), cache.misses()))
+        cache(document(2), location_base='here')
+        self.assertEqual((2, 3), (cache.hits(), cache.misses()))
+        self.assertEqual(3, cache.entryCount())
+
+    def testEntryLimit (self):
+        cache = DocumentCache(CreateFromDocument, max_entries=2)
+        cache(document(1))
+        cache(document(2))
+        cache(document(1))
+        cache(document(3))
+        self.assertEqual(2, cache.entryCount())
+        self.assertEqual(1, cache.evictions())
+        cache(document(1))
+        self.assertEqual(2, cache.hits())
+        cache(document(2))
+        self.assertEqual(4, cache.misses())
+
+    def testByteLimit (self):
+        cache = DocumentCache(CreateFromDocument, max_entries=None, max_bytes=1)
+        cache(document(1))
+        self.assertEqual(0, cache.entryCount())
+        cache = DocumentCache(CreateFromDocument, max_entries=None)
+        cache(document(1))
+        size = cache.byteCount()
+        self.assertTrue(0 < size)
+        cache = DocumentCache(CreateFromDocument, max_entries=None, max_bytes=2 * size)
+        for n in range(5):
+            cache(document(n + 10))
+        self.assertEqual(2, cache.entryCount())
+        self.assertTrue(cache.byteCount() <= 2 * size)
+        self.assertEqual(3, cache.evictions())
+        cache.clear()
+        self.assertEqual((0, 0), (cache.entryCount(), cache.byteCount()))
+
+    def testInvalid (self):
+        cache = DocumentCache(CreateFromDocument)
+        xmlt = document(1).replace('<code>a</code>', '<code>abcd</code>')
+        self.assertRaises(SimpleFacetValueError, cache, xmlt)
+        self.assertRaises(SimpleFacetValueError, cache, xmlt)
+        self.assertEqual((0, 2), (cache.hits(), cache.misses()))
+        self.assertEqual(0, cache.entryCount())
+
+    def testConfiguration (self):
+        cache = DocumentCache(CreateFromDocument)
+        xmlt = document(1).replace('<code>a</code>', '<code>abcd</code>')
+        config = pyxb.GlobalValidationConfig.setThreadConfig(None)
+        try:
+            pyxb.RequireValidWhenParsing(False)
+            self.assertEqual('abcd', cache(xmlt).code[0])
+            pyxb.RequireValidWhenParsing(True)
+            self.assertRaises(SimpleFacetValueError, cache, xmlt)
+            self.assertEqual((0, 2), (cache.hits(), cache.misses()))
+        finally:
+            pyxb.RequireValidWhenParsing(True)
+            pyxb.GlobalValidationConfig.setThreadConfig(config)
+        cache(document(1))
+        pyxb._SetXMLStyle(pyxb.XMLStyle_minidom, thread_only=True)
+        try:
+            cache(document(1))
+        finally:
+            pyxb._SetXMLStyle(None, thread_only=True)
+        self.assertEqual((0, 4), (cache.hits(), cache.misses()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.facets
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:validator" targetNamespace="urn:validator">
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:string">
+      <xs:pattern value="[A-Z]{3}"/>
+      <xs:pattern value="[0-9]{2}"/>
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tShortCode">
+    <xs:restriction base="tns:tCode">
+      <xs:length value="2"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tColor">
+    <xs:restriction base="xs:token">
+      <xs:enumeration value="red"/>
+      <xs:enumeration value="green"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tPercent">
+    <xs:restriction base="xs:decimal">
+      <xs:minInclusive value="0"/>
+      <xs:maxExclusive value="100"/>
+      <xs:fractionDigits value="2"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tColors">
+    <xs:list itemType="tns:tColor"/>
+  </xs:simpleType>
+  <xs:simpleType name="tPair">
+    <xs:restriction base="tns:tColors">
+      <xs:enumeration value="red green"/>
+      <xs:enumeration value="green red"/>
+    </xs:restriction>
+  </xs:simpleType>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestCompiledValidator (unittest.TestCase):
+
+    def testPatterns (self):
+        self.assertEqual('ABC', tCode('ABC'))
+        self.assertEqual('42', tCode('42'))
+        self.assertRaises(SimpleFacetValueError, tCode, 'AB')
+        self.assertRaises(SimpleFacetValueError, tCode, 'ABC1')
+        try:
+            tCode('4')
+            self.fail('Invalid pattern accepted')
+        except SimpleFacetValueError as e:
+            self.assertTrue(isinstance(e.facet, pyxb.binding.facets.CF_pattern))
+
+    def testInherited (self):
+        self.assertEqual('42', tShortCode('42'))
+        try:
+            tShortCode('ABC')
+            self.fail('Invalid length accepted')
+        except SimpleFacetValueError as e:
+            self.assertTrue(e.facet is tShortCode._CF_length)
+        self.assertRaises(SimpleFacetValueError, tShortCode, 'AB')
+
+    def testEnumeration (self):
+        self.assertEqual(tColor.red, tColor('red'))
+        self.assertRaises(SimpleFacetValueError, tColor, 'blue')
+        self.assertEqual(2, len(tPair('red green')))
+        self.assertRaises(SimpleFacetValueError, tPair, 'red red')
+
+    def testBounds (self):
+        self.assertEqual(0, tPercent('0'))
+        self.assertEqual(99.99, float(tPercent('99.99')))
+        self.assertRaises(SimpleFacetValueError, tPercent, '100')
+        self.assertRaises(SimpleFacetValueError, tPercent, '-1')
+        self.assertRaises(SimpleFacetValueError, tPercent, '1.234')
+
+    def testCached (self):
+        tShortCode('42')
+        validator = tShortCode._ConstraintValidator()
+        self.assertTrue(validator is tShortCode._ConstraintValidator())
+        self.assertTrue(validator(tShortCode('42')) is None)
+        self.assertTrue(validator(tShortCode('ABC', _validate_constraints=False)) is tShortCode._CF_length)
+
+    def testReconfigured (self):
+        self.assertRaises(SimpleFacetValueError, tColor, 'blue')
+        tColor._CF_enumeration.addEnumeration(unicode_value='blue', tag='blue')
+        self.assertEqual('blue', tColor('blue'))
+
+if __name__ == '__main__':
+    unittest.main()
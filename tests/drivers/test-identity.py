@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb
+import pyxb.binding.generate
+import pyxb.binding.identity
+import pyxb.binding.saxer
+import pyxb.binding.cache
+import pyxb.binding.snapshot
+import pyxb.binding.content
+import io
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:lib="urn:identity" targetNamespace="urn:identity" elementFormDefault="qualified">
+  <xs:complexType name="tBook">
+    <xs:sequence>
+      <xs:element name="title" type="xs:string"/>
+      <xs:element name="copy" minOccurs="0" maxOccurs="unbounded">
+        <xs:complexType>
+          <xs:attribute name="number" type="xs:int"/>
+        </xs:complexType>
+      </xs:element>
+    </xs:sequence>
+    <xs:attribute name="isbn" type="xs:string"/>
+    <xs:attribute name="author" type="xs:IDREF"/>
+  </xs:complexType>
+  <xs:complexType name="tAuthor">
+    <xs:simpleContent>
+      <xs:extension base="xs:string">
+        <xs:attribute name="id" type="xs:ID" use="required"/>
+      </xs:extension>
+    </xs:simpleContent>
+  </xs:complexType>
+  <xs:complexType name="tLoan">
+    <xs:attribute name="isbn" type="xs:string"/>
+    <xs:attribute name="copy" type="xs:int"/>
+  </xs:complexType>
+  <xs:element name="library">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="author" type="lib:tAuthor" minOccurs="0" maxOccurs="unbounded"/>
+        <xs:element name="book" type="lib:tBook" minOccurs="0" maxOccurs="unbounded">
+          <xs:unique name="copyNumber">
+            <xs:selector xpath="lib:copy"/>
+            <xs:field xpath="@number"/>
+          </xs:unique>
+        </xs:element>
+        <xs:element name="loan" type="lib:tLoan" minOccurs="0" maxOccurs="unbounded"/>
+        <xs:any namespace="##other" processContents="lax" minOccurs="0"/>
+      </xs:sequence>
+    </xs:complexType>
+    <xs:key name="bookKey">
+      <xs:selector xpath="lib:book"/>
+      <xs:field xpath="@isbn"/>
+    </xs:key>
+    <xs:unique name="titleKey">
+      <xs:selector xpath=".//lib:title"/>
+      <xs:field xpath="."/>
+    </xs:unique>
+    <xs:keyref name="loanBook" refer="lib:bookKey">
+      <xs:selector xpath="lib:loan"/>
+      <xs:field xpath="@isbn"/>
+    </xs:keyref>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def _Document (authors='<author id="a1">Austen</author><author id="a2">Bronte</author>',
+               books='<book isbn="111" author="a1"><title>Emma</title><copy number="1"/><copy number="2"/></book><book isbn="222" author="a2"><title>Shirley</title></book>',
+               loans='<loan isbn="111"/><loan isbn="222"/>'):
+    return '<library xmlns="urn:identity">%s%s%s</library>' % (authors, books, loans)
+
+class TestIdentity (unittest.TestCase):
+
+    def setUp (self):
+        self.__config = pyxb.GlobalValidationConfig.setThreadConfig(None)
+
+    def tearDown (self):
+        pyxb.GlobalValidationConfig.setThreadConfig(self.__config)
+
+    def setMode (self, mode):
+        config = pyxb.GlobalValidationConfig.copy()
+        config._setIdentityConstraints(mode)
+        pyxb.GlobalValidationConfig.setThreadConfig(config)
+
+    def testMetadata (self):
+        constraints = library.identityConstraints()
+        self.assertEqual(['bookKey', 'titleKey', 'loanBook'], [ _c.name().localName() for _c in constraints ])
+        self.assertEqual(pyxb.binding.identity.IdentityConstraint.KEYREF, constraints[2].category())
+        self.assertEqual(constraints[0].name(), constraints[2].referencedKey())
+        self.assertEqual(1, len(library.memberElement(pyxb.namespace.ExpandedName(Namespace, 'book')).identityConstraints()))
+        self.assertEqual((), library.memberElement(pyxb.namespace.ExpandedName(Namespace, 'loan')).identityConstraints())
+
+    def testLookup (self):
+        self.setMode(pyxb.ValidationConfig.RAISE_EXCEPTION)
+        instance = CreateFromDocument(_Document())
+        index = instance._identityIndex()
+        self.assertEqual([], index.violations())
+        book = index.lookupByKey(pyxb.namespace.ExpandedName(Namespace, 'bookKey'), '222')
+        self.assertTrue(book is instance.book[1])
+        self.assertTrue(index.lookupByKey(library.identityConstraints()[0], '333') is None)
+        self.assertTrue(index.lookupByKey(library.identityConstraints()[1], 'Emma') is instance.book[0].title)
+        self.assertTrue(index.resolveIDREF(book.author) is instance.author[1])
+        self.assertTrue(index.resolveIDREF('a3') is None)
+        copy_number = library.memberElement(pyxb.namespace.ExpandedName(Namespace, 'book')).identityConstraints()[0]
+        self.assertTrue(index.lookupByKey(copy_number, 2, scope=instance.book[0]) is instance.book[0].copy[1])
+        self.assertTrue(index.lookupByKey(copy_number, 2, scope=instance.book[1]) is None)
+
+    def testDefault (self):
+        instance = CreateFromDocument(_Document(loans='<loan isbn="333"/>'))
+        self.assertTrue(instance._identityIndex() is None)
+        index = pyxb.binding.identity.IdentityIndex(instance)
+        self.assertTrue(index.lookupByKey(pyxb.namespace.ExpandedName(Namespace, 'bookKey'), '111') is instance.book[0])
+        self.assertTrue(index.resolveIDREF('a1') is instance.author[0])
+        self.assertRaises(UnresolvedKeyrefError, index.validate)
+
+    def testViolations (self):
+        self.setMode(pyxb.ValidationConfig.RAISE_EXCEPTION)
+        cases = ( (DuplicateKeyError, _Document(books='<book isbn="111"><title>A</title></book><book isbn="111"><title>B</title></book>', loans='')),
+                  (IncompleteKeyError, _Document(books='<book><title>A</title></book>', loans='')),
+                  (DuplicateKeyError, _Document(books='<book isbn="111"><title>A</title></book><book isbn="222"><title>A</title></book>', loans='')),
+                  (DuplicateKeyError, _Document(books='<book isbn="111"><title>A</title><copy number="1"/><copy number="1"/></book>', loans='')),
+                  (UnresolvedKeyrefError, _Document(loans='<loan isbn="333"/>')),
+                  (DuplicateKeyError, _Document(authors='<author id="a1">Austen</author><author id="a1">Bronte</author>', books='', loans='')),
+                  (UnresolvedKeyrefError, _Document(authors='', loans='')) )
+        for (exc, xmlt) in cases:
+            self.assertRaises(exc, CreateFromDocument, xmlt)
+        self.setMode(pyxb.ValidationConfig.IGNORE_ONCE)
+        for (exc, xmlt) in cases:
+            index = CreateFromDocument(xmlt)._identityIndex()
+            self.assertEqual(exc, type(index.violations()[0]))
+            self.assertRaises(exc, index.validate)
+
+    def testRetainsValidation (self):
+        instance = CreateFromDocument(_Document(loans='<loan isbn="111"/><o:extra xmlns:o="urn:other">x</o:extra>'))
+        self.assertEqual(1, len(instance._wildcardElements()))
+        instance.validateBinding()
+        sequenced_children = pyxb.binding.content.AutomatonConfiguration.sequencedChildren
+        calls = []
+        def counter (cfg):
+            calls.append(cfg)
+            return sequenced_children(cfg)
+        pyxb.binding.content.AutomatonConfiguration.sequencedChildren = counter
+        try:
+            index = pyxb.binding.identity.IdentityIndex(instance)
+            self.assertTrue(index.lookupByKey(pyxb.namespace.ExpandedName(Namespace, 'bookKey'), '111') is instance.book[0])
+            instance.validateBinding()
+            self.assertEqual([], calls)
+        finally:
+            pyxb.binding.content.AutomatonConfiguration.sequencedChildren = sequenced_children
+
+    def testRestored (self):
+        cache = pyxb.binding.cache.DocumentCache(CreateFromDocument)
+        xmlt = _Document()
+        self.assertTrue(cache(xmlt)._identityIndex() is None)
+        self.setMode(pyxb.ValidationConfig.RAISE_EXCEPTION)
+        cache(xmlt)
+        instance = cache(xmlt)
+        self.assertEqual(1, cache.hits())
+        index = instance._identityIndex()
+        self.assertTrue(index.lookupByKey(pyxb.namespace.ExpandedName(Namespace, 'bookKey'), '222') is instance.book[1])
+        snapshot = pyxb.binding.snapshot.CreateSnapshot(instance)
+        instance = pyxb.binding.snapshot.CreateFromSnapshot(snapshot)
+        self.assertTrue(instance._identityIndex().resolveIDREF('a1') is instance.author[0])
+        xmlt = _Document(loans='<loan isbn="333"/>')
+        self.setMode(pyxb.ValidationConfig.IGNORE_ONCE)
+        cache(xmlt)
+        index = cache(xmlt)._identityIndex()
+        self.assertEqual(2, cache.hits())
+        self.assertEqual(UnresolvedKeyrefError, type(index.violations()[0]))
+        snapshot = pyxb.binding.snapshot.CreateSnapshot(CreateFromDocument(xmlt))
+        self.setMode(pyxb.ValidationConfig.RAISE_EXCEPTION)
+        self.assertRaises(UnresolvedKeyrefError, cache, xmlt)
+        self.assertRaises(UnresolvedKeyrefError, pyxb.binding.snapshot.CreateFromSnapshot, snapshot)
+        self.setMode(pyxb.ValidationConfig.NEVER)
+        self.assertTrue(pyxb.binding.snapshot.CreateFromSnapshot(snapshot)._identityIndex() is None)
+
+    def testHandler (self):
+        saxer = pyxb.binding.saxer.make_parser(fallback_namespace=Namespace.fallbackNamespace(), identity_constraints=pyxb.ValidationConfig.IGNORE_ONCE)
+        handler = saxer.getContentHandler()
+        saxer.parse(io.BytesIO(_Document(loans='<loan isbn="333"/>').encode('utf-8')))
+        instance = handler.rootObject()
+        self.assertTrue(handler.identityIndex() is instance._identityIndex())
+        violation = handler.identityIndex().violations()[0]
+        self.assertTrue(isinstance(violation, UnresolvedKeyrefError))
+        self.assertEqual(('333',), violation.value)
+        self.assertTrue(violation.instance is instance.loan[0])
+        self.assertEqual(1, violation.location.lineNumber)
+
+    def testInvalidXPath (self):
+        bad = xsd.replace('urn:identity', 'urn:identity-invalid').replace('xpath="lib:loan"', 'xpath="lib:loan[1]"')
+        code = pyxb.binding.generate.GeneratePython(schema_text=bad)
+        self.assertTrue('bookKey' in code)
+        self.assertFalse('loanBook' in code)
+        self.assertRaises(pyxb.SchemaValidationError, pyxb.binding.identity.IdentityConstraint, 'bad', 'key', 'a', [ 'b//@c' ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.saxer
+import io
+import gc
+import weakref
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:iterparse" targetNamespace="urn:iterparse">
+  <xs:complexType name="tRecord">
+    <xs:sequence>
+      <xs:element name="title" type="xs:string"/>
+      <xs:element name="note" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+    <xs:attribute name="id" type="xs:int" use="required"/>
+  </xs:complexType>
+  <xs:element name="feed">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="header" type="xs:string"/>
+        <xs:element name="record" type="tns:tRecord" maxOccurs="unbounded"/>
+        <xs:element name="archive" minOccurs="0">
+          <xs:complexType>
+            <xs:sequence>
+              <xs:element name="record" type="tns:tRecord" maxOccurs="unbounded"/>
+            </xs:sequence>
+          </xs:complexType>
+        </xs:element>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def makeDocument (count, archived=0):
+    parts = [ '<tns:feed xmlns:tns="urn:iterparse"><header>h</header>' ]
+    for i in range(count):
+        parts.append('<record id="%d"><title>t%d</title><note>n</note></record>' % (i, i))
+    if archived:
+        parts.append('<archive>')
+        for i in range(archived):
+            parts.append('<record id="%d"><title>a%d</title></record>' % (count+i, i))
+        parts.append('</archive>')
+    parts.append('</tns:feed>')
+    return ''.join(parts)
+
+class TestIterParse (unittest.TestCase):
+
+    def testByName (self):
+        xmlt = makeDocument(5, 2)
+        records = list(pyxb.binding.saxer.iterparse(xmlt, [ pyxb.namespace.ExpandedName('record') ], chunk_size=16))
+        self.assertEqual(7, len(records))
+        for (i, r) in enumerate(records):
+            self.assertTrue(isinstance(r, tRecord))
+            self.assertEqual(i, r.id)
+        self.assertEqual('t0', records[0].title)
+        self.assertEqual('a1', records[6].title)
+
+    def testByPath (self):
+        xmlt = makeDocument(5, 2)
+        path = ( Namespace.createExpandedName('feed'), pyxb.namespace.ExpandedName('archive'), pyxb.namespace.ExpandedName('record') )
+        records = list(pyxb.binding.saxer.iterparse(io.BytesIO(xmlt.encode('utf-8')), [ path ]))
+        self.assertEqual([5, 6], [ _r.id for _r in records ])
+
+    def testRoot (self):
+        xmlt = makeDocument(3)
+        select = [ pyxb.namespace.ExpandedName('record'), Namespace.createExpandedName('feed') ]
+        objects = list(pyxb.binding.saxer.iterparse(xmlt, select))
+        self.assertEqual(4, len(objects))
+        root = objects[-1]
+        self.assertTrue(isinstance(root, feed.typeDefinition()))
+        self.assertEqual('h', root.header)
+        self.assertEqual(0, len(root.record))
+
+    def testStringSelect (self):
+        xmlt = makeDocument(3)
+        self.assertRaises(pyxb.UsageError, pyxb.binding.saxer.make_parser, select='record')
+        self.assertRaises(pyxb.UsageError, pyxb.binding.saxer.make_parser, select=[ 'record' ])
+        self.assertRaises(pyxb.UsageError, list, pyxb.binding.saxer.iterparse(xmlt, [ 'record' ]))
+
+    def testValidation (self):
+        xmlt = makeDocument(3).replace('<title>t1</title><note>n</note>', '')
+        gen = pyxb.binding.saxer.iterparse(xmlt, [ pyxb.namespace.ExpandedName('record') ], chunk_size=16)
+        self.assertEqual(0, next(gen).id)
+        self.assertRaises(IncompleteElementContentError, next, gen)
+
+    def testDetached (self):
+        xmlt = makeDocument(200)
+        refs = []
+        for r in pyxb.binding.saxer.iterparse(xmlt, [ pyxb.namespace.ExpandedName('record') ], chunk_size=256):
+            refs.append(weakref.ref(r))
+        del r
+        gc.collect()
+        self.assertEqual(200, len(refs))
+        self.assertEqual(0, len([ _r for _r in refs if _r() is not None ]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.basis
+import pyxb.utils.fac
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:complexType name="tBase">
+    <xs:sequence>
+      <xs:element name="a" type="xs:string"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:complexType name="tUnused">
+    <xs:sequence>
+      <xs:element name="b" type="xs:string"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:complexType name="tAll">
+    <xs:all>
+      <xs:element name="a" type="xs:string"/>
+      <xs:element name="b" type="xs:string"/>
+    </xs:all>
+  </xs:complexType>
+  <xs:element name="base" type="tBase"/>
+  <xs:element name="unused" type="tUnused"/>
+  <xs:element name="all" type="tAll"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestLazyAutomaton (unittest.TestCase):
+
+    def tearDown (self):
+        pyxb.EagerAutomatonBuild(False)
+
+    def isDeferred (self, ctd):
+        return isinstance(ctd.__dict__.get('_Automaton'), pyxb.binding.basis._DeferredAutomaton)
+
+    def testGenerated (self):
+        self.assertTrue(0 <= code.find('tBase._SetAutomatonBuilder('))
+        self.assertTrue(0 > code.find('_Automaton = _BuildAutomaton'))
+
+    def testDeferred (self):
+        self.assertTrue(self.isDeferred(tAll))
+        instance = CreateFromDocument('<all><b>2</b><a>1</a></all>')
+        self.assertEqual('1', instance.a)
+        self.assertFalse(self.isDeferred(tAll))
+        self.assertTrue(isinstance(tAll._Automaton, pyxb.utils.fac.Automaton))
+        self.assertTrue(tAll._Automaton is instance._Automaton)
+
+    def testEager (self):
+        self.assertTrue(self.isDeferred(tUnused))
+        self.assertFalse(pyxb.EagerAutomatonBuild())
+        self.assertTrue(pyxb.EagerAutomatonBuild(True))
+        self.assertFalse(self.isDeferred(tUnused))
+        self.assertFalse(self.isDeferred(tBase))
+        self.assertEqual(0, pyxb.binding.basis.complexTypeDefinition._BuildDeferredAutomata())
+        self.assertRaises(TypeError, pyxb.EagerAutomatonBuild, 1)
+
+    def testInherited (self):
+        class tMid (tBase):
+            pass
+        class tSub (tMid):
+            pass
+        tMid._SetAutomatonBuilder(lambda: 'automaton')
+        self.assertTrue(self.isDeferred(tMid))
+        self.assertEqual('automaton', tSub._Automaton)
+        self.assertFalse('_Automaton' in tSub.__dict__)
+        self.assertEqual('automaton', tMid.__dict__['_Automaton'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb
+import pyxb.binding.generate
+import pyxb.binding.content
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:nondeterminism" targetNamespace="urn:nondeterminism">
+  <xs:complexType name="tList">
+    <xs:choice maxOccurs="unbounded">
+      <xs:element name="a" type="xs:int" minOccurs="0" maxOccurs="unbounded"/>
+      <xs:sequence>
+        <xs:element name="a" type="xs:int" minOccurs="0" maxOccurs="unbounded"/>
+        <xs:element name="b" type="xs:int" minOccurs="0"/>
+      </xs:sequence>
+    </xs:choice>
+  </xs:complexType>
+  <xs:element name="items" type="tns:tList"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def _Document (count, tail='<b>2</b>'):
+    return '<ns:items xmlns:ns="urn:nondeterminism">%s%s</ns:items>' % ('<a>1</a>' * count, tail)
+
+class TestNondeterminism (unittest.TestCase):
+
+    def testEquivalentPaths (self):
+        # Each a may be matched by either particle, but the paths
+        # converge, so the number of parallel configurations stays
+        # below the limit however long the document.
+        count = 10 * pyxb.binding.content.AutomatonConfiguration.PermittedNondeterminism
+        instance = CreateFromDocument(_Document(count))
+        self.assertEqual(count, len(instance.a))
+        self.assertEqual([2], list(instance.b))
+        instance = CreateFromDocument(_Document(count, ''))
+        self.assertEqual(count, len(instance.a))
+        self.assertEqual(0, len(instance.b))
+
+    def testInvalid (self):
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, _Document(50, '<b>2</b><b>3</b><c/>'))
+
+if __name__ == '__main__':
+    unittest.main()
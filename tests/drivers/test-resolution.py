@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.namespace.resolution
+from pyxb.namespace.resolution import ResolutionStatistics
+
+# A chain of types each of which is declared before the type it is
+# derived from.
+Length = 30
+xsd = ['<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:resolution" targetNamespace="urn:resolution">']
+for i in range(Length):
+    xsd.append('<xs:simpleType name="s%d"><xs:restriction base="tns:s%d"><xs:maxLength value="%d"/></xs:restriction></xs:simpleType>' % (i, i+1, Length + 10 - i))
+    xsd.append('<xs:complexType name="t%d"><xs:simpleContent><xs:extension base="tns:s%d"><xs:attribute name="a%d" type="tns:s%d"/></xs:extension></xs:simpleContent></xs:complexType>' % (i, i, i, i))
+xsd.append('<xs:simpleType name="s%d"><xs:restriction base="xs:string"/></xs:simpleType>' % (Length,))
+xsd.append('<xs:element name="root" type="tns:t0"/>')
+xsd.append('</xs:schema>')
+xsd = '\n'.join(xsd)
+
+ResolutionStatistics.Reset()
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+timings = ResolutionStatistics.Timings()
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestResolution (unittest.TestCase):
+
+    def testBindings (self):
+        instance = CreateFromDocument('<ns1:root xmlns:ns1="urn:resolution" a0="abc">text</ns1:root>')
+        self.assertEqual('text', instance.value())
+        self.assertEqual('abc', instance.a0)
+        self.assertTrue(issubclass(s0, s1))
+        self.assertTrue(issubclass(s1, s2))
+        self.assertRaises(SimpleFacetValueError, s0, 'x' * (Length + 11))
+
+    def testStatistics (self):
+        (attempts, resolved, seconds) = timings['SimpleTypeDefinition']
+        self.assertEqual(Length + 1, resolved)
+        # Each type is attempted once before its base is resolved and once
+        # after, not once per pass over the unresolved components.
+        self.assertTrue(attempts <= 2 * resolved)
+        (attempts, resolved, seconds) = timings['ComplexTypeDefinition']
+        self.assertEqual(Length, resolved)
+        self.assertTrue(attempts <= 2 * resolved)
+        self.assertTrue(0 <= seconds)
+        report = ResolutionStatistics.Report().split('\n')
+        self.assertTrue(report[0].startswith('Component'))
+        self.assertTrue(report[-1].startswith('Total'))
+
+    def testReset (self):
+        saved = ResolutionStatistics.Timings()
+        ResolutionStatistics.Reset()
+        self.assertEqual({}, ResolutionStatistics.Timings())
+        ResolutionStatistics.Record(type(self), 0.5, False)
+        ResolutionStatistics.Record(type(self), 0.25, True)
+        self.assertEqual({ 'TestResolution': (2, 1, 0.75) }, ResolutionStatistics.Timings())
+        ResolutionStatistics.Reset()
+
+    def testCircular (self):
+        xsdc = '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:circular" targetNamespace="urn:circular">
+  <xs:simpleType name="a"><xs:restriction base="tns:b"/></xs:simpleType>
+  <xs:simpleType name="b"><xs:restriction base="tns:a"/></xs:simpleType>
+</xs:schema>'''
+        self.assertRaises(pyxb.LogicError, pyxb.binding.generate.GeneratePython, schema_text=xsdc)
+        ns = pyxb.namespace.NamespaceForURI('urn:circular')
+        self.assertEqual(2, len(ns._unresolvedComponents()))
+        self.assertRaises(pyxb.NotInNamespaceError, ns.resolveDefinitions)
+        self.assertFalse(ns.resolveDefinitions(allow_unresolved=True))
+
+    def testGeneratorOptions (self):
+        g = pyxb.binding.generate.Generator()
+        self.assertFalse(g.reportResolutionTimes())
+        self.assertTrue('--no-report-resolution-times' in g.getCommandLineArgs())
+        g = pyxb.binding.generate.Generator(argv=['--report-resolution-times'])
+        self.assertTrue(g.reportResolutionTimes())
+
+if __name__ == '__main__':
+    unittest.main()
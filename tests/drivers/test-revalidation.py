@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb
+import pyxb.binding.generate
+import pyxb.binding.content
+from pyxb.utils import six
+import copy
+import pickle
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:revalidation" targetNamespace="urn:revalidation">
+  <xs:simpleType name="tCodes">
+    <xs:restriction>
+      <xs:simpleType>
+        <xs:list itemType="xs:int"/>
+      </xs:simpleType>
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:complexType name="tNode">
+    <xs:sequence>
+      <xs:element name="label" type="xs:string"/>
+      <xs:element name="codes" type="tns:tCodes" minOccurs="0"/>
+      <xs:element name="child" type="tns:tNode" minOccurs="0" maxOccurs="3"/>
+    </xs:sequence>
+    <xs:attribute name="tags" type="tns:tCodes"/>
+  </xs:complexType>
+  <xs:element name="node" type="tns:tNode"/>
+  <xs:complexType name="tLeaf">
+    <xs:sequence>
+      <xs:element name="v" type="xs:int" maxOccurs="2"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="leaf" type="tns:tLeaf"/>
+  <xs:complexType name="tText" mixed="true">
+    <xs:sequence>
+      <xs:element name="b" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="text" type="tns:tText"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def _Tree (depth, label='n', binding=node):
+    instance = binding(label=label, codes=[1, 2])
+    if 0 < depth:
+        for i in range(3):
+            instance.child.append(_Tree(depth - 1, '%s.%d' % (label, i), tNode))
+    return instance
+
+class TestRevalidation (unittest.TestCase):
+
+    def setUp (self):
+        self.__sequencedChildren = pyxb.binding.content.AutomatonConfiguration.sequencedChildren
+        self.sequenced = 0
+        def counter (cfg):
+            self.sequenced += 1
+            return self.__sequencedChildren(cfg)
+        pyxb.binding.content.AutomatonConfiguration.sequencedChildren = counter
+
+    def tearDown (self):
+        pyxb.binding.content.AutomatonConfiguration.sequencedChildren = self.__sequencedChildren
+
+    def validateCount (self, instance):
+        self.sequenced = 0
+        instance.validateBinding()
+        return self.sequenced
+
+    def testUnchanged (self):
+        instance = _Tree(3)
+        self.assertEqual(40, self.validateCount(instance))
+        self.assertEqual(0, self.validateCount(instance))
+        xmld = instance.toxml('utf-8')
+        self.assertEqual(0, self.sequenced)
+        instance = CreateFromDocument(xmld)
+        self.assertEqual(40, self.validateCount(instance))
+        self.assertEqual(0, self.validateCount(instance))
+
+    def testElementChange (self):
+        instance = _Tree(3)
+        instance.validateBinding()
+        leaf = instance.child[1].child[2].child[0]
+        leaf.label = None
+        self.sequenced = 0
+        self.assertRaises(pyxb.IncompleteElementContentError, instance.validateBinding)
+        self.assertEqual(4, self.sequenced)
+        leaf.label = 'fixed'
+        # The ancestors retain the order calculated before the failure
+        self.assertEqual(1, self.validateCount(instance))
+        self.assertEqual(0, self.validateCount(instance))
+        self.assertTrue(six.b('<label>fixed</label>') in instance.toxml('utf-8'))
+
+    def testPluralChange (self):
+        instance = _Tree(2)
+        instance.validateBinding()
+        children = instance.child[0].child
+        children.append(_Tree(0, binding=tNode))
+        self.assertRaises(pyxb.UnprocessedElementContentError, instance.validateBinding)
+        children.pop()
+        self.assertEqual(1, self.validateCount(instance))
+        children[1] = _Tree(0, 'replaced', tNode)
+        self.assertEqual(3, self.validateCount(instance))
+        self.assertTrue(six.b('<label>replaced</label>') in instance.toxml('utf-8'))
+
+    def testListChange (self):
+        instance = _Tree(2)
+        instance.validateBinding()
+        codes = instance.child[2].child[1].codes
+        codes.extend([3, 4])
+        self.assertRaises(SimpleFacetValueError, instance.validateBinding)
+        del codes[0]
+        instance.validateBinding()
+        instance.child[0].tags = [5]
+        instance.validateBinding()
+        instance.child[0].tags.append(6)
+        instance.child[0].tags.append(7)
+        instance.child[0].tags.append(8)
+        self.assertRaises(SimpleFacetValueError, instance.validateBinding)
+        instance.child[0].tags.remove(8)
+        instance.validateBinding()
+
+    def testShared (self):
+        leaf = _Tree(0, binding=tNode)
+        first = tNode(label='first', child=[leaf])
+        second = tNode(label='second', child=[leaf])
+        first.validateBinding()
+        second.validateBinding()
+        leaf.codes = [1, 2, 3]
+        leaf.codes.append(4)
+        self.assertRaises(SimpleFacetValueError, first.validateBinding)
+        self.assertRaises(SimpleFacetValueError, second.validateBinding)
+
+    def testAssignedPlural (self):
+        instance = leaf(v=[1])
+        instance.validateBinding()
+        instance.v.extend([2, 3])
+        self.assertRaises(pyxb.UnprocessedElementContentError, instance.validateBinding)
+        del instance.v[1:]
+        instance.validateBinding()
+        instance.v.pop()
+        self.assertRaises(pyxb.IncompleteElementContentError, instance.validateBinding)
+        instance.v = [1, 2]
+        instance.validateBinding()
+        instance.v[1:] = [2, 3]
+        self.assertRaises(pyxb.UnprocessedElementContentError, instance.validateBinding)
+        self.assertRaises(pyxb.UnprocessedElementContentError, instance.toxml, 'utf-8')
+        parent = tNode(label='parent', child=[_Tree(0, binding=tNode), _Tree(0, binding=tNode), _Tree(0, binding=tNode)])
+        parent.validateBinding()
+        parent.child.append(_Tree(0, binding=tNode))
+        self.assertRaises(pyxb.UnprocessedElementContentError, parent.validateBinding)
+
+    def testUnconvertedPlural (self):
+        values = [1]
+        instance = leaf()
+        pyxb.RequireValidWhenParsing(False)
+        try:
+            instance.v = values
+        finally:
+            pyxb.RequireValidWhenParsing(True)
+        instance.validateBinding()
+        values.extend([2, 3])
+        self.assertRaises(pyxb.UnprocessedElementContentError, instance.validateBinding)
+        del values[:]
+        self.assertRaises(pyxb.IncompleteElementContentError, instance.validateBinding)
+
+    def testOrderedContent (self):
+        instance = CreateFromDocument('<ns:text xmlns:ns="urn:revalidation">one<b>two</b>three</ns:text>')
+        instance.validateBinding()
+        self.assertTrue(six.b('>one<b>two</b>three<') in instance.toxml('utf-8'))
+        instance.orderedContent().reverse()
+        self.assertTrue(six.b('>three<b>two</b>one<') in instance.toxml('utf-8'))
+
+    def testCopy (self):
+        instance = _Tree(1)
+        instance.validateBinding()
+        for clone in (copy.deepcopy(instance), pickle.loads(pickle.dumps(instance, 2))):
+            self.assertEqual(4, self.validateCount(clone))
+            clone.child[0].codes.extend([3, 4])
+            self.assertRaises(SimpleFacetValueError, clone.validateBinding)
+            self.assertEqual(0, self.validateCount(instance))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.utils.domutils
+import pyxb.binding.saxer
+import io
+import pickle
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:slots" targetNamespace="urn:slots">
+  <xs:complexType name="tBase">
+    <xs:sequence>
+      <xs:element name="name" type="xs:string"/>
+    </xs:sequence>
+    <xs:attribute name="id" type="xs:int"/>
+  </xs:complexType>
+  <xs:complexType name="tDerived">
+    <xs:complexContent>
+      <xs:extension base="tns:tBase">
+        <xs:sequence>
+          <xs:element name="tag" type="xs:string" maxOccurs="unbounded"/>
+        </xs:sequence>
+        <xs:attribute name="flag" type="xs:boolean"/>
+      </xs:extension>
+    </xs:complexContent>
+  </xs:complexType>
+  <xs:complexType name="tMixed" mixed="true">
+    <xs:sequence>
+      <xs:element name="em" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="derived" type="tns:tDerived"/>
+  <xs:element name="mixed" type="tns:tMixed"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd, generate_slots=True, compact_instances=True)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestSlots (unittest.TestCase):
+
+    xmlt = '<tns:derived xmlns:tns="urn:slots" id="3" flag="true"><name>n</name><tag>a</tag><tag>b</tag></tns:derived>'
+
+    def testSlots (self):
+        self.assertEqual(2, len(tBase.__slots__))
+        self.assertEqual(2, len(tDerived.__slots__))
+        instance = CreateFromDocument(self.xmlt)
+        self.assertEqual('n', instance.name)
+        self.assertEqual(['a', 'b'], list(instance.tag))
+        self.assertEqual(3, instance.id)
+        self.assertTrue(instance.flag)
+        for slot in tBase.__slots__ + tDerived.__slots__:
+            self.assertFalse(slot in instance.__dict__)
+            self.assertTrue(getattr(instance, slot) is not None)
+
+    def testAssignment (self):
+        instance = derived(name='n', tag=['a'], id=4)
+        instance.tag.append('b')
+        instance.flag = False
+        self.assertEqual(['a', 'b'], list(instance.tag))
+        copy = CreateFromDocument(instance.toxml('utf-8'))
+        self.assertEqual(['a', 'b'], list(copy.tag))
+        self.assertEqual(4, copy.id)
+        self.assertFalse(copy.flag)
+
+    def testCompact (self):
+        instance = CreateFromDocument(self.xmlt)
+        self.assertTrue(instance._location() is None)
+        self.assertTrue(instance._namespaceContext() is None)
+        self.assertEqual(0, len(instance.orderedContent()))
+        xmld = instance.toxml('utf-8', root_only=True).decode('utf-8')
+        self.assertTrue(xmld.endswith('><name>n</name><tag>a</tag><tag>b</tag></ns1:derived>'))
+
+    def testCompactMixed (self):
+        xmlt = '<ns1:mixed xmlns:ns1="urn:slots">some <em>mixed</em> text</ns1:mixed>'
+        instance = CreateFromDocument(xmlt)
+        self.assertEqual(3, len(instance.orderedContent()))
+        self.assertEqual(xmlt, instance.toxml('utf-8', root_only=True).decode('utf-8'))
+
+    def testPickle (self):
+        instance = CreateFromDocument(self.xmlt)
+        copy = pickle.loads(pickle.dumps(instance, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual('n', copy.name)
+        self.assertEqual(['a', 'b'], list(copy.tag))
+        self.assertEqual(3, copy.id)
+        self.assertTrue(copy.flag)
+        self.assertEqual(instance.toxml('utf-8'), copy.toxml('utf-8'))
+
+    def testGeneratorOptions (self):
+        g = pyxb.binding.generate.Generator(generate_slots=True)
+        args = g.getCommandLineArgs()
+        self.assertTrue('--generate-slots' in args)
+        self.assertTrue('--no-compact-instances' in args)
+        g = pyxb.binding.generate.Generator(argv=['--compact-instances'])
+        self.assertTrue(g.compactInstances())
+        self.assertFalse(g.generateSlots())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.snapshot
+import pyxb.utils.domutils
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:snapshot" targetNamespace="urn:snapshot">
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:string">
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tCodes">
+    <xs:list itemType="tns:tCode"/>
+  </xs:simpleType>
+  <xs:simpleType name="tSize">
+    <xs:union memberTypes="xs:int tns:tCode"/>
+  </xs:simpleType>
+  <xs:complexType name="tPrice">
+    <xs:simpleContent>
+      <xs:extension base="xs:decimal">
+        <xs:attribute name="currency" type="tns:tCode"/>
+      </xs:extension>
+    </xs:simpleContent>
+  </xs:complexType>
+  <xs:complexType name="tItem">
+    <xs:sequence>
+      <xs:element name="code" type="tns:tCode"/>
+      <xs:element name="price" type="tns:tPrice" nillable="true"/>
+      <xs:element name="size" type="tns:tSize" minOccurs="0" maxOccurs="unbounded"/>
+      <xs:element name="codes" type="tns:tCodes" minOccurs="0"/>
+      <xs:element name="ref" type="xs:QName" minOccurs="0"/>
+      <xs:element name="when" type="xs:dateTime" minOccurs="0"/>
+      <xs:element name="data" type="xs:base64Binary" minOccurs="0"/>
+      <xs:element name="flag" type="xs:boolean" minOccurs="0"/>
+      <xs:element name="ratio" type="xs:double" minOccurs="0"/>
+    </xs:sequence>
+    <xs:attribute name="id" type="xs:int" use="required"/>
+    <xs:anyAttribute namespace="##other" processContents="skip"/>
+  </xs:complexType>
+  <xs:complexType name="tSpecial">
+    <xs:complexContent>
+      <xs:extension base="tns:tItem">
+        <xs:attribute name="special" type="xs:string"/>
+      </xs:extension>
+    </xs:complexContent>
+  </xs:complexType>
+  <xs:complexType name="tNote" mixed="true">
+    <xs:sequence>
+      <xs:element name="em" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="catalog">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="item" type="tns:tItem" maxOccurs="unbounded"/>
+        <xs:element name="note" type="tns:tNote" minOccurs="0"/>
+        <xs:any namespace="##other" processContents="lax" minOccurs="0" maxOccurs="unbounded"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="note" type="tns:tNote"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+from pyxb.binding.snapshot import CreateSnapshot, CreateFromSnapshot
+
+import unittest
+
+xmlt = '''<tns:catalog xmlns:tns="urn:snapshot" xmlns:o="urn:other" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<item id="1" o:extra="x"><code>abc</code><price currency="EUR">1.50</price><size>3</size><size>XL</size><codes>a bc def</codes><ref>tns:item</ref><when>2013-04-05T06:07:08.25Z</when><data>AAEC</data><flag>true</flag><ratio>0.5</ratio></item>
+<item id="2" xsi:type="tns:tSpecial" special="yes"><code>def</code><price xsi:nil="true"/></item>
+<note>some <em>mixed</em> text</note>
+<o:other>wild</o:other>
+</tns:catalog>'''
+
+class TestSnapshot (unittest.TestCase):
+
+    def testRoundTrip (self):
+        instance = CreateFromDocument(xmlt)
+        snapshot = CreateSnapshot(instance)
+        self.assertTrue(isinstance(snapshot, bytes))
+        copy = CreateFromSnapshot(snapshot)
+        self.assertEqual(instance.toxml('utf-8'), copy.toxml('utf-8'))
+        item = copy.item[0]
+        self.assertEqual('EUR', item.price.currency)
+        self.assertEqual(instance.item[0].price.value(), item.price.value())
+        self.assertEqual([3, 'XL'], list(item.size))
+        self.assertTrue(isinstance(item.size[0], pyxb.binding.datatypes.int))
+        self.assertTrue(isinstance(item.size[1], tCode))
+        self.assertEqual(['a', 'bc', 'def'], list(item.codes))
+        self.assertEqual(pyxb.namespace.ExpandedName(Namespace, 'item'), item.ref)
+        self.assertEqual(instance.item[0].when, item.when)
+        self.assertEqual(instance.item[0].data, item.data)
+        self.assertTrue(item.flag)
+        self.assertEqual(0.5, item.ratio)
+        self.assertEqual('x', item.wildcardAttributeMap()[pyxb.namespace.ExpandedName('urn:other', 'extra')])
+        self.assertTrue(isinstance(copy.item[1], tSpecial))
+        self.assertEqual('yes', copy.item[1].special)
+        self.assertTrue(copy.item[1].price._isNil())
+        self.assertEqual(['some ', 'mixed', ' text'], [ _c.value for _c in copy.note.orderedContent() ])
+        self.assertEqual(1, len(copy.wildcardElements()))
+
+    def testElement (self):
+        instance = CreateFromDocument(xmlt)
+        copy = CreateFromSnapshot(CreateSnapshot(instance.note))
+        self.assertEqual(instance.note._element(), copy._element())
+        self.assertEqual(instance.note.toxml('utf-8', root_only=True), copy.toxml('utf-8', root_only=True))
+        instance = CreateFromDocument('<tns:note xmlns:tns="urn:snapshot">a <em>b</em></tns:note>')
+        copy = CreateFromSnapshot(CreateSnapshot(instance))
+        self.assertEqual(note, copy._element())
+        self.assertEqual(instance.toxml('utf-8'), copy.toxml('utf-8'))
+
+    def testValidation (self):
+        instance = CreateFromDocument(xmlt)
+        instance.item[0].code = tCode('abcd', _validate_constraints=False)
+        self.assertRaises(SimpleFacetValueError, CreateSnapshot, instance)
+        snapshot = CreateSnapshot(instance, validate=False)
+        self.assertRaises(SimpleFacetValueError, CreateFromSnapshot, snapshot)
+        copy = CreateFromSnapshot(snapshot, validate=False)
+        self.assertEqual('abcd', copy.item[0].code)
+
+    def testAppend (self):
+        instance = CreateFromDocument(xmlt)
+        copy = CreateFromSnapshot(CreateSnapshot(instance))
+        copy.note.append('more')
+        copy.item.append(tItem(code='ghi', price=4, id=3))
+        self.assertEqual(3, len(copy.item))
+        self.assertTrue(copy.validateBinding())
+
+    def testBadSnapshot (self):
+        instance = CreateFromDocument(xmlt)
+        snapshot = CreateSnapshot(instance)
+        self.assertRaises(SnapshotError, CreateFromSnapshot, b'not a snapshot')
+        self.assertRaises(SnapshotError, CreateFromSnapshot, snapshot[:8] + b'\x63' + snapshot[9:])
+        self.assertRaises(SnapshotError, CreateFromSnapshot, snapshot[:20])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.namespace
+import threading
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:threads" targetNamespace="urn:threads">
+  <xs:complexType name="tRef">
+    <xs:sequence>
+      <xs:element name="ref" type="xs:QName" maxOccurs="unbounded"/>
+    </xs:sequence>
+    <xs:attribute name="count" type="xs:int" use="required"/>
+  </xs:complexType>
+  <xs:element name="refs" type="tns:tRef"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def document (worker, count):
+    # Each worker binds the same prefix to its own namespace, so a
+    # reference resolved in the wrong context is detected.
+    refs = ''.join([ '<ref>p:n%d</ref>' % (_i,) for _i in range(count) ])
+    return '<t:refs xmlns:t="urn:threads" xmlns:p="urn:worker%d" count="%d">%s</t:refs>' % (worker, count, refs)
+
+class TestThreads (unittest.TestCase):
+
+    Workers = 8
+    Iterations = 50
+
+    def runWorkers (self, target):
+        errors = []
+        def run (worker):
+            try:
+                target(worker)
+            except Exception as e:
+                errors.append(e)
+        threads = [ threading.Thread(target=run, args=(_w,)) for _w in range(self.Workers) ]
+        [ _t.start() for _t in threads ]
+        [ _t.join() for _t in threads ]
+        if errors:
+            raise errors[0]
+
+    def testConcurrentParse (self):
+        def parse (worker):
+            uri = 'urn:worker%d' % (worker,)
+            for i in range(self.Iterations):
+                count = 1 + (i % 5)
+                instance = CreateFromDocument(document(worker, count))
+                self.assertEqual(count, instance.count)
+                self.assertEqual(count, len(instance.ref))
+                for (j, ref) in enumerate(instance.ref):
+                    self.assertEqual(uri, ref.namespaceURI())
+                    self.assertEqual('n%d' % (j,), ref.localName())
+                self.assertTrue(pyxb.namespace.NamespaceContext.Current() is None)
+        self.runWorkers(parse)
+
+    def testThreadValidationConfig (self):
+        invalid = document(0, 1).replace(' count="1"', '')
+        self.assertRaises(MissingAttributeError, CreateFromDocument, invalid)
+        def parse (worker):
+            for i in range(self.Iterations):
+                if 0 == (worker % 2):
+                    config = pyxb.GlobalValidationConfig.copy()
+                    config._setForBinding(False)
+                    previous = pyxb.GlobalValidationConfig.setThreadConfig(config)
+                    try:
+                        instance = CreateFromDocument(invalid)
+                        self.assertTrue(instance.count is None)
+                    finally:
+                        pyxb.GlobalValidationConfig.setThreadConfig(previous)
+                else:
+                    self.assertRaises(MissingAttributeError, CreateFromDocument, invalid)
+        self.runWorkers(parse)
+        self.assertTrue(pyxb.GlobalValidationConfig.forBinding)
+        self.assertTrue(pyxb.GlobalValidationConfig.threadConfig() is None)
+
+    def testThreadXMLStyle (self):
+        styles = {}
+        def check (worker):
+            if 0 == (worker % 2):
+                pyxb._SetXMLStyle(pyxb.XMLStyle_minidom, thread_only=True)
+            for i in range(self.Iterations):
+                instance = CreateFromDocument(document(worker, 2))
+                self.assertEqual(2, len(instance.ref))
+            styles[worker] = pyxb._CurrentXMLStyle()
+            pyxb._SetXMLStyle(None, thread_only=True)
+        self.runWorkers(check)
+        for (worker, style) in styles.items():
+            if 0 == (worker % 2):
+                self.assertEqual(pyxb.XMLStyle_minidom, style)
+            else:
+                self.assertEqual(pyxb._XMLStyle, style)
+        self.assertEqual(pyxb._XMLStyle, pyxb._CurrentXMLStyle())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.content
+import pyxb.utils.domutils
+from xml.dom import Node
+
+import os.path
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="a" type="xs:string"/>
+  <xs:element name="b" type="xs:string"/>
+  <xs:element name="c" type="xs:string"/>
+  <xs:element name="seq">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="a" minOccurs="2" maxOccurs="3"/>
+        <xs:choice minOccurs="0">
+          <xs:element ref="b"/>
+          <xs:element ref="c"/>
+        </xs:choice>
+        <xs:any namespace="##other" processContents="lax" minOccurs="0"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="nd">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="a" minOccurs="0"/>
+        <xs:element ref="a"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="all">
+    <xs:complexType>
+      <xs:all>
+        <xs:element ref="a"/>
+        <xs:element ref="b" minOccurs="0"/>
+      </xs:all>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+TransitionTable = pyxb.binding.content.TransitionTable
+
+class TestTransitionTable (unittest.TestCase):
+
+    def testTables (self):
+        table = TransitionTable.ForAutomaton(seq.typeDefinition()._Automaton)
+        self.assertTrue(table is TransitionTable.ForAutomaton(seq.typeDefinition()._Automaton))
+        (element_map, wildcards) = table.stateTable(None)
+        self.assertEqual(1, len(element_map))
+        self.assertEqual(0, len(wildcards))
+        table = TransitionTable.ForAutomaton(all.typeDefinition()._Automaton)
+        self.assertTrue(table.stateTable(None) is None)
+
+    def testSequence (self):
+        instance = CreateFromDocument('<seq><a>1</a><a>2</a><c>3</c></seq>')
+        self.assertEqual(['1', '2'], instance.a)
+        self.assertEqual('3', instance.c)
+        self.assertEqual(None, instance.b)
+        instance = CreateFromDocument('<seq><a>1</a><a>2</a><a>3</a><b>4</b></seq>')
+        self.assertEqual(['1', '2', '3'], instance.a)
+        self.assertEqual('4', instance.b)
+
+    def testCounters (self):
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, '<seq><a>1</a><a>2</a><a>3</a><a>4</a></seq>')
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, '<seq><a>1</a><b>2</b></seq>')
+        self.assertRaises(IncompleteElementContentError, CreateFromDocument, '<seq><a>1</a></seq>')
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, '<seq><a>1</a><a>2</a><b>3</b><c>4</c></seq>')
+
+    def testWildcard (self):
+        instance = CreateFromDocument('<seq xmlns:o="urn:other"><a>1</a><a>2</a><b>3</b><o:x/></seq>')
+        self.assertEqual(1, len(instance.wildcardElements()))
+        wc = instance.wildcardElements()[0]
+        self.assertEqual(Node.ELEMENT_NODE, wc.nodeType)
+        self.assertEqual('x', wc.localName)
+
+    def testNondeterministic (self):
+        instance = CreateFromDocument('<nd><a>1</a></nd>')
+        self.assertEqual(['1'], instance.a)
+        instance = CreateFromDocument('<nd><a>1</a><a>2</a></nd>')
+        self.assertEqual(['1', '2'], instance.a)
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, '<nd><a>1</a><a>2</a><a>3</a></nd>')
+
+    def testAll (self):
+        instance = CreateFromDocument('<all><b>2</b><a>1</a></all>')
+        self.assertEqual('1', instance.a)
+        self.assertEqual('2', instance.b)
+        self.assertRaises(UnrecognizedContentError, CreateFromDocument, '<all><b>2</b><b>1</b></all>')
+
+if __name__ == '__main__':
+    unittest.main()
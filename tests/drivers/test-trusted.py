@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.saxer
+import io
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:trusted" targetNamespace="urn:trusted">
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:string">
+      <xs:maxLength value="3"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:complexType name="tPrice">
+    <xs:simpleContent>
+      <xs:extension base="xs:decimal">
+        <xs:attribute name="currency" type="tns:tCode"/>
+      </xs:extension>
+    </xs:simpleContent>
+  </xs:complexType>
+  <xs:complexType name="tItem">
+    <xs:sequence>
+      <xs:element name="code" type="tns:tCode"/>
+      <xs:element name="price" type="tns:tPrice"/>
+      <xs:element name="tag" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+    <xs:attribute name="id" type="xs:int" use="required"/>
+  </xs:complexType>
+  <xs:complexType name="tNote" mixed="true">
+    <xs:sequence>
+      <xs:element name="em" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="catalog">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="item" type="tns:tItem" maxOccurs="unbounded"/>
+        <xs:element name="note" type="tns:tNote" minOccurs="0"/>
+        <xs:any namespace="##other" processContents="lax" minOccurs="0"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+def parse (xmld, **kw):
+    saxer = pyxb.binding.saxer.make_parser(**kw)
+    handler = saxer.getContentHandler()
+    saxer.parse(io.BytesIO(xmld.encode('utf-8')))
+    return handler.rootObject()
+
+xmlt = '''<tns:catalog xmlns:tns="urn:trusted">
+<item id="1"><code>abc</code><price currency="EUR">1.50</price><tag>a</tag><tag>b</tag></item>
+<item id="2"><code>def</code><price>2</price></item>
+<note>some <em>mixed</em> text</note>
+</tns:catalog>'''
+
+class TestTrusted (unittest.TestCase):
+
+    def testEquivalent (self):
+        validated = parse(xmlt)
+        trusted = parse(xmlt, trusted=True)
+        self.assertEqual(2, len(trusted.item))
+        self.assertEqual(1, trusted.item[0].id)
+        self.assertEqual('abc', trusted.item[0].code)
+        self.assertEqual(['a', 'b'], list(trusted.item[0].tag))
+        self.assertEqual('EUR', trusted.item[0].price.currency)
+        self.assertTrue(isinstance(trusted.item[1].price, tPrice))
+        self.assertEqual(2, trusted.item[1].price.value())
+        self.assertEqual(validated.toxml('utf-8'), trusted.toxml('utf-8'))
+        self.assertTrue(trusted.validateBinding())
+
+    def testOrderedContent (self):
+        instance = parse(xmlt, trusted=True)
+        self.assertEqual(0, len(instance.orderedContent()))
+        self.assertEqual(0, len(instance.item[0].orderedContent()))
+        # Mixed content is always recorded
+        self.assertEqual(['some ', 'mixed', ' text'], [ _c.value for _c in instance.note.orderedContent() ])
+        instance = parse(xmlt, trusted=True, ordered_content=True)
+        self.assertEqual(3, len(instance.orderedContent()))
+        self.assertEqual(4, len(instance.item[0].orderedContent()))
+        self.assertEqual(instance.item[1], instance.orderedContent()[1].value)
+
+    def testFacetsNotChecked (self):
+        xmlf = xmlt.replace('<code>abc</code>', '<code>abcdef</code>').replace('EUR', 'EURO')
+        self.assertRaises(SimpleFacetValueError, parse, xmlf)
+        instance = parse(xmlf, trusted=True)
+        self.assertEqual('abcdef', instance.item[0].code)
+        self.assertEqual('EURO', instance.item[0].price.currency)
+        self.assertRaises(SimpleFacetValueError, instance.validateBinding)
+
+    def testContentModelNotChecked (self):
+        xmlf = xmlt.replace('<code>def</code><price>2</price>', '<price>2</price><code>def</code>')
+        self.assertRaises(UnrecognizedContentError, parse, xmlf)
+        instance = parse(xmlf, trusted=True)
+        self.assertEqual('def', instance.item[1].code)
+        xmlf = xmlt.replace('<code>def</code>', '')
+        self.assertRaises(UnrecognizedContentError, parse, xmlf)
+        instance = parse(xmlf, trusted=True)
+        self.assertTrue(instance.item[1].code is None)
+        self.assertRaises(ValidationError, instance.validateBinding)
+
+    def testWildcard (self):
+        xmlw = xmlt.replace('</tns:catalog>', '<o:extra xmlns:o="urn:other">x</o:extra></tns:catalog>')
+        instance = parse(xmlw, trusted=True)
+        self.assertEqual(1, len(instance.wildcardElements()))
+
+    def testAppend (self):
+        for kw in ({}, { 'trusted': True }, { 'trusted': True, 'ordered_content': True }):
+            instance = parse(xmlt, **kw)
+            instance.item[1].append(tItem._UseForTag('tag').elementBinding()('t'))
+            self.assertEqual('def', instance.item[1].code)
+            self.assertEqual(['t'], list(instance.item[1].tag))
+            instance.item[0].tag.append('c')
+            self.assertEqual(['a', 'b', 'c'], list(instance.item[0].tag))
+            self.assertTrue(instance.validateBinding())
+            self.assertTrue('<tag>t</tag></item>' in instance.toxml('utf-8').decode('utf-8'))
+
+    def testUnrecognized (self):
+        xmlu = xmlt.replace('<tag>a</tag>', '<unknown>a</unknown>')
+        self.assertRaises(StructuralBadDocumentError, parse, xmlu, trusted=True)
+
+if __name__ == '__main__':
+    unittest.main()
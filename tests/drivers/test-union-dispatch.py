@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.binding.datatypes as xs
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:union" targetNamespace="urn:union">
+  <xs:simpleType name="tNil">
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="missing"/>
+      <xs:enumeration value="unknown"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tCode">
+    <xs:restriction base="xs:token">
+      <xs:pattern value="[A-Z]{3}"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="tWhen">
+    <xs:union memberTypes="xs:dateTime xs:date xs:gYear tns:tNil tns:tCode xs:string"/>
+  </xs:simpleType>
+  <xs:simpleType name="tMeasure">
+    <xs:union memberTypes="xs:integer xs:double xs:boolean tns:tNil"/>
+  </xs:simpleType>
+  <xs:simpleType name="tCount">
+    <xs:union memberTypes="xs:date xs:int"/>
+  </xs:simpleType>
+  <xs:simpleType name="tMeasures">
+    <xs:list itemType="tns:tMeasure"/>
+  </xs:simpleType>
+  <xs:simpleType name="tNested">
+    <xs:union memberTypes="tns:tMeasures tns:tWhen"/>
+  </xs:simpleType>
+  <xs:element name="when" type="tns:tWhen"/>
+  <xs:element name="measures" type="tns:tMeasures"/>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestUnionDispatch (unittest.TestCase):
+
+    def assertMember (self, union, text, member, normalize=False):
+        self.assertEqual(member, union._OrderedMemberTypes(text, normalize)[0])
+        if normalize:
+            value = union.Factory(text, _from_xml=True)
+        else:
+            value = union.Factory(text)
+        self.assertEqual(member, type(value))
+
+    def testWhen (self):
+        self.assertMember(tWhen, '2016-10-16T12:00:00Z', xs.dateTime)
+        self.assertMember(tWhen, '2016-10-16', xs.date)
+        self.assertMember(tWhen, '2016', xs.gYear)
+        self.assertMember(tWhen, 'unknown', tNil)
+        self.assertMember(tWhen, 'EUR', tCode)
+        self.assertMember(tWhen, 'EURO', xs.string)
+        self.assertMember(tWhen, 'Unknown', xs.string)
+        self.assertMember(tWhen, '16 October', xs.string)
+
+    def testMeasure (self):
+        self.assertMember(tMeasure, '12', xs.integer)
+        self.assertMember(tMeasure, '-1.5e3', xs.double)
+        self.assertMember(tMeasure, 'INF', xs.double)
+        self.assertMember(tMeasure, 'true', xs.boolean)
+        self.assertMember(tMeasure, 'missing', tNil)
+        self.assertEqual(list(tMeasure._MemberTypes), tMeasure._OrderedMemberTypes('other'))
+        self.assertRaises(SimpleUnionValueError, tMeasure.Factory, 'other')
+
+    def testWhitespace (self):
+        self.assertMember(tMeasure, ' 12 ', xs.integer, normalize=True)
+        self.assertMember(tMeasure, ' true ', xs.boolean, normalize=True)
+        self.assertEqual(xs.integer, type(tMeasure.Factory(' 12 ')))
+        # The enumeration derives from xs:string, which preserves whitespace
+        self.assertRaises(SimpleUnionValueError, tMeasure.Factory, ' missing ', _from_xml=True)
+
+    def testNonString (self):
+        self.assertEqual(tMeasure._MemberTypes, tMeasure._OrderedMemberTypes(12))
+        self.assertEqual(xs.integer, type(tMeasure.Factory(12)))
+        self.assertEqual(tNil, type(tMeasure.Factory(tNil.missing)))
+
+    def testList (self):
+        instance = CreateFromDocument('<measures xmlns="urn:union">1 2.5 missing true</measures>')
+        self.assertEqual([xs.integer, xs.double, tNil, xs.boolean], [ type(_v) for _v in instance ])
+        self.assertMember(tNested, '1 2.5 missing', tMeasures)
+        self.assertMember(tNested, '2016 later', xs.string)
+
+    def testDocument (self):
+        instance = CreateFromDocument('<when xmlns="urn:union">2016-10-16</when>')
+        self.assertTrue(isinstance(instance, xs.date))
+        instance = CreateFromDocument('<when xmlns="urn:union"> missing </when>')
+        self.assertTrue(isinstance(instance, xs.string))
+        self.assertEqual(' missing ', instance)
+
+    def testFallback (self):
+        # A screen that rejects valid text only changes the order in which
+        # members are attempted.
+        screen_re = xs.int._LexicalScreen_re
+        try:
+            xs.int._LexicalScreen_re = xs.boolean._LexicalScreen_re
+            xs.int._InvalidateConstraintValidators()
+            self.assertEqual([xs.date, xs.int], tCount._OrderedMemberTypes('12'))
+            self.assertEqual(xs.int, type(tCount.Factory('12')))
+        finally:
+            xs.int._LexicalScreen_re = screen_re
+            xs.int._InvalidateConstraintValidators()
+        self.assertEqual([xs.int, xs.date], tCount._OrderedMemberTypes('12'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.utils.utility
+import pyxb.utils.uricache
+from pyxb.utils import six
+from pyxb.utils.six.moves import BaseHTTPServer
+import shutil
+import tempfile
+import threading
+import time
+import os.path
+
+# Documents served by the stand-in server.  The entrypoint includes one
+# document and imports another; that document in turn includes a third.
+documents = {
+    'root.xsd': '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:uricache" xmlns:o="urn:uricache:other" targetNamespace="urn:uricache">
+  <xs:include schemaLocation="inc.xsd"/>
+  <xs:import namespace="urn:uricache:other" schemaLocation="sub/other.xsd"/>
+  <xs:element name="root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="tns:inc"/>
+        <xs:element ref="o:other"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>''',
+    'inc.xsd': '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:uricache">
+  <xs:element name="inc" type="xs:string"/>
+</xs:schema>''',
+    'sub/other.xsd': '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:o="urn:uricache:other" targetNamespace="urn:uricache:other">
+  <xs:include schemaLocation="otherinc.xsd"/>
+  <xs:element name="other" type="o:tOther"/>
+</xs:schema>''',
+    'sub/otherinc.xsd': '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:uricache:other">
+  <xs:simpleType name="tOther"><xs:restriction base="xs:int"/></xs:simpleType>
+</xs:schema>''',
+    # Same content as inc.xsd
+    'copy.xsd': '''<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:uricache">
+  <xs:element name="inc" type="xs:string"/>
+</xs:schema>''',
+}
+
+requests = []
+
+class Handler (BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET (self):
+        path = self.path.lstrip('/')
+        requests.append(path)
+        xmls = documents.get(path)
+        if xmls is None:
+            self.send_error(404)
+            return
+        xmld = xmls.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(xmld)))
+        self.end_headers()
+        self.wfile.write(xmld)
+
+    def log_message (self, *args):
+        pass
+
+import unittest
+
+class TestURICache (unittest.TestCase):
+
+    def setUp (self):
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.base = 'http://127.0.0.1:%d/' % (self.server.server_address[1],)
+        self.directory = tempfile.mkdtemp()
+        del requests[:]
+
+    def tearDown (self):
+        pyxb.utils.utility.SetURICache(None)
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def testRetrieve (self):
+        cache = pyxb.utils.uricache.URICache(self.directory)
+        self.assertTrue(cache.isCacheable(self.base + 'inc.xsd'))
+        self.assertFalse(cache.isCacheable('/tmp/inc.xsd'))
+        self.assertTrue(cache.lookup(self.base + 'inc.xsd') is None)
+        xmld = cache.retrieve(self.base + 'inc.xsd')
+        self.assertEqual(documents['inc.xsd'].encode('utf-8'), xmld)
+        self.assertEqual(xmld, cache.retrieve(self.base + 'inc.xsd'))
+        self.assertEqual(['inc.xsd'], requests)
+        self.assertEqual((1, 1), (cache.hits(), cache.misses()))
+        # Identical content is stored once
+        cache.retrieve(self.base + 'copy.xsd')
+        self.assertEqual(1, len(os.listdir(os.path.join(self.directory, 'content'))))
+        self.assertEqual(2, len(os.listdir(os.path.join(self.directory, 'uri'))))
+
+    def testOffline (self):
+        cache = pyxb.utils.uricache.URICache(self.directory)
+        cache.retrieve(self.base + 'inc.xsd')
+        cache = pyxb.utils.uricache.URICache(self.directory, offline=True)
+        self.assertEqual(documents['inc.xsd'].encode('utf-8'), cache.retrieve(self.base + 'inc.xsd'))
+        self.assertRaises(IOError, cache.retrieve, self.base + 'root.xsd')
+        self.assertEqual(['inc.xsd'], requests)
+
+    def testDataFromURI (self):
+        cache = pyxb.utils.uricache.URICache(self.directory)
+        self.assertTrue(pyxb.utils.utility.SetURICache(cache) is None)
+        pyxb.utils.utility.DataFromURI(self.base + 'inc.xsd')
+        pyxb.utils.utility.DataFromURI(self.base + 'inc.xsd')
+        pyxb.utils.utility.DataFromURI(self.base + 'inc.xsd', use_cache=False)
+        self.assertEqual(['inc.xsd', 'inc.xsd'], requests)
+        self.assertTrue(pyxb.utils.utility.SetURICache(None) is cache)
+
+    def testPrefetch (self):
+        cache = pyxb.utils.uricache.URICache(self.directory)
+        retrieved = cache.prefetchSchemas([self.base + 'root.xsd', self.base + 'missing.xsd'], workers=3)
+        self.assertEqual(set([ self.base + _p for _p in ('root.xsd', 'inc.xsd', 'sub/other.xsd', 'sub/otherinc.xsd') ]), retrieved)
+        # Python 2 repeats a failed request using urllib
+        self.assertEqual(set(['root.xsd', 'inc.xsd', 'sub/other.xsd', 'sub/otherinc.xsd', 'missing.xsd']), set(requests))
+        del requests[:]
+        retrieved = cache.prefetchSchemas([self.base + 'root.xsd'], import_filter=lambda _ns: False)
+        self.assertEqual(set([ self.base + _p for _p in ('root.xsd', 'inc.xsd') ]), retrieved)
+        self.assertEqual([], requests)
+
+    def testPrefetchConcurrency (self):
+        wide = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">%s</xs:schema>' % (''.join([ '<xs:include schemaLocation="w%d.xsd"/>' % (_i,) for _i in range(8) ]),)
+        state = { 'active': 0, 'peak': 0 }
+        lock = threading.Lock()
+        class SlowCache (pyxb.utils.uricache.URICache):
+            def retrieve (self, location):
+                with lock:
+                    state['active'] += 1
+                    state['peak'] = max(state['peak'], state['active'])
+                time.sleep(0.05)
+                with lock:
+                    state['active'] -= 1
+                if location.endswith('wide.xsd'):
+                    return wide.encode('utf-8')
+                return documents['inc.xsd'].encode('utf-8')
+        cache = SlowCache(self.directory)
+        retrieved = cache.prefetchSchemas([self.base + 'wide.xsd'], workers=4)
+        self.assertEqual(9, len(retrieved))
+        self.assertTrue(1 < state['peak'] <= 4)
+
+    def testGenerate (self):
+        generator = pyxb.binding.generate.Generator(uri_cache_directory=self.directory, generate_to_files=False)
+        generator.addSchemaLocation(self.base + 'root.xsd')
+        code = generator.bindingModules()
+        self.assertEqual(4, len(requests))
+        self.assertEqual(4, len(set(requests)))
+        self.assertEqual(4, pyxb.utils.utility.GetURICache().misses())
+        args = generator.getCommandLineArgs()
+        self.assertTrue(('--uri-cache-directory=' + self.directory) in args)
+        self.assertFalse('--offline' in args)
+        generator = pyxb.binding.generate.Generator(argv=['--uri-cache-directory', self.directory, '--offline'])
+        self.assertTrue(generator.offline())
+
+if __name__ == '__main__':
+    unittest.main()
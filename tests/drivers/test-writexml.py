@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import pyxb.binding.generate
+import pyxb.utils.domutils
+from pyxb.utils import six
+import io
+
+xsd='''<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:writexml" targetNamespace="urn:writexml">
+  <xs:complexType name="tBase">
+    <xs:sequence>
+      <xs:element name="name" type="xs:string"/>
+    </xs:sequence>
+    <xs:attribute name="label" type="xs:string"/>
+  </xs:complexType>
+  <xs:complexType name="tDerived">
+    <xs:complexContent>
+      <xs:extension base="tns:tBase">
+        <xs:sequence>
+          <xs:element name="ref" type="xs:QName" minOccurs="0"/>
+        </xs:sequence>
+      </xs:extension>
+    </xs:complexContent>
+  </xs:complexType>
+  <xs:complexType name="tMixed" mixed="true">
+    <xs:sequence>
+      <xs:element name="em" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+    </xs:sequence>
+  </xs:complexType>
+  <xs:element name="root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="item" type="tns:tBase" maxOccurs="unbounded"/>
+        <xs:element name="count" type="xs:int" nillable="true" minOccurs="0"/>
+        <xs:element name="note" type="tns:tMixed" minOccurs="0"/>
+        <xs:any namespace="##other" processContents="lax" minOccurs="0" maxOccurs="unbounded"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>'''
+
+code = pyxb.binding.generate.GeneratePython(schema_text=xsd)
+#open('code.py', 'w').write(code)
+
+rv = compile(code, 'test', 'exec')
+eval(rv)
+
+from pyxb.exceptions_ import *
+
+import unittest
+
+class TestWriteXML (unittest.TestCase):
+
+    def tearDown (self):
+        pyxb.utils.domutils.BindingDOMSupport.SetDefaultNamespace(None)
+
+    def testSimple (self):
+        xmlt = six.u('<ns1:root xmlns:ns1="urn:writexml"><item label="a &amp; &quot;b&quot;"><name>one &lt;1&gt;</name></item><item><name>two</name></item></ns1:root>')
+        instance = CreateFromDocument(xmlt)
+        self.assertEqual(instance.toxml('utf-8', root_only=True), xmlt.encode('utf-8'))
+        stream = io.BytesIO()
+        self.assertTrue(stream is instance.writeXML(stream, 'utf-8', root_only=True))
+        self.assertEqual(stream.getvalue(), xmlt.encode('utf-8'))
+        stream = io.StringIO()
+        instance.toxml(stream=stream)
+        self.assertEqual(stream.getvalue(), instance.toxml())
+
+    def testXSIType (self):
+        instance = root(item=[ tDerived(name='one', ref=Namespace.createExpandedName('other'), label='x') ])
+        stream = io.StringIO()
+        instance.writeXML(stream, root_only=True)
+        xmlt = stream.getvalue()
+        self.assertEqual(xmlt, six.u('<ns1:root xmlns:ns1="urn:writexml"><item xsi:type="ns1:tDerived" label="x" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"><name>one</name><ref>ns1:other</ref></item></ns1:root>'))
+        copy = CreateFromDocument(xmlt)
+        self.assertTrue(isinstance(copy.item[0], tDerived))
+        self.assertEqual(copy.item[0].ref, Namespace.createExpandedName('other'))
+
+    def testNil (self):
+        instance = root(item=[ tBase('one') ])
+        instance.count = root.typeDefinition()._ElementMap['count'].elementBinding()(_nil=True)
+        stream = io.StringIO()
+        instance.writeXML(stream, root_only=True)
+        xmlt = stream.getvalue()
+        self.assertTrue(0 < xmlt.find('xsi:nil="true"'))
+        copy = CreateFromDocument(xmlt)
+        self.assertTrue(copy.count._isNil())
+
+    def testMixed (self):
+        xmlt = six.u('<ns1:root xmlns:ns1="urn:writexml"><item><name>one</name></item><note>text <em>with</em> markup<em></em></note></ns1:root>')
+        instance = CreateFromDocument(xmlt)
+        stream = io.StringIO()
+        instance.writeXML(stream, root_only=True)
+        self.assertEqual(stream.getvalue(), xmlt)
+
+    def testWildcard (self):
+        xmlt = six.u('<ns1:root xmlns:ns1="urn:writexml"><item><name>one</name></item><ns2:extra xmlns:ns2="urn:other" at="v"><ns2:sub/></ns2:extra></ns1:root>')
+        instance = CreateFromDocument(xmlt)
+        stream = io.StringIO()
+        instance.writeXML(stream, root_only=True)
+        copy = CreateFromDocument(stream.getvalue())
+        self.assertEqual(1, len(copy.wildcardElements()))
+        extra = copy.wildcardElements()[0]
+        self.assertEqual('urn:other', extra.namespaceURI)
+        self.assertEqual('extra', extra.localName)
+
+    def testDefaultNamespace (self):
+        instance = root(item=[ tBase('one') ])
+        bds = pyxb.utils.domutils.BindingStreamSupport(default_namespace=Namespace)
+        stream = io.StringIO()
+        instance.toxml(stream=stream, bds=bds, root_only=True)
+        self.assertEqual(stream.getvalue(), six.u('<root xmlns="urn:writexml"><item><name>one</name></item></root>'))
+        bds = pyxb.utils.domutils.BindingDOMSupport(default_namespace=Namespace)
+        self.assertEqual(instance.toxml(bds=bds, root_only=True), stream.getvalue())
+
+    def testBadSupport (self):
+        instance = root(item=[ tBase('one') ])
+        bds = pyxb.utils.domutils.BindingDOMSupport()
+        self.assertRaises(pyxb.UsageError, instance.toxml, stream=io.StringIO(), bds=bds)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -144,6 +144,77 @@ class TestExpandedName (unittest.TestCase):
         self.assertEqual(xsd_module.int, int_en.typeBinding())
         self.assertRaises(pyxb.NamespaceError, getattr, int_en, 'notACategory')
 
+class TestInternedName (unittest.TestCase):
+    def testTuple (self):
+        en1 = ExpandedName.Intern((xsd.uri(), 'internedTuple'))
+        en2 = ExpandedName.Intern((xsd.uri(), 'internedTuple'))
+        self.assertTrue(en1 is en2)
+        self.assertEqual(xsd, en1.namespace())
+        self.assertEqual('internedTuple', en1.localName())
+        an1 = ExpandedName.Intern((None, 'internedTuple'))
+        self.assertTrue(an1 is not en1)
+        self.assertTrue(an1.namespace() is None)
+        self.assertTrue(an1 is ExpandedName.Intern((None, 'internedTuple')))
+
+    def testCanonical (self):
+        en1 = ExpandedName(xsd, 'internedCanonical')
+        self.assertTrue(en1 is ExpandedName.Intern(en1))
+        en2 = ExpandedName(xsd, 'internedCanonical')
+        self.assertEqual(en1, en2)
+        self.assertTrue(en1 is ExpandedName.Intern(en2))
+        self.assertTrue(en1 is ExpandedName.Intern((xsd.uri(), 'internedCanonical')))
+
+    def testFallback (self):
+        an = pyxb.namespace.CreateAbsentNamespace()
+        an2 = pyxb.namespace.CreateAbsentNamespace()
+        ln = 'internedFallback'
+        en0 = ExpandedName.Intern((None, ln))
+        en1 = ExpandedName.Intern((None, ln), fallback_namespace=an)
+        en2 = ExpandedName.Intern((None, ln), fallback_namespace=an2)
+        self.assertTrue(en0.namespace() is None)
+        self.assertTrue(en1.namespace() is an)
+        self.assertTrue(en2.namespace() is an2)
+        self.assertTrue(en1 is ExpandedName.Intern((None, ln), fallback_namespace=an))
+        self.assertTrue(en1 is ExpandedName.Intern(ExpandedName(an, ln)))
+        # Fallback applies only to names without a namespace
+        self.assertTrue(ExpandedName.Intern((xsd.uri(), ln), fallback_namespace=an).namespace() is xsd)
+
+    def testLimit (self):
+        limit = ExpandedName._InternLimit
+        try:
+            ExpandedName._InternLimit = 4
+            en1 = ExpandedName.Intern((None, 'internedLimit'))
+            for i in range(8):
+                ExpandedName.Intern((None, 'internedLimit%d' % (i,)))
+            en2 = ExpandedName.Intern((None, 'internedLimit'))
+            self.assertTrue(en1 is not en2)
+            self.assertEqual(en1, en2)
+        finally:
+            ExpandedName._InternLimit = limit
+
+    def testLimitRetainsDeclared (self):
+        limit = ExpandedName._InternLimit
+        try:
+            ExpandedName._InternLimit = 4
+            declared = ExpandedName.Intern(ExpandedName(xsd, 'internedDeclared'))
+            parsed = ExpandedName.Intern((xsd.uri(), 'internedPromoted'))
+            self.assertTrue(parsed is ExpandedName.Intern(ExpandedName(xsd, 'internedPromoted')))
+            for i in range(8):
+                ExpandedName.Intern((None, 'internedRetained%d' % (i,)))
+            self.assertTrue(declared is ExpandedName.Intern((xsd.uri(), 'internedDeclared')))
+            self.assertTrue(parsed is ExpandedName.Intern((xsd.uri(), 'internedPromoted')))
+        finally:
+            ExpandedName._InternLimit = limit
+
+    def testPickle (self):
+        import pickle
+        en = ExpandedName(None, 'internedPickle')
+        hash(en)
+        self.assertFalse('_ExpandedName__hash' in en.__getstate__())
+        en2 = pickle.loads(pickle.dumps(en))
+        self.assertEqual(en, en2)
+        self.assertEqual(hash(en), hash(en2))
+
 class TestCategories (unittest.TestCase):
     def testXSDCategories (self):
         # Need type and element bindings, along with all the component ones
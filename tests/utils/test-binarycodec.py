@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import unittest
+import base64
+import binascii
+import io
+import tempfile
+from pyxb.utils import six
+from pyxb.utils.binarycodec import *
+
+def _Decode (decoder, text, piece_length):
+    for i in range(0, len(text), piece_length):
+        decoder.feed(text[i:i+piece_length])
+    return decoder.close()
+
+class TestBase64Decoder (unittest.TestCase):
+
+    data = six.b('').join([ six.int2byte(_i) for _i in range(256) ]) * 3
+
+    def testPieces (self):
+        literal = base64.encodestring(self.data) if six.PY2 else base64.encodebytes(self.data)
+        literal = literal.decode('ascii')
+        for piece_length in (1, 3, 4, 7, 76, 77, len(literal)):
+            self.assertEqual(self.data, _Decode(Base64Decoder(), literal, piece_length))
+        for tail in range(1, 4):
+            data = self.data[:len(self.data)-tail]
+            literal = base64.standard_b64encode(data).decode('ascii')
+            for piece_length in (1, 2, 5):
+                self.assertEqual(data, _Decode(Base64Decoder(), literal, piece_length))
+
+    def testWhitespace (self):
+        self.assertEqual(six.b(''), _Decode(Base64Decoder(), six.u(''), 1))
+        self.assertEqual(six.b(''), _Decode(Base64Decoder(), six.u(' \n'), 1))
+        self.assertEqual(six.b('e'), _Decode(Base64Decoder(), six.u(' Z Q = = '), 2))
+        self.assertEqual(six.b('e'), _Decode(Base64Decoder(), six.u('ZQ=\r\n\t='), 2))
+
+    def testInvalid (self):
+        for literal in ('Z', 'Zg', 'Zg=', 'ZZZ=', 'Z===', 'ZQ==ZQ==', 'ZQ==Z', 'Zm9v!', 'Zm9v\xe9'):
+            for piece_length in (1, 3):
+                self.assertRaises(ValueError, _Decode, Base64Decoder(), six.u(literal), piece_length)
+
+    def testValidateLength (self):
+        self.assertRaises(ValueError, _Decode, Base64Decoder(validate_length=4), six.u('ZZZ='), 1)
+        self.assertEqual(six.b('e\x96'), _Decode(Base64Decoder(validate_length=3), six.u('ZZZ='), 1))
+        self.assertEqual(six.b('e\x96'), _Decode(Base64Decoder(validate_length=-1), six.u('ZZZ='), 1))
+        self.assertRaises(ValueError, _Decode, Base64Decoder(validate_length=-1), six.u('Zm9v!'), 1)
+
+    def testSinks (self):
+        literal = base64.standard_b64encode(self.data).decode('ascii')
+        sink = bytearray()
+        self.assertTrue(sink is _Decode(Base64Decoder(sink), literal, 100))
+        self.assertEqual(self.data, memoryview(sink).tobytes())
+        sink = tempfile.TemporaryFile()
+        self.assertTrue(sink is _Decode(Base64Decoder(sink), literal, 100))
+        sink.seek(0)
+        self.assertEqual(self.data, sink.read())
+        sink.close()
+
+class TestHexDecoder (unittest.TestCase):
+
+    def testPieces (self):
+        data = six.b('').join([ six.int2byte(_i) for _i in range(256) ])
+        literal = binascii.hexlify(data).decode('ascii')
+        for piece_length in (1, 2, 3, len(literal)):
+            self.assertEqual(data, _Decode(HexDecoder(), literal, piece_length))
+            self.assertEqual(data, _Decode(HexDecoder(), literal.upper(), piece_length))
+
+    def testWhitespace (self):
+        self.assertEqual(six.b(''), _Decode(HexDecoder(), six.u(''), 1))
+        self.assertEqual(six.b(''), _Decode(HexDecoder(), six.u(' \n '), 1))
+        self.assertEqual(six.b('\x0a\xff'), _Decode(HexDecoder(), six.u('\n  0aFf \n'), 1))
+        self.assertEqual(six.b('\x0a\xff'), _Decode(HexDecoder(), six.u('\n  0aFf \n'), 4))
+
+    def testInvalid (self):
+        for literal in ('0', '012', '0a f0', '0a\n0f', 'sb', '0x'):
+            for piece_length in (1, 2, 3):
+                self.assertRaises(ValueError, _Decode, HexDecoder(), six.u(literal), piece_length)
+
+class TestChunks (unittest.TestCase):
+
+    data = six.b('').join([ six.int2byte(_i % 256) for _i in range(1000) ])
+
+    def testBase64 (self):
+        literal = base64.standard_b64encode(self.data).decode('ascii')
+        for chunk_size in (1, 3, 100, 2000):
+            chunks = list(Base64Chunks(self.data, chunk_size))
+            self.assertEqual(literal, ''.join(chunks))
+            self.assertTrue(all([ '=' not in _c for _c in chunks[:-1] ]))
+        self.assertEqual(literal, ''.join(Base64Chunks(io.BytesIO(self.data), 300)))
+        self.assertEqual([], list(Base64Chunks(six.b(''))))
+
+    def testHex (self):
+        literal = binascii.hexlify(self.data).decode('ascii').upper()
+        for chunk_size in (1, 7, 2000):
+            self.assertEqual(literal, ''.join(HexChunks(self.data, chunk_size)))
+        self.assertEqual(literal, ''.join(HexChunks(io.BytesIO(self.data), 7)))
+
+if __name__ == '__main__':
+    unittest.main()
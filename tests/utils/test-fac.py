@@ -427,5 +427,38 @@ class TestFAC (unittest.TestCase):
         cfg = cfg.step('s')
         self.assertEqual(1, len(cfg.candidateTransitions('s')))
 
+    def testCloneSharing (self):
+        ex = NumericalConstraint(Sequence(NumericalConstraint(self.a, 1, None), self.b), 2, 3)
+        au = ex.buildAutomaton()
+        cfg = Configuration(au)
+        cfg.step('a')
+        clone = cfg.clone()
+        clone.step('a')
+        clone.step('b')
+        self.assertFalse(cfg.isAccepting())
+        cfg.step('b')
+        cfg.step('a')
+        cfg.step('b')
+        self.assertTrue(cfg.isAccepting())
+        clone.step('a')
+        clone.step('b')
+        self.assertTrue(clone.isAccepting())
+
+    def testDistinct (self):
+        # Counters without an upper bound are equivalent once they reach
+        # their lower bound; bounded counters must match exactly.
+        ex = Sequence(NumericalConstraint(self.a, 2, None), NumericalConstraint(self.b, 0, 3))
+        au = ex.buildAutomaton()
+        cfgs = []
+        for word in ('aa', 'aaa', 'aaaa', 'a', 'aab', 'aaab', 'aabb'):
+            cfg = Configuration(au)
+            for c in word:
+                cfg.step(c)
+            cfgs.append(cfg)
+        distinct = Configuration.Distinct(cfgs)
+        self.assertEqual([cfgs[0], cfgs[3], cfgs[4], cfgs[6]], distinct)
+        pairs = [ (_c, None) for _c in cfgs ]
+        self.assertEqual([pairs[0], pairs[3]], Configuration.Distinct(pairs[:4], key=lambda _p: _p[0]))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import logging
+if __name__ == '__main__':
+    logging.basicConfig()
+_log = logging.getLogger(__name__)
+import unittest
+import io
+import xml.sax
+import pyxb
+from pyxb.utils import saxutils
+
+try:
+    import lxml.etree
+    have_lxml = True
+except ImportError:
+    have_lxml = False
+
+class RecordingHandler (saxutils.BaseSAXHandler):
+    def __init__ (self, **kw):
+        super(RecordingHandler, self).__init__(**kw)
+        self.events = []
+
+    def startPrefixMapping (self, prefix, uri):
+        super(RecordingHandler, self).startPrefixMapping(prefix, uri)
+        self.events.append(('ns', prefix, uri))
+
+    def startElementNS (self, name, qname, attrs):
+        (this_state, parent_state, ns_ctx, name_en) = super(RecordingHandler, self).startElementNS(name, qname, attrs)
+        self.events.append(('start', name, sorted([ (_n, attrs.getValue(_n)) for _n in attrs.getNames() ], key=lambda _a: (_a[0][0] or '', _a[0][1]))))
+        self.locations.append(this_state.location())
+
+    def endElementNS (self, name, qname):
+        this_state = super(RecordingHandler, self).endElementNS(name, qname)
+        self.events.append(('end', name, this_state.expandedName().uriTuple()))
+
+    def characters (self, content):
+        super(RecordingHandler, self).characters(content)
+        if self.events and ('text' == self.events[-1][0]):
+            self.events[-1] = ('text', self.events[-1][1] + content)
+        else:
+            self.events.append(('text', content))
+
+    def processingInstruction (self, target, data):
+        super(RecordingHandler, self).processingInstruction(target, data)
+        self.events.append(('pi', target, data))
+
+    def reset (self):
+        self.events = []
+        self.locations = []
+        return super(RecordingHandler, self).reset()
+
+xmld = '''<?xml version="1.0"?>
+<a:root xmlns:a="urn:a" xmlns="urn:d" at="1" a:at="2">
+  <child>text &amp; more<?target data?></child>
+  <child xmlns="" plain="x"/>
+</a:root>'''.encode('utf-8')
+
+class TestBackend (unittest.TestCase):
+
+    def tearDown (self):
+        saxutils.SetParserBackend(saxutils.ParserBackend_sax)
+
+    def parse (self, backend, xmld=xmld):
+        saxer = saxutils.make_parser(content_handler_constructor=RecordingHandler, backend=backend)
+        saxer.parse(io.BytesIO(xmld))
+        return saxer.getContentHandler()
+
+    def testParserTypes (self):
+        self.assertTrue(isinstance(saxutils.make_parser(backend=saxutils.ParserBackend_expat), saxutils.ExpatParser))
+        saxutils.SetParserBackend(saxutils.ParserBackend_expat)
+        self.assertTrue(isinstance(saxutils.make_parser(), saxutils.ExpatParser))
+        self.assertRaises(pyxb.PyXBException, saxutils.SetParserBackend, 'expat')
+        if not have_lxml:
+            self.assertRaises(pyxb.PyXBException, saxutils.SetParserBackend, saxutils.ParserBackend_lxml)
+
+    def testExpatEvents (self):
+        sax_handler = self.parse(saxutils.ParserBackend_sax)
+        expat_handler = self.parse(saxutils.ParserBackend_expat)
+        self.assertEqual(sax_handler.events, expat_handler.events)
+        self.assertEqual(('start', ('urn:a', 'root'), [ ((None, 'at'), '1'), (('urn:a', 'at'), '2') ]), expat_handler.events[2])
+        self.assertEqual([ (_l.lineNumber, _l.columnNumber) for _l in sax_handler.locations ],
+                         [ (_l.lineNumber, _l.columnNumber) for _l in expat_handler.locations ])
+
+    def testExpatReuse (self):
+        saxer = saxutils.make_parser(content_handler_constructor=RecordingHandler, backend=saxutils.ParserBackend_expat)
+        self.assertRaises(xml.sax.SAXParseException, saxer.parse, io.BytesIO('<root><x></root>'.encode('utf-8')))
+        saxer.parse(io.BytesIO(xmld))
+        self.assertEqual(self.parse(saxutils.ParserBackend_sax).events, saxer.getContentHandler().events)
+
+    def testExpatIncremental (self):
+        saxer = saxutils.make_parser(content_handler_constructor=RecordingHandler, backend=saxutils.ParserBackend_expat)
+        for i in range(0, len(xmld), 7):
+            saxer.feed(xmld[i:i+7])
+        saxer.close()
+        self.assertEqual(self.parse(saxutils.ParserBackend_sax).events, saxer.getContentHandler().events)
+
+    if have_lxml:
+        def testLXMLEvents (self):
+            sax_handler = self.parse(saxutils.ParserBackend_sax)
+            lxml_handler = self.parse(saxutils.ParserBackend_lxml)
+            self.assertEqual(sax_handler.events, lxml_handler.events)
+
+if '__main__' == __name__:
+    unittest.main()
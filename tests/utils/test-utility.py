@@ -524,6 +524,14 @@ class TestUTCTimeZone (unittest.TestCase):
         self.assertTrue(utc_a < utc_p1)
         self.assertTrue(utc_m1 < utc_a)
 
+    def testIntern (self):
+        utc = UTCOffsetTimeZone.Intern('+05:30')
+        self.assertTrue(utc is UTCOffsetTimeZone.Intern('+05:30'))
+        self.assertEqual(UTCOffsetTimeZone(330), utc)
+        self.assertTrue(UTCOffsetTimeZone.Intern(0) is UTCOffsetTimeZone.Intern(0))
+        self.assertEqual(UTCOffsetTimeZone.Intern('Z'), UTCOffsetTimeZone.Intern(0))
+        self.assertRaises(ValueError, UTCOffsetTimeZone.Intern, '+14:01')
+
 class TestLocalTimeZone (unittest.TestCase):
     pass
 